@@ -0,0 +1,161 @@
+"""
+Benchmark Audio DSP
+Đo hiệu năng DSP Audio
+
+Compares the previous per-sample Python implementations of trim_silence,
+normalize_audio and ensure_audio_format (formerly in models/dia_tts.py) with the
+vectorized versions in tts_backend.audio_dsp, and checks the outputs match.
+No model is needed: the clip is synthetic speech-like noise with silent edges.
+
+So sánh các cài đặt Python theo từng mẫu trước đây của trim_silence,
+normalize_audio và ensure_audio_format (trước nằm trong models/dia_tts.py) với
+bản vector hóa trong tts_backend.audio_dsp, và kiểm tra đầu ra khớp nhau.
+Không cần model: đoạn audio là nhiễu giống giọng nói với hai đầu im lặng.
+
+Usage / Cách dùng:
+    python benchmark_audio_dsp.py [--seconds 60] [--sample-rate 44100]
+"""
+import argparse
+import importlib.util
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Load audio_dsp directly so the benchmark does not import torch via tts_backend
+# Tải trực tiếp audio_dsp để benchmark không import torch qua tts_backend
+_spec = importlib.util.spec_from_file_location(
+    "audio_dsp", Path(__file__).parent / "tts_backend" / "audio_dsp.py"
+)
+audio_dsp = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(audio_dsp)
+
+
+def legacy_trim_silence(audio, threshold=0.01, margin=1000):
+    """Previous per-sample loop / Vòng lặp từng mẫu trước đây"""
+    if audio.size == 0:
+        return audio
+    abs_audio = np.abs(audio)
+    window_size = max(1000, int(0.02 * len(audio)))
+    if window_size > len(audio):
+        window_size = len(audio)
+    window_half = window_size // 2
+    rms_values = []
+    for i in range(len(audio)):
+        start_idx = max(0, i - window_half)
+        end_idx = min(len(audio), i + window_half)
+        window_audio = abs_audio[start_idx:end_idx]
+        rms = np.sqrt(np.mean(window_audio ** 2))
+        rms_values.append(rms)
+    rms_array = np.array(rms_values)
+    non_silent_indices = np.where(rms_array > threshold * 0.5)[0]
+    if non_silent_indices.size == 0:
+        return audio
+    start = max(non_silent_indices[0] - margin, 0)
+    end = min(non_silent_indices[-1] + margin + 1, len(audio))
+    return audio[start:end]
+
+
+def legacy_normalize_audio(audio, target_db=-3.0, max_peak=0.95):
+    """Previous two-pass normalization / Chuẩn hóa hai lượt trước đây"""
+    if audio.size == 0:
+        return audio
+    current_max = np.max(np.abs(audio))
+    if current_max == 0:
+        return audio
+    if current_max > max_peak:
+        audio = audio * (max_peak / current_max)
+        current_max = max_peak
+    if target_db is not None:
+        scale_factor = 10 ** (target_db / 20.0) / current_max
+        if scale_factor * current_max > max_peak:
+            scale_factor = max_peak / current_max
+        audio = audio * scale_factor
+    return audio
+
+
+def legacy_ensure_audio_format(audio):
+    """Previous format coercion / Chuẩn hóa định dạng trước đây"""
+    if audio.size == 0:
+        return audio
+    if audio.dtype != np.float32:
+        if np.issubdtype(audio.dtype, np.integer):
+            audio = audio.astype(np.float32) / np.iinfo(audio.dtype).max
+        else:
+            audio = audio.astype(np.float32)
+    if audio.ndim > 1:
+        if audio.shape[0] == 2:
+            audio = np.mean(audio, axis=0)
+        elif audio.shape[1] == 2:
+            audio = np.mean(audio, axis=1)
+        else:
+            audio = audio.flatten()
+    return np.clip(audio, -1.0, 1.0)
+
+
+def make_clip(seconds: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    """Speech-like clip with 1.5 s of near-silence at each end / Đoạn giống giọng nói với 1.5 s gần im lặng ở mỗi đầu"""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate)
+    t = np.arange(n) / sample_rate
+    # Syllable-rate amplitude envelope / Envelope biên độ theo nhịp âm tiết
+    envelope = 0.3 * (0.6 + 0.4 * np.sin(2 * np.pi * 4.0 * t))
+    audio = rng.standard_normal(n) * envelope
+    edge = int(1.5 * sample_rate)
+    audio[:edge] *= 0.001
+    audio[-edge:] *= 0.001
+    return audio.astype(np.float32)
+
+
+def timed(fn):
+    """Run fn once and return (result, seconds) / Chạy fn một lần, trả về (kết quả, giây)"""
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def report(label: str, old_s: float, new_s: float, match: bool):
+    print(f"  {label:<22} legacy: {old_s * 1000:10.1f} ms   vectorized: {new_s * 1000:8.2f} ms   "
+          f"speedup: {old_s / max(new_s, 1e-9):8.1f}x   match: {match}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio DSP benchmark / Đo hiệu năng DSP audio")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Clip length in seconds")
+    parser.add_argument("--sample-rate", type=int, default=44100, help="Sample rate (Dia outputs 44.1 kHz)")
+    args = parser.parse_args()
+
+    clip = make_clip(args.seconds, args.sample_rate)
+    print("=" * 90)
+    print(f"Audio post-processing: {args.seconds:.0f} s @ {args.sample_rate} Hz ({clip.shape[0]:,} samples)")
+    print(f"Hậu xử lý audio: {args.seconds:.0f} s @ {args.sample_rate} Hz ({clip.shape[0]:,} mẫu)")
+    print("=" * 90)
+
+    old, old_s = timed(lambda: legacy_trim_silence(clip))
+    new, new_s = timed(lambda: audio_dsp.trim_silence(clip))
+    report("trim_silence", old_s, new_s, old.shape == new.shape and np.array_equal(old, new))
+    print(f"    trimmed to / cắt còn: {old.shape[0]:,} (legacy) vs {new.shape[0]:,} (vectorized) samples")
+
+    old, old_s = timed(lambda: legacy_normalize_audio(clip))
+    new, new_s = timed(lambda: audio_dsp.normalize_audio(clip))
+    report("normalize_audio", old_s, new_s, np.allclose(old, new, rtol=1e-6, atol=1e-7))
+
+    loud = clip * 4.0
+    old, old_s = timed(lambda: legacy_normalize_audio(loud, target_db=None))
+    new, new_s = timed(lambda: audio_dsp.normalize_audio(loud, target_db=None))
+    report("normalize (clip only)", old_s, new_s, np.allclose(old, new, rtol=1e-6, atol=1e-7))
+
+    stereo_int = (np.stack([clip, clip * 0.5], axis=1) * 32767).astype(np.int16)
+    old, old_s = timed(lambda: legacy_ensure_audio_format(stereo_int))
+    new, new_s = timed(lambda: audio_dsp.ensure_audio_format(stereo_int))
+    report("ensure_audio_format", old_s, new_s, old.dtype == new.dtype and np.allclose(old, new, atol=1e-7))
+
+    speed = 0.9
+    n = clip.shape[0]
+    old, old_s = timed(lambda: np.interp(np.linspace(0, n - 1, int(n / speed)), np.arange(n), clip).astype(np.float32))
+    new, new_s = timed(lambda: audio_dsp.change_speed(clip, speed))
+    report("change_speed", old_s, new_s, old.shape == new.shape and np.allclose(old, new, atol=1e-5))
+
+
+if __name__ == "__main__":
+    main()
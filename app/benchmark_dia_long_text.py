@@ -0,0 +1,138 @@
+"""
+Benchmark Dia Long-Text Chunking
+Đo hiệu năng Chia nhỏ Văn bản Dài cho Dia
+
+Synthesizes dialog paragraphs of increasing length with Dia, once as a single
+generation (auto_chunk=False) and once chunked (auto_chunk=True), and reports
+peak memory, wall time and output duration for each length. Peak memory is
+torch.cuda.max_memory_allocated on CUDA, otherwise sampled process RSS (psutil).
+
+Tổng hợp các đoạn hội thoại có độ dài tăng dần với Dia, một lần dưới dạng một
+generation (auto_chunk=False) và một lần chia chunk (auto_chunk=True), báo cáo bộ
+nhớ đỉnh, thời gian và độ dài đầu ra cho mỗi độ dài. Bộ nhớ đỉnh là
+torch.cuda.max_memory_allocated trên CUDA, nếu không thì RSS tiến trình lấy mẫu (psutil).
+
+Usage / Cách dùng:
+    python benchmark_dia_long_text.py [--lengths 250 500 1000 2000] [--max-chars 250]
+    python benchmark_dia_long_text.py --plan-only   # show chunk plans, no model / chỉ xem cách chia, không tải model
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tts_backend.text_chunker import split_dia_text
+
+# Alternating narrator/character lines / Các câu xen kẽ người kể/nhân vật
+PARAGRAPH_LINES = [
+    "[01] Màn đêm buông xuống thị trấn nhỏ ven sông, những ngọn đèn dầu lần lượt được thắp lên.",
+    "[02] Anh có nghe thấy tiếng gì không? Hình như có ai đang gõ cửa.",
+    "[01] Hắn đứng dậy, bước chậm về phía cửa, tay vẫn còn cầm chén trà nguội.",
+    "[02] Cẩn thận đấy. Giờ này chẳng ai tới thăm đâu.",
+    "[01] Cánh cửa mở ra, chỉ có gió lạnh và mùi đất ẩm sau cơn mưa.",
+]
+
+
+def make_text(length: int) -> str:
+    """Dialog text of roughly `length` characters / Văn bản hội thoại khoảng `length` ký tự"""
+    lines = []
+    index = 0
+    while sum(len(line) + 1 for line in lines) < length:
+        lines.append(PARAGRAPH_LINES[index % len(PARAGRAPH_LINES)])
+        index += 1
+    return " ".join(lines)
+
+
+class PeakMemory:
+    """Peak memory tracker (CUDA allocator or sampled RSS) / Theo dõi bộ nhớ đỉnh (CUDA hoặc RSS lấy mẫu)"""
+
+    def __init__(self, torch_module):
+        self.torch = torch_module
+        self.cuda = torch_module.cuda.is_available()
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            self._process = None
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._process.memory_info().rss)
+            time.sleep(0.02)
+
+    def __enter__(self):
+        self.peak = 0
+        if self.cuda:
+            self.torch.cuda.synchronize()
+            self.torch.cuda.reset_peak_memory_stats()
+        elif self._process is not None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.cuda:
+            self.torch.cuda.synchronize()
+            self.peak = self.torch.cuda.max_memory_allocated()
+        elif self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+
+    @property
+    def label(self) -> str:
+        return "CUDA allocated" if self.cuda else "process RSS"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dia long-text benchmark / Đo hiệu năng văn bản dài Dia")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[250, 500, 1000, 2000], help="Text lengths (chars)")
+    parser.add_argument("--max-chars", type=int, default=250, help="Maximum characters per chunk")
+    parser.add_argument("--plan-only", action="store_true", help="Print chunk plans without loading Dia")
+    args = parser.parse_args()
+
+    print("=" * 92)
+    print("Dia long text: single generation vs chunked / Văn bản dài Dia: một generation so với chia chunk")
+    print("=" * 92)
+
+    if args.plan_only:
+        for length in args.lengths:
+            chunks = split_dia_text(make_text(length), max_chars=args.max_chars)
+            print(f"{length:>6} chars -> {len(chunks)} chunks, longest {max(len(c) for c in chunks)} chars")
+            for chunk in chunks:
+                print(f"         {chunk[:80]}")
+        return
+
+    import torch
+    from tts_backend.models.dia_tts import DiaTTSWrapper
+
+    dia = DiaTTSWrapper()
+    dia.synthesize(PARAGRAPH_LINES[0], auto_chunk=False)  # Warm-up / Khởi động
+    tracker = PeakMemory(torch)
+    print(f"Peak memory source / Nguồn bộ nhớ đỉnh: {tracker.label}")
+    print(f"{'chars':>6} {'mode':<8} {'chunks':>6} {'peak MiB':>9} {'time s':>7} {'audio s':>8} {'tokens':>7}")
+
+    for length in args.lengths:
+        text = make_text(length)
+        for mode, auto_chunk in (("single", False), ("chunked", True)):
+            try:
+                with tracker:
+                    start = time.perf_counter()
+                    wav = dia.synthesize(text, auto_chunk=auto_chunk, max_chars=args.max_chars, normalize=False)
+                    elapsed = time.perf_counter() - start
+                stats = dia.last_generation_stats
+                print(f"{length:>6} {mode:<8} {stats.get('chunks', 1):>6} {tracker.peak / 2**20:>9.1f} "
+                      f"{elapsed:>7.1f} {len(wav) / dia.sample_rate:>8.1f} {stats['generated_tokens']:>7}")
+            except torch.cuda.OutOfMemoryError:
+                print(f"{length:>6} {mode:<8} {'-':>6} {'OOM':>9}")
+                torch.cuda.empty_cache()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark Dia Generation Watchdog
+Đo hiệu năng Watchdog Generation Dia
+
+Runs a corpus of short sentences through Dia with the early-stop watchdog off and
+on, and reports generated tokens, trailing-silence (wasted) tokens, wall time and
+output length per sentence.
+
+With --simulate no model is loaded: token streams are synthetic (varied speech
+codes followed by a near-constant silence tail that never reaches EOS), which
+checks the watchdog logic and shows the token budget it saves.
+
+Chạy một tập câu ngắn qua Dia với watchdog dừng sớm tắt và bật, báo cáo số token
+đã tạo, token im lặng cuối (lãng phí), thời gian và độ dài đầu ra cho mỗi câu.
+
+Với --simulate không tải model: chuỗi token là tổng hợp (mã giọng nói đa dạng rồi
+đuôi im lặng gần như không đổi và không bao giờ tới EOS), để kiểm tra logic
+watchdog và cho thấy ngân sách token tiết kiệm được.
+
+Usage / Cách dùng:
+    python benchmark_dia_watchdog.py [--simulate] [--repeats 1]
+"""
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Short narration lines that often miss EOS / Câu tường thuật ngắn thường bỏ lỡ EOS
+CORPUS = [
+    "[01] Xin chào.",
+    "[01] Trời đã tối.",
+    "[02] Anh đi đâu vậy?",
+    "[01] Cô ấy mỉm cười.",
+    "[02] Không sao đâu.",
+    "[01] Gió thổi nhẹ qua khung cửa.",
+    "[02] Ta sẽ quay lại sớm thôi.",
+    "[01] Chương một: Khởi đầu.",
+    "[02] Cảm ơn ngươi.",
+    "[01] Hắn im lặng một lúc lâu rồi gật đầu.",
+]
+
+# Same floor as DiaTTSWrapper.synthesize / Cùng mức sàn như DiaTTSWrapper.synthesize
+MIN_MAX_TOKENS = 3072
+
+
+def load_watchdog_module():
+    """Load generation_watchdog without importing torch / Tải generation_watchdog mà không import torch"""
+    spec = importlib.util.spec_from_file_location(
+        "generation_watchdog", Path(__file__).parent / "tts_backend" / "generation_watchdog.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def simulated_stream(text: str, max_tokens: int, rng: np.random.Generator):
+    """
+    Yield synthetic 9-channel frames: speech then a silence tail without EOS
+    Tạo frame 9 kênh tổng hợp: giọng nói rồi đuôi im lặng không có EOS
+    """
+    speech_frames = int(len(text) * rng.uniform(5.0, 8.0)) + 40
+    silence_codes = rng.integers(0, 1024, size=2)
+    for step in range(max_tokens):
+        frame = rng.integers(0, 1024, size=9)
+        if step >= speech_frames:
+            # Silence: channel 0 alternates between two codes / Im lặng: kênh 0 xen kẽ hai mã
+            frame[0] = silence_codes[step % 2] if rng.random() > 0.02 else rng.integers(0, 1024)
+        yield frame, speech_frames
+
+
+def run_simulation(repeats: int):
+    watchdog_module = load_watchdog_module()
+    from tts_backend.config import (
+        DIA_WATCHDOG_WINDOW, DIA_WATCHDOG_MAX_DISTINCT, DIA_WATCHDOG_PATIENCE, DIA_WATCHDOG_MIN_SPEECH
+    )
+    eos_value = 1024
+    rng = np.random.default_rng(0)
+    totals = {"off": 0, "on": 0, "speech": 0, "overshoot": 0, "cut_speech": 0}
+    print(f"{'text':<44} {'speech':>6} {'off':>6} {'on':>6} {'saved':>7}")
+    for _ in range(repeats):
+        for text in CORPUS:
+            max_tokens = max(MIN_MAX_TOKENS, len(text) * 20)
+            watchdog = watchdog_module.GenerationWatchdog(
+                max_tokens=max_tokens,
+                eos_value=eos_value,
+                window=DIA_WATCHDOG_WINDOW,
+                max_distinct=DIA_WATCHDOG_MAX_DISTINCT,
+                patience=DIA_WATCHDOG_PATIENCE,
+                min_speech_frames=DIA_WATCHDOG_MIN_SPEECH,
+            )
+            speech_frames = 0
+            for frame, speech_frames in simulated_stream(text, max_tokens, rng):
+                if watchdog.observe(frame):
+                    break
+            stats = watchdog.get_stats()
+            generated = stats["generated_tokens"]
+            totals["off"] += max_tokens
+            totals["on"] += generated
+            totals["speech"] += speech_frames
+            totals["overshoot"] += max(0, generated - speech_frames)
+            totals["cut_speech"] += int(generated < speech_frames)
+            print(f"{text[:44]:<44} {speech_frames:>6} {max_tokens:>6} {generated:>6} "
+                  f"{1 - generated / max_tokens:>6.0%}")
+    print("-" * 74)
+    print(f"Tokens generated without watchdog / Token không có watchdog: {totals['off']}")
+    print(f"Tokens generated with watchdog    / Token có watchdog:       {totals['on']} "
+          f"({1 - totals['on'] / totals['off']:.0%} saved / tiết kiệm)")
+    print(f"Silence kept after speech / Im lặng giữ lại sau giọng nói: "
+          f"{totals['overshoot'] / max(totals['speech'], 1):.0%} of speech frames")
+    print(f"Sentences cut inside speech / Câu bị cắt giữa giọng nói: {totals['cut_speech']}")
+
+
+def run_model(repeats: int):
+    from tts_backend.models.dia_tts import DiaTTSWrapper
+
+    dia = DiaTTSWrapper()
+    dia.synthesize(CORPUS[0], trim_silence=False, early_stop=False)  # Warm-up / Khởi động
+
+    results = {}
+    for mode, early_stop in (("off", False), ("on", True)):
+        rows = []
+        for _ in range(repeats):
+            for text in CORPUS:
+                start = time.perf_counter()
+                wav = dia.synthesize(text, trim_silence=False, early_stop=early_stop)
+                elapsed = time.perf_counter() - start
+                stats = dia.last_generation_stats
+                rows.append((text, stats["generated_tokens"], stats["wasted_ratio"], elapsed,
+                             len(wav) / dia.sample_rate))
+        results[mode] = rows
+
+    print(f"{'text':<40} {'tok off':>8} {'tok on':>7} {'waste off':>9} {'s off':>6} {'s on':>6} {'audio on':>8}")
+    for off, on in zip(results["off"], results["on"]):
+        print(f"{off[0][:40]:<40} {off[1]:>8} {on[1]:>7} {off[2]:>8.0%} {off[3]:>6.1f} {on[3]:>6.1f} {on[4]:>7.1f}s")
+    print("-" * 90)
+    for mode in ("off", "on"):
+        rows = results[mode]
+        tokens = sum(r[1] for r in rows)
+        seconds = sum(r[3] for r in rows)
+        print(f"watchdog {mode:<3}: {tokens} tokens, {seconds:.1f}s total, "
+              f"mean wasted ratio {np.mean([r[2] for r in rows]):.0%}")
+    print(f"Aggregate / Tổng hợp: {dia.get_generation_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dia watchdog benchmark / Đo hiệu năng watchdog Dia")
+    parser.add_argument("--simulate", action="store_true", help="Use synthetic token streams (no model)")
+    parser.add_argument("--repeats", type=int, default=1, help="Passes over the corpus")
+    args = parser.parse_args()
+
+    print("=" * 90)
+    print("Dia early-stop watchdog on short sentences / Watchdog dừng sớm Dia trên câu ngắn")
+    print("=" * 90)
+    if args.simulate:
+        run_simulation(args.repeats)
+    else:
+        run_model(args.repeats)
+
+
+if __name__ == "__main__":
+    main()
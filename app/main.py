@@ -87,6 +87,9 @@ if __name__ == "__main__":
             storage.shutdown()
         except Exception:
             pass
+        from tts_backend import service as tts_service
+        if tts_service._service_instance is not None:
+            tts_service._service_instance.shutdown()
     
     atexit.register(cleanup_on_exit)
     
@@ -0,0 +1,134 @@
+"""
+Model manager tests - memory budget eviction, pinning and idle unloading
+Kiểm thử quản lý model - gỡ theo ngân sách bộ nhớ, ghim và gỡ khi rảnh
+"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("torch")
+
+from tts_backend import model_manager
+from tts_backend.model_manager import ModelManager
+
+MB = 2**20
+
+
+class _Loader:
+    """Loader returning a fresh object and counting calls"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"model": self.name, "load": self.calls}
+
+
+@pytest.fixture
+def fake_footprints(monkeypatch):
+    """Measure each load as a fixed footprint instead of the real RSS delta"""
+    sizes = {}
+
+    def measure(self, entry):
+        return entry.loader(), (0.01, sizes.get(entry.name, 0), 0)
+
+    monkeypatch.setattr(ModelManager, "_measure_load", measure)
+    monkeypatch.setattr(model_manager.gc, "collect", lambda: 0)
+    return sizes
+
+
+def _manager(names, **kwargs):
+    kwargs.setdefault("idle_unload_minutes", 0)
+    return ModelManager({name: _Loader(name) for name in names}, **kwargs)
+
+
+def test_budget_evicts_least_recently_used(fake_footprints):
+    """Test that loading past the budget unloads the least recently used model"""
+    fake_footprints.update({"a": 60 * MB, "b": 60 * MB, "c": 60 * MB})
+    manager = _manager(["a", "b", "c"], memory_budget_mb=130)
+
+    manager.get("a")
+    manager.get("b")
+    manager.get("a")  # b is now least recently used
+    manager.get("c")
+
+    assert manager.is_loaded("a")
+    assert not manager.is_loaded("b")
+    assert manager.is_loaded("c")
+
+
+def test_pinned_and_in_use_models_survive_eviction(fake_footprints):
+    """Test that pinned models and models held by use() are never evicted"""
+    fake_footprints.update({"a": 60 * MB, "b": 60 * MB, "c": 60 * MB})
+    manager = _manager(["a", "b", "c"], memory_budget_mb=100, pinned=["a"])
+
+    manager.get("a")
+    with manager.use("b"):
+        manager.get("c")
+        assert manager.is_loaded("a")
+        assert manager.is_loaded("b")
+
+    with pytest.raises(ValueError):
+        manager.unload("a")
+    assert manager.unload("a", force=True)
+
+
+def test_use_counts_model_in_use_before_eviction_can_run(fake_footprints):
+    """Test that use() marks the model busy in the same critical section as the lookup"""
+    fake_footprints.update({"a": 60 * MB, "b": 60 * MB})
+    manager = _manager(["a", "b"], memory_budget_mb=100)
+    manager.get("a")
+
+    with manager.use("a") as instance:
+        assert manager.list_models()["models"][0]["in_use"] == 1
+        with pytest.raises(ValueError):
+            manager.unload("a")
+        manager.get("b")
+        assert manager.peek("a") is instance
+    assert manager.list_models()["models"][0]["in_use"] == 0
+
+
+def test_peek_and_use_without_load_never_load(fake_footprints):
+    """Test that peek() and use(load=False) leave an unloaded model unloaded"""
+    manager = _manager(["a"])
+
+    assert manager.peek("a") is None
+    with manager.use("a", load=False) as instance:
+        assert instance is None
+    assert not manager.is_loaded("a")
+    assert manager._entries["a"].loader.calls == 0
+
+
+def test_idle_sweep_unloads_only_idle_unpinned(fake_footprints):
+    """Test that unload_idle() skips pinned and busy models"""
+    manager = _manager(["a", "b", "c"], pinned=["a"])
+    manager.idle_unload_seconds = 60
+    for name in ("a", "b", "c"):
+        manager.get(name)
+        manager._entries[name].last_used = time.time() - 120
+
+    with manager.use("c"):
+        manager._entries["c"].last_used = time.time() - 120
+        assert manager.unload_idle() == 1
+
+    assert manager.is_loaded("a")
+    assert not manager.is_loaded("b")
+    assert manager.is_loaded("c")
+
+
+def test_concurrent_get_loads_once(fake_footprints):
+    """Test that concurrent requests for an unloaded model share one load"""
+    manager = _manager(["a"])
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.get("a"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert manager._entries["a"].loader.calls == 1
+    assert all(result is results[0] for result in results)
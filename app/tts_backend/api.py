@@ -2,11 +2,12 @@
 TTS API Endpoints
 Điểm cuối API TTS
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query
 from pydantic import BaseModel
 from typing import Optional, Literal
 import soundfile as sf
 import io
+import os
 import numpy as np
 import uuid
 
@@ -30,6 +31,10 @@ class TTSSynthesizeRequest(BaseModel):
     speed_factor: Optional[float] = 1.0  # Speech speed (0.8-1.0, 1.0 = normal/normal) / Tốc độ giọng nói
     trim_silence: Optional[bool] = True  # Trim silence from beginning and end (default: True) / Cắt im lặng ở đầu và cuối (mặc định: True)
     normalize: Optional[bool] = False  # Normalize audio volume (default: False) / Chuẩn hóa âm lượng audio (mặc định: False)
+    early_stop: Optional[bool] = None  # Stop generation on sustained silence (None = server default) / Dừng generation khi im lặng kéo dài
+    audio_prompt_id: Optional[str] = None  # Registered voice-cloning prompt (see POST /dia/prompts) / Prompt clone giọng đã đăng ký
+    auto_chunk: Optional[bool] = None  # Generate long text chunk by chunk (None = DIA_AUTO_CHUNK, off by default) / Tạo văn bản dài theo từng chunk (None = DIA_AUTO_CHUNK, mặc định tắt)
+    max_chars: Optional[int] = None  # Maximum characters per chunk / Ký tự tối đa mỗi chunk
     # Storage options / Tùy chọn lưu trữ
     store: Optional[bool] = True  # Store audio file / Lưu file audio
     expiry_hours: Optional[int] = None  # Expiration hours (None = use default)
@@ -64,6 +69,138 @@ async def get_model_info(request: ModelInfoRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Model lifecycle / Vòng đời model
+@router.get("/models")
+async def list_models():
+    """
+    List models with load state, measured memory and load time / Liệt kê model với trạng thái, bộ nhớ đo được và thời gian tải
+    
+    Returns:
+        Model manager status / Trạng thái quản lý model
+    """
+    try:
+        service = get_service()
+        return {"success": True, **service.models.list_models()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/models/{name}/load")
+async def load_model(name: Literal["vieneu-tts", "dia"]):
+    """
+    Load a model now (e.g. before traffic arrives) / Tải model ngay (vd. trước khi có lưu lượng)
+    
+    Args:
+        name: Model name / Tên model
+        
+    Returns:
+        Model manager status / Trạng thái quản lý model
+    """
+    try:
+        service = get_service()
+        service.models.get(name)
+        return {"success": True, **service.models.list_models()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/models/{name}/unload")
+async def unload_model(name: Literal["vieneu-tts", "dia"], force: bool = Query(False)):
+    """
+    Unload a model and release its memory / Gỡ model và giải phóng bộ nhớ
+    
+    Args:
+        name: Model name / Tên model
+        force: Also unload a pinned model / Gỡ cả model đã ghim
+        
+    Returns:
+        Whether the model was unloaded and manager status / Model có được gỡ không và trạng thái quản lý model
+    """
+    service = get_service()
+    try:
+        unloaded = service.models.unload(name, force=force)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"success": True, "unloaded": unloaded, **service.models.list_models()}
+
+# Dia generation statistics / Thống kê generation Dia
+@router.get("/dia/generation/stats")
+async def get_dia_generation_stats():
+    """
+    Get Dia token usage and early-stop statistics / Lấy thống kê dùng token và dừng sớm của Dia
+    
+    Polling never loads the model; while Dia is unloaded stats is null.
+    Việc truy vấn không bao giờ tải model; khi Dia chưa được tải stats là null.
+    
+    Returns:
+        Aggregate and last-request generation statistics / Thống kê generation tổng hợp và request gần nhất
+    """
+    try:
+        dia = get_service().get_loaded_dia_tts()
+        return {"success": True, "loaded": dia is not None, "stats": dia.get_generation_stats() if dia else None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Register Dia audio prompt / Đăng ký audio prompt Dia
+@router.post("/dia/prompts")
+async def register_dia_prompt(
+    file: UploadFile = File(...),
+    name: Optional[str] = Form(None)
+):
+    """
+    Register a voice-cloning prompt and precompute its DAC codes
+    Đăng ký prompt clone giọng và tính trước mã DAC
+    
+    Pass the returned prompt_id as audio_prompt_id in synthesize requests.
+    Truyền prompt_id trả về vào audio_prompt_id trong request synthesize.
+    
+    Codes are precomputed only if Dia is already loaded; otherwise the first
+    synthesis encodes the prompt.
+    Mã chỉ được tính trước nếu Dia đã được tải; nếu không lần tổng hợp đầu
+    sẽ mã hóa prompt.
+    
+    Args:
+        file: Prompt audio file / File audio prompt
+        name: Optional display name / Tên hiển thị tùy chọn
+        
+    Returns:
+        Registered prompt info / Thông tin prompt đã đăng ký
+    """
+    try:
+        audio_data = await file.read()
+        suffix = os.path.splitext(file.filename or "")[1].lower() or ".wav"
+        with get_service().models.use("dia", load=False) as dia:
+            if dia is not None:
+                info = dia.register_audio_prompt(audio_data, suffix=suffix, name=name)
+            else:
+                from .prompt_cache import get_prompt_cache
+                info = {**get_prompt_cache().register(audio_data, suffix, name), "precomputed": False}
+        return {"success": True, "prompt": info}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# List Dia audio prompts / Liệt kê audio prompt Dia
+@router.get("/dia/prompts")
+async def list_dia_prompts():
+    """
+    List registered prompts and encoding cache statistics / Liệt kê prompt đã đăng ký và thống kê cache mã hóa
+    """
+    from .prompt_cache import get_prompt_cache
+    cache = get_prompt_cache()
+    prompts = [{"prompt_id": prompt_id, **info} for prompt_id, info in cache.registered.items()]
+    return {"success": True, "prompts": prompts, "stats": cache.get_stats()}
+
+# Delete Dia audio prompt / Xóa audio prompt Dia
+@router.delete("/dia/prompts/{prompt_id}")
+async def delete_dia_prompt(prompt_id: str):
+    """
+    Unregister a prompt / Hủy đăng ký prompt
+    """
+    from .prompt_cache import get_prompt_cache
+    if not get_prompt_cache().unregister(prompt_id):
+        raise HTTPException(status_code=404, detail="Audio prompt not found")
+    return {"success": True, "prompt_id": prompt_id}
+
 # Synthesize speech / Tổng hợp giọng nói
 @router.post("/synthesize")
 async def synthesize_speech(request: TTSSynthesizeRequest):
@@ -123,8 +260,13 @@ async def synthesize_speech(request: TTSSynthesizeRequest):
                 "max_tokens": request.max_tokens,
                 "speed_factor": request.speed_factor or 1.0,  # Default normal speed (matches preset)
                 "trim_silence": request.trim_silence if request.trim_silence is not None else True,  # Default to True for API, but worker will pass False
-                "normalize": request.normalize if request.normalize is not None else False  # Default to False
+                "normalize": request.normalize if request.normalize is not None else False,  # Default to False
+                "early_stop": request.early_stop,
+                "auto_chunk": request.auto_chunk,
+                "max_chars": request.max_chars
             })
+            if request.audio_prompt_id:
+                params["audio_prompt_id"] = request.audio_prompt_id
         
         # Generate audio / Tạo audio
         audio = service.synthesize(**params)
@@ -133,6 +275,10 @@ async def synthesize_speech(request: TTSSynthesizeRequest):
         model_info = service.get_model_info(request.model)
         sample_rate = model_info["sample_rate"]
         
+        # Token usage of this request (Dia only) / Mức dùng token của request này (chỉ Dia)
+        dia = service.get_loaded_dia_tts() if request.model == "dia" else None
+        generation_stats = dia.last_generation_stats if dia is not None else None
+        
         # Convert to bytes / Chuyển đổi sang bytes
         audio_buffer = io.BytesIO()
         sf.write(audio_buffer, audio, sample_rate, format="WAV")
@@ -163,7 +309,8 @@ async def synthesize_speech(request: TTSSynthesizeRequest):
             "model": request.model,
             "sample_rate": sample_rate,
             "duration_seconds": len(audio) / sample_rate,
-            "file_metadata": file_metadata
+            "file_metadata": file_metadata,
+            "generation": generation_stats
         }
         
         # Return audio in response if requested / Trả về audio trong phản hồi nếu được yêu cầu
@@ -184,6 +331,8 @@ async def synthesize_speech(request: TTSSynthesizeRequest):
                     "X-Request-ID": request_id,
                     "X-File-ID": file_metadata["file_id"] if file_metadata else "",
                     "X-Expires-At": file_metadata["expires_at"] if file_metadata else "",
+                    "X-Generated-Tokens": str(generation_stats["generated_tokens"]) if generation_stats else "",
+                    "X-Wasted-Token-Ratio": f"{generation_stats['wasted_ratio']:.3f}" if generation_stats else "",
                 }
             )
         else:
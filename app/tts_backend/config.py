@@ -60,3 +60,55 @@ STORAGE_DIR = os.getenv("TTS_STORAGE_DIR", str(BASE_DIR / "storage" / "audio"))
 DEFAULT_EXPIRY_HOURS = int(os.getenv("TTS_DEFAULT_EXPIRY_HOURS", "2"))  # Changed from 24 to 2 hours
 CLEANUP_INTERVAL_MINUTES = int(os.getenv("TTS_CLEANUP_INTERVAL_MINUTES", "30"))  # More frequent cleanup
 
+
+# Dia generation watchdog / Watchdog generation Dia
+# Forces EOS once channel-0 codes stay near-constant (silence) after speech (~86 frames per second)
+# Ép EOS khi mã kênh 0 gần như không đổi (im lặng) sau giọng nói (~86 frame mỗi giây)
+DIA_WATCHDOG_ENABLED = os.getenv("DIA_WATCHDOG_ENABLED", "true").lower() == "true"
+DIA_WATCHDOG_WINDOW = int(os.getenv("DIA_WATCHDOG_WINDOW", "86"))  # Rolling window in frames
+DIA_WATCHDOG_MAX_DISTINCT = int(os.getenv("DIA_WATCHDOG_MAX_DISTINCT", "4"))  # Distinct codes counted as silence
+DIA_WATCHDOG_PATIENCE = int(os.getenv("DIA_WATCHDOG_PATIENCE", "43"))  # Extra silent frames before stopping
+DIA_WATCHDOG_MIN_SPEECH = int(os.getenv("DIA_WATCHDOG_MIN_SPEECH", "86"))  # Speech frames required first
+
+# Dia max_tokens predictor / Bộ dự đoán max_tokens Dia
+# Online per-speaker regression replacing the len(text) * 20 heuristic once trained
+# Hồi quy trực tuyến theo người nói thay heuristic len(text) * 20 khi đã đủ dữ liệu
+DIA_TOKEN_PREDICTOR_ENABLED = os.getenv("DIA_TOKEN_PREDICTOR_ENABLED", "true").lower() == "true"
+DIA_TOKEN_PREDICTOR_PATH = os.getenv("DIA_TOKEN_PREDICTOR_PATH", str(BASE_DIR / "storage" / "dia_token_predictor.json"))
+DIA_TOKEN_PREDICTOR_MIN_SAMPLES = int(os.getenv("DIA_TOKEN_PREDICTOR_MIN_SAMPLES", "8"))  # Before a model is trusted
+DIA_TOKEN_PREDICTOR_MIN_MARGIN = float(os.getenv("DIA_TOKEN_PREDICTOR_MIN_MARGIN", "0.2"))  # Relative safety margin
+DIA_TOKEN_PREDICTOR_HEADROOM = int(os.getenv("DIA_TOKEN_PREDICTOR_HEADROOM", "256"))  # Extra tokens for the watchdog
+
+# Dia audio-prompt encoding cache / Cache mã hóa audio prompt Dia
+DIA_PROMPT_CACHE_DIR = os.getenv("DIA_PROMPT_CACHE_DIR", str(BASE_DIR / "storage" / "dia_prompts"))
+DIA_PROMPT_CACHE_MEMORY_ENTRIES = int(os.getenv("DIA_PROMPT_CACHE_MEMORY_ENTRIES", "16"))
+
+# Dia long-text chunking / Chia nhỏ văn bản dài cho Dia
+# Long text is split on speaker-tag/sentence boundaries and generated chunk by chunk.
+# Off by default: it changes the output (a pause is inserted between chunks), so callers
+# opt in per request (auto_chunk=true) or server-wide with DIA_AUTO_CHUNK=true.
+# Văn bản dài được chia tại ranh giới tag người nói/câu và tạo từng chunk.
+# Tắt mặc định: nó thay đổi đầu ra (chèn khoảng lặng giữa các chunk), nên client bật
+# theo request (auto_chunk=true) hoặc cho cả server với DIA_AUTO_CHUNK=true.
+DIA_AUTO_CHUNK = os.getenv("DIA_AUTO_CHUNK", "false").lower() == "true"
+DIA_CHUNK_MAX_CHARS = int(os.getenv("DIA_CHUNK_MAX_CHARS", "250"))
+DIA_CHUNK_PAUSE_MS = float(os.getenv("DIA_CHUNK_PAUSE_MS", "150"))  # Silence between trimmed chunks
+DIA_CHUNK_CROSSFADE_MS = float(os.getenv("DIA_CHUNK_CROSSFADE_MS", "0"))
+
+# Model lifecycle / Vòng đời model
+# Models load on demand; unpinned ones are unloaded LRU-first over budget or after idling
+# Model tải khi cần; model không ghim bị gỡ theo LRU khi vượt ngân sách hoặc khi rảnh lâu
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))  # 0 = unlimited
+MODEL_IDLE_UNLOAD_MINUTES = float(os.getenv("MODEL_IDLE_UNLOAD_MINUTES", "30"))  # 0 = never
+# Comma-separated models never unloaded; empty = pin the service's default model
+# Danh sách model không bao giờ bị gỡ, cách nhau bởi dấu phẩy; rỗng = ghim model mặc định của service
+MODEL_PINNED = [m.strip() for m in os.getenv("MODEL_PINNED", "").split(",") if m.strip()]
+
+# VieNeu-TTS reference-code cache / Cache mã tham chiếu VieNeu-TTS
+# Same default directory in app and VieNeu backends so encodings are shared
+# Cùng thư mục mặc định ở app và VieNeu backend để dùng chung mã hóa
+VIENEU_REF_CODE_CACHE_DIR = os.getenv("VIENEU_REF_CODE_CACHE_DIR", str(BASE_DIR / "storage" / "vieneu_ref_codes"))
+VIENEU_REF_CODE_MEMORY_ENTRIES = int(os.getenv("VIENEU_REF_CODE_MEMORY_ENTRIES", "32"))
+VIENEU_PRELOAD_VOICES = os.getenv("VIENEU_PRELOAD_VOICES", "true").lower() == "true"  # Encode sample voices on load
+# Voice samples shipped with VieNeu-TTS (id_*.wav + id_*.txt) / Giọng mẫu đi kèm VieNeu-TTS (id_*.wav + id_*.txt)
+VIENEU_SAMPLE_DIR = os.getenv("VIENEU_SAMPLE_DIR", str(BASE_DIR / "tts" / "VieNeu-TTS" / "sample"))
@@ -0,0 +1,335 @@
+"""
+Model Lifecycle Manager
+Quản lý Vòng đời Model
+
+Loads TTS models on demand, keeps them within a memory budget by unloading the
+least recently used unpinned model, and unloads models that have been idle longer
+than a configured time. Each load measures the model's footprint (process RSS
+delta, plus CUDA allocations on GPU) and load time, so eviction decisions and the
+/models endpoints use real numbers.
+
+Tải model TTS khi cần, giữ trong ngân sách bộ nhớ bằng cách gỡ model không ghim
+ít dùng gần đây nhất, và gỡ model rảnh lâu hơn thời gian cấu hình. Mỗi lần tải đo
+dung lượng model (chênh lệch RSS tiến trình, cộng cấp phát CUDA trên GPU) và thời
+gian tải, để quyết định gỡ và các endpoint /models dùng số liệu thực.
+"""
+import gc
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import torch
+
+try:
+    import psutil
+except ImportError:  # RSS is reported as unknown / RSS được báo là không rõ
+    psutil = None
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current process RSS / RSS hiện tại của tiến trình"""
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def _cuda_bytes() -> int:
+    """Current CUDA allocations / Cấp phát CUDA hiện tại"""
+    return torch.cuda.memory_allocated() if torch.cuda.is_available() else 0
+
+
+class _ModelEntry:
+    """State of one managed model / Trạng thái của một model được quản lý"""
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self.loader = loader
+        self.instance = None
+        self.in_use = 0
+        self.last_used = 0.0
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.rss_bytes: Optional[int] = None
+        self.cuda_bytes = 0
+        self.loads = 0
+        self.unloads = 0
+        # Set while a thread runs the loader / Đặt khi một luồng đang chạy hàm tải
+        self.loading = False
+
+    @property
+    def footprint_bytes(self) -> int:
+        """Measured memory footprint / Dung lượng bộ nhớ đã đo"""
+        return max(self.rss_bytes or 0, 0) + max(self.cuda_bytes, 0)
+
+
+class ModelManager:
+    """On-demand loading with memory budget and idle unloading / Tải theo nhu cầu với ngân sách bộ nhớ và gỡ khi rảnh"""
+
+    def __init__(
+        self,
+        loaders: Dict[str, Callable[[], Any]],
+        memory_budget_mb: float = 0,
+        idle_unload_minutes: float = 30,
+        pinned: Iterable[str] = (),
+        sweep_interval_seconds: float = 60
+    ):
+        """
+        Initialize model manager / Khởi tạo quản lý model
+
+        Args:
+            loaders: Model name -> factory returning a loaded wrapper / Tên model -> hàm tạo wrapper đã tải
+            memory_budget_mb: Total footprint allowed (0 = unlimited) / Tổng dung lượng cho phép (0 = không giới hạn)
+            idle_unload_minutes: Unload unpinned models idle this long (0 = never) / Gỡ model không ghim rảnh lâu như vậy (0 = không bao giờ)
+            pinned: Models never unloaded automatically / Model không bao giờ tự động gỡ
+            sweep_interval_seconds: Idle check interval / Chu kỳ kiểm tra rảnh
+        """
+        self._entries = {name: _ModelEntry(name, loader) for name, loader in loaders.items()}
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.idle_unload_seconds = idle_unload_minutes * 60
+        self.pinned = set(pinned)
+        self._lock = threading.Condition()
+        self._stop = threading.Event()
+        self._sweeper = None
+        if self.idle_unload_seconds > 0:
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop, args=(sweep_interval_seconds,), name="model-idle-sweeper", daemon=True
+            )
+            self._sweeper.start()
+
+    def _entry(self, name: str) -> _ModelEntry:
+        entry = self._entries.get(name)
+        if entry is None:
+            raise ValueError(f"Unknown model: {name}")
+        return entry
+
+    def get(self, name: str):
+        """
+        Get a model, loading it if needed / Lấy model, tải nếu cần
+
+        Args:
+            name: Model name / Tên model
+
+        Returns:
+            Loaded model wrapper / Wrapper model đã tải
+        """
+        return self._acquire(name, hold=False, load=True)
+
+    def peek(self, name: str):
+        """
+        Get a model only if it is already loaded (never loads) / Lấy model chỉ khi đã tải (không bao giờ tải)
+
+        Returns:
+            Loaded model wrapper or None / Wrapper model đã tải hoặc None
+        """
+        return self._entry(name).instance
+
+    def _acquire(self, name: str, hold: bool, load: bool):
+        """
+        Look up or load a model; with hold, count it in use under the same lock
+        Tìm hoặc tải model; với hold, tính là đang dùng trong cùng một lần giữ lock
+
+        Returns None when load is False and the model is not loaded.
+        Trả về None khi load là False và model chưa được tải.
+        """
+        entry = self._entry(name)
+        with self._lock:
+            while entry.loading:
+                self._lock.wait()
+            if entry.instance is not None:
+                entry.last_used = time.time()
+                if hold:
+                    entry.in_use += 1
+                return entry.instance
+            if not load:
+                return None
+            entry.loading = True
+            # Make room using the footprint measured on a previous load
+            # Dọn chỗ theo dung lượng đo được ở lần tải trước
+            self._evict_for(entry.footprint_bytes, keep=name)
+
+        try:
+            instance, stats = self._measure_load(entry)
+        except Exception:
+            with self._lock:
+                entry.loading = False
+                self._lock.notify_all()
+            raise
+
+        with self._lock:
+            entry.instance = instance
+            entry.loaded_at = entry.last_used = time.time()
+            entry.load_seconds, entry.rss_bytes, entry.cuda_bytes = stats
+            entry.loads += 1
+            entry.loading = False
+            if hold:
+                entry.in_use += 1
+            self._lock.notify_all()
+            self._evict_for(0, keep=name)
+        return instance
+
+    def _measure_load(self, entry: _ModelEntry):
+        """Run the loader and measure time and memory / Chạy hàm tải và đo thời gian, bộ nhớ"""
+        print(f"[ModelManager] Loading {entry.name}...")
+        print(f"[ModelManager] Đang tải {entry.name}...")
+        gc.collect()
+        rss_before = _rss_bytes()
+        cuda_before = _cuda_bytes()
+        start = time.time()
+        instance = entry.loader()
+        load_seconds = time.time() - start
+        rss_after = _rss_bytes()
+        rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        cuda_delta = _cuda_bytes() - cuda_before
+        print(f"[ModelManager] Loaded {entry.name} in {load_seconds:.1f}s "
+              f"(RSS +{(rss_delta or 0) / 2**20:.0f} MiB, CUDA +{cuda_delta / 2**20:.0f} MiB)")
+        print(f"[ModelManager] Đã tải {entry.name} trong {load_seconds:.1f}s")
+        return instance, (load_seconds, rss_delta, cuda_delta)
+
+    def _used_bytes(self) -> int:
+        return sum(e.footprint_bytes for e in self._entries.values() if e.instance is not None)
+
+    def _evict_for(self, needed_bytes: int, keep: str):
+        """
+        Unload LRU unpinned idle models until needed_bytes fits (caller holds lock)
+        Gỡ model LRU không ghim và không bận đến khi đủ needed_bytes (đã giữ lock)
+        """
+        if not self.memory_budget_bytes:
+            return
+        candidates = sorted(
+            (e for e in self._entries.values()
+             if e.instance is not None and e.name != keep and e.name not in self.pinned and not e.in_use),
+            key=lambda e: e.last_used
+        )
+        for entry in candidates:
+            if self._used_bytes() + needed_bytes <= self.memory_budget_bytes:
+                break
+            self._unload_entry(entry, reason="memory budget")
+        if self._used_bytes() + needed_bytes > self.memory_budget_bytes:
+            print(f"⚠️  [ModelManager] Memory budget exceeded ({self._used_bytes() / 2**20:.0f} MiB used), "
+                  "no more models can be unloaded")
+            print("⚠️  [ModelManager] Vượt ngân sách bộ nhớ, không thể gỡ thêm model")
+
+    def _unload_entry(self, entry: _ModelEntry, reason: str):
+        """Drop a model and release memory (caller holds lock) / Bỏ model và giải phóng bộ nhớ (đã giữ lock)"""
+        print(f"[ModelManager] Unloading {entry.name} ({reason})")
+        print(f"[ModelManager] Đang gỡ {entry.name} ({reason})")
+        entry.instance = None
+        entry.loaded_at = None
+        entry.unloads += 1
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def unload(self, name: str, force: bool = False) -> bool:
+        """
+        Unload a model / Gỡ model
+
+        Args:
+            name: Model name / Tên model
+            force: Also unload a pinned model / Gỡ cả model đã ghim
+
+        Returns:
+            True if it was loaded and is now unloaded / True nếu đã được tải và nay đã gỡ
+
+        Raises:
+            ValueError: Model is pinned (without force) or busy / Model đã ghim (không force) hoặc đang bận
+        """
+        entry = self._entry(name)
+        with self._lock:
+            if entry.instance is None:
+                return False
+            if name in self.pinned and not force:
+                raise ValueError(f"Model {name} is pinned; use force to unload it")
+            if entry.in_use:
+                raise ValueError(f"Model {name} is serving {entry.in_use} request(s)")
+            self._unload_entry(entry, reason="requested")
+            return True
+
+    @contextmanager
+    def use(self, name: str, load: bool = True):
+        """
+        Hold a model for the duration of a request (never evicted while held)
+        Giữ model trong suốt một request (không bị gỡ khi đang giữ)
+
+        Args:
+            name: Model name / Tên model
+            load: Load the model if needed; otherwise yield None when unloaded
+                  Tải model nếu cần; nếu không thì trả None khi chưa tải
+        """
+        instance = self._acquire(name, hold=True, load=load)
+        if instance is None:
+            yield None
+            return
+        entry = self._entries[name]
+        try:
+            yield instance
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.time()
+
+    def _sweep_loop(self, interval: float):
+        """Unload idle models periodically / Gỡ model rảnh theo chu kỳ"""
+        while not self._stop.wait(interval):
+            self.unload_idle()
+
+    def unload_idle(self) -> int:
+        """
+        Unload unpinned models idle longer than the limit / Gỡ model không ghim rảnh quá giới hạn
+
+        Returns:
+            Number of models unloaded / Số model đã gỡ
+        """
+        now = time.time()
+        unloaded = 0
+        with self._lock:
+            for entry in self._entries.values():
+                if (
+                    entry.instance is not None
+                    and entry.name not in self.pinned
+                    and not entry.in_use
+                    and now - entry.last_used > self.idle_unload_seconds
+                ):
+                    self._unload_entry(entry, reason=f"idle {(now - entry.last_used) / 60:.0f} min")
+                    unloaded += 1
+        return unloaded
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether a model is currently loaded / Model có đang được tải không"""
+        return self._entry(name).instance is not None
+
+    def list_models(self) -> Dict[str, Any]:
+        """Status of all managed models / Trạng thái mọi model được quản lý"""
+        now = time.time()
+        with self._lock:
+            models = [
+                {
+                    "name": e.name,
+                    "loaded": e.instance is not None,
+                    "loading": e.loading,
+                    "pinned": e.name in self.pinned,
+                    "in_use": e.in_use,
+                    "rss_mb": e.rss_bytes / 2**20 if e.rss_bytes is not None else None,
+                    "cuda_mb": e.cuda_bytes / 2**20,
+                    "load_seconds": e.load_seconds,
+                    "idle_seconds": now - e.last_used if e.instance is not None else None,
+                    "loads": e.loads,
+                    "unloads": e.unloads,
+                }
+                for e in self._entries.values()
+            ]
+            used = self._used_bytes()
+        return {
+            "models": models,
+            "used_mb": used / 2**20,
+            "memory_budget_mb": self.memory_budget_bytes / 2**20 if self.memory_budget_bytes else None,
+            "idle_unload_minutes": self.idle_unload_seconds / 60 if self.idle_unload_seconds else None,
+            "process_rss_mb": _rss_bytes() / 2**20 if psutil is not None else None,
+        }
+
+    def shutdown(self):
+        """Stop the idle sweeper / Dừng luồng kiểm tra rảnh"""
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=5)
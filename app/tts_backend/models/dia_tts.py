@@ -3,6 +3,7 @@ Dia TTS Model Wrapper
 Wrapper cho Model Dia TTS
 """
 import sys
+import time
 from pathlib import Path
 from typing import Optional
 import torch
@@ -12,157 +13,29 @@ import numpy as np
 DIA_REPO_PATH = Path(__file__).parent.parent.parent.parent / "tts" / "Dia-Finetuning-Vietnamese"
 sys.path.insert(0, str(DIA_REPO_PATH))
 
+import dia.model as dia_model_module
 from dia.model import Dia as DiaModel
-from ..config import ModelConfig
-
-
-def trim_silence(audio: np.ndarray, threshold: float = 0.01, margin: int = 1000) -> np.ndarray:
-    """
-    Remove silence from the beginning and end of audio.
-    Cắt bỏ vùng im lặng ở đầu và cuối audio.
-    
-    Improved algorithm: Only trims from start/end, never cuts content in middle.
-    Thuật toán cải tiến: Chỉ cắt từ đầu/cuối, không bao giờ cắt nội dung ở giữa.
-    
-    Args:
-        audio: Audio array / Mảng audio
-        threshold: Amplitude threshold to consider as 'sound' / Ngưỡng biên độ để coi là 'có tiếng'
-        margin: Keep some samples before and after the sound region / Giữ lại một ít mẫu trước và sau vùng có tiếng
-        
-    Returns:
-        Trimmed audio array / Mảng audio đã cắt
-    """
-    if audio.size == 0:
-        return audio
-    
-    # Use envelope detection to handle quiet but valid speech
-    # Sử dụng phát hiện envelope để xử lý giọng nói yếu nhưng hợp lệ
-    abs_audio = np.abs(audio)
-    
-    # Calculate windowed RMS (root mean square) for more robust detection
-    # Tính RMS theo cửa sổ để phát hiện chính xác hơn
-    # Use larger window to avoid cutting on brief pauses
-    # Sử dụng cửa sổ lớn hơn để tránh cắt ở khoảng tạm dừng ngắn
-    window_size = max(1000, int(0.02 * len(audio)))  # At least 1000 samples or 2% of audio
-    if window_size > len(audio):
-        window_size = len(audio)
-    
-    # Create sliding window RMS
-    # Tạo RMS trượt
-    window_half = window_size // 2
-    rms_values = []
-    
-    for i in range(len(audio)):
-        start_idx = max(0, i - window_half)
-        end_idx = min(len(audio), i + window_half)
-        window_audio = abs_audio[start_idx:end_idx]
-        rms = np.sqrt(np.mean(window_audio ** 2))
-        rms_values.append(rms)
-    
-    rms_array = np.array(rms_values)
-    
-    # Use RMS-based threshold (more robust than amplitude)
-    # Sử dụng ngưỡng dựa trên RMS (chắc chắn hơn so với biên độ)
-    # Lower threshold to avoid cutting valid quiet speech
-    # Giảm ngưỡng để tránh cắt giọng nói yếu hợp lệ
-    rms_threshold = threshold * 0.5  # More lenient for RMS
-    non_silent_indices = np.where(rms_array > rms_threshold)[0]
-    
-    if non_silent_indices.size == 0:
-        # Completely silent, return as is / Hoàn toàn im lặng, trả về như cũ
-        return audio
-    
-    # Find start and end with margin / Tìm điểm bắt đầu và kết thúc có margin
-    # Only trim from actual start/end, never from middle
-    # Chỉ cắt từ đầu/cuối thực tế, không bao giờ từ giữa
-    start = max(non_silent_indices[0] - margin, 0)
-    end = min(non_silent_indices[-1] + margin + 1, len(audio))
-    
-    return audio[start:end]
-
-
-def normalize_audio(audio: np.ndarray, target_db: float = -3.0, max_peak: float = 0.95) -> np.ndarray:
-    """
-    Normalize audio to target dB level and prevent clipping.
-    Chuẩn hóa audio đến mức dB mục tiêu và ngăn chặn clipping.
-    
-    Args:
-        audio: Audio array / Mảng audio
-        target_db: Target dB level (negative value, e.g., -3.0 for -3dB) / Mức dB mục tiêu
-        max_peak: Maximum peak value to prevent clipping / Giá trị peak tối đa để ngăn clipping
-        
-    Returns:
-        Normalized audio array / Mảng audio đã chuẩn hóa
-    """
-    if audio.size == 0:
-        return audio
-    
-    # Get current max value / Lấy giá trị max hiện tại
-    current_max = np.max(np.abs(audio))
-    
-    if current_max == 0:
-        # Silent audio, return as is / Audio im lặng, trả về như cũ
-        return audio
-    
-    # Prevent clipping first / Ngăn clipping trước
-    if current_max > max_peak:
-        audio = audio * (max_peak / current_max)
-        current_max = max_peak
-    
-    # Normalize to target dB if needed / Chuẩn hóa đến mức dB mục tiêu nếu cần
-    if target_db is not None:
-        # Convert dB to linear scale / Chuyển dB sang tỷ lệ tuyến tính
-        target_linear = 10 ** (target_db / 20.0)
-        
-        # Calculate scale factor / Tính hệ số tỷ lệ
-        scale_factor = target_linear / current_max
-        
-        # Ensure we don't clip / Đảm bảo không clip
-        if scale_factor * current_max > max_peak:
-            scale_factor = max_peak / current_max
-        
-        # Apply normalization / Áp dụng chuẩn hóa
-        audio = audio * scale_factor
-    
-    return audio
-
-
-def ensure_audio_format(audio: np.ndarray) -> np.ndarray:
-    """
-    Ensure audio is in correct format (float32, mono, clamped to [-1, 1]).
-    Đảm bảo audio ở định dạng đúng (float32, mono, giới hạn trong [-1, 1]).
-    
-    Args:
-        audio: Audio array / Mảng audio
-        
-    Returns:
-        Formatted audio array / Mảng audio đã định dạng
-    """
-    if audio.size == 0:
-        return audio
-    
-    # Convert to float32 if needed / Chuyển sang float32 nếu cần
-    if audio.dtype != np.float32:
-        if np.issubdtype(audio.dtype, np.integer):
-            # Convert from integer to float / Chuyển từ integer sang float
-            max_val = np.iinfo(audio.dtype).max
-            audio = audio.astype(np.float32) / max_val
-        else:
-            audio = audio.astype(np.float32)
-    
-    # Ensure mono (take first channel if stereo) / Đảm bảo mono (lấy kênh đầu nếu stereo)
-    if audio.ndim > 1:
-        if audio.shape[0] == 2:  # (channels, samples)
-            audio = np.mean(audio, axis=0)
-        elif audio.shape[1] == 2:  # (samples, channels)
-            audio = np.mean(audio, axis=1)
-        else:
-            audio = audio.flatten()
-    
-    # Clamp to [-1, 1] range / Giới hạn trong khoảng [-1, 1]
-    audio = np.clip(audio, -1.0, 1.0)
-    
-    return audio
+from ..config import (
+    ModelConfig,
+    DIA_WATCHDOG_ENABLED,
+    DIA_WATCHDOG_WINDOW,
+    DIA_WATCHDOG_MAX_DISTINCT,
+    DIA_WATCHDOG_PATIENCE,
+    DIA_WATCHDOG_MIN_SPEECH,
+    DIA_TOKEN_PREDICTOR_ENABLED,
+    DIA_AUTO_CHUNK,
+    DIA_CHUNK_MAX_CHARS,
+    DIA_CHUNK_PAUSE_MS,
+    DIA_CHUNK_CROSSFADE_MS,
+)
+# trim_silence is aliased: synthesize() has a trim_silence flag parameter
+# trim_silence được đặt alias: synthesize() có tham số cờ trim_silence
+from ..audio_dsp import trim_silence as _trim_silence, normalize_audio, ensure_audio_format, change_speed
+from ..generation_watchdog import GenerationWatchdog, install_sampler_hook, watch, DIA_HOP_LENGTH
+from ..token_predictor import get_token_predictor
+from ..text_chunker import split_dia_text, should_chunk_text
+from ..audio_assembly import AudioAssembler, estimate_samples
+from ..prompt_cache import get_prompt_cache, install_encoder_hook, use_prompt
 
 
 class DiaTTSWrapper:
@@ -195,6 +68,16 @@ class DiaTTSWrapper:
         self.use_torch_compile = use_torch_compile
         self.model = None
         self.max_safe_tokens = None  # Will be calculated after model load
+        self.last_generation_stats = None
+        self.token_predictor = get_token_predictor() if DIA_TOKEN_PREDICTOR_ENABLED else None
+        self.prompt_cache = get_prompt_cache()
+        self._generation_totals = {
+            "requests": 0,
+            "early_stops": 0,
+            "generated_tokens": 0,
+            "wasted_tokens": 0,
+            "budget_tokens": 0,
+        }
         self._load_model()
     
     def _get_gpu_memory_info(self):
@@ -279,6 +162,13 @@ class DiaTTSWrapper:
         except Exception as e:
             print(f"[DiaTTS] ⚠️ Failed to enable Flash Attention: {e}")
     
+    def _get_audio_eos_value(self) -> Optional[int]:
+        """Audio EOS token from the Dia config / Token EOS audio từ cấu hình Dia"""
+        try:
+            return int(self.model.config.data.audio_eos_value)
+        except AttributeError:
+            return None
+    
     def _load_model(self):
         """Load Dia TTS model / Tải model Dia TTS"""
         print(f"[DiaTTS] Loading Dia TTS from: {self.checkpoint_path}")
@@ -345,6 +235,21 @@ class DiaTTSWrapper:
         print("✅ Dia TTS loaded successfully")
         print("✅ Dia TTS đã được tải thành công")
         
+        # Hook the sampler so the generation watchdog sees every frame
+        # Hook sampler để watchdog generation thấy mọi frame
+        self.audio_eos_value = self._get_audio_eos_value()
+        self._watchdog_hooked = install_sampler_hook(dia_model_module)
+        if not self._watchdog_hooked or self.audio_eos_value is None:
+            print("[DiaTTS] ⚠️ Generation watchdog unavailable (sampler hook or EOS value not found)")
+            print("[DiaTTS] ⚠️ Watchdog generation không khả dụng (không tìm thấy hook sampler hoặc giá trị EOS)")
+        
+        # Serve audio-prompt DAC codes from the cache instead of re-encoding
+        # Lấy mã DAC của audio prompt từ cache thay vì mã hóa lại
+        self._prompt_hooked = install_encoder_hook(dia_model_module, self.prompt_cache)
+        if not self._prompt_hooked:
+            print("[DiaTTS] ⚠️ Audio-prompt cache unavailable (audio_to_codebook not found)")
+            print("[DiaTTS] ⚠️ Cache audio prompt không khả dụng (không tìm thấy audio_to_codebook)")
+        
         # Calculate max safe tokens based on GPU memory after model is loaded
         # Tính toán max safe tokens dựa trên bộ nhớ GPU sau khi model được tải
         if self.device_obj.type == "cuda":
@@ -370,6 +275,7 @@ class DiaTTSWrapper:
         self,
         text: str,
         audio_prompt_path: Optional[str] = None,
+        audio_prompt_id: Optional[str] = None,
         max_tokens: Optional[int] = None,
         temperature: float = 1.3,
         top_p: float = 0.95,
@@ -383,6 +289,9 @@ class DiaTTSWrapper:
         normalize: bool = True,  # Normalize audio levels / Chuẩn hóa mức audio
         normalize_target_db: float = -3.0,  # Target dB for normalization / Mức dB mục tiêu cho chuẩn hóa
         max_peak: float = 0.95,  # Maximum peak to prevent clipping / Peak tối đa để ngăn clipping
+        early_stop: Optional[bool] = None,  # Stop on sustained silence (None = config default) / Dừng khi im lặng kéo dài
+        auto_chunk: Optional[bool] = None,  # Split long text into chunks (None = config default) / Chia văn bản dài thành chunk
+        max_chars: Optional[int] = None,  # Maximum characters per chunk / Ký tự tối đa mỗi chunk
         output_path: Optional[str] = None
     ) -> np.ndarray:
         """
@@ -391,6 +300,7 @@ class DiaTTSWrapper:
         Args:
             text: Input text with speaker tags (e.g., "[01] Your text") / Văn bản đầu vào có tag người nói
             audio_prompt_path: Optional audio prompt path for voice cloning / Đường dẫn audio prompt tùy chọn
+            audio_prompt_id: ID of a registered prompt (overrides audio_prompt_path) / ID của prompt đã đăng ký
             max_tokens: Maximum audio tokens / Số token audio tối đa
             temperature: Sampling temperature / Nhiệt độ lấy mẫu
             top_p: Nucleus sampling / Lấy mẫu nucleus
@@ -404,6 +314,10 @@ class DiaTTSWrapper:
             normalize: Whether to normalize audio levels / Có chuẩn hóa mức audio không
             normalize_target_db: Target dB level for normalization / Mức dB mục tiêu cho chuẩn hóa
             max_peak: Maximum peak value to prevent clipping / Giá trị peak tối đa để ngăn clipping
+            early_stop: Force EOS once sustained silence follows speech / Ép EOS khi im lặng kéo dài sau giọng nói
+            auto_chunk: Generate long text chunk by chunk on sentence/speaker boundaries
+                        Tạo văn bản dài theo từng chunk tại ranh giới câu/người nói
+            max_chars: Maximum characters per chunk (default: DIA_CHUNK_MAX_CHARS) / Ký tự tối đa mỗi chunk
             output_path: Optional output path / Đường dẫn đầu ra tùy chọn
             
         Returns:
@@ -413,9 +327,56 @@ class DiaTTSWrapper:
         # Chuẩn hóa text: thêm dấu chấm ở cuối nếu thiếu (giúp phát hiện EOS cho câu ngắn)
         text = self._normalize_text_for_tts(text)
         
+        # Long text: generate chunk by chunk instead of one huge generation
+        # Văn bản dài: tạo theo từng chunk thay vì một lần generation lớn
+        generation_kwargs = {
+            "audio_prompt_path": audio_prompt_path,
+            "audio_prompt_id": audio_prompt_id,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "cfg_scale": cfg_scale,
+            "use_cfg_filter": use_cfg_filter,
+            "cfg_filter_top_k": cfg_filter_top_k,
+            "trim_silence": trim_silence,
+            "silence_threshold": silence_threshold,
+            "silence_margin": silence_margin,
+            "early_stop": early_stop,
+        }
+        max_chars = max_chars or DIA_CHUNK_MAX_CHARS
+        if (DIA_AUTO_CHUNK if auto_chunk is None else auto_chunk) and should_chunk_text(text, max_chars):
+            wav = self._synthesize_chunked(text, max_chars, generation_kwargs)
+        else:
+            wav = self._generate_single(text, speed_factor=speed_factor, **generation_kwargs)
+        return self._finish_audio(wav, normalize, normalize_target_db, max_peak, speed_factor, output_path)
+    
+    def _generate_single(
+        self,
+        text: str,
+        audio_prompt_path: Optional[str],
+        audio_prompt_id: Optional[str],
+        max_tokens: Optional[int],
+        temperature: float,
+        top_p: float,
+        cfg_scale: float,
+        use_cfg_filter: bool,
+        cfg_filter_top_k: int,
+        trim_silence: bool,
+        silence_threshold: float,
+        silence_margin: int,
+        early_stop: Optional[bool],
+        speed_factor: float = 1.0
+    ) -> np.ndarray:
+        """
+        One Dia generation of normalized text, trimmed but not normalized or sped up
+        Một lần generation Dia cho văn bản đã chuẩn hóa, đã cắt im lặng nhưng chưa chuẩn hóa hay đổi tốc độ
+        
+        speed_factor is only recorded by the token predictor / speed_factor chỉ được bộ dự đoán token ghi lại
+        """
         # Calculate max_tokens based on text length if not provided
         # Tính max_tokens dựa trên độ dài text nếu không được cung cấp
         original_text_length = len(text)
+        prediction = None
         if max_tokens is None:
             # Estimate tokens needed based on text length
             # Ước tính số token cần thiết dựa trên độ dài text
@@ -437,6 +398,17 @@ class DiaTTSWrapper:
             default_max_tokens = 3072  # ~30 seconds of audio
             max_tokens = max(default_max_tokens, estimated_tokens)
             
+            # Learned per-speaker budget replaces the heuristic once trained
+            # Ngân sách học theo người nói thay heuristic khi đã đủ dữ liệu
+            if self.token_predictor is not None:
+                prediction = self.token_predictor.predict(text, heuristic_tokens=max_tokens)
+                if prediction is not None:
+                    max_tokens = prediction["max_tokens"]
+                    print(f"[DiaTTS] Predicted {prediction['expected_tokens']} tokens for speaker {prediction['speaker']} "
+                          f"(+{prediction['margin']:.0%} margin), heuristic would use {prediction['heuristic_tokens']}")
+                    print(f"[DiaTTS] Dự đoán {prediction['expected_tokens']} tokens cho người nói {prediction['speaker']} "
+                          f"(+{prediction['margin']:.0%} biên), heuristic sẽ dùng {prediction['heuristic_tokens']}")
+            
             # Cap at GPU-safe maximum to prevent OOM
             # Giới hạn ở mức tối đa an toàn cho GPU để tránh hết bộ nhớ
             if hasattr(self, 'max_safe_tokens') and self.max_safe_tokens:
@@ -458,11 +430,43 @@ class DiaTTSWrapper:
             print(f"[DiaTTS] Using provided max_tokens: {max_tokens} (~{max_tokens/102:.1f}s)")
             print(f"[DiaTTS] Sử dụng max_tokens được cung cấp: {max_tokens} (~{max_tokens/102:.1f}s)")
         
+        # Watchdog stops generation once sustained silence follows speech
+        # Watchdog dừng generation khi im lặng kéo dài sau giọng nói
+        watchdog = GenerationWatchdog(
+            max_tokens=max_tokens,
+            eos_value=self.audio_eos_value,
+            window=DIA_WATCHDOG_WINDOW,
+            max_distinct=DIA_WATCHDOG_MAX_DISTINCT,
+            patience=DIA_WATCHDOG_PATIENCE,
+            min_speech_frames=DIA_WATCHDOG_MIN_SPEECH,
+            enabled=DIA_WATCHDOG_ENABLED if early_stop is None else early_stop
+        )
+        
+        # Cached prompt encodings skip the DAC encoder / Mã hóa prompt đã cache bỏ qua bộ mã hóa DAC
+        if audio_prompt_id:
+            audio_prompt_path = self.prompt_cache.resolve(audio_prompt_id)
+        prompt_key = self.prompt_cache.cache_key(audio_prompt_path) if audio_prompt_path and self._prompt_hooked else None
+        
         # Generate speech / Tạo giọng nói
         # Use autocast for fp16 inference (safer than model.half() with torch.compile)
         # Dùng autocast cho inference fp16 (an toàn hơn model.half() với torch.compile)
-        if hasattr(self, '_use_autocast_fp16') and self._use_autocast_fp16 and self.device_obj.type == "cuda":
-            with torch.cuda.amp.autocast(dtype=torch.float16):
+        with watch(watchdog), use_prompt(prompt_key):
+            if hasattr(self, '_use_autocast_fp16') and self._use_autocast_fp16 and self.device_obj.type == "cuda":
+                with torch.cuda.amp.autocast(dtype=torch.float16):
+                    wav = self.model.generate(
+                        text=text,
+                        max_tokens=max_tokens,
+                        cfg_scale=cfg_scale,
+                        temperature=temperature,
+                        top_p=top_p,
+                        use_cfg_filter=use_cfg_filter,
+                        use_torch_compile=False,  # Don't use with autocast
+                        cfg_filter_top_k=cfg_filter_top_k,
+                        audio_prompt_path=audio_prompt_path
+                    )
+            else:
+                # Standard float32 inference (or autocast not enabled)
+                # Inference float32 tiêu chuẩn (hoặc autocast không được bật)
                 wav = self.model.generate(
                     text=text,
                     max_tokens=max_tokens,
@@ -470,53 +474,60 @@ class DiaTTSWrapper:
                     temperature=temperature,
                     top_p=top_p,
                     use_cfg_filter=use_cfg_filter,
-                    use_torch_compile=False,  # Don't use with autocast
+                    use_torch_compile=self.use_torch_compile if self.device_obj.type == "cuda" else False,
                     cfg_filter_top_k=cfg_filter_top_k,
                     audio_prompt_path=audio_prompt_path
                 )
-        else:
-            # Standard float32 inference (or autocast not enabled)
-            # Inference float32 tiêu chuẩn (hoặc autocast không được bật)
-            wav = self.model.generate(
-                text=text,
+        
+        generation_stats = self._record_generation(watchdog, wav)
+        
+        # Learn the actual speech length for future budgets / Học độ dài giọng nói thực cho ngân sách sau
+        if self.token_predictor is not None:
+            needed_tokens = generation_stats["generated_tokens"] - generation_stats["wasted_tokens"]
+            self.token_predictor.observe(
+                text,
+                speed_factor=speed_factor,
+                needed_tokens=needed_tokens,
                 max_tokens=max_tokens,
-                cfg_scale=cfg_scale,
-                temperature=temperature,
-                top_p=top_p,
-                use_cfg_filter=use_cfg_filter,
-                use_torch_compile=self.use_torch_compile if self.device_obj.type == "cuda" else False,
-                cfg_filter_top_k=cfg_filter_top_k,
-                audio_prompt_path=audio_prompt_path
+                truncated=(
+                    generation_stats["generated_tokens"] >= max_tokens
+                    and not generation_stats["stopped_early"]
+                    and generation_stats["wasted_tokens"] == 0
+                ),
+                prediction=prediction
             )
+        generation_stats["prediction"] = prediction
         
         # Ensure audio format is correct / Đảm bảo định dạng audio đúng
         wav = ensure_audio_format(wav)
         
-        # Get function references from module namespace to avoid parameter shadowing
-        # Lấy tham chiếu hàm từ module namespace để tránh tham số che khuất
-        # Parameters with same names as functions shadow them, so access via module
-        import sys
-        module = sys.modules[__name__]
-        _trim_silence_func = getattr(module, 'trim_silence')  # Get function from module
-        _normalize_audio_func = getattr(module, 'normalize_audio')  # Get function from module
-        
         # Trim silence from beginning and end / Cắt im lặng ở đầu và cuối
-        # Parameter name 'trim_silence' (bool) shadows function 'trim_silence()'
-        if trim_silence:  # Check boolean parameter
+        if trim_silence:
             original_length = len(wav)
-            # Use function from module namespace (not shadowed by parameter)
-            wav = _trim_silence_func(wav, threshold=silence_threshold, margin=silence_margin)
+            wav = _trim_silence(wav, threshold=silence_threshold, margin=silence_margin)
             trimmed_length = len(wav)
             if trimmed_length < original_length:
                 trimmed_seconds = (original_length - trimmed_length) / self.sample_rate
                 print(f"Trimmed silence: {original_length} -> {trimmed_length} samples ({trimmed_seconds:.2f}s removed)")
                 print(f"Đã cắt im lặng: {original_length} -> {trimmed_length} mẫu ({trimmed_seconds:.2f}s đã loại bỏ)")
         
+        return wav
+    
+    def _finish_audio(
+        self,
+        wav: np.ndarray,
+        normalize: bool,
+        normalize_target_db: float,
+        max_peak: float,
+        speed_factor: float,
+        output_path: Optional[str]
+    ) -> np.ndarray:
+        """
+        Normalize, apply speed factor and save / Chuẩn hóa, áp dụng hệ số tốc độ và lưu
+        """
         # Normalize audio levels / Chuẩn hóa mức audio
-        # Parameter name 'normalize' (bool) would shadow function, but we use different name
-        if normalize:  # Check boolean parameter
-            # Use function from module namespace
-            wav = _normalize_audio_func(wav, target_db=normalize_target_db, max_peak=max_peak)
+        if normalize:
+            wav = normalize_audio(wav, target_db=normalize_target_db, max_peak=max_peak)
         
         # Apply speed factor for slower narration / Áp dụng hệ số tốc độ cho narration chậm hơn
         if speed_factor < 1.0 and speed_factor >= 0.8:
@@ -528,9 +539,7 @@ class DiaTTSWrapper:
             target_len = int(original_len / speed_factor)
             
             if target_len != original_len and target_len > 0:
-                x_original = np.arange(original_len)
-                x_resampled = np.linspace(0, original_len - 1, target_len)
-                wav = np.interp(x_resampled, x_original, wav).astype(np.float32)
+                wav = change_speed(wav, speed_factor)
                 print(f"Applied speed factor {speed_factor:.2f}x (slower): {original_len} -> {target_len} samples")
                 print(f"Đã áp dụng hệ số tốc độ {speed_factor:.2f}x (chậm hơn): {original_len} -> {target_len} mẫu")
         
@@ -541,6 +550,136 @@ class DiaTTSWrapper:
         
         return wav
     
+    def _synthesize_chunked(self, text: str, max_chars: int, generation_kwargs: dict) -> np.ndarray:
+        """
+        Generate long text chunk by chunk into one assembly buffer
+        Tạo văn bản dài theo từng chunk vào một buffer ghép
+        
+        Chunks are split on speaker-tag/sentence boundaries and keep their speaker
+        tags; each is generated back to back (Dia.generate takes a single text, so
+        there is no batching) and written straight into a preallocated float32
+        buffer. Normalization and speed change run once on the joined audio.
+        
+        Chunk được chia tại ranh giới tag người nói/câu và giữ tag người nói; mỗi
+        chunk được tạo nối tiếp (Dia.generate chỉ nhận một văn bản, nên không batch)
+        và ghi thẳng vào buffer float32 cấp phát trước. Chuẩn hóa và đổi tốc độ chạy
+        một lần trên audio đã ghép.
+        
+        Args:
+            text: Normalized input text / Văn bản đầu vào đã chuẩn hóa
+            max_chars: Maximum characters per chunk / Ký tự tối đa mỗi chunk
+            generation_kwargs: Per-chunk synthesize arguments / Tham số synthesize cho mỗi chunk
+            
+        Returns:
+            Joined float32 audio / Audio float32 đã ghép
+        """
+        chunks = split_dia_text(text, max_chars=max_chars)
+        print(f"[DiaTTS] Long text ({len(text)} chars) split into {len(chunks)} chunks (max {max_chars} chars)")
+        print(f"[DiaTTS] Văn bản dài ({len(text)} ký tự) được chia thành {len(chunks)} chunk (tối đa {max_chars} ký tự)")
+        
+        assembler = AudioAssembler(
+            self.sample_rate,
+            expected_samples=estimate_samples(len(text), self.sample_rate),
+            pause_ms=DIA_CHUNK_PAUSE_MS,
+            crossfade_ms=DIA_CHUNK_CROSSFADE_MS
+        )
+        combined = {"chunks": len(chunks), "max_tokens": 0, "generated_tokens": 0, "wasted_tokens": 0, "early_stops": 0}
+        for index, chunk in enumerate(chunks):
+            print(f"[DiaTTS] Chunk {index + 1}/{len(chunks)}: {chunk[:60]}...")
+            audio = self._generate_single(self._normalize_text_for_tts(chunk), **generation_kwargs)
+            assembler.append(audio)
+            stats = self.last_generation_stats
+            combined["max_tokens"] += stats["max_tokens"]
+            combined["generated_tokens"] += stats["generated_tokens"]
+            combined["wasted_tokens"] += stats["wasted_tokens"]
+            combined["early_stops"] += int(stats["stopped_early"])
+        
+        generated = combined["generated_tokens"]
+        combined["wasted_ratio"] = combined["wasted_tokens"] / generated if generated else 0.0
+        combined["unused_budget_ratio"] = (
+            max(0, combined["max_tokens"] - generated) / combined["max_tokens"] if combined["max_tokens"] else 0.0
+        )
+        combined["stopped_early"] = combined["early_stops"] > 0
+        combined["assembly"] = assembler.get_stats()
+        self.last_generation_stats = combined
+        return assembler.finalize()
+    
+    def _record_generation(self, watchdog: GenerationWatchdog, wav) -> dict:
+        """
+        Record per-request token usage / Ghi nhận mức dùng token theo request
+        
+        Falls back to the output length when the sampler hook is unavailable.
+        Dùng độ dài đầu ra khi không có hook sampler.
+        """
+        output_samples = len(wav) if wav is not None else 0
+        stats = watchdog.get_stats(generated_tokens=-(-output_samples // DIA_HOP_LENGTH))
+        self.last_generation_stats = stats
+        totals = self._generation_totals
+        totals["requests"] += 1
+        totals["early_stops"] += int(stats["stopped_early"])
+        totals["generated_tokens"] += stats["generated_tokens"]
+        totals["wasted_tokens"] += stats["wasted_tokens"]
+        totals["budget_tokens"] += stats["max_tokens"]
+        
+        status = f"early stop at frame {stats['stop_frame']}" if stats["stopped_early"] else "no early stop"
+        print(f"[DiaTTS] Tokens: {stats['generated_tokens']}/{stats['max_tokens']} generated, "
+              f"{stats['wasted_tokens']} trailing silence ({stats['wasted_ratio']:.0%}), {status}")
+        print(f"[DiaTTS] Tokens: đã tạo {stats['generated_tokens']}/{stats['max_tokens']}, "
+              f"{stats['wasted_tokens']} im lặng cuối ({stats['wasted_ratio']:.0%})")
+        return stats
+    
+    def register_audio_prompt(self, audio_data: bytes, suffix: str = ".wav", name: Optional[str] = None) -> dict:
+        """
+        Register a voice-cloning prompt and encode it once / Đăng ký prompt clone giọng và mã hóa một lần
+        
+        Args:
+            audio_data: Prompt audio bytes / Bytes audio prompt
+            suffix: File extension / Phần mở rộng file
+            name: Optional display name / Tên hiển thị tùy chọn
+            
+        Returns:
+            Prompt info with prompt_id to pass as audio_prompt_id / Thông tin prompt với prompt_id để truyền vào audio_prompt_id
+        """
+        info = self.prompt_cache.register(audio_data, suffix, name)
+        info["precomputed"] = False
+        if self._prompt_hooked:
+            try:
+                start = time.time()
+                self._encode_prompt(info["file"])
+                info["precomputed"] = True
+                info["precompute_seconds"] = time.time() - start
+            except Exception as e:
+                # First synthesis encodes it instead / Lần tổng hợp đầu sẽ mã hóa thay
+                print(f"[DiaTTS] ⚠️ Could not precompute prompt {info['prompt_id']}: {e}")
+                print(f"[DiaTTS] ⚠️ Không thể tính trước prompt {info['prompt_id']}: {e}")
+        return info
+    
+    def _encode_prompt(self, prompt_path: str):
+        """
+        Encode a prompt the same way Dia.generate does, storing the codes in the cache
+        Mã hóa prompt giống cách Dia.generate làm, lưu mã vào cache
+        """
+        import torchaudio
+        
+        audio, sr = torchaudio.load(prompt_path, channels_first=True)
+        if sr != self.sample_rate:
+            audio = torchaudio.functional.resample(audio, sr, self.sample_rate)
+        audio = audio.to(self.device_obj).unsqueeze(0)
+        with torch.inference_mode(), use_prompt(self.prompt_cache.cache_key(prompt_path)):
+            dia_model_module.audio_to_codebook(self.model.dac_model, audio, data_config=self.model.config.data)
+    
+    def get_generation_stats(self) -> dict:
+        """Aggregate generation statistics / Thống kê generation tổng hợp"""
+        totals = dict(self._generation_totals)
+        generated = totals["generated_tokens"]
+        totals["wasted_ratio"] = totals["wasted_tokens"] / generated if generated else 0.0
+        totals["budget_used_ratio"] = generated / totals["budget_tokens"] if totals["budget_tokens"] else 0.0
+        totals["watchdog_enabled"] = DIA_WATCHDOG_ENABLED
+        totals["watchdog_hooked"] = self._watchdog_hooked
+        totals["last_request"] = self.last_generation_stats
+        totals["max_tokens_predictor"] = self.token_predictor.get_stats() if self.token_predictor else None
+        return totals
+    
     def _normalize_text_for_tts(self, text: str) -> str:
         """
         Normalize text for TTS generation to improve EOS detection.
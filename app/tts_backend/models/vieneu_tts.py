@@ -90,6 +90,9 @@ except ImportError:
     # Fallback to our config system
     from config import ModelConfig
 
+from ..config import VIENEU_PRELOAD_VOICES, VIENEU_SAMPLE_DIR
+from ..ref_code_cache import get_ref_code_cache
+
 
 class VieNeuTTSWrapper:
     """
@@ -152,6 +155,34 @@ class VieNeuTTSWrapper:
         
         print("✅ VieNeu-TTS loaded successfully")
         print("✅ VieNeu-TTS đã được tải thành công")
+        
+        # Reference encodings: shared on-disk .npy cache with in-memory LRU
+        # Mã hóa tham chiếu: cache .npy trên disk dùng chung với LRU bộ nhớ
+        self.ref_code_cache = get_ref_code_cache()
+        if VIENEU_PRELOAD_VOICES:
+            self.preload_voices()
+    
+    def get_ref_codes(self, ref_audio_path: str) -> torch.Tensor:
+        """
+        Reference codes for an audio file (encoded once, then cached)
+        Mã tham chiếu cho file audio (mã hóa một lần, sau đó cache)
+        """
+        return self.ref_code_cache.get_or_encode_tensor(ref_audio_path, self.model.encode_reference)
+    
+    def preload_voices(self, sample_dir: Optional[str] = None) -> int:
+        """
+        Encode the sample voices (id_*.wav with a matching .txt) ahead of requests
+        Mã hóa các giọng mẫu (id_*.wav có .txt tương ứng) trước request
+        
+        Args:
+            sample_dir: Voice sample directory (default: VIENEU_SAMPLE_DIR) / Thư mục giọng mẫu (mặc định: VIENEU_SAMPLE_DIR)
+        """
+        sample_dir = Path(sample_dir or VIENEU_SAMPLE_DIR)
+        paths = [p for p in sorted(sample_dir.glob("id_*.wav")) if p.with_suffix(".txt").exists()]
+        ready = self.ref_code_cache.preload(paths, self.model.encode_reference)
+        print(f"✅ Reference codes ready for {ready}/{len(paths)} voices")
+        print(f"✅ Mã tham chiếu sẵn sàng cho {ready}/{len(paths)} giọng")
+        return ready
     
     def synthesize(
         self,
@@ -175,9 +206,9 @@ class VieNeuTTSWrapper:
         Returns:
             Audio array (numpy array) / Mảng audio (numpy array)
         """
-        # Encode reference audio (exactly like repo examples)
-        # Mã hóa audio tham chiếu (chính xác như các ví dụ trong repo)
-        ref_codes = self.model.encode_reference(ref_audio_path)
+        # Encode reference audio once; later requests hit the shared cache
+        # Mã hóa audio tham chiếu một lần; request sau dùng cache chung
+        ref_codes = self.get_ref_codes(ref_audio_path)
         
         # Generate speech (exactly like repo examples)
         # Tạo giọng nói (chính xác như các ví dụ trong repo)
@@ -0,0 +1,238 @@
+"""
+VieNeu-TTS Reference-Code Cache
+Cache Mã Tham chiếu VieNeu-TTS
+
+encode_reference() runs the NeuCodec encoder over the reference WAV, which costs
+far more than looking up its result. Reference codes are cached here as .npy files
+keyed by the audio content hash plus the codec identity and version, with a bounded
+in-memory LRU in front. The default directory is shared by the app backend and the
+standalone VieNeu backend, so a voice encoded by one is a disk hit for the other.
+
+encode_reference() chạy bộ mã hóa NeuCodec trên WAV tham chiếu, tốn hơn nhiều so
+với tra kết quả. Mã tham chiếu được cache ở đây dưới dạng file .npy theo hash nội
+dung audio cộng định danh và phiên bản codec, với LRU bộ nhớ có giới hạn phía
+trước. Thư mục mặc định dùng chung giữa app backend và VieNeu backend độc lập, nên
+giọng được mã hóa bởi bên này là disk hit cho bên kia.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+# Bump when the stored code layout changes / Tăng khi cấu trúc mã lưu trữ thay đổi
+ENCODING_VERSION = 1
+
+# Codec used by both wrappers / Codec dùng bởi cả hai wrapper
+CODEC_REPO = "neuphonic/neucodec"
+
+
+def codec_version() -> str:
+    """Installed neucodec version, part of the cache key / Phiên bản neucodec đã cài, một phần của khóa cache"""
+    try:
+        from importlib.metadata import version
+        return version("neucodec")
+    except Exception:
+        return "unknown"
+
+
+def hash_audio_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Content hash of a reference file / Hash nội dung của file tham chiếu
+
+    Args:
+        path: Reference audio path / Đường dẫn audio tham chiếu
+        chunk_size: Read chunk size / Kích thước đọc mỗi lần
+
+    Returns:
+        SHA-256 hex digest / Chuỗi hex SHA-256
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RefCodeCache:
+    """Disk (.npy) + LRU cache of VieNeu reference codes / Cache disk (.npy) + LRU cho mã tham chiếu VieNeu"""
+
+    def __init__(self, store_dir: str, max_memory_entries: int = 32, codec_id: Optional[str] = None):
+        """
+        Initialize reference-code cache / Khởi tạo cache mã tham chiếu
+
+        Args:
+            store_dir: Directory for .npy codes / Thư mục cho mã .npy
+            max_memory_entries: Maximum codes kept in memory / Số mã tối đa giữ trong bộ nhớ
+            codec_id: Codec identity, part of the cache key / Định danh codec, một phần của khóa cache
+        """
+        self.store_dir = Path(store_dir).resolve()
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.codec_id = codec_id or f"{CODEC_REPO}@{codec_version()}"
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # key -> torch tensor sharing the array's memory, dropped with the LRU entry
+        # key -> tensor torch dùng chung bộ nhớ với mảng, bị bỏ cùng mục LRU
+        self._tensors: Dict[str, Any] = {}
+        # path -> (mtime, size, content hash), avoids re-hashing unchanged files
+        # path -> (mtime, size, hash nội dung), tránh hash lại file không đổi
+        self._path_hashes: Dict[str, tuple] = {}
+        self._lock = threading.RLock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "encoded": 0, "evictions": 0, "encode_seconds": 0.0}
+
+        print(f"[RefCodeCache] Directory: {self.store_dir} (codec: {self.codec_id}, memory LRU: {self.max_memory_entries})")
+
+    def cache_key(self, ref_audio_path: str) -> str:
+        """Cache key for a reference file / Khóa cache cho file tham chiếu"""
+        path = str(ref_audio_path)
+        stat = Path(path).stat()
+        with self._lock:
+            memo = self._path_hashes.get(path)
+        if memo and memo[0] == stat.st_mtime and memo[1] == stat.st_size:
+            content_hash = memo[2]
+        else:
+            content_hash = hash_audio_file(path)
+            with self._lock:
+                self._path_hashes[path] = (stat.st_mtime, stat.st_size, content_hash)
+        return hashlib.sha256(f"{self.codec_id}:v{ENCODING_VERSION}:{content_hash}".encode()).hexdigest()
+
+    def _remember(self, key: str, codes: np.ndarray):
+        """Insert into memory LRU (caller holds lock) / Thêm vào LRU bộ nhớ (đã giữ lock)"""
+        self._memory[key] = codes
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            evicted, _ = self._memory.popitem(last=False)
+            self._tensors.pop(evicted, None)
+            self._stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Cached codes for a key or None / Mã đã cache theo khóa hoặc None"""
+        with self._lock:
+            codes = self._memory.get(key)
+            if codes is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return codes
+
+            codes_path = self.store_dir / f"{key}.npy"
+            if codes_path.exists():
+                try:
+                    codes = np.load(codes_path, allow_pickle=False)
+                    self._stats["disk_hits"] += 1
+                    self._remember(key, codes)
+                    return codes
+                except Exception as e:
+                    print(f"⚠️  [RefCodeCache] Corrupt codes {codes_path.name}, re-encoding: {e}")
+                    print(f"⚠️  [RefCodeCache] Mã hỏng {codes_path.name}, mã hóa lại: {e}")
+        return None
+
+    def put(self, key: str, codes: np.ndarray, encode_seconds: float = 0.0):
+        """Store freshly encoded codes / Lưu mã vừa mã hóa"""
+        codes_path = self.store_dir / f"{key}.npy"
+        tmp_path = codes_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, codes, allow_pickle=False)
+        tmp_path.replace(codes_path)
+        with self._lock:
+            self._stats["encoded"] += 1
+            self._stats["encode_seconds"] += encode_seconds
+            self._remember(key, codes)
+
+    def get_or_encode(self, ref_audio_path: str, encode_fn: Callable[[str], Any]) -> np.ndarray:
+        """
+        Reference codes from cache, encoding on miss / Mã tham chiếu từ cache, mã hóa khi miss
+
+        Args:
+            ref_audio_path: Reference audio path / Đường dẫn audio tham chiếu
+            encode_fn: Encoder (e.g. VieNeuTTS.encode_reference) / Bộ mã hóa (vd. VieNeuTTS.encode_reference)
+
+        Returns:
+            Reference codes as an integer array / Mã tham chiếu dạng mảng số nguyên
+        """
+        key = self.cache_key(ref_audio_path)
+        codes = self.get(key)
+        if codes is not None:
+            return codes
+
+        start = time.time()
+        encoded = encode_fn(str(ref_audio_path))
+        if hasattr(encoded, "detach"):
+            encoded = encoded.detach().cpu().numpy()
+        codes = np.asarray(encoded)
+        self.put(key, codes, time.time() - start)
+        return codes
+
+    def get_or_encode_tensor(self, ref_audio_path: str, encode_fn: Callable[[str], Any]):
+        """
+        Like get_or_encode, but returns a torch tensor built once per cached entry
+        Giống get_or_encode, nhưng trả về tensor torch tạo một lần cho mỗi mục cache
+        """
+        import torch
+
+        key = self.cache_key(ref_audio_path)
+        with self._lock:
+            tensor = self._tensors.get(key)
+            if tensor is not None and key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return tensor
+        codes = self.get_or_encode(ref_audio_path, encode_fn)
+        tensor = torch.from_numpy(codes)
+        with self._lock:
+            if key in self._memory:
+                self._tensors[key] = tensor
+        return tensor
+
+    def preload(self, ref_audio_paths: Iterable[str], encode_fn: Callable[[str], Any]) -> int:
+        """
+        Encode references ahead of requests (disk hits are just loaded) / Mã hóa tham chiếu trước request (disk hit chỉ được tải)
+
+        Returns:
+            Number of references ready / Số tham chiếu đã sẵn sàng
+        """
+        ready = 0
+        for path in ref_audio_paths:
+            try:
+                self.get_or_encode(path, encode_fn)
+                ready += 1
+            except Exception as e:
+                print(f"⚠️  [RefCodeCache] Could not preload {path}: {e}")
+                print(f"⚠️  [RefCodeCache] Không thể tải trước {path}: {e}")
+        return ready
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics / Thống kê cache"""
+        with self._lock:
+            lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["encoded"]
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            return {
+                **self._stats,
+                "hit_ratio": hits / lookups if lookups else None,
+                "memory_entries": len(self._memory),
+                "max_memory_entries": self.max_memory_entries,
+                "codec": self.codec_id,
+                "store_dir": str(self.store_dir),
+            }
+
+
+# Global cache instance / Instance cache toàn cục
+_cache_instance: Optional[RefCodeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ref_code_cache() -> RefCodeCache:
+    """Get global reference-code cache / Lấy cache mã tham chiếu toàn cục"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                from .config import VIENEU_REF_CODE_CACHE_DIR, VIENEU_REF_CODE_MEMORY_ENTRIES
+                _cache_instance = RefCodeCache(
+                    store_dir=VIENEU_REF_CODE_CACHE_DIR,
+                    max_memory_entries=VIENEU_REF_CODE_MEMORY_ENTRIES
+                )
+    return _cache_instance
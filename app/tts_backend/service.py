@@ -9,7 +9,8 @@ if TYPE_CHECKING:
     from .models.vieneu_tts import VieNeuTTSWrapper
     from .models.dia_tts import DiaTTSWrapper
 
-from .config import ModelConfig
+from .config import ModelConfig, MODEL_MEMORY_BUDGET_MB, MODEL_IDLE_UNLOAD_MINUTES, MODEL_PINNED
+from .model_manager import ModelManager
 
 # Model types / Loại model
 ModelType = Literal["vieneu-tts", "dia"]
@@ -26,14 +27,21 @@ class TTSService:
             preload_default: Whether to preload default model at startup / Có tải trước model mặc định khi khởi động không
         """
         self.default_model = default_model
-        self.vieneu_tts = None
-        self.dia_tts = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         print(f"Initializing TTS Service on device: {self.device}")
         print(f"Khởi tạo Dịch vụ TTS trên thiết bị: {self.device}")
         print(f"Default model: {default_model}")
         print(f"Model mặc định: {default_model}")
         
+        # Models are loaded, measured and unloaded by the model manager
+        # Model được tải, đo và gỡ bởi quản lý model
+        self.models = ModelManager(
+            loaders={"vieneu-tts": self._load_vieneu_tts, "dia": self._load_dia_tts},
+            memory_budget_mb=MODEL_MEMORY_BUDGET_MB,
+            idle_unload_minutes=MODEL_IDLE_UNLOAD_MINUTES,
+            pinned=MODEL_PINNED or [default_model]
+        )
+        
         # Preload default model at startup to avoid loading delay on first request
         # Tải trước model mặc định khi khởi động để tránh độ trễ tải ở request đầu tiên
         if preload_default:
@@ -48,23 +56,31 @@ class TTSService:
             print("✅ Default model preloaded")
             print("✅ Model mặc định đã được tải trước")
     
+    def _load_vieneu_tts(self):
+        """Load VieNeu-TTS model / Tải model VieNeu-TTS"""
+        print("Loading VieNeu-TTS model...")
+        print("Đang tải model VieNeu-TTS...")
+        from .models.vieneu_tts import VieNeuTTSWrapper
+        return VieNeuTTSWrapper(device=self.device)
+    
+    def _load_dia_tts(self):
+        """Load Dia TTS model / Tải model Dia TTS"""
+        print("Loading Dia TTS model...")
+        print("Đang tải model Dia TTS...")
+        from .models.dia_tts import DiaTTSWrapper
+        return DiaTTSWrapper(device=self.device)
+    
     def get_vieneu_tts(self):
         """Get or load VieNeu-TTS model / Lấy hoặc tải model VieNeu-TTS"""
-        if self.vieneu_tts is None:
-            print("Loading VieNeu-TTS model...")
-            print("Đang tải model VieNeu-TTS...")
-            from .models.vieneu_tts import VieNeuTTSWrapper
-            self.vieneu_tts = VieNeuTTSWrapper(device=self.device)
-        return self.vieneu_tts
+        return self.models.get("vieneu-tts")
     
     def get_dia_tts(self):
         """Get or load Dia TTS model / Lấy hoặc tải model Dia TTS"""
-        if self.dia_tts is None:
-            print("Loading Dia TTS model...")
-            print("Đang tải model Dia TTS...")
-            from .models.dia_tts import DiaTTSWrapper
-            self.dia_tts = DiaTTSWrapper(device=self.device)
-        return self.dia_tts
+        return self.models.get("dia")
+    
+    def get_loaded_dia_tts(self):
+        """Dia TTS model if loaded, without loading it / Model Dia TTS nếu đã tải, không tải thêm"""
+        return self.models.peek("dia")
     
     def synthesize(
         self,
@@ -92,12 +108,14 @@ class TTSService:
         if model == "vieneu-tts":
             if not ref_audio_path or not ref_text:
                 raise ValueError("VieNeu-TTS requires ref_audio_path and ref_text")
-            vieneu = self.get_vieneu_tts()
-            return vieneu.synthesize(text, ref_audio_path, ref_text, **kwargs)
+            # Held for the whole request so it cannot be unloaded mid-synthesis
+            # Giữ trong suốt request để không bị gỡ giữa chừng
+            with self.models.use("vieneu-tts") as vieneu:
+                return vieneu.synthesize(text, ref_audio_path, ref_text, **kwargs)
         
         elif model == "dia":
-            dia = self.get_dia_tts()
-            return dia.synthesize(text, **kwargs)
+            with self.models.use("dia") as dia:
+                return dia.synthesize(text, **kwargs)
         
         else:
             raise ValueError(f"Unknown model: {model}")
@@ -131,6 +149,10 @@ class TTSService:
         else:
             raise ValueError(f"Unknown model: {model}")
 
+    def shutdown(self):
+        """Stop background model management / Dừng quản lý model nền"""
+        self.models.shutdown()
+
 # Global service instance / Instance dịch vụ toàn cục
 _service_instance: Optional[TTSService] = None
 
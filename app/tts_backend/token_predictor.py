@@ -0,0 +1,420 @@
+"""
+Online max_tokens Predictor for Dia
+Bộ dự đoán max_tokens Trực tuyến cho Dia
+
+The old `len(text) * 20` heuristic (with a 3072-token floor) over-allocates for
+most lines and under-allocates for dialog-heavy ones. Every synthesis is recorded
+as (text features, speaker tag, speed, audio tokens actually needed) and fed into
+a small ridge regression per speaker (plus a global fallback), updated online from
+its sufficient statistics. The prediction is widened by a safety margin learned
+from the model's own relative errors, and the state is persisted as JSON so it
+survives restarts.
+
+Truncated runs only tell us a lower bound on the tokens needed (censored samples).
+They are kept out of the regression, which would otherwise learn too-small budgets,
+cause more truncation and feed that back; they can only widen the margin.
+
+Heuristic cũ `len(text) * 20` (sàn 3072 token) cấp dư cho hầu hết câu và cấp thiếu
+cho đoạn nhiều hội thoại. Mỗi lần tổng hợp được ghi lại (đặc trưng văn bản, tag
+người nói, tốc độ, số token audio thực sự cần) và đưa vào một hồi quy ridge nhỏ
+cho mỗi người nói (cùng mô hình toàn cục dự phòng), cập nhật trực tuyến từ thống
+kê đủ. Dự đoán được nới rộng bằng biên an toàn học từ sai số tương đối của chính
+mô hình, và trạng thái được lưu dạng JSON để tồn tại qua các lần khởi động lại.
+
+Lần chạy bị cắt chỉ cho biết cận dưới của số token cần (mẫu bị kiểm duyệt). Chúng
+không được đưa vào hồi quy, vốn sẽ học ngân sách quá nhỏ, gây cắt nhiều hơn và tự
+khuếch đại; chúng chỉ có thể nới rộng biên an toàn.
+"""
+import json
+import math
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Bump when the feature layout or update rule changes (old state is then discarded)
+# Tăng khi cấu trúc đặc trưng hoặc quy tắc cập nhật thay đổi (trạng thái cũ sẽ bị bỏ)
+MODEL_VERSION = 2
+
+FEATURE_NAMES = ("bias", "chars", "words", "pauses", "turns", "digits")
+
+GLOBAL_KEY = "__global__"
+
+_SPEAKER_TAG = re.compile(r"\[([^\]]+)\]")
+_PAUSE_CHARS = re.compile(r"[.,!?;:…\-]")
+
+# Exponential decay of residual statistics (recent errors weigh more)
+# Hệ số suy giảm của thống kê sai số (sai số gần đây có trọng số lớn hơn)
+_ERROR_DECAY = 0.9
+
+
+def extract_features(text: str) -> List[float]:
+    """
+    Text features used by the regression / Đặc trưng văn bản dùng cho hồi quy
+
+    Speaker tags are counted as turns and removed before counting characters.
+    Tag người nói được đếm là lượt thoại và bỏ đi trước khi đếm ký tự.
+    """
+    turns = len(_SPEAKER_TAG.findall(text))
+    spoken = _SPEAKER_TAG.sub(" ", text)
+    return [
+        1.0,
+        float(len(spoken.strip())),
+        float(len(spoken.split())),
+        float(len(_PAUSE_CHARS.findall(spoken))),
+        float(max(turns, 1)),
+        float(sum(c.isdigit() for c in spoken)),
+    ]
+
+
+def speaker_key(text: str) -> str:
+    """
+    Speaker tag of a request; multi-speaker dialog gets its own key
+    Tag người nói của request; hội thoại nhiều người nói có khóa riêng
+    """
+    tags = sorted(set(_SPEAKER_TAG.findall(text)))
+    if not tags:
+        return "default"
+    return tags[0] if len(tags) == 1 else "+".join(tags)
+
+
+class _SpeakerModel:
+    """Ridge regression kept as sufficient statistics / Hồi quy ridge lưu dạng thống kê đủ"""
+
+    def __init__(self, ridge: float, state: Optional[Dict[str, Any]] = None):
+        size = len(FEATURE_NAMES)
+        self.ridge = ridge
+        self.xtx = np.zeros((size, size))
+        self.xty = np.zeros(size)
+        self.count = 0
+        self.error_mean = 0.0
+        self.error_var = 0.0
+        self.truncations = 0
+        self._weights: Optional[np.ndarray] = None
+        if state:
+            self.xtx = np.asarray(state["xtx"], dtype=np.float64)
+            self.xty = np.asarray(state["xty"], dtype=np.float64)
+            self.count = state["count"]
+            self.error_mean = state["error_mean"]
+            self.error_var = state["error_var"]
+            self.truncations = state.get("truncations", 0)
+
+    def weights(self) -> np.ndarray:
+        """Solve (XᵀX + λI) w = Xᵀy / Giải (XᵀX + λI) w = Xᵀy"""
+        if self._weights is None:
+            regularized = self.xtx + self.ridge * np.eye(self.xtx.shape[0])
+            self._weights = np.linalg.solve(regularized, self.xty)
+        return self._weights
+
+    def predict(self, features: List[float]) -> float:
+        return float(np.dot(self.weights(), features))
+
+    def margin(self, min_margin: float) -> float:
+        """Relative safety margin: mean + 2σ of recent under-predictions / Biên an toàn tương đối"""
+        return max(min_margin, self.error_mean + 2.0 * math.sqrt(max(self.error_var, 0.0)))
+
+    def _record_error(self, error: float):
+        delta = error - self.error_mean
+        self.error_mean += (1 - _ERROR_DECAY) * delta
+        self.error_var = _ERROR_DECAY * (self.error_var + (1 - _ERROR_DECAY) * delta * delta)
+
+    def update(self, features: List[float], tokens: float, truncated: bool):
+        """
+        Learn from one observation / Học từ một quan sát
+
+        A truncated observation is censored (tokens is only a lower bound): it never
+        enters XᵀX/Xᵀy, and its error is recorded only when it shows an
+        under-prediction, so it can widen the margin but never shrink the budget.
+        Quan sát bị cắt là mẫu kiểm duyệt (tokens chỉ là cận dưới): không bao giờ vào
+        XᵀX/Xᵀy, và sai số chỉ được ghi khi cho thấy dự đoán thiếu, nên chỉ có thể nới
+        rộng biên mà không bao giờ thu hẹp ngân sách.
+        """
+        if self.count:
+            # Prequential error: score the prediction before learning from it
+            # Sai số tuần tự: chấm dự đoán trước khi học từ mẫu này
+            predicted = max(self.predict(features), 1.0)
+            error = (tokens - predicted) / predicted
+            if not truncated or error > 0:
+                self._record_error(error)
+        if truncated:
+            self.truncations += 1
+            return
+        x = np.asarray(features)
+        self.xtx += np.outer(x, x)
+        self.xty += x * tokens
+        self.count += 1
+        self._weights = None
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "xtx": self.xtx.tolist(),
+            "xty": self.xty.tolist(),
+            "count": self.count,
+            "error_mean": self.error_mean,
+            "error_var": self.error_var,
+            "truncations": self.truncations,
+        }
+
+
+class TokenPredictor:
+    """Per-speaker online max_tokens predictor / Bộ dự đoán max_tokens trực tuyến theo người nói"""
+
+    def __init__(
+        self,
+        state_path: str,
+        min_samples: int = 8,
+        min_margin: float = 0.2,
+        headroom_tokens: int = 256,
+        min_tokens: int = 512,
+        ridge: float = 1.0,
+        save_every: int = 20,
+        save_interval_seconds: float = 30.0,
+        max_log_bytes: int = 10 * 1024 * 1024
+    ):
+        """
+        Initialize predictor / Khởi tạo bộ dự đoán
+
+        Args:
+            state_path: JSON file for the persisted model / File JSON lưu mô hình
+            min_samples: Observations needed before a model is trusted / Số quan sát cần trước khi tin mô hình
+            min_margin: Minimum relative safety margin / Biên an toàn tương đối tối thiểu
+            headroom_tokens: Fixed extra tokens (room for the silence watchdog) / Token dư cố định (chỗ cho watchdog im lặng)
+            min_tokens: Lower bound of predicted max_tokens / Giới hạn dưới của max_tokens dự đoán
+            ridge: Ridge regularization strength / Độ mạnh chuẩn hóa ridge
+            save_every: Observations buffered before state and log are written / Số quan sát đệm trước khi ghi
+            save_interval_seconds: Write buffered observations at least this often / Ghi quan sát đệm ít nhất mỗi khoảng này
+            max_log_bytes: Rotate the observation log past this size (one backup kept) / Xoay vòng log quan sát khi vượt kích thước này
+        """
+        self.state_path = Path(state_path).resolve()
+        self.observations_path = self.state_path.with_suffix(".jsonl")
+        self.min_samples = max(1, min_samples)
+        self.min_margin = min_margin
+        self.headroom_tokens = headroom_tokens
+        self.min_tokens = min_tokens
+        self.ridge = ridge
+        self.save_every = max(1, save_every)
+        self.save_interval_seconds = save_interval_seconds
+        self.max_log_bytes = max_log_bytes
+
+        self._lock = threading.Lock()
+        self._models: Dict[str, _SpeakerModel] = {}
+        self._pending_records: List[Dict[str, Any]] = []
+        self._last_save = time.monotonic()
+        self._metrics = {
+            "predictions": 0,
+            "fallbacks": 0,
+            "observations": 0,
+            "truncations": 0,
+            "abs_error_tokens": 0.0,
+            "abs_relative_error": 0.0,
+            "scored": 0,
+            "budget_saved_tokens": 0,
+        }
+        self._load()
+
+    def _load(self):
+        """Load persisted state / Tải trạng thái đã lưu"""
+        if not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") != MODEL_VERSION:
+                return
+            self._models = {
+                key: _SpeakerModel(self.ridge, model_state)
+                for key, model_state in state.get("models", {}).items()
+            }
+            self._metrics.update(state.get("metrics", {}))
+            print(f"[TokenPredictor] Loaded {len(self._models)} speaker models from {self.state_path.name}")
+            print(f"[TokenPredictor] Đã tải {len(self._models)} mô hình người nói từ {self.state_path.name}")
+        except Exception as e:
+            print(f"⚠️  [TokenPredictor] Could not load state, starting fresh: {e}")
+            print(f"⚠️  [TokenPredictor] Không thể tải trạng thái, bắt đầu mới: {e}")
+
+    def _save(self):
+        """Persist state atomically (caller holds lock) / Lưu trạng thái nguyên tử (đã giữ lock)"""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "version": MODEL_VERSION,
+            "features": FEATURE_NAMES,
+            "models": {key: model.to_state() for key, model in self._models.items()},
+            "metrics": self._metrics,
+        }
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        tmp_path.replace(self.state_path)
+
+    def _append_log(self):
+        """Append buffered observations, rotating the log (caller holds lock) / Ghi quan sát đệm, xoay vòng log (đã giữ lock)"""
+        if not self._pending_records:
+            return
+        if self.observations_path.exists() and self.observations_path.stat().st_size >= self.max_log_bytes:
+            self.observations_path.replace(self.observations_path.with_suffix(".jsonl.1"))
+        with open(self.observations_path, "a", encoding="utf-8") as f:
+            for record in self._pending_records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._pending_records = []
+
+    def _flush_locked(self):
+        self._save()
+        self._append_log()
+        self._last_save = time.monotonic()
+
+    def flush(self):
+        """Write buffered state and observations now / Ghi trạng thái và quan sát đệm ngay"""
+        with self._lock:
+            if self._pending_records:
+                self._flush_locked()
+
+    def _trusted_model(self, key: str) -> Optional[_SpeakerModel]:
+        """Speaker model if trained enough, else the global one / Mô hình người nói nếu đủ dữ liệu, không thì toàn cục"""
+        for candidate in (key, GLOBAL_KEY):
+            model = self._models.get(candidate)
+            if model is not None and model.count >= self.min_samples:
+                return model
+        return None
+
+    def predict(self, text: str, heuristic_tokens: int) -> Optional[Dict[str, Any]]:
+        """
+        Predict a tight max_tokens / Dự đoán max_tokens sát
+
+        Args:
+            text: Normalized input text / Văn bản đầu vào đã chuẩn hóa
+            heuristic_tokens: max_tokens the old heuristic would use / max_tokens heuristic cũ sẽ dùng
+
+        Returns:
+            Dict with max_tokens, expected_tokens, margin and speaker, or None when no model is trusted yet
+            Dict chứa max_tokens, expected_tokens, margin và speaker, hoặc None khi chưa có mô hình đáng tin
+        """
+        key = speaker_key(text)
+        features = extract_features(text)
+        with self._lock:
+            model = self._trusted_model(key)
+            if model is None:
+                self._metrics["fallbacks"] += 1
+                return None
+            expected = max(model.predict(features), 1.0)
+            margin = model.margin(self.min_margin)
+            max_tokens = int(math.ceil(expected * (1.0 + margin))) + self.headroom_tokens
+            # Round up to a multiple of 128 like the GPU-safe limit / Làm tròn lên bội số 128 như giới hạn GPU
+            max_tokens = max(self.min_tokens, -(-max_tokens // 128) * 128)
+            self._metrics["predictions"] += 1
+            self._metrics["budget_saved_tokens"] += max(0, heuristic_tokens - max_tokens)
+        return {
+            "speaker": key,
+            "expected_tokens": int(expected),
+            "margin": margin,
+            "max_tokens": max_tokens,
+            "heuristic_tokens": heuristic_tokens,
+        }
+
+    def observe(
+        self,
+        text: str,
+        speed_factor: float,
+        needed_tokens: int,
+        max_tokens: int,
+        truncated: bool,
+        prediction: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Record one synthesis and update the models / Ghi lại một lần tổng hợp và cập nhật mô hình
+
+        speed_factor is logged but not a regression input: Dia applies it by
+        resampling after generation, so it does not change the token count.
+        speed_factor được ghi log nhưng không là đầu vào hồi quy: Dia áp dụng bằng
+        cách lấy mẫu lại sau generation, nên không đổi số token.
+
+        Args:
+            text: Normalized input text / Văn bản đầu vào đã chuẩn hóa
+            speed_factor: Requested speed factor / Hệ số tốc độ yêu cầu
+            needed_tokens: Tokens of actual speech (generated minus trailing silence) / Token giọng nói thực
+            max_tokens: Budget that was used / Ngân sách đã dùng
+            truncated: Budget ran out before speech ended (needed_tokens is a lower bound)
+                       Hết ngân sách trước khi giọng nói kết thúc (needed_tokens là cận dưới)
+            prediction: Result of predict() for this request, if any / Kết quả predict() cho request này
+        """
+        if needed_tokens <= 0:
+            return
+        key = speaker_key(text)
+        features = extract_features(text)
+        with self._lock:
+            if prediction is not None:
+                error = abs(prediction["expected_tokens"] - needed_tokens)
+                self._metrics["abs_error_tokens"] += error
+                self._metrics["abs_relative_error"] += error / needed_tokens
+                self._metrics["scored"] += 1
+            for model_key in (key, GLOBAL_KEY):
+                model = self._models.get(model_key)
+                if model is None:
+                    model = self._models[model_key] = _SpeakerModel(self.ridge)
+                model.update(features, float(needed_tokens), truncated)
+            self._metrics["observations"] += 1
+            self._metrics["truncations"] += int(truncated)
+            self._pending_records.append({
+                "time": time.time(),
+                "speaker": key,
+                "features": dict(zip(FEATURE_NAMES[1:], features[1:])),
+                "speed_factor": speed_factor,
+                "tokens": needed_tokens,
+                "max_tokens": max_tokens,
+                "truncated": truncated,
+                "predicted": prediction["expected_tokens"] if prediction else None,
+            })
+            # Batched writes: state JSON and log are rewritten every save_every observations
+            # Ghi theo lô: JSON trạng thái và log được ghi mỗi save_every quan sát
+            due = time.monotonic() - self._last_save >= self.save_interval_seconds
+            if len(self._pending_records) >= self.save_every or due:
+                self._flush_locked()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Prediction error and budget metrics / Chỉ số sai số dự đoán và ngân sách"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            speakers = {
+                key: {
+                    "samples": model.count,
+                    "trusted": model.count >= self.min_samples,
+                    "margin": model.margin(self.min_margin),
+                    "truncations": model.truncations,  # Censored, not in the regression / Bị kiểm duyệt, không vào hồi quy
+                }
+                for key, model in self._models.items()
+            }
+        scored = metrics.pop("scored")
+        metrics["mean_abs_error_tokens"] = metrics.pop("abs_error_tokens") / scored if scored else None
+        metrics["mean_abs_relative_error"] = metrics.pop("abs_relative_error") / scored if scored else None
+        metrics["scored_predictions"] = scored
+        metrics["speakers"] = speakers
+        return metrics
+
+
+# Global predictor instance / Instance bộ dự đoán toàn cục
+_predictor_instance: Optional[TokenPredictor] = None
+
+
+def get_token_predictor() -> TokenPredictor:
+    """Get global token predictor / Lấy bộ dự đoán token toàn cục"""
+    global _predictor_instance
+    if _predictor_instance is None:
+        import atexit
+        from .config import (
+            DIA_TOKEN_PREDICTOR_PATH,
+            DIA_TOKEN_PREDICTOR_MIN_SAMPLES,
+            DIA_TOKEN_PREDICTOR_MIN_MARGIN,
+            DIA_TOKEN_PREDICTOR_HEADROOM,
+        )
+        _predictor_instance = TokenPredictor(
+            state_path=DIA_TOKEN_PREDICTOR_PATH,
+            min_samples=DIA_TOKEN_PREDICTOR_MIN_SAMPLES,
+            min_margin=DIA_TOKEN_PREDICTOR_MIN_MARGIN,
+            headroom_tokens=DIA_TOKEN_PREDICTOR_HEADROOM,
+        )
+        # Observations are written in batches; write the last ones on exit
+        # Quan sát được ghi theo lô; ghi nốt phần còn lại khi thoát
+        atexit.register(_predictor_instance.flush)
+    return _predictor_instance
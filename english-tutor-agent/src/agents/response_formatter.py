@@ -7,6 +7,7 @@ import logging
 from datetime import datetime
 from typing import Dict, Any, List
 from src.models.state import TutorState
+from src.utils.text_chunker import iter_text_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -25,45 +26,17 @@ def create_chunks_from_text(text: str, max_chunk_length: int = 500) -> List[Dict
     if not text:
         return []
     
-    # Simple sentence-based chunking
-    sentences = text.split('. ')
-    chunks = []
-    current_chunk = ""
-    
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-        
-        # Add period if not present
-        if not sentence.endswith(('.', '!', '?', ':', ';')):
-            sentence += '.'
-        
-        # If adding this sentence would exceed limit, finalize current chunk
-        if current_chunk and len(current_chunk) + len(sentence) + 2 > max_chunk_length:
-            chunks.append({
-                "text": current_chunk.strip(),
-                "emotion": "neutral",
-                "icon": "💬",
-                "pause": 0.5,
-                "emphasis": False,
-            })
-            current_chunk = sentence
-        else:
-            if current_chunk:
-                current_chunk += " " + sentence
-            else:
-                current_chunk = sentence
-    
-    # Add final chunk if any remaining
-    if current_chunk:
-        chunks.append({
-            "text": current_chunk.strip(),
+    # Length-balanced sentence chunking shared with the TTS backends
+    chunks = [
+        {
+            "text": chunk,
             "emotion": "neutral",
             "icon": "💬",
             "pause": 0.5,
             "emphasis": False,
-        })
+        }
+        for chunk in iter_text_chunks(text, max_chars=max_chunk_length)
+    ]
     
     return chunks if chunks else [{
         "text": text[:max_chunk_length],
@@ -0,0 +1,47 @@
+"""
+Text chunker tests - sentence splitting and balanced chunking
+"""
+
+import io
+import statistics
+
+from src.utils.text_chunker import iter_sentences, iter_text_chunks, split_text_into_chunks
+
+
+def test_abbreviations_and_initials_do_not_split():
+    """Test that abbreviations and initials keep the sentence together"""
+    sentences = [s.text for s in iter_sentences("Ông Nguyễn V. A. sống ở TP. Hồ Chí Minh. Mr. Smith agreed.")]
+    assert sentences == ["Ông Nguyễn V. A. sống ở TP. Hồ Chí Minh.", "Mr. Smith agreed."]
+
+
+def test_closing_quote_stays_with_sentence():
+    """Test that closing quotes are attached to the sentence they close"""
+    sentences = list(iter_sentences('Anh nói: "Đi thôi. Trời tối rồi." Rồi bước đi.'))
+    assert [s.text for s in sentences] == ['Anh nói: "Đi thôi.', 'Trời tối rồi."', "Rồi bước đi."]
+    assert [s.in_quote for s in sentences] == [True, False, False]
+
+
+def test_chunks_respect_limit_and_are_balanced():
+    """Test that chunks never exceed max_chars and avoid a tiny tail"""
+    text = " ".join(f"Câu số {i} có độ dài vừa phải để kiểm tra việc chia." for i in range(30))
+    chunks = split_text_into_chunks(text, max_chars=256)
+    lengths = [len(chunk) for chunk in chunks]
+    assert max(lengths) <= 256
+    assert min(lengths) >= 0.6 * statistics.mean(lengths)
+    assert " ".join(chunks) == text
+
+
+def test_long_sentence_is_split_by_words():
+    """Test that a sentence longer than max_chars is split on word boundaries"""
+    text = " ".join(["từ"] * 200) + "."
+    chunks = split_text_into_chunks(text, max_chars=100)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_streams_from_file_like_source():
+    """Test that chunking works lazily over an iterable of lines"""
+    source = io.StringIO("Dòng một. Dòng hai.\n\nĐoạn mới ở đây.\n" * 1000)
+    chunks = iter_text_chunks(source, max_chars=200)
+    assert next(chunks).startswith("Dòng một.")
+    assert all(len(chunk) <= 200 for chunk in chunks)
@@ -0,0 +1,83 @@
+"""
+Benchmark batched vs sequential multi-file transcription on CPU (int8)
+
+Transcribes the same set of short clips:
+- sequentially, one STTService.transcribe() call per file
+- with STTService.transcribe_batch(), which decodes speech chunks from all files
+  together, for several batch sizes
+
+and reports wall time, files per second and audio seconds per second.
+
+Usage:
+    python benchmark_batch.py --dir path/to/wavs [--limit 16] [--batch-sizes 4 8 16] [--model path]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# CPU int8 unless overridden; must be set before the config module is imported
+os.environ.setdefault("STT_DEVICE", "cpu")
+os.environ.setdefault("STT_COMPUTE_TYPE", "int8")
+# Time real decoding: cached results would turn reruns into lookups
+os.environ["STT_CACHE_ENABLED"] = "false"
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched transcription throughput benchmark")
+    parser.add_argument("--dir", type=Path, help="Directory of audio clips (wav/mp3/flac/m4a)")
+    parser.add_argument("--files", type=Path, nargs="*", default=[], help="Audio clips")
+    parser.add_argument("--limit", type=int, default=16, help="Maximum number of clips")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16], help="Batch sizes to compare")
+    parser.add_argument("--language", default="en", help="Language (batched mode needs a fixed language)")
+    parser.add_argument("--model", default=None, help="Model path or size (default: config)")
+    args = parser.parse_args()
+
+    files = list(args.files)
+    if args.dir:
+        files += sorted(p for p in args.dir.rglob("*") if p.suffix.lower() in (".wav", ".mp3", ".flac", ".m4a"))
+    files = files[:args.limit]
+    if not files:
+        parser.error("no audio clips given (use --dir or --files)")
+
+    from faster_whisper.audio import decode_audio
+    from stt_backend.audio_input import SAMPLE_RATE
+    from stt_backend.service import get_service
+
+    service = get_service()
+    if args.model:
+        service.config = {**service.config, "model_path": args.model}
+    service._load_model()
+
+    audios = [decode_audio(str(path), sampling_rate=SAMPLE_RATE) for path in files]
+    audio_seconds = sum(len(a) for a in audios) / SAMPLE_RATE
+
+    print("=" * 70)
+    print(f"{len(files)} clips, {audio_seconds:.1f}s audio, {service.config['model_path']} on CPU int8")
+    print("=" * 70)
+    print(f"{'mode':<12} {'time s':>8} {'files/s':>8} {'audio s/s':>10} {'speedup':>8}")
+
+    service.transcribe(audios[0], language=args.language, use_cache=False)  # Warm-up
+
+    start = time.perf_counter()
+    sequential = [service.transcribe(audio, language=args.language, use_cache=False) for audio in audios]
+    baseline = time.perf_counter() - start
+    print(f"{'sequential':<12} {baseline:>8.1f} {len(files) / baseline:>8.2f} {audio_seconds / baseline:>10.2f} {1.0:>7.2f}x")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        batch = service.transcribe_batch(audios, language=args.language, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{f'batch/{batch_size}':<12} {elapsed:>8.1f} {len(files) / elapsed:>8.2f} "
+              f"{audio_seconds / elapsed:>10.2f} {baseline / elapsed:>7.2f}x")
+
+    # Same files, same model: the texts should agree closely
+    differing = sum(1 for a, b in zip(sequential, batch["results"]) if a["text"].strip() != b["text"].strip())
+    print(f"\nFiles whose batched text differs from sequential: {differing}/{len(files)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark per-request audio ingest overhead for short utterances
+
+Compares the old temp-file path (write upload to disk, decode from path, unlink)
+with the in-memory paths used by the API now:
+- BytesIO decoded by faster-whisper (any container)
+- PCM16 mono 16 kHz WAV fast path (data chunk read directly)
+- raw PCM16 body (/api/stt/transcribe/pcm)
+
+Only ingest is timed (bytes -> 16 kHz float32 samples), which is the part that
+differs between the paths; Whisper itself is unchanged.
+
+Usage:
+    python benchmark_ingest.py [--durations 1 3 5] [--runs 200]
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from stt_backend.audio_input import load_audio_bytes, SAMPLE_RATE
+
+
+def make_utterance(seconds: float, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Speech-like test signal: modulated tones plus noise, as PCM16"""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    signal = 0.3 * np.sin(2 * np.pi * 180 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    signal += 0.02 * np.random.default_rng(0).standard_normal(len(t))
+    return (np.clip(signal, -1, 1) * 32767).astype("<i2")
+
+
+def to_wav(pcm: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Wrap PCM16 samples in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def time_ms(fn, runs: int) -> float:
+    """Median wall time of fn() in milliseconds"""
+    fn()  # Warm-up
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STT ingest overhead benchmark")
+    parser.add_argument("--durations", type=float, nargs="+", default=[1, 3, 5], help="Utterance lengths in seconds")
+    parser.add_argument("--runs", type=int, default=200, help="Runs per path")
+    args = parser.parse_args()
+
+    try:
+        from faster_whisper.audio import decode_audio
+    except ImportError:
+        decode_audio = None
+        print("faster-whisper not installed: container-decoding rows are skipped")
+
+    def temp_file_path(content: bytes):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
+            f.write(content)
+            path = f.name
+        try:
+            return decode_audio(path, sampling_rate=SAMPLE_RATE)
+        finally:
+            os.unlink(path)
+
+    print("=" * 64)
+    print("Per-request ingest overhead (median ms)")
+    print("=" * 64)
+    print(f"{'seconds':>7} {'temp file':>10} {'BytesIO':>10} {'WAV fast':>10} {'raw PCM':>10}")
+
+    for seconds in args.durations:
+        pcm = make_utterance(seconds)
+        wav_bytes, pcm_bytes = to_wav(pcm), pcm.tobytes()
+
+        row = []
+        if decode_audio is not None:
+            row.append(time_ms(lambda: temp_file_path(wav_bytes), args.runs))
+            row.append(time_ms(lambda: decode_audio(io.BytesIO(wav_bytes), sampling_rate=SAMPLE_RATE), args.runs))
+        else:
+            row += [float("nan"), float("nan")]
+        row.append(time_ms(lambda: load_audio_bytes(wav_bytes), args.runs))
+        row.append(time_ms(lambda: load_audio_bytes(pcm_bytes, raw_pcm16=True), args.runs))
+        print(f"{seconds:>7.1f} " + " ".join(f"{value:>10.3f}" for value in row))
+
+
+if __name__ == "__main__":
+    main()
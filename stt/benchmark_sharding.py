@@ -0,0 +1,90 @@
+"""
+Benchmark long-audio sharding across CPU worker processes
+
+Transcribes one long recording:
+- sequentially with a single int8 model using all cores (baseline)
+- split at VAD silences and sharded across 1..N worker processes
+
+and reports wall time, speedup, pool utilization and the word error rate of
+each sharded transcript against the sequential one (cuts at silences should
+leave it close to 0).
+
+Usage:
+    python benchmark_sharding.py long.wav [--workers 1 2 4] [--shard-seconds 60] [--model path]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("STT_DEVICE", "cpu")
+os.environ.setdefault("STT_COMPUTE_TYPE", "int8")
+# Time real decoding: cached results would turn reruns into lookups
+os.environ["STT_CACHE_ENABLED"] = "false"
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance / reference length (case and punctuation ignored)"""
+    ref = re.findall(r"[\w']+", reference.lower())
+    hyp = re.findall(r"[\w']+", hypothesis.lower())
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-audio sharding benchmark")
+    parser.add_argument("audio", type=Path, help="Long recording")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Pool sizes")
+    parser.add_argument("--shard-seconds", type=float, default=60.0, help="Target shard length")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--model", default=None, help="Model path or size (default: config)")
+    args = parser.parse_args()
+
+    from faster_whisper.audio import decode_audio
+    from stt_backend.audio_input import SAMPLE_RATE
+    from stt_backend.service import get_service
+    from stt_backend.sharding import ShardedTranscriber
+
+    service = get_service()
+    if args.model:
+        service.config = {**service.config, "model_path": args.model}
+    service._load_model()
+    audio = decode_audio(str(args.audio), sampling_rate=SAMPLE_RATE)
+    duration = len(audio) / SAMPLE_RATE
+
+    print("=" * 72)
+    print(f"{args.audio.name}: {duration:.1f}s, {os.cpu_count()} cores, shards of ~{args.shard_seconds:.0f}s")
+    print("=" * 72)
+    print(f"{'mode':<12} {'time s':>8} {'RTF':>6} {'speedup':>8} {'shards':>7} {'util':>6} {'WER':>7}")
+
+    start = time.perf_counter()
+    baseline = service.transcribe(audio, language=args.language, use_cache=False)
+    sequential = time.perf_counter() - start
+    print(f"{'sequential':<12} {sequential:>8.1f} {sequential / duration:>6.3f} {1.0:>7.2f}x {1:>7} {'-':>6} {0.0:>7.3f}")
+
+    for workers in args.workers:
+        pool = ShardedTranscriber(service.config["model_path"], num_workers=workers)
+        pool.warm_up()  # Model loads are not part of the timing
+        start = time.perf_counter()
+        result = pool.transcribe(audio, shard_seconds=args.shard_seconds, language=args.language)
+        elapsed = time.perf_counter() - start
+        stats = pool.get_stats()
+        pool.shutdown()
+        wer = word_error_rate(baseline["text"], result["text"])
+        print(f"{f'{workers} workers':<12} {elapsed:>8.1f} {elapsed / duration:>6.3f} {sequential / elapsed:>7.2f}x "
+              f"{len(result['shards']):>7} {stats['utilization']:>6.2f} {wer:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -120,7 +120,7 @@ import logging
 # Import STT backend
 from stt_backend.service import get_service
 from stt_backend.api import router
-from stt_backend.config import API_HOST, API_PORT, LOG_LEVEL
+from stt_backend.config import API_HOST, API_PORT, LOG_LEVEL, SERVING_CONFIG
 
 # Setup logging
 logging.basicConfig(
@@ -136,19 +136,22 @@ app = FastAPI(
     version="1.0.0",
 )
 
-# Preload STT service at startup to avoid loading delay on first request
+# Warm-load the model in the background so the server accepts connections immediately;
+# /api/stt/health/ready reports 503 until loading has finished
 @app.on_event("startup")
 async def startup_event():
     """Initialize STT service at startup"""
     logger.info("Starting STT Backend...")
-    try:
-        service = get_service()
-        # Preload model
-        service._load_model()
-        logger.info("✅ STT Backend ready with faster-whisper-large-v3")
-    except Exception as e:
-        logger.error(f"Failed to initialize STT service: {e}", exc_info=True)
-        logger.warning("Service will attempt to load model on first request")
+    if SERVING_CONFIG["warm_load"]:
+        get_service().start_warm_load()
+        logger.info("Model warm load started in the background")
+    else:
+        logger.info("Warm load disabled; model loads on first request")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the inference executor and worker processes"""
+    get_service().shutdown()
 
 # CORS middleware
 app.add_middleware(
@@ -185,9 +188,16 @@ async def root():
         "health": "/health",
         "endpoints": {
             "health": "/health",
+            "liveness": "/api/stt/health/live",
+            "readiness": "/api/stt/health/ready",
             "api": "/api/stt",
             "transcribe": "POST /api/stt/transcribe",
             "transcribe_json": "POST /api/stt/transcribe/json",
+            "transcribe_pcm": "POST /api/stt/transcribe/pcm",
+            "transcribe_stream": "POST /api/stt/transcribe/stream",
+            "transcribe_batch": "POST /api/stt/transcribe/batch",
+            "transcribe_long": "POST /api/stt/transcribe/long",
+            "live": "WS /api/stt/live",
         },
     }
 
@@ -2,14 +2,21 @@
 STT API Endpoints
 FastAPI routes for Speech-to-Text service
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional, Literal
-import tempfile
-import os
+from typing import List, Optional, Literal
+import asyncio
+import json
 import logging
 
 from .service import get_service
+from .audio_input import load_audio_bytes, SAMPLE_RATE
+from .config import LIVE_CONFIG, BATCH_SIZE, BATCH_MAX_FILES, SERVING_CONFIG
+from .executor import ExecutorBusy
+from .live import LiveTranscriber
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -24,19 +31,53 @@ class STTTranscribeRequest(BaseModel):
     vad_filter: Optional[bool] = True  # Voice Activity Detection
     return_timestamps: Optional[bool] = True
     word_timestamps: Optional[bool] = False  # Word-level timestamps (slower)
+    bypass_cache: Optional[bool] = False  # Skip the result cache lookup
+
+
+def _overloaded(e: ExecutorBusy) -> HTTPException:
+    """429 with Retry-After for a full inference queue"""
+    logger.warning(f"Rejecting request: {e}")
+    return HTTPException(
+        status_code=429,
+        detail="Too many transcription requests in progress, retry later",
+        headers={"Retry-After": str(SERVING_CONFIG["retry_after_seconds"])},
+    )
+
+
+async def _run_inference(fn, *args, **kwargs):
+    """Run a blocking service call on the bounded inference executor"""
+    try:
+        return await get_service().get_executor().run(fn, *args, **kwargs)
+    except ExecutorBusy as e:
+        raise _overloaded(e)
+
+
+async def _transcribe_cached(service, **options):
+    """
+    Transcribe, answering cache hits without taking an executor slot
+
+    The lookup (decode + hash) runs in the request threadpool; only a miss
+    waits for a model replica, and it reuses the decoded audio and key.
+    """
+    lookup = await run_in_threadpool(service.lookup_cache, **options)
+    if lookup.entry is not None:
+        return await run_in_threadpool(service.transcribe, **options, lookup=lookup)
+    return await _run_inference(service.transcribe, **options, lookup=lookup)
 
 
 # Health check
 @router.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (reports load state; never loads the model)"""
     try:
         service = get_service()
-        available = service.is_available()
+        status = service.get_status()
         return {
-            "status": "healthy" if available else "unhealthy",
+            "status": "healthy" if status["ready"] else status["state"],
             "service": "STT Backend",
-            "available": available,
+            "available": status["ready"],
+            "model": status,
+            "cache": service.get_cache_stats(),
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}", exc_info=True)
@@ -48,6 +89,24 @@ async def health_check():
         }
 
 
+# Liveness probe
+@router.get("/health/live")
+async def liveness():
+    """Process is up and serving requests (also while the model is loading)"""
+    return {"status": "alive"}
+
+
+# Readiness probe
+@router.get("/health/ready")
+async def readiness():
+    """200 once the model and replicas are loaded, 503 before that or after a failed load"""
+    status = get_service().get_status()
+    return JSONResponse(
+        status_code=200 if status["ready"] else 503,
+        content={"status": "ready" if status["ready"] else status["state"], **status},
+    )
+
+
 # Transcribe audio file
 @router.post("/transcribe")
 async def transcribe_audio(
@@ -58,6 +117,7 @@ async def transcribe_audio(
     vad_filter: bool = Query(True, description="Enable Voice Activity Detection"),
     return_timestamps: bool = Query(True, description="Return segment timestamps"),
     word_timestamps: bool = Query(False, description="Return word-level timestamps (slower)"),
+    bypass_cache: bool = Query(False, description="Skip the result cache lookup (result is still stored)"),
 ):
     """
     Transcribe audio file to text
@@ -81,34 +141,22 @@ async def transcribe_audio(
     # Get service
     service = get_service()
     
-    # Save uploaded file temporarily
-    temp_file = None
-    temp_file_path = None
     try:
-        logger.info(f"Receiving audio file: {audio.filename}")
-        
-        # Create temporary file
-        suffix = os.path.splitext(audio.filename)[1] if audio.filename else ".wav"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            temp_file_path = temp_file.name
-            
-            # Write uploaded content in chunks to avoid memory issues
-            content = await audio.read()
-            temp_file.write(content)
-            temp_file.flush()
-        
+        # Decode from memory (no temp file)
+        content = await audio.read()
         logger.info(f"Received audio file: {audio.filename}, size: {len(content)} bytes")
-        logger.info(f"Saved to temporary file: {temp_file_path}")
         
         # Transcribe
-        result = service.transcribe(
-            audio_path=temp_file_path,
+        result = await _transcribe_cached(
+            service,
+            audio=load_audio_bytes(content),
             language=language if language != "auto" else None,
             task=task,
             beam_size=beam_size,
             vad_filter=vad_filter,
             return_timestamps=return_timestamps,
             word_timestamps=word_timestamps,
+            bypass_cache=bypass_cache,
         )
         
         logger.info(f"Transcription completed: {len(result['text'])} characters")
@@ -118,18 +166,254 @@ async def transcribe_audio(
             "data": result,
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Transcription failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+
+
+# Stream transcription segments as they decode
+@router.post("/transcribe/stream")
+async def transcribe_audio_stream(
+    audio: UploadFile = File(..., description="Audio file to transcribe"),
+    format: Literal["ndjson", "sse"] = Query("ndjson", description="Stream format: ndjson or sse (Server-Sent Events)"),
+    language: Optional[str] = Query("en", description="Language code (e.g., 'en', 'auto')"),
+    task: Literal["transcribe", "translate"] = Query("transcribe", description="Task: transcribe or translate to English"),
+    beam_size: int = Query(5, ge=1, le=20, description="Beam size for beam search"),
+    vad_filter: bool = Query(True, description="Enable Voice Activity Detection"),
+    word_timestamps: bool = Query(False, description="Return word-level timestamps (slower)"),
+    bypass_cache: bool = Query(False, description="Skip the result cache lookup (result is still stored)"),
+):
+    """
+    Transcribe audio file, streaming each segment as soon as it is decoded
     
-    finally:
-        # Clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-                logger.debug(f"Cleaned up temporary file: {temp_file_path}")
-            except Exception as e:
-                logger.warning(f"Failed to delete temp file {temp_file_path}: {e}")
+    Events (one JSON object per line for ndjson, one SSE event each for sse):
+        {"type": "segment", "index", "segment": {"text", "start", "end", "words"?}}
+        {"type": "summary", "text", "language", "language_probability", "duration", "segment_count"}
+        {"type": "error", "message"} if decoding fails part way
+    """
+    if not audio.filename:
+        raise HTTPException(status_code=400, detail="Audio file is required")
+    
+    service = get_service()
+    content = await audio.read()
+    logger.info(f"Received audio file for streaming: {audio.filename}, size: {len(content)} bytes")
+    
+    options = dict(
+        audio=load_audio_bytes(content),
+        language=language if language != "auto" else None,
+        task=task,
+        beam_size=beam_size,
+        vad_filter=vad_filter,
+        word_timestamps=word_timestamps,
+        bypass_cache=bypass_cache,
+    )
+    try:
+        lookup = await run_in_threadpool(service.lookup_cache, **options)
+    except Exception as e:
+        logger.error(f"Streaming transcription failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+    
+    if lookup.entry is not None:
+        # Cache hit: replay without waiting for a replica
+        events = service.transcribe_stream(**options, lookup=lookup)
+    else:
+        try:
+            # Decoding runs on an executor replica; events are relayed as they arrive
+            events = service.get_executor().iterate(service.transcribe_stream, **options, lookup=lookup)
+        except ExecutorBusy as e:
+            raise _overloaded(e)
+    
+    def encode(event: dict) -> str:
+        data = json.dumps(event, ensure_ascii=False)
+        if format == "sse":
+            return f"event: {event['type']}\ndata: {data}\n\n"
+        return data + "\n"
+    
+    def body():
+        # Sync generator: Starlette iterates it in the threadpool, so waiting
+        # for events does not block the event loop
+        try:
+            for event in events:
+                yield encode(event)
+        except Exception as e:
+            logger.error(f"Streaming transcription failed: {e}", exc_info=True)
+            yield encode({"type": "error", "message": str(e)})
+        finally:
+            events.close()
+    
+    from fastapi.responses import StreamingResponse
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    # The background task also runs when the client disconnects before the body
+    # is consumed, so the replica and slot are released either way
+    return StreamingResponse(
+        body(), media_type=media_type, headers={"Cache-Control": "no-cache"},
+        background=BackgroundTask(events.close),
+    )
+
+
+# Transcribe several files in one batched pass
+@router.post("/transcribe/batch")
+async def transcribe_audio_batch(
+    files: List[UploadFile] = File(..., description="Audio files to transcribe"),
+    language: Optional[str] = Query("en", description="Language code ('auto' transcribes files one by one)"),
+    task: Literal["transcribe", "translate"] = Query("transcribe", description="Task: transcribe or translate to English"),
+    beam_size: int = Query(5, ge=1, le=20, description="Beam size for beam search"),
+    vad_filter: bool = Query(True, description="Enable Voice Activity Detection"),
+    word_timestamps: bool = Query(False, description="Return word-level timestamps (slower)"),
+    batch_size: int = Query(BATCH_SIZE, ge=1, le=64, description="Speech chunks decoded per forward pass"),
+):
+    """
+    Transcribe multiple audio files with batched inference
+    
+    Speech chunks from all files are decoded together, several per forward
+    pass. Results are returned per file, in upload order.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="At least one audio file is required")
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_FILES} files per batch")
+    
+    service = get_service()
+    
+    try:
+        audios, sizes = [], []
+        for upload in files:
+            content = await upload.read()
+            sizes.append(len(content))
+            audios.append(load_audio_bytes(content))
+        logger.info(f"Received batch of {len(files)} files, {sum(sizes)} bytes")
+        
+        batch = await _run_inference(
+            service.transcribe_batch,
+            audios,
+            language=language if language != "auto" else None,
+            task=task,
+            beam_size=beam_size,
+            vad_filter=vad_filter,
+            word_timestamps=word_timestamps,
+            batch_size=batch_size,
+        )
+        
+        return {
+            "success": True,
+            "mode": batch["mode"],
+            "timings": batch["timings"],
+            "data": [
+                {"filename": upload.filename, "size": size, **result}
+                for upload, size, result in zip(files, sizes, batch["results"])
+            ],
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch transcription failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Batch transcription failed: {str(e)}")
+
+
+# Long-audio transcription (parallel shards)
+@router.post("/transcribe/long")
+async def transcribe_audio_long(
+    audio: UploadFile = File(..., description="Long audio file to transcribe"),
+    language: Optional[str] = Query("en", description="Language code (e.g., 'en', 'auto')"),
+    task: Literal["transcribe", "translate"] = Query("transcribe", description="Task: transcribe or translate to English"),
+    beam_size: int = Query(5, ge=1, le=20, description="Beam size for beam search"),
+    vad_filter: bool = Query(True, description="Enable Voice Activity Detection"),
+    word_timestamps: bool = Query(False, description="Return word-level timestamps (slower)"),
+    shard_seconds: Optional[float] = Query(None, ge=10, description="Target shard length in seconds"),
+):
+    """
+    Transcribe a long recording split at silences across CPU worker processes
+    
+    Falls back to the regular path for short audio or when STT_LONG_AUDIO_WORKERS=0.
+    """
+    if not audio.filename:
+        raise HTTPException(status_code=400, detail="Audio file is required")
+    
+    service = get_service()
+    
+    try:
+        content = await audio.read()
+        logger.info(f"Received long audio file: {audio.filename}, size: {len(content)} bytes")
+        
+        result = await _run_inference(
+            service.transcribe_long,
+            audio=load_audio_bytes(content),
+            language=language if language != "auto" else None,
+            task=task,
+            beam_size=beam_size,
+            vad_filter=vad_filter,
+            word_timestamps=word_timestamps,
+            shard_seconds=shard_seconds,
+        )
+        
+        return {
+            "success": True,
+            "data": result,
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Long-audio transcription failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+
+
+# Transcribe raw PCM (fast path)
+@router.post("/transcribe/pcm")
+async def transcribe_pcm(
+    request: Request,
+    language: Optional[str] = Query("en", description="Language code (e.g., 'en', 'auto')"),
+    task: Literal["transcribe", "translate"] = Query("transcribe", description="Task: transcribe or translate to English"),
+    beam_size: int = Query(5, ge=1, le=20, description="Beam size for beam search"),
+    vad_filter: bool = Query(True, description="Enable Voice Activity Detection"),
+    return_timestamps: bool = Query(True, description="Return segment timestamps"),
+    word_timestamps: bool = Query(False, description="Return word-level timestamps (slower)"),
+    bypass_cache: bool = Query(False, description="Skip the result cache lookup (result is still stored)"),
+):
+    """
+    Transcribe raw PCM audio sent as the request body
+    
+    The body must be headerless 16-bit little-endian mono PCM at 16 kHz
+    (Content-Type: application/octet-stream). No container decoding or
+    resampling is done, which makes this the cheapest path for short
+    utterances captured by the client.
+    """
+    content = await request.body()
+    if len(content) < 2:
+        raise HTTPException(status_code=400, detail="Request body must contain PCM16 audio")
+    
+    service = get_service()
+    
+    try:
+        logger.info(f"Received raw PCM: {len(content)} bytes ({len(content) / 2 / SAMPLE_RATE:.2f}s)")
+        
+        result = await _transcribe_cached(
+            service,
+            audio=load_audio_bytes(content, raw_pcm16=True),
+            language=language if language != "auto" else None,
+            task=task,
+            beam_size=beam_size,
+            vad_filter=vad_filter,
+            return_timestamps=return_timestamps,
+            word_timestamps=word_timestamps,
+            bypass_cache=bypass_cache,
+        )
+        
+        logger.info(f"Transcription completed: {len(result['text'])} characters")
+        
+        return {
+            "success": True,
+            "data": result,
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Transcription failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
 
 # Transcribe with JSON request body (alternative endpoint)
@@ -147,30 +431,22 @@ async def transcribe_audio_json(
     # Get service
     service = get_service()
     
-    # Save uploaded file temporarily
-    temp_file = None
     try:
-        # Create temporary file
-        suffix = os.path.splitext(audio.filename)[1] if audio.filename else ".wav"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            temp_file_path = temp_file.name
-            
-            # Write uploaded content
-            content = await audio.read()
-            temp_file.write(content)
-            temp_file.flush()
-        
+        # Decode from memory (no temp file)
+        content = await audio.read()
         logger.info(f"Received audio file: {audio.filename}, size: {len(content)} bytes")
         
         # Transcribe
-        result = service.transcribe(
-            audio_path=temp_file_path,
+        result = await _transcribe_cached(
+            service,
+            audio=load_audio_bytes(content),
             language=request.language if request.language != "auto" else None,
             task=request.task,
             beam_size=request.beam_size or 5,
             vad_filter=request.vad_filter if request.vad_filter is not None else True,
             return_timestamps=request.return_timestamps if request.return_timestamps is not None else True,
             word_timestamps=request.word_timestamps if request.word_timestamps is not None else False,
+            bypass_cache=bool(request.bypass_cache),
         )
         
         logger.info(f"Transcription completed: {len(result['text'])} characters")
@@ -180,16 +456,105 @@ async def transcribe_audio_json(
             "data": result,
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Transcription failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+
+
+# Live transcription over WebSocket
+@router.websocket("/live")
+async def live_transcription(
+    websocket: WebSocket,
+    language: Optional[str] = Query("en", description="Language code (e.g., 'en', 'auto')"),
+    task: Literal["transcribe", "translate"] = Query("transcribe"),
+    beam_size: int = Query(5, ge=1, le=20),
+    partial_interval: Optional[float] = Query(None, ge=0, description="Seconds between partial results (0 = off)"),
+):
+    """
+    Live transcription of microphone audio
+    
+    Protocol:
+        client -> binary messages: PCM16LE mono 16 kHz, any frame size
+        client -> text "stop" (or {"type": "stop"}): flush and finish
+        server -> {"type": "ready", "sample_rate": 16000}
+        server -> {"type": "partial", "segment_id", "text", "start", "end"} while a segment is open
+                  (covers the last STT_LIVE_PARTIAL_WINDOW_SECONDS of the segment)
+        server -> {"type": "final", "segment_id", "text", "start", "end", "language", "segments"}
+        server -> {"type": "error", "segment_id", "message"} if one segment fails
+        server -> {"type": "done", "duration"} after stop
     
+    Speech segments are found incrementally by VAD while frames are received;
+    transcription runs on a worker and events are sent as soon as they are
+    ready, so a slow segment never holds up the incoming audio. Partials that
+    the decoder cannot keep up with are skipped.
+    """
+    await websocket.accept()
+    
+    service = get_service()
+    try:
+        # One executor slot is held for the whole session
+        reservation = service.get_executor().reserve()
+    except ExecutorBusy:
+        # 1013 = Try Again Later
+        await websocket.close(code=1013, reason="Too many transcription requests in progress")
+        return
+    options = dict(LIVE_CONFIG)
+    if partial_interval is not None:
+        options["partial_interval_seconds"] = partial_interval
+    
+    # Events come from the session's worker thread and are sent by their own task
+    loop = asyncio.get_running_loop()
+    outgoing: "asyncio.Queue[dict]" = asyncio.Queue()
+    session = LiveTranscriber(
+        service,
+        reservation=reservation,
+        language=language if language != "auto" else None,
+        task=task,
+        beam_size=beam_size,
+        on_event=lambda event: loop.call_soon_threadsafe(outgoing.put_nowait, event),
+        **options,
+    )
+    logger.info("Live transcription session started")
+    
+    async def send_events():
+        while True:
+            event = await outgoing.get()
+            await websocket.send_json(event)
+            if event["type"] == "done":
+                return
+    
+    sender = asyncio.create_task(send_events())
+    try:
+        await websocket.send_json({"type": "ready", "sample_rate": SAMPLE_RATE})
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes") is not None:
+                # VAD only (cheap); segments are queued for the worker
+                session.feed(message["bytes"])
+            elif message.get("text") is not None and "stop" in message["text"]:
+                await run_in_threadpool(session.flush)
+                # Queued after every final the flush produced
+                outgoing.put_nowait({"type": "done", "duration": session.duration})
+                await sender
+                await websocket.close()
+                break
+    
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Live transcription failed: {e}", exc_info=True)
+        try:
+            await websocket.send_json({"type": "error", "message": str(e)})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
     finally:
-        # Clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-                logger.debug(f"Cleaned up temporary file: {temp_file_path}")
-            except Exception as e:
-                logger.warning(f"Failed to delete temp file {temp_file_path}: {e}")
-
+        sender.cancel()
+        await run_in_threadpool(session.close)
+        reservation.release()
+        logger.info(f"Live transcription session ended: {session.duration:.1f}s audio, {session.segment_id} segments")
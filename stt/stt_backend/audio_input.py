@@ -0,0 +1,97 @@
+"""
+In-memory audio ingest
+Turns uploaded bytes into something faster-whisper can consume without a temp file
+"""
+import io
+import struct
+from typing import BinaryIO, Optional, Union
+
+import numpy as np
+
+# faster-whisper works on 16 kHz mono float32
+SAMPLE_RATE = 16000
+
+AudioInput = Union[str, BinaryIO, np.ndarray]
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """
+    Convert raw little-endian PCM16 bytes to float32 in [-1, 1)
+
+    Args:
+        data: PCM16LE samples (an odd trailing byte is ignored)
+
+    Returns:
+        float32 numpy array
+    """
+    samples = np.frombuffer(data, dtype="<i2", count=len(data) // 2)
+    return samples.astype(np.float32) / 32768.0
+
+
+def _wav_pcm16_mono_16k(content: bytes) -> Optional[memoryview]:
+    """
+    Return the data chunk of a PCM16 mono 16 kHz WAV, or None for any other layout
+
+    Only the RIFF chunk headers are walked; the sample data is not copied.
+    """
+    if len(content) < 12 or content[:4] != b"RIFF" or content[8:12] != b"WAVE":
+        return None
+
+    view = memoryview(content)
+    offset = 12
+    fmt_ok = False
+    while offset + 8 <= len(content):
+        chunk_id = bytes(view[offset:offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", content, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            if chunk_size < 16:
+                return None
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", content, body)
+            # 0xFFFE = WAVE_FORMAT_EXTENSIBLE, which ffmpeg writes for plain PCM too
+            fmt_ok = audio_format in (1, 0xFFFE) and channels == 1 and sample_rate == SAMPLE_RATE and bits == 16
+            if not fmt_ok:
+                return None
+        elif chunk_id == b"data":
+            if not fmt_ok:
+                return None
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF; take the rest of the file
+            end = len(content) if chunk_size in (0, 0xFFFFFFFF) else min(body + chunk_size, len(content))
+            return view[body:end]
+        offset = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def load_audio_bytes(content: bytes, raw_pcm16: bool = False) -> Union[BinaryIO, np.ndarray]:
+    """
+    Prepare uploaded audio for transcription without touching disk
+
+    - raw_pcm16: the bytes are headerless PCM16LE mono 16 kHz -> float32 array
+    - PCM16 mono 16 kHz WAV: the data chunk is read directly -> float32 array
+    - anything else (MP3, M4A, FLAC, other WAV layouts): a BytesIO that
+      faster-whisper decodes and resamples in memory with PyAV
+
+    Args:
+        content: Uploaded bytes
+        raw_pcm16: Treat the bytes as raw PCM16/16 kHz mono
+
+    Returns:
+        float32 numpy array or file-like object accepted by WhisperModel.transcribe
+    """
+    if raw_pcm16:
+        return pcm16_to_float32(content)
+
+    pcm = _wav_pcm16_mono_16k(content)
+    if pcm is not None:
+        return pcm16_to_float32(pcm)
+
+    return io.BytesIO(content)
+
+
+def describe_audio(audio: AudioInput) -> str:
+    """Short description of an audio input for logging"""
+    if isinstance(audio, np.ndarray):
+        return f"<pcm {len(audio) / SAMPLE_RATE:.2f}s>"
+    if isinstance(audio, str):
+        return audio
+    return "<in-memory buffer>"
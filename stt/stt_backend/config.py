@@ -40,3 +40,44 @@ class ModelConfig:
         "num_workers": int(os.getenv("STT_NUM_WORKERS", "4")),  # CPU workers for preprocessing
     }
 
+
+# Live (WebSocket) transcription
+LIVE_CONFIG = {
+    "min_speech_ms": int(os.getenv("STT_LIVE_MIN_SPEECH_MS", "150")),
+    "min_silence_ms": int(os.getenv("STT_LIVE_MIN_SILENCE_MS", "500")),  # Silence that closes a segment
+    "speech_pad_ms": int(os.getenv("STT_LIVE_SPEECH_PAD_MS", "200")),
+    "max_segment_seconds": float(os.getenv("STT_LIVE_MAX_SEGMENT_SECONDS", "15")),
+    "partial_interval_seconds": float(os.getenv("STT_LIVE_PARTIAL_INTERVAL_SECONDS", "1.0")),  # 0 disables partials
+    "partial_window_seconds": float(os.getenv("STT_LIVE_PARTIAL_WINDOW_SECONDS", "5")),  # Trailing audio decoded per partial
+    "threshold_db": float(os.getenv("STT_LIVE_VAD_THRESHOLD_DB", "-40")),
+}
+
+# Batched multi-file transcription
+BATCH_SIZE = int(os.getenv("STT_BATCH_SIZE", "8"))  # Speech chunks per forward pass
+BATCH_MAX_FILES = int(os.getenv("STT_BATCH_MAX_FILES", "32"))
+
+# Long-audio mode: VAD-split shards across CPU worker processes (each with its own int8 model)
+LONG_AUDIO_CONFIG = {
+    "workers": int(os.getenv("STT_LONG_AUDIO_WORKERS", "0")),  # 0 = off (sequential in the main model)
+    "compute_type": os.getenv("STT_LONG_AUDIO_COMPUTE_TYPE", "int8"),
+    "cpu_threads": int(os.getenv("STT_LONG_AUDIO_CPU_THREADS", "0")),  # 0 = cores / workers
+    "shard_seconds": float(os.getenv("STT_LONG_AUDIO_SHARD_SECONDS", "60")),
+    "min_seconds": float(os.getenv("STT_LONG_AUDIO_MIN_SECONDS", "120")),  # Shorter audio is not sharded
+}
+
+# Transcription result cache (keyed by PCM content hash + decoding options)
+CACHE_CONFIG = {
+    "enabled": os.getenv("STT_CACHE_ENABLED", "true").lower() == "true",
+    "dir": os.getenv("STT_CACHE_DIR", str(BASE_DIR / "storage" / "stt_cache")),
+    "memory_entries": int(os.getenv("STT_CACHE_MEMORY_ENTRIES", "256")),
+    "disk_entries": int(os.getenv("STT_CACHE_DISK_ENTRIES", "10000")),
+}
+
+# Serving: background warm load and the bounded inference executor
+SERVING_CONFIG = {
+    "warm_load": os.getenv("STT_WARM_LOAD", "true").lower() == "true",  # Load the model in the background at startup
+    "replicas": int(os.getenv("STT_REPLICAS", "1")),  # Model replicas on CPU (GPU loads one model shared by all slots)
+    "replica_cpu_threads": int(os.getenv("STT_REPLICA_CPU_THREADS", "0")),  # 0 = cores / replicas
+    "max_queue": int(os.getenv("STT_MAX_QUEUE", "8")),  # Requests waiting for a replica before 429
+    "retry_after_seconds": int(os.getenv("STT_RETRY_AFTER_SECONDS", "2")),
+}
@@ -0,0 +1,316 @@
+"""
+Inference executor
+Runs transcriptions off the event loop on a fixed set of model replicas, with a
+bounded queue so overload is rejected (HTTP 429) instead of piling up
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+# End-of-stream marker for iterate()
+_DONE = object()
+
+# Events buffered between an iterate() producer and its consumer
+STREAM_BUFFER = 16
+
+
+class ExecutorBusy(Exception):
+    """Raised when the queue-depth limit is reached"""
+
+
+def current_replica() -> Any:
+    """Model replica checked out by the calling executor thread, or None"""
+    return getattr(_local, "replica", None)
+
+
+class Reservation:
+    """
+    One executor slot held for a long-lived session (e.g. a live WebSocket)
+
+    The slot counts against the executor's capacity from reserve() until
+    release(), whether or not the session is transcribing at the moment, so
+    admitted sessions can never push the queue past its limit. Work submitted
+    through the reservation runs one task at a time.
+    """
+
+    def __init__(self, executor: "InferenceExecutor"):
+        self._executor = executor
+        self._released = False
+        self._busy = threading.Lock()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run fn on a replica using this reservation's slot"""
+        if self._released:
+            raise RuntimeError("Reservation already released")
+        self._busy.acquire()
+        try:
+            future = self._executor._dispatch(fn, args, kwargs, holds_slot=False)
+        except BaseException:
+            self._busy.release()
+            raise
+        future.add_done_callback(lambda _: self._busy.release())
+        return future
+
+    def release(self):
+        """Give the slot back (idempotent)"""
+        if not self._released:
+            self._released = True
+            self._executor._unreserve()
+
+    def __enter__(self) -> "Reservation":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class ResultStream:
+    """
+    Iterator over the items of an iterate() producer
+
+    close() - or garbage collection, if the iterator is dropped without ever
+    being consumed - stops the producer at its next item and frees its replica.
+    """
+
+    def __init__(self, items: "queue.Queue", cancelled: threading.Event):
+        self._items = items
+        self._cancelled = cancelled
+        self._finished = False
+        self._finalizer = weakref.finalize(self, cancelled.set)
+
+    def __iter__(self) -> "ResultStream":
+        return self
+
+    def __next__(self) -> Any:
+        if self._finished:
+            raise StopIteration
+        item = self._items.get()
+        if item is _DONE:
+            self.close()
+            raise StopIteration
+        if isinstance(item, BaseException):
+            self.close()
+            raise item
+        return item
+
+    def close(self):
+        """Stop the producer (safe to call more than once, from any thread)"""
+        self._finished = True
+        self._finalizer()
+        # Wake a consumer blocked in __next__ on another thread
+        try:
+            self._items.put_nowait(_DONE)
+        except queue.Full:
+            pass
+
+
+class InferenceExecutor:
+    """
+    One worker thread per model replica plus a bounded wait queue
+
+    A task checks out a free replica for its whole duration; current_replica()
+    returns it inside the task. At most `workers + max_queue` tasks and
+    reserved sessions may be running or waiting; further submissions raise
+    ExecutorBusy. CTranslate2 releases the GIL, so replicas on CPU run truly
+    in parallel.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        """
+        Args:
+            workers: Number of replicas / worker threads
+            max_queue: Tasks allowed to wait for a free replica
+        """
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stt-inference")
+        # Filled by set_replicas(); tasks wait here until the warm load has finished
+        self._free: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        # Admitted tasks + reserved sessions (compared against capacity)
+        self._pending = 0
+        self._reserved = 0
+        self._queued = 0
+        self._running = 0
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "sessions": 0,
+                       "queue_wait_seconds": 0.0, "busy_seconds": 0.0, "max_pending": 0}
+        self._started = time.time()
+
+    def set_replicas(self, replicas: List[Any]):
+        """Make replicas available to tasks (None = use the service's default model)"""
+        for replica in replicas[:self.workers]:
+            self._free.put(replica)
+        for _ in range(self.workers - len(replicas)):
+            self._free.put(None)
+
+    @property
+    def capacity(self) -> int:
+        """Maximum running + waiting tasks"""
+        return self.workers + self.max_queue
+
+    def is_saturated(self) -> bool:
+        """True when a new submission would be rejected"""
+        with self._lock:
+            return self._pending >= self.capacity
+
+    def _admit(self):
+        """Take a slot or raise ExecutorBusy (caller holds lock)"""
+        if self._pending >= self.capacity:
+            self._stats["rejected"] += 1
+            raise ExecutorBusy(f"Inference queue full ({self._pending} pending, capacity {self.capacity})")
+        self._pending += 1
+        self._stats["max_pending"] = max(self._stats["max_pending"], self._pending)
+
+    def _finish(self, ok: bool, holds_slot: bool):
+        with self._lock:
+            if holds_slot:
+                self._pending -= 1
+            self._stats["completed" if ok else "failed"] += 1
+
+    def reserve(self) -> Reservation:
+        """
+        Hold one slot for a session until Reservation.release()
+
+        Raises:
+            ExecutorBusy: Queue is full
+        """
+        with self._lock:
+            self._admit()
+            self._reserved += 1
+            self._stats["sessions"] += 1
+        return Reservation(self)
+
+    def _unreserve(self):
+        with self._lock:
+            self._pending -= 1
+            self._reserved -= 1
+
+    def _run_with_replica(self, fn: Callable, args, kwargs, submitted: float, cancelled: Optional[threading.Event]):
+        """Worker side: check out a replica and run fn"""
+        replica = self._free.get()
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._stats["queue_wait_seconds"] += started - submitted
+        if cancelled is not None and cancelled.is_set():
+            # Consumer went away while this task was waiting
+            self._free.put(replica)
+            with self._lock:
+                self._running -= 1
+            return None
+        _local.replica = replica
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.replica = None
+            self._free.put(replica)
+            with self._lock:
+                self._running -= 1
+                self._stats["busy_seconds"] += time.perf_counter() - started
+
+    def _dispatch(self, fn: Callable, args, kwargs, holds_slot: bool,
+                  cancelled: Optional[threading.Event] = None) -> Future:
+        """Queue fn for a worker; holds_slot = the task returns an admitted slot when done"""
+        with self._lock:
+            self._queued += 1
+            self._stats["submitted"] += 1
+        try:
+            future = self._pool.submit(self._run_with_replica, fn, args, kwargs, time.perf_counter(), cancelled)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+                if holds_slot:
+                    self._pending -= 1
+            raise
+        future.add_done_callback(lambda f: self._finish(not f.cancelled() and f.exception() is None, holds_slot))
+        return future
+
+    def _submit(self, fn: Callable, args, kwargs, cancelled: Optional[threading.Event] = None) -> Future:
+        with self._lock:
+            self._admit()
+        return self._dispatch(fn, args, kwargs, holds_slot=True, cancelled=cancelled)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Run fn(*args, **kwargs) on a replica
+
+        Raises:
+            ExecutorBusy: Queue is full
+        """
+        return self._submit(fn, args, kwargs)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Await fn on a replica from async code"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def iterate(self, fn: Callable[..., Iterator], *args, **kwargs) -> ResultStream:
+        """
+        Run a generator function on a replica and yield its items to the caller
+
+        The slot is admitted immediately (so ExecutorBusy is raised before any
+        response starts). At most STREAM_BUFFER items wait for the consumer; a
+        slow consumer pauses the producer. Closing the returned stream - or
+        dropping it without consuming it - stops the producer at its next item
+        and frees the replica and the slot.
+
+        Raises:
+            ExecutorBusy: Queue is full
+        """
+        items: "queue.Queue" = queue.Queue(maxsize=STREAM_BUFFER)
+        cancelled = threading.Event()
+
+        def put(item) -> bool:
+            while not cancelled.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            generator = None
+            try:
+                generator = fn(*args, **kwargs)
+                for item in generator:
+                    if not put(item):
+                        return
+            except Exception as e:
+                put(e)
+                raise
+            finally:
+                if generator is not None:
+                    generator.close()
+                put(_DONE)
+
+        stream = ResultStream(items, cancelled)
+        self._submit(produce, (), {}, cancelled=cancelled)
+        return stream
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and utilization"""
+        with self._lock:
+            uptime = time.time() - self._started
+            return {
+                **self._stats,
+                "replicas": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._queued,
+                "reserved_sessions": self._reserved,
+                "utilization": self._stats["busy_seconds"] / (uptime * self.workers) if uptime else 0.0,
+            }
+
+    def shutdown(self):
+        """Stop worker threads (running tasks finish)"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,329 @@
+"""
+Live transcription session
+Incremental VAD over microphone PCM frames; each closed speech segment is
+transcribed on a background worker while the caller keeps streaming
+"""
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .audio_input import SAMPLE_RATE, pcm16_to_float32
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingVAD:
+    """
+    Frame-level energy VAD with an adaptive noise floor
+
+    Frames are speech when their RMS is above both an absolute threshold and a
+    multiple of the running noise floor. The noise floor follows non-speech
+    frames, so steady background hum does not keep a segment open.
+    """
+
+    def __init__(
+        self,
+        frame_ms: int = 30,
+        threshold_db: float = -40.0,
+        noise_ratio: float = 3.0,
+        noise_adapt: float = 0.05,
+    ):
+        self.frame_samples = SAMPLE_RATE * frame_ms // 1000
+        self.threshold = 10 ** (threshold_db / 20)
+        self.noise_ratio = noise_ratio
+        self.noise_adapt = noise_adapt
+        self.noise_floor: Optional[float] = None
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        """Classify one frame"""
+        rms = float(np.sqrt(np.mean(np.square(frame, dtype=np.float64))))
+        floor = self.noise_floor if self.noise_floor is not None else rms
+        speech = rms > self.threshold and rms > floor * self.noise_ratio
+        if not speech:
+            self.noise_floor = floor + self.noise_adapt * (rms - floor)
+        return speech
+
+
+class LiveTranscriber:
+    """
+    One live transcription session
+
+    feed() takes PCM16LE mono 16 kHz bytes in any frame size and only runs the
+    VAD; closed segments and partial snapshots are handed to a worker thread,
+    so audio keeps flowing while a segment is being transcribed. Events:
+    - {"type": "partial", ...}: transcript of the last partial_window_seconds of the open segment
+    - {"type": "final", ...}: transcript of a closed segment, with stream timestamps
+    - {"type": "error", ...}: a transcription failed (the session continues)
+    Finals are transcribed in order. Only the latest partial snapshot is kept:
+    a partial that is overtaken by a newer one or by its segment closing is
+    dropped instead of queueing behind the decoder.
+
+    Events go to on_event (called from the worker thread) or, without a
+    callback, are returned by feed()/flush(). flush() closes the open segment
+    and waits for the worker; close() stops it and drops pending work.
+    """
+
+    def __init__(
+        self,
+        service,
+        reservation=None,
+        language: Optional[str] = None,
+        task: str = "transcribe",
+        beam_size: int = 5,
+        min_speech_ms: int = 150,
+        min_silence_ms: int = 500,
+        speech_pad_ms: int = 200,
+        max_segment_seconds: float = 15.0,
+        partial_interval_seconds: float = 1.0,
+        partial_window_seconds: float = 5.0,
+        threshold_db: float = -40.0,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """
+        Args:
+            service: STTService used for transcription
+            reservation: Executor slot held for this session (None = admit each segment separately)
+            language: Language code (None = auto-detect)
+            task: "transcribe" or "translate"
+            beam_size: Beam size for final results (partials use greedy decoding)
+            min_speech_ms: Speech needed to open a segment
+            min_silence_ms: Silence that closes a segment
+            speech_pad_ms: Audio kept before the segment start
+            max_segment_seconds: Force-close segments longer than this
+            partial_interval_seconds: New audio between partial results (0 = no partials)
+            partial_window_seconds: Trailing audio decoded for a partial, so its cost does not grow with the segment
+            threshold_db: Absolute VAD threshold in dBFS
+            on_event: Called with each event from the worker thread (None = return them from feed()/flush())
+        """
+        self.service = service
+        self.reservation = reservation
+        self.language = language
+        self.task = task
+        self.beam_size = beam_size
+        self.vad = StreamingVAD(threshold_db=threshold_db)
+        frame = self.vad.frame_samples
+        self.min_speech_frames = max(1, min_speech_ms * SAMPLE_RATE // 1000 // frame)
+        self.min_silence_frames = max(1, min_silence_ms * SAMPLE_RATE // 1000 // frame)
+        self.max_segment_samples = int(max_segment_seconds * SAMPLE_RATE)
+        self.partial_interval_samples = int(partial_interval_seconds * SAMPLE_RATE)
+        self.partial_window_samples = int(partial_window_seconds * SAMPLE_RATE)
+        self.on_event = on_event
+
+        self._pending = np.zeros(0, dtype=np.float32)  # Samples not yet framed
+        # Holds the frames that open a segment plus the padding before them
+        pad_frames = speech_pad_ms * SAMPLE_RATE // 1000 // frame
+        self._pre_roll: Deque[np.ndarray] = deque(maxlen=self.min_speech_frames + pad_frames)
+        self._segment: List[np.ndarray] = []
+        self._segment_start = 0  # Stream sample index of the open segment
+        self._speech_run = 0
+        self._silence_run = 0
+        self._in_speech = False
+        self._since_partial = 0
+        self._samples_seen = 0
+        self._odd_byte = b""
+        self.segment_id = 0  # Id of the open (or next) segment
+
+        # Work for the transcription worker: closed segments in order + latest partial snapshot
+        self._cond = threading.Condition()
+        self._finals: Deque[Tuple[int, float, np.ndarray]] = deque()
+        self._partial_job: Optional[Tuple[int, float, np.ndarray]] = None
+        self._busy = False
+        self._closed = False
+        self._outbox: List[Dict[str, Any]] = []
+        self.dropped_partials = 0
+        self._worker = threading.Thread(target=self._run, name="stt-live", daemon=True)
+        self._worker.start()
+
+    def _transcribe(self, audio: np.ndarray, beam_size: int) -> Dict[str, Any]:
+        """
+        Transcribe one speech segment (already VAD-trimmed)
+
+        Runs on the slot reserved at connect time, so an admitted session is
+        never cut off mid-stream and never pushes the executor past its limit.
+        """
+        submit = self.reservation.submit if self.reservation is not None else self.service.get_executor().submit
+        return submit(
+            self.service.transcribe,
+            audio=audio,
+            language=self.language,
+            task=self.task,
+            beam_size=beam_size,
+            vad_filter=False,
+            word_timestamps=False,
+            use_cache=False,
+        ).result()
+
+    def _close_segment(self):
+        """Queue the open segment for a final transcript and reset"""
+        if not self._segment:
+            return
+        audio = np.concatenate(self._segment)
+        start = self._segment_start / SAMPLE_RATE
+        self._segment = []
+        self._in_speech = False
+        self._speech_run = self._silence_run = self._since_partial = 0
+
+        with self._cond:
+            if self._partial_job is not None:
+                # The final supersedes the pending partial of this segment
+                self._partial_job = None
+                self.dropped_partials += 1
+            self._finals.append((self.segment_id, start, audio))
+            self._cond.notify_all()
+        self.segment_id += 1
+
+    def _queue_partial(self):
+        """Replace the pending partial with a snapshot of the last partial_window_seconds"""
+        self._since_partial = 0
+        audio = np.concatenate(self._segment)[-self.partial_window_samples:]
+        start = (self._samples_seen - len(audio)) / SAMPLE_RATE
+        with self._cond:
+            if self._partial_job is not None:
+                self.dropped_partials += 1
+            self._partial_job = (self.segment_id, start, audio)
+            self._cond.notify_all()
+
+    def _final_event(self, segment_id: int, start: float, audio: np.ndarray) -> Dict[str, Any]:
+        result = self._transcribe(audio, self.beam_size)
+        return {
+            "type": "final",
+            "segment_id": segment_id,
+            "text": result["text"],
+            "start": start,
+            "end": start + len(audio) / SAMPLE_RATE,
+            "language": result["language"],
+            "segments": [
+                {**segment, "start": start + segment["start"], "end": start + segment["end"]}
+                for segment in result["segments"]
+            ],
+        }
+
+    def _partial_event(self, segment_id: int, start: float, audio: np.ndarray) -> Dict[str, Any]:
+        """Greedy transcript of the partial window"""
+        result = self._transcribe(audio, 1)
+        return {
+            "type": "partial",
+            "segment_id": segment_id,
+            "text": result["text"],
+            "start": start,
+            "end": start + len(audio) / SAMPLE_RATE,
+        }
+
+    def _emit(self, event: Dict[str, Any]):
+        if self.on_event is not None:
+            self.on_event(event)
+        else:
+            with self._cond:
+                self._outbox.append(event)
+
+    def _run(self):
+        """Worker thread: transcribe finals in order, then the latest partial"""
+        while True:
+            with self._cond:
+                while not self._finals and self._partial_job is None and not self._closed:
+                    self._cond.wait()
+                if self._finals:
+                    job, make_event = self._finals.popleft(), self._final_event
+                elif self._partial_job is not None:
+                    job, make_event = self._partial_job, self._partial_event
+                    self._partial_job = None
+                else:
+                    return
+                self._busy = True
+            try:
+                event = make_event(*job)
+            except Exception as e:
+                logger.error(f"Live transcription of segment {job[0]} failed: {e}", exc_info=True)
+                event = {"type": "error", "segment_id": job[0], "message": str(e)}
+            try:
+                self._emit(event)
+            except Exception as e:
+                logger.warning(f"Could not deliver live event: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _take_events(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            events, self._outbox = self._outbox, []
+        return events
+
+    def _process_frame(self, frame: np.ndarray):
+        """Advance the VAD state machine by one frame"""
+        speech = self.vad.is_speech(frame)
+        frame_start = self._samples_seen
+        self._samples_seen += len(frame)
+
+        if not self._in_speech:
+            self._pre_roll.append(frame)
+            self._speech_run = self._speech_run + 1 if speech else 0
+            if self._speech_run >= self.min_speech_frames:
+                # Open a segment, including the pre-roll padding
+                self._in_speech = True
+                self._segment = list(self._pre_roll)
+                self._pre_roll.clear()
+                padded = sum(len(f) for f in self._segment)
+                self._segment_start = frame_start + len(frame) - padded
+                self._silence_run = 0
+                self._since_partial = padded
+            return
+
+        self._segment.append(frame)
+        self._since_partial += len(frame)
+        self._silence_run = 0 if speech else self._silence_run + 1
+
+        segment_samples = self._samples_seen - self._segment_start
+        if self._silence_run >= self.min_silence_frames or segment_samples >= self.max_segment_samples:
+            self._close_segment()
+        elif self.partial_interval_samples and self._since_partial >= self.partial_interval_samples:
+            self._queue_partial()
+
+    def feed(self, pcm: bytes) -> List[Dict[str, Any]]:
+        """
+        Add PCM16LE mono 16 kHz bytes (VAD only; never waits for the model)
+
+        Returns:
+            Events finished by the worker since the last call (always empty with on_event)
+        """
+        pcm = self._odd_byte + pcm
+        self._odd_byte = pcm[-1:] if len(pcm) % 2 else b""
+        samples = pcm16_to_float32(pcm)
+        self._pending = np.concatenate([self._pending, samples]) if len(self._pending) else samples
+
+        frame = self.vad.frame_samples
+        usable = len(self._pending) - len(self._pending) % frame
+        for offset in range(0, usable, frame):
+            self._process_frame(self._pending[offset:offset + frame])
+        self._pending = self._pending[usable:].copy()
+        return self._take_events()
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Close the open segment at end of stream and wait until every final is transcribed"""
+        if self._in_speech and len(self._pending):
+            self._segment.append(self._pending)
+        self._samples_seen += len(self._pending)
+        self._pending = np.zeros(0, dtype=np.float32)
+        if self._in_speech:
+            self._close_segment()
+        with self._cond:
+            while (self._finals or self._partial_job is not None or self._busy) and self._worker.is_alive():
+                self._cond.wait()
+        return self._take_events()
+
+    def close(self):
+        """Stop the worker, dropping work it has not started (waits for a running transcription)"""
+        with self._cond:
+            self._closed = True
+            self._finals.clear()
+            self._partial_job = None
+            self._cond.notify_all()
+        self._worker.join()
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio received"""
+        return self._samples_seen / SAMPLE_RATE
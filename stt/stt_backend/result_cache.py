@@ -0,0 +1,167 @@
+"""
+Transcription result cache
+Results keyed by the decoded PCM content hash and the decoding options, with a
+bounded in-memory LRU in front of a persistent JSON tier on disk
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored result layout changes
+RESULT_VERSION = 1
+
+
+def make_key(
+    pcm: np.ndarray,
+    model_id: str,
+    language: Optional[str],
+    task: str,
+    beam_size: int,
+    vad_filter: bool,
+    word_timestamps: bool,
+) -> str:
+    """
+    Cache key for one transcription
+
+    The audio part is the hash of the 16 kHz float32 samples, so the same clip
+    hits whether it was uploaded as WAV, raw PCM or another container that
+    decodes to identical samples.
+    """
+    digest = hashlib.sha256(np.ascontiguousarray(pcm, dtype=np.float32).tobytes())
+    options = f"{model_id}|v{RESULT_VERSION}|{language or 'auto'}|{task}|{beam_size}|{int(vad_filter)}|{int(word_timestamps)}"
+    digest.update(options.encode())
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """Memory LRU + persistent JSON cache of transcription results"""
+
+    def __init__(self, store_dir: str, max_memory_entries: int = 256, max_disk_entries: int = 10000):
+        """
+        Args:
+            store_dir: Directory for persisted results
+            max_memory_entries: Results kept in memory
+            max_disk_entries: Results kept on disk (oldest are pruned)
+        """
+        self.store_dir = Path(store_dir).resolve()
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.max_disk_entries = max(1, max_disk_entries)
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0, "pruned": 0}
+        logger.info(f"Transcription cache: {self.store_dir} (memory: {self.max_memory_entries}, disk: {self.max_disk_entries})")
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        """Insert into memory LRU (caller holds lock)"""
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result or None"""
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return result
+
+        path = self.store_dir / f"{key}.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            # Recently read results survive _prune() (oldest mtime goes first)
+            path.touch()
+        except FileNotFoundError:
+            result = None
+        except Exception as e:
+            logger.warning(f"Corrupt cached result {path.name}: {e}")
+            result = None
+
+        with self._lock:
+            if result is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a result in both tiers"""
+        path = self.store_dir / f"{key}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+        with self._lock:
+            self._stats["stores"] += 1
+            self._remember(key, result)
+            self._puts_since_prune += 1
+            prune = self._puts_since_prune >= 100
+            if prune:
+                self._puts_since_prune = 0
+        if prune:
+            self._prune()
+
+    def record_bypass(self):
+        """Count a lookup skipped by the caller"""
+        with self._lock:
+            self._stats["bypassed"] += 1
+
+    def _prune(self):
+        """Drop the least recently used persisted results beyond max_disk_entries"""
+        files = sorted(self.store_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        excess = len(files) - self.max_disk_entries
+        for path in files[:max(0, excess)]:
+            path.unlink(missing_ok=True)
+        if excess > 0:
+            with self._lock:
+                self._stats["pruned"] += excess
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics"""
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_ratio": hits / lookups if lookups else None,
+                "memory_entries": len(self._memory),
+                "max_memory_entries": self.max_memory_entries,
+                "max_disk_entries": self.max_disk_entries,
+                "store_dir": str(self.store_dir),
+            }
+
+
+# Singleton instance
+_cache_instance: Optional[TranscriptionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> TranscriptionCache:
+    """Get transcription cache singleton"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                from .config import CACHE_CONFIG
+                _cache_instance = TranscriptionCache(
+                    store_dir=CACHE_CONFIG["dir"],
+                    max_memory_entries=CACHE_CONFIG["memory_entries"],
+                    max_disk_entries=CACHE_CONFIG["disk_entries"],
+                )
+    return _cache_instance
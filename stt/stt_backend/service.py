@@ -3,10 +3,14 @@ STT Service - faster-whisper wrapper
 Speech-to-Text service using faster-whisper with Whisper Large V3
 """
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List, NamedTuple
 import logging
 import os
 import sys
+import threading
+import time
+
+import numpy as np
 
 # Configure cuDNN PATH before importing faster-whisper
 # CTranslate2 (used by faster-whisper) loads cuDNN DLLs at import time
@@ -103,11 +107,22 @@ except ImportError:
         "faster-whisper is not installed. Install it with: pip install faster-whisper"
     )
 
-from .config import ModelConfig
+from .config import ModelConfig, LONG_AUDIO_CONFIG, CACHE_CONFIG, SERVING_CONFIG
+from .executor import InferenceExecutor, current_replica
+from .result_cache import get_result_cache, make_key
+from .audio_input import AudioInput, SAMPLE_RATE, describe_audio
 
 logger = logging.getLogger(__name__)
 
 
+class CacheLookup(NamedTuple):
+    """Result-cache lookup done ahead of inference (see STTService.lookup_cache)"""
+    audio: AudioInput  # Decoded PCM when the cache is enabled
+    key: Optional[str]  # None = caching disabled for this request
+    entry: Optional[Dict[str, Any]]  # Cached segments + summary on a hit
+    model_id: Optional[str] = None  # Model + compute type the key was made for
+
+
 class STTService:
     """Speech-to-Text service using faster-whisper"""
     
@@ -116,97 +131,339 @@ class STTService:
         self.model: Optional[WhisperModel] = None
         self.config = ModelConfig.FASTER_WHISPER
         self._model_loaded = False
+        self._load_lock = threading.Lock()
+        self._batched_pipelines: Dict[int, Any] = {}
+        self._sharded = None
+        self._sharded_lock = threading.Lock()
+        
+        # Warm load / serving state
+        self.state = "not_loaded"  # not_loaded, loading, ready, failed
+        self.load_error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.device_in_use: Optional[str] = None
+        self._compute_type_in_use: Optional[str] = None
+        self._replicas: List[WhisperModel] = []
+        self._warm_thread: Optional[threading.Thread] = None
+        self._executor = None
+        self._executor_lock = threading.Lock()
+    
+    def _cpu_threads(self) -> int:
+        """Threads per CPU model when several replicas share the cores (0 = CTranslate2 default)"""
+        replicas = max(1, SERVING_CONFIG["replicas"])
+        if SERVING_CONFIG["replica_cpu_threads"]:
+            return SERVING_CONFIG["replica_cpu_threads"]
+        return max(1, (os.cpu_count() or 1) // replicas) if replicas > 1 else 0
         
     def _load_model(self):
         """Lazy load the model (only load when needed)"""
         if self._model_loaded and self.model is not None:
             return
-            
-        logger.info("Loading faster-whisper model...")
-        logger.info(f"Model path: {self.config['model_path']}")
-        logger.info(f"Device: {self.config['device']}")
-        logger.info(f"Compute type: {self.config['compute_type']}")
         
-        device = self.config["device"]
-        compute_type = self.config["compute_type"]
+        with self._load_lock:
+            if self._model_loaded and self.model is not None:
+                return
+            
+            logger.info("Loading faster-whisper model...")
+            logger.info(f"Model path: {self.config['model_path']}")
+            logger.info(f"Device: {self.config['device']}")
+            logger.info(f"Compute type: {self.config['compute_type']}")
+            
+            device = self.config["device"]
+            compute_type = self.config["compute_type"]
+            cpu_kwargs = {"cpu_threads": self._cpu_threads()} if device == "cpu" else {}
+            
+            # Try to load with specified device
+            try:
+                self.model = WhisperModel(
+                    self.config["model_path"],
+                    device=device,
+                    compute_type=compute_type,
+                    num_workers=self.config["num_workers"],
+                    **cpu_kwargs,
+                )
+                self.device_in_use = device
+                self._compute_type_in_use = compute_type
+                self._model_loaded = True
+                logger.info(f"✅ faster-whisper model loaded successfully on {device}")
+            except Exception as e:
+                # If CUDA fails and device is cuda, try CPU fallback
+                if device == "cuda":
+                    logger.warning(f"Failed to load model on CUDA: {e}")
+                    logger.info("Attempting CPU fallback...")
+                    try:
+                        # Use int8 for CPU (more efficient)
+                        cpu_compute_type = "int8" if compute_type in ["float16", "int8_float16"] else "int8"
+                        self.model = WhisperModel(
+                            self.config["model_path"],
+                            device="cpu",
+                            compute_type=cpu_compute_type,
+                            num_workers=self.config["num_workers"],
+                            cpu_threads=self._cpu_threads(),
+                        )
+                        self.device_in_use = "cpu"
+                        self._compute_type_in_use = cpu_compute_type
+                        self._model_loaded = True
+                        logger.info("✅ faster-whisper model loaded successfully on CPU (CUDA fallback)")
+                    except Exception as cpu_error:
+                        logger.error(f"Failed to load model on CPU: {cpu_error}", exc_info=True)
+                        raise
+                else:
+                    logger.error(f"Failed to load faster-whisper model: {e}", exc_info=True)
+                    raise
+    
+    def _load_replicas(self) -> List[WhisperModel]:
+        """
+        Main model plus the extra CPU replicas (STT_REPLICAS)
         
-        # Try to load with specified device
+        Each CPU replica gets cores / replicas threads, so concurrent requests
+        run side by side instead of oversubscribing the cores. On GPU only the
+        main model is loaded; executor slots without a replica share it.
+        """
+        self._load_model()
+        replicas = [self.model]
+        if self.device_in_use == "cpu":
+            for index in range(1, max(1, SERVING_CONFIG["replicas"])):
+                logger.info(f"Loading CPU replica {index + 1}/{SERVING_CONFIG['replicas']}...")
+                replicas.append(WhisperModel(
+                    self.config["model_path"],
+                    device="cpu",
+                    compute_type=self._compute_type_in_use,
+                    num_workers=1,
+                    cpu_threads=self._cpu_threads(),
+                ))
+        self._replicas = replicas
+        return replicas
+    
+    def _warm_load(self):
+        """Load the model and replicas, then hand them to the executor"""
+        self.state = "loading"
+        start = time.perf_counter()
+        replicas: List[WhisperModel] = []
         try:
-            self.model = WhisperModel(
-                self.config["model_path"],
-                device=device,
-                compute_type=compute_type,
-                num_workers=self.config["num_workers"],
-            )
-            self._model_loaded = True
-            logger.info(f"✅ faster-whisper model loaded successfully on {device}")
+            replicas = self._load_replicas()
+            self.state = "ready"
+            self.load_error = None
+            logger.info(f"✅ STT warm load finished: {len(replicas)} replica(s) on {self.device_in_use} "
+                        f"in {time.perf_counter() - start:.1f}s")
         except Exception as e:
-            # If CUDA fails and device is cuda, try CPU fallback
-            if device == "cuda":
-                logger.warning(f"Failed to load model on CUDA: {e}")
-                logger.info("Attempting CPU fallback...")
-                try:
-                    # Use int8 for CPU (more efficient)
-                    cpu_compute_type = "int8" if compute_type in ["float16", "int8_float16"] else "int8"
-                    self.model = WhisperModel(
-                        self.config["model_path"],
-                        device="cpu",
-                        compute_type=cpu_compute_type,
-                        num_workers=self.config["num_workers"],
+            self.state = "failed"
+            self.load_error = str(e)
+            logger.error(f"STT warm load failed: {e}", exc_info=True)
+            logger.warning("Requests will retry loading the model")
+        finally:
+            self.load_seconds = time.perf_counter() - start
+            # Empty slots fall back to self.model, which retries the load after a failure
+            self._ensure_executor().set_replicas(replicas)
+        if self.state == "ready" and LONG_AUDIO_CONFIG["workers"] > 0:
+            self._warm_long_audio_pool()
+    
+    def _warm_long_audio_pool(self):
+        """Start the long-audio worker processes and load their models (after the replicas are serving)"""
+        start = time.perf_counter()
+        try:
+            self._get_sharded_transcriber().warm_up()
+            logger.info(f"✅ Long-audio pool warm: {LONG_AUDIO_CONFIG['workers']} worker(s) "
+                        f"in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            logger.warning(f"Long-audio pool warm-up failed, workers start on first use: {e}")
+    
+    def start_warm_load(self, wait: bool = False):
+        """
+        Load the model in a background thread (only the first call starts it)
+        
+        Args:
+            wait: Block until loading has finished
+        """
+        with self._executor_lock:
+            if self._warm_thread is None:
+                self.state = "loading"
+                self._warm_thread = threading.Thread(target=self._warm_load, name="stt-warm-load", daemon=True)
+                self._warm_thread.start()
+        if wait:
+            self._warm_thread.join()
+    
+    def _ensure_executor(self) -> InferenceExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = InferenceExecutor(
+                        workers=SERVING_CONFIG["replicas"],
+                        max_queue=SERVING_CONFIG["max_queue"],
                     )
-                    self._model_loaded = True
-                    logger.info("✅ faster-whisper model loaded successfully on CPU (CUDA fallback)")
-                except Exception as cpu_error:
-                    logger.error(f"Failed to load model on CPU: {cpu_error}", exc_info=True)
-                    raise
-            else:
-                logger.error(f"Failed to load faster-whisper model: {e}", exc_info=True)
-                raise
+        return self._executor
+    
+    def get_executor(self) -> InferenceExecutor:
+        """Bounded inference executor (one slot per replica); starts the warm load on first use"""
+        executor = self._ensure_executor()
+        self.start_warm_load()
+        return executor
+    
+    def _active_model(self) -> WhisperModel:
+        """Replica checked out by the current executor task, or the main model"""
+        self._load_model()
+        replica = current_replica()
+        model = replica if replica is not None else self.model
+        if model is None:
+            raise RuntimeError("Model not loaded")
+        return model
+    
+    def _language_param(self, language: Optional[str]) -> Optional[str]:
+        """Language passed to the model: the config default if not given, None for auto-detection"""
+        transcribe_language = language or self.config["language"]
+        return None if transcribe_language in ("auto", None) else transcribe_language
+    
+    def _cache_model_id(self) -> str:
+        """Model part of the cache key: the compute type actually loaded (e.g. int8 after a CUDA -> CPU fallback)"""
+        return f"{self.config['model_path']}@{self._compute_type_in_use or self.config['compute_type']}"
+    
+    def lookup_cache(
+        self,
+        audio: AudioInput,
+        language: Optional[str] = None,
+        task: str = "transcribe",
+        beam_size: int = 5,
+        vad_filter: bool = True,
+        return_timestamps: bool = True,
+        word_timestamps: bool = False,
+        use_cache: bool = True,
+        bypass_cache: bool = False,
+    ) -> CacheLookup:
+        """
+        Check the result cache without touching the model or the inference executor
+        
+        Takes the same arguments as transcribe(). Callers serve a hit straight away
+        and pass the lookup on to transcribe()/transcribe_stream() on a miss, so the
+        audio is decoded and hashed only once.
+        """
+        if not (use_cache and CACHE_CONFIG["enabled"]):
+            return CacheLookup(audio, None, None)
+        # Keyed by decoded PCM, so the audio is decoded here once
+        if not isinstance(audio, np.ndarray):
+            from faster_whisper.audio import decode_audio
+            audio = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+        cache = get_result_cache()
+        model_id = self._cache_model_id()
+        key = make_key(audio, model_id, self._language_param(language), task, beam_size, vad_filter, word_timestamps)
+        if bypass_cache:
+            cache.record_bypass()
+            return CacheLookup(audio, key, None, model_id)
+        return CacheLookup(audio, key, cache.get(key), model_id)
     
     def transcribe(
         self,
-        audio_path: str,
+        audio: AudioInput,
         language: Optional[str] = None,
         task: str = "transcribe",  # "transcribe" or "translate"
         beam_size: int = 5,
         vad_filter: bool = True,
         return_timestamps: bool = True,
         word_timestamps: bool = False,
+        use_cache: bool = True,
+        bypass_cache: bool = False,
+        lookup: Optional[CacheLookup] = None,
     ) -> Dict[str, Any]:
         """
-        Transcribe audio file to text
+        Transcribe audio to text
         
         Args:
-            audio_path: Path to audio file
+            audio: Audio file path, file-like object, or 16 kHz mono float32 array
             language: Language code (e.g., "en"). If None, auto-detect
             task: "transcribe" or "translate" (to English)
             beam_size: Beam size for beam search
             vad_filter: Enable Voice Activity Detection
             return_timestamps: Return segment timestamps
             word_timestamps: Return word-level timestamps (slower)
+            use_cache: Read and write the result cache
+            bypass_cache: Skip the cache lookup (the fresh result is still stored)
+            lookup: Result of lookup_cache() done by the caller (the cache is not checked again)
             
         Returns:
             Dictionary with transcription results
         """
-        # Load model if not already loaded
-        self._load_model()
+        # Collect the streamed segments
+        segment_list: List[Dict[str, Any]] = []
+        summary: Dict[str, Any] = {}
+        for event in self.transcribe_stream(
+            audio,
+            language=language,
+            task=task,
+            beam_size=beam_size,
+            vad_filter=vad_filter,
+            word_timestamps=word_timestamps,
+            use_cache=use_cache,
+            bypass_cache=bypass_cache,
+            lookup=lookup,
+        ):
+            if event["type"] == "segment":
+                segment_list.append(event["segment"])
+            else:
+                summary = event
         
-        if self.model is None:
-            raise RuntimeError("Model not loaded")
+        result: Dict[str, Any] = {
+            "text": summary["text"],
+            "language": summary["language"],
+            "language_probability": summary["language_probability"],
+            "segments": segment_list,
+        }
+        if summary.get("cached"):
+            result["cached"] = True
         
-        # Use default language if not specified
-        transcribe_language = language or self.config["language"]
+        logger.info(f"Transcription completed: {len(result['text'])} characters, {len(segment_list)} segments")
+        
+        return result
+    
+    def transcribe_stream(
+        self,
+        audio: AudioInput,
+        language: Optional[str] = None,
+        task: str = "transcribe",
+        beam_size: int = 5,
+        vad_filter: bool = True,
+        word_timestamps: bool = False,
+        use_cache: bool = True,
+        bypass_cache: bool = False,
+        lookup: Optional[CacheLookup] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Transcribe audio, yielding each segment as soon as it is decoded
+        
+        faster-whisper decodes lazily: the segments generator runs the model one
+        30-second window at a time, so the first segment of a long recording is
+        available long before the last one.
+        
+        Args:
+            Same as transcribe()
+            
+        Yields:
+            {"type": "segment", "index", "segment": {...}} for every segment, then
+            {"type": "summary", "text", "language", "language_probability",
+             "duration", "segment_count"} once decoding has finished
+            (a cache hit replays the stored events, with "cached": true in the summary)
+        """
+        transcribe_language_param = self._language_param(language)
         
-        # Handle "auto" language detection
-        transcribe_language_param = None if (transcribe_language == "auto" or transcribe_language is None) else transcribe_language
+        if lookup is None:
+            lookup = self.lookup_cache(audio, language=language, task=task, beam_size=beam_size,
+                                       vad_filter=vad_filter, word_timestamps=word_timestamps,
+                                       use_cache=use_cache, bypass_cache=bypass_cache)
+        audio, cache_key, cached, lookup_model_id = lookup
+        if cached is not None:
+            logger.info(f"Transcription cache hit: {describe_audio(audio)}")
+            for index, segment_data in enumerate(cached["segments"]):
+                yield {"type": "segment", "index": index, "segment": segment_data}
+            yield {**cached["summary"], "cached": True}
+            return
         
-        logger.info(f"Transcribing audio: {audio_path}")
-        logger.debug(f"Language: {transcribe_language} (param: {transcribe_language_param}), Task: {task}, VAD: {vad_filter}")
+        # Load model if not already loaded
+        model = self._active_model()
+        
+        logger.info(f"Transcribing audio: {describe_audio(audio)}")
+        logger.debug(f"Language: {transcribe_language_param or 'auto'}, Task: {task}, VAD: {vad_filter}")
         
         try:
-            # Transcribe audio
-            segments, info = self.model.transcribe(
-                audio_path,
+            # Transcribe audio (returns immediately; decoding happens while iterating)
+            segments, info = model.transcribe(
+                audio,
                 language=transcribe_language_param,
                 task=task,
                 beam_size=beam_size,
@@ -214,56 +471,295 @@ class STTService:
                 word_timestamps=word_timestamps,
             )
             
-            # Collect segments
-            segment_list: List[Dict[str, Any]] = []
             full_text_parts: List[str] = []
+            segment_list: List[Dict[str, Any]] = []
             
-            for segment in segments:
-                segment_data: Dict[str, Any] = {
-                    "text": segment.text.strip(),
-                    "start": float(segment.start),
-                    "end": float(segment.end),
-                }
-                
-                if word_timestamps and hasattr(segment, "words"):
-                    segment_data["words"] = [
-                        {
-                            "word": word.word,
-                            "start": float(word.start),
-                            "end": float(word.end),
-                            "probability": float(word.probability),
-                        }
-                        for word in segment.words
-                    ]
-                
-                segment_list.append(segment_data)
+            for index, segment in enumerate(segments):
+                segment_data = self._segment_dict(segment, word_timestamps)
                 full_text_parts.append(segment_data["text"])
+                segment_list.append(segment_data)
+                yield {"type": "segment", "index": index, "segment": segment_data}
             
-            # Combine all text
-            full_text = " ".join(full_text_parts)
-            
-            result: Dict[str, Any] = {
-                "text": full_text,
+            summary = {
+                "type": "summary",
+                "text": " ".join(full_text_parts),
                 "language": info.language,
                 "language_probability": float(info.language_probability) if hasattr(info, "language_probability") else None,
-                "segments": segment_list,
+                "duration": float(info.duration) if hasattr(info, "duration") else None,
+                "segment_count": len(full_text_parts),
             }
-            
-            logger.info(f"Transcription completed: {len(full_text)} characters, {len(segment_list)} segments")
-            
-            return result
+            if cache_key is not None:
+                if lookup_model_id != self._cache_model_id():
+                    # Looked up before the model finished loading with a different compute type
+                    cache_key = make_key(audio, self._cache_model_id(), transcribe_language_param,
+                                         task, beam_size, vad_filter, word_timestamps)
+                try:
+                    get_result_cache().put(cache_key, {"segments": segment_list, "summary": summary})
+                except Exception as e:
+                    logger.warning(f"Could not cache transcription result: {e}")
+            yield summary
             
         except Exception as e:
             logger.error(f"Transcription failed: {e}", exc_info=True)
             raise
     
+    def _get_batched_pipeline(self, model: WhisperModel):
+        """Lazily wrap a model replica in a BatchedInferencePipeline (faster-whisper >= 1.1)"""
+        pipeline = self._batched_pipelines.get(id(model))
+        if pipeline is None:
+            from faster_whisper import BatchedInferencePipeline
+            pipeline = self._batched_pipelines.setdefault(id(model), BatchedInferencePipeline(model=model))
+        return pipeline
+    
+    def _speech_chunks(self, model: WhisperModel, audio: np.ndarray, vad_filter: bool) -> List[Dict[str, int]]:
+        """
+        Speech chunks of one file in samples, each at most one Whisper window long
+        
+        Uses faster-whisper's own VAD + merge step (what BatchedInferencePipeline does
+        for a single file); without VAD the file is cut into fixed windows.
+        """
+        window = model.feature_extractor.chunk_length * SAMPLE_RATE
+        if vad_filter:
+            from faster_whisper.vad import VadOptions, get_speech_timestamps, merge_segments
+            vad_options = VadOptions(max_speech_duration_s=model.feature_extractor.chunk_length, min_silence_duration_ms=160)
+            speech = get_speech_timestamps(audio, vad_options)
+            return [{"start": c["start"], "end": c["end"]} for c in merge_segments(speech, vad_options)]
+        return [{"start": start, "end": min(start + window, len(audio))} for start in range(0, len(audio), window)]
+    
+    def transcribe_batch(
+        self,
+        audios: List[AudioInput],
+        language: Optional[str] = None,
+        task: str = "transcribe",
+        beam_size: int = 5,
+        vad_filter: bool = True,
+        word_timestamps: bool = False,
+        batch_size: int = 8,
+    ) -> Dict[str, Any]:
+        """
+        Transcribe several files with batched inference
+        
+        Speech chunks from all files are laid out on one timeline and decoded by
+        BatchedInferencePipeline, so chunks from different files share a batch.
+        Chunks never cross a file boundary; segments are mapped back to their
+        file with file-relative timestamps.
+        
+        Language detection runs once per pipeline pass, so with language=None
+        (auto) the files are transcribed one by one instead (each still batched
+        internally).
+        
+        Args:
+            audios: Audio inputs (paths, file-like objects or 16 kHz float32 arrays)
+            batch_size: Chunks decoded per forward pass
+            (others as transcribe())
+            
+        Returns:
+            {"results": [per-file result], "timings": {...}, "mode": "batched" | "sequential"}
+        """
+        from faster_whisper.audio import decode_audio
+        
+        model = self._active_model()
+        
+        language_param = self._language_param(language)
+        
+        # Decode every file to 16 kHz float32
+        decode_start = time.perf_counter()
+        arrays = [
+            audio if isinstance(audio, np.ndarray) else decode_audio(audio, sampling_rate=SAMPLE_RATE)
+            for audio in audios
+        ]
+        decode_seconds = time.perf_counter() - decode_start
+        
+        pipeline = self._get_batched_pipeline(model)
+        options = dict(language=language_param, task=task, beam_size=beam_size,
+                       word_timestamps=word_timestamps, batch_size=batch_size)
+        results: List[Dict[str, Any]] = []
+        per_file_seconds: List[Optional[float]] = []
+        transcribe_start = time.perf_counter()
+        
+        if language_param is None:
+            mode = "sequential"
+            for array in arrays:
+                file_start = time.perf_counter()
+                segments, info = pipeline.transcribe(array, vad_filter=vad_filter, **options)
+                segment_list = [self._segment_dict(segment, word_timestamps) for segment in segments]
+                results.append(self._file_result(segment_list, info.language, info.language_probability, len(array)))
+                per_file_seconds.append(time.perf_counter() - file_start)
+        else:
+            mode = "batched"
+            offsets, clips, position = [], [], 0
+            for array in arrays:
+                offsets.append(position)
+                clips.extend({"start": c["start"] + position, "end": c["end"] + position}
+                             for c in self._speech_chunks(model, array, vad_filter))
+                position += len(array)
+            
+            per_file: List[List[Dict[str, Any]]] = [[] for _ in arrays]
+            probability = None
+            if clips:
+                timeline = np.concatenate(arrays)
+                segments, info = pipeline.transcribe(timeline, clip_timestamps=clips, **options)
+                probability = info.language_probability
+                for segment in segments:
+                    start_sample = int(segment.start * SAMPLE_RATE)
+                    index = max(0, int(np.searchsorted(offsets, start_sample, side="right")) - 1)
+                    per_file[index].append(self._segment_dict(segment, word_timestamps, -offsets[index] / SAMPLE_RATE))
+            for array, segment_list in zip(arrays, per_file):
+                results.append(self._file_result(segment_list, language_param, probability, len(array)))
+                per_file_seconds.append(None)  # Files share forward passes
+        
+        transcribe_seconds = time.perf_counter() - transcribe_start
+        audio_seconds = sum(len(array) for array in arrays) / SAMPLE_RATE
+        for result, seconds in zip(results, per_file_seconds):
+            result["transcribe_seconds"] = seconds
+        
+        logger.info(f"Batch transcription ({mode}): {len(arrays)} files, {audio_seconds:.1f}s audio in {transcribe_seconds:.2f}s")
+        
+        return {
+            "mode": mode,
+            "results": results,
+            "timings": {
+                "files": len(arrays),
+                "audio_seconds": audio_seconds,
+                "decode_seconds": decode_seconds,
+                "transcribe_seconds": transcribe_seconds,
+                "real_time_factor": transcribe_seconds / audio_seconds if audio_seconds else None,
+                "batch_size": batch_size,
+            },
+        }
+    
+    @staticmethod
+    def _segment_dict(segment, word_timestamps: bool, shift: float = 0.0) -> Dict[str, Any]:
+        """faster-whisper Segment -> API dict, timestamps shifted by `shift` seconds"""
+        segment_data: Dict[str, Any] = {
+            "text": segment.text.strip(),
+            "start": float(segment.start) + shift,
+            "end": float(segment.end) + shift,
+        }
+        if word_timestamps and getattr(segment, "words", None):
+            segment_data["words"] = [
+                {
+                    "word": word.word,
+                    "start": float(word.start) + shift,
+                    "end": float(word.end) + shift,
+                    "probability": float(word.probability),
+                }
+                for word in segment.words
+            ]
+        return segment_data
+    
+    @staticmethod
+    def _file_result(segments: List[Dict[str, Any]], language, probability, samples: int) -> Dict[str, Any]:
+        """Per-file result in the same shape as transcribe()"""
+        return {
+            "text": " ".join(segment["text"] for segment in segments),
+            "language": language,
+            "language_probability": float(probability) if probability is not None else None,
+            "segments": segments,
+            "duration": samples / SAMPLE_RATE,
+        }
+    
+    def _get_sharded_transcriber(self):
+        """Long-audio worker pool (started by the warm load, or lazily when warm load is off)"""
+        if self._sharded is None:
+            with self._sharded_lock:
+                if self._sharded is None:
+                    from .sharding import ShardedTranscriber
+                    self._sharded = ShardedTranscriber(
+                        self.config["model_path"],
+                        num_workers=LONG_AUDIO_CONFIG["workers"],
+                        compute_type=LONG_AUDIO_CONFIG["compute_type"],
+                        cpu_threads=LONG_AUDIO_CONFIG["cpu_threads"],
+                    )
+        return self._sharded
+    
+    def transcribe_long(
+        self,
+        audio: AudioInput,
+        language: Optional[str] = None,
+        task: str = "transcribe",
+        beam_size: int = 5,
+        vad_filter: bool = True,
+        word_timestamps: bool = False,
+        shard_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Transcribe a long recording in parallel shards
+        
+        The audio is split at VAD silence boundaries into shards of about
+        shard_seconds, transcribed across CPU worker processes (STT_LONG_AUDIO_WORKERS)
+        and merged with timestamps on the recording timeline. Recordings shorter
+        than STT_LONG_AUDIO_MIN_SECONDS, or with the pool disabled, go through
+        transcribe() unchanged.
+        
+        Args:
+            shard_seconds: Target shard length (None = config)
+            (others as transcribe())
+        """
+        from faster_whisper.audio import decode_audio
+        
+        array = audio if isinstance(audio, np.ndarray) else decode_audio(audio, sampling_rate=SAMPLE_RATE)
+        duration = len(array) / SAMPLE_RATE
+        if LONG_AUDIO_CONFIG["workers"] < 1 or duration < LONG_AUDIO_CONFIG["min_seconds"]:
+            return self.transcribe(array, language=language, task=task, beam_size=beam_size,
+                                   vad_filter=vad_filter, word_timestamps=word_timestamps)
+        
+        language_param = self._language_param(language)
+        
+        start = time.perf_counter()
+        result = self._get_sharded_transcriber().transcribe(
+            array,
+            shard_seconds=shard_seconds or LONG_AUDIO_CONFIG["shard_seconds"],
+            language=language_param,
+            task=task,
+            beam_size=beam_size,
+            vad_filter=vad_filter,
+            word_timestamps=word_timestamps,
+        )
+        logger.info(f"Long-audio transcription: {duration:.1f}s in {len(result['shards'])} shards, "
+                    f"{time.perf_counter() - start:.2f}s")
+        return result
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Result cache statistics"""
+        if not CACHE_CONFIG["enabled"]:
+            return {"enabled": False}
+        return {"enabled": True, **get_result_cache().get_stats()}
+    
+    def get_long_audio_stats(self) -> Dict[str, Any]:
+        """Long-audio pool statistics"""
+        if self._sharded is None:
+            return {"enabled": LONG_AUDIO_CONFIG["workers"] >= 1, "started": False}
+        return {"enabled": True, "started": True, **self._sharded.get_stats()}
+    
+    def shutdown(self):
+        """Stop the inference executor and worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+        if self._sharded is not None:
+            self._sharded.shutdown()
+            self._sharded = None
+    
+    def is_ready(self) -> bool:
+        """Model loaded and warm load not in progress (never triggers a load)"""
+        return self._model_loaded and self.model is not None and self.state != "loading"
+    
     def is_available(self) -> bool:
-        """Check if STT service is available"""
-        try:
-            self._load_model()
-            return self.model is not None
-        except Exception:
-            return False
+        """Check if STT service is available (does not load the model)"""
+        return self.is_ready()
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Load state, replicas and executor queue statistics"""
+        return {
+            "state": self.state,
+            "ready": self.is_ready(),
+            "error": self.load_error,
+            "load_seconds": self.load_seconds,
+            "device": self.device_in_use,
+            "compute_type": self._compute_type_in_use,
+            "replicas": len(self._replicas),
+            "executor": self._executor.get_stats() if self._executor is not None else None,
+        }
 
 
 # Singleton instance
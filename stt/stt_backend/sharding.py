@@ -0,0 +1,232 @@
+"""
+Long-audio sharding
+Splits long recordings at VAD silence boundaries and transcribes the shards in
+parallel CPU worker processes, each holding its own int8 model
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .audio_input import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Model inside each worker process
+_worker_model = None
+
+
+def plan_shards(
+    total_samples: int,
+    speech: Sequence[Dict[str, int]],
+    target_seconds: float,
+    sampling_rate: int = SAMPLE_RATE,
+) -> List[Tuple[int, int]]:
+    """
+    Cut [0, total_samples) into shards of roughly target_seconds at silence gaps
+
+    A shard is closed at the first gap between speech regions after it reaches the
+    target length; the cut is placed in the middle of that gap, so no word is split.
+    Speech that runs far past the target without a gap is still cut at 2x target.
+
+    Args:
+        total_samples: Length of the recording
+        speech: VAD speech regions as {"start", "end"} in samples, sorted
+        target_seconds: Desired shard length
+
+    Returns:
+        List of (start, end) sample ranges covering the whole recording
+    """
+    target = max(1, int(target_seconds * sampling_rate))
+    if total_samples <= target:
+        return [(0, total_samples)]
+    if not speech:
+        return [(start, min(start + target, total_samples)) for start in range(0, total_samples, target)]
+
+    shards: List[Tuple[int, int]] = []
+    shard_start = 0
+    for region, next_region in zip(speech, list(speech[1:]) + [None]):
+        # Hard cut inside very long speech without pauses
+        while region["end"] - shard_start > 2 * target:
+            shards.append((shard_start, shard_start + 2 * target))
+            shard_start += 2 * target
+        if next_region is None:
+            break
+        if region["end"] - shard_start >= target:
+            cut = (region["end"] + next_region["start"]) // 2
+            shards.append((shard_start, cut))
+            shard_start = cut
+    shards.append((shard_start, total_samples))
+    return shards
+
+
+def _init_worker(model_path: str, compute_type: str, cpu_threads: int):
+    """Load this worker's own model"""
+    global _worker_model
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(model_path, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+def _worker_ready(delay: float = 0.0) -> int:
+    """No-op task that forces a worker (and its model load) to start; the delay spreads tasks over workers"""
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _detect_language(audio: np.ndarray, vad_filter: bool) -> Tuple[str, float]:
+    """Detect the language of a shard in a worker (no decoding: segments are never iterated)"""
+    _, info = _worker_model.transcribe(audio, vad_filter=vad_filter)
+    return info.language, float(info.language_probability)
+
+
+def _transcribe_shard(audio: np.ndarray, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Transcribe one shard in a worker; timestamps are shard-relative"""
+    start = time.time()
+    segments, info = _worker_model.transcribe(audio, **options)
+    segment_list = []
+    for segment in segments:
+        data: Dict[str, Any] = {"text": segment.text.strip(), "start": float(segment.start), "end": float(segment.end)}
+        if options.get("word_timestamps") and getattr(segment, "words", None):
+            data["words"] = [
+                {"word": w.word, "start": float(w.start), "end": float(w.end), "probability": float(w.probability)}
+                for w in segment.words
+            ]
+        segment_list.append(data)
+    return {
+        "segments": segment_list,
+        "language": info.language,
+        "language_probability": float(info.language_probability),
+        "pid": os.getpid(),
+        "busy_seconds": time.time() - start,
+    }
+
+
+class ShardedTranscriber:
+    """Pool of CPU worker processes transcribing VAD-split shards of one recording"""
+
+    def __init__(self, model_path: str, num_workers: int, compute_type: str = "int8", cpu_threads: int = 0):
+        """
+        Args:
+            model_path: faster-whisper model path or size
+            num_workers: Worker processes (each loads its own model)
+            compute_type: CTranslate2 compute type for the workers
+            cpu_threads: Threads per worker (0 = cores / workers)
+        """
+        self.num_workers = max(1, num_workers)
+        self.cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // self.num_workers)
+        # spawn: CTranslate2 state must not be inherited through fork
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_path, compute_type, self.cpu_threads),
+        )
+        self._lock = threading.Lock()
+        self._stats = {"recordings": 0, "shards": 0, "audio_seconds": 0.0, "wall_seconds": 0.0, "busy_seconds": 0.0}
+        logger.info(f"Long-audio pool: {self.num_workers} workers x {self.cpu_threads} threads ({compute_type})")
+
+    def warm_up(self, timeout: float = 600.0) -> List[int]:
+        """
+        Start all workers and wait until each has loaded its model
+
+        Raises:
+            TimeoutError: Not every worker answered in time
+        """
+        deadline = time.time() + timeout
+        ready = set()
+        while len(ready) < self.num_workers:
+            if time.time() > deadline:
+                raise TimeoutError(f"Only {len(ready)}/{self.num_workers} long-audio workers started")
+            ready.update(self._executor.map(_worker_ready, [0.05] * self.num_workers))
+        return sorted(ready)
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        shard_seconds: float = 60.0,
+        language: Optional[str] = None,
+        task: str = "transcribe",
+        beam_size: int = 5,
+        vad_filter: bool = True,
+        word_timestamps: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Transcribe a long 16 kHz recording across the worker pool
+
+        With language=None the language is detected once, on the first 30 s of the
+        first shard, and every shard is decoded with it.
+
+        Returns:
+            Same shape as STTService.transcribe() plus "shards" (ranges and timings)
+        """
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        start = time.perf_counter()
+        speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=500))
+        shards = plan_shards(len(audio), speech, shard_seconds)
+
+        language_probability = 1.0
+        if language is None:
+            first_start, first_end = shards[0]
+            window = audio[first_start:min(first_end, first_start + 30 * SAMPLE_RATE)]
+            language, language_probability = self._executor.submit(_detect_language, window, vad_filter).result()
+
+        options = dict(language=language, task=task, beam_size=beam_size,
+                       vad_filter=vad_filter, word_timestamps=word_timestamps)
+        futures = [self._executor.submit(_transcribe_shard, audio[s:e], options) for s, e in shards]
+
+        # Merge in order, moving shard-relative timestamps onto the recording timeline
+        segments: List[Dict[str, Any]] = []
+        shard_info = []
+        results = [future.result() for future in futures]
+        for (shard_start, shard_end), result in zip(shards, results):
+            offset = shard_start / SAMPLE_RATE
+            for segment in result["segments"]:
+                segment["start"] += offset
+                segment["end"] += offset
+                for word in segment.get("words", ()):
+                    word["start"] += offset
+                    word["end"] += offset
+                segments.append(segment)
+            shard_info.append({
+                "start": offset,
+                "end": shard_end / SAMPLE_RATE,
+                "worker": result["pid"],
+                "busy_seconds": result["busy_seconds"],
+            })
+
+        wall = time.perf_counter() - start
+        with self._lock:
+            self._stats["recordings"] += 1
+            self._stats["shards"] += len(shards)
+            self._stats["audio_seconds"] += len(audio) / SAMPLE_RATE
+            self._stats["wall_seconds"] += wall
+            self._stats["busy_seconds"] += sum(r["busy_seconds"] for r in results)
+
+        return {
+            "text": " ".join(segment["text"] for segment in segments),
+            "language": language,
+            "language_probability": language_probability,
+            "segments": segments,
+            "shards": shard_info,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool statistics"""
+        with self._lock:
+            wall = self._stats["wall_seconds"]
+            return {
+                **self._stats,
+                "num_workers": self.num_workers,
+                "cpu_threads": self.cpu_threads,
+                "utilization": self._stats["busy_seconds"] / (wall * self.num_workers) if wall else 0.0,
+            }
+
+    def shutdown(self):
+        """Stop worker processes"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,111 @@
+"""
+Test live (WebSocket) transcription with a prerecorded WAV file
+
+Streams the WAV as 20 ms PCM16 frames and prints partial/final events.
+- Default: runs LiveTranscriber in-process on CPU (no server needed)
+- --url: streams to a running backend, e.g. ws://localhost:11210/api/stt/live
+
+Usage:
+    python test_live_transcription.py speech.wav [--url ws://localhost:11210/api/stt/live] [--realtime]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from stt_backend.audio_input import SAMPLE_RATE
+
+FRAME_BYTES = SAMPLE_RATE * 2 * 20 // 1000  # 20 ms of PCM16
+
+
+def load_pcm16(path: Path) -> bytes:
+    """Read a WAV file as PCM16LE mono 16 kHz bytes (decoded and resampled by faster-whisper)"""
+    from faster_whisper.audio import decode_audio
+    audio = decode_audio(str(path), sampling_rate=SAMPLE_RATE)
+    return (np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def print_event(event: dict, started: float):
+    """Print one server event"""
+    elapsed = time.perf_counter() - started
+    if event["type"] in ("partial", "final"):
+        end = f"-{event['end']:.2f}" if "end" in event else ""
+        print(f"[{elapsed:6.2f}s] {event['type']:<7} #{event['segment_id']} {event['start']:.2f}{end}: {event['text']}")
+    else:
+        print(f"[{elapsed:6.2f}s] {json.dumps(event)}")
+
+
+def run_in_process(pcm: bytes, language: str, realtime: bool):
+    """Feed frames to LiveTranscriber directly (CPU)"""
+    import os
+    os.environ.setdefault("STT_DEVICE", "cpu")
+    os.environ.setdefault("STT_COMPUTE_TYPE", "int8")
+    from stt_backend.service import get_service
+    from stt_backend.live import LiveTranscriber
+    from stt_backend.config import LIVE_CONFIG
+
+    service = get_service()
+    service._load_model()
+    session = LiveTranscriber(service, language=language, **LIVE_CONFIG)
+    started = time.perf_counter()
+    for offset in range(0, len(pcm), FRAME_BYTES):
+        for event in session.feed(pcm[offset:offset + FRAME_BYTES]):
+            print_event(event, started)
+        if realtime:
+            time.sleep(0.02)
+    for event in session.flush():
+        print_event(event, started)
+    session.close()
+    print(f"Done: {session.duration:.2f}s audio in {time.perf_counter() - started:.2f}s")
+
+
+async def run_websocket(pcm: bytes, url: str, realtime: bool):
+    """Stream frames to a running backend"""
+    import websockets
+
+    async with websockets.connect(url, max_size=None) as ws:
+        started = time.perf_counter()
+
+        async def receive():
+            async for message in ws:
+                event = json.loads(message)
+                print_event(event, started)
+                if event["type"] in ("done", "error"):
+                    return
+
+        receiver = asyncio.create_task(receive())
+        for offset in range(0, len(pcm), FRAME_BYTES):
+            await ws.send(pcm[offset:offset + FRAME_BYTES])
+            if realtime:
+                await asyncio.sleep(0.02)
+        await ws.send("stop")
+        await receiver
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live transcription test")
+    parser.add_argument("wav", type=Path, help="Prerecorded WAV fixture")
+    parser.add_argument("--url", default=None, help="WebSocket URL (default: in-process)")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--realtime", action="store_true", help="Pace frames at real time")
+    args = parser.parse_args()
+
+    pcm = load_pcm16(args.wav)
+    print("=" * 70)
+    print(f"Live transcription: {args.wav.name}, {len(pcm) / 2 / SAMPLE_RATE:.2f}s")
+    print("=" * 70)
+    if args.url:
+        url = args.url + ("&" if "?" in args.url else "?") + f"language={args.language}"
+        asyncio.run(run_websocket(pcm, url, args.realtime))
+    else:
+        run_in_process(pcm, args.language, args.realtime)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+In-memory audio ingest tests - WAV fast path, RIFF chunk walking and fallbacks
+"""
+
+import io
+import struct
+import wave
+
+import numpy as np
+
+from stt_backend.audio_input import SAMPLE_RATE, _wav_pcm16_mono_16k, load_audio_bytes, pcm16_to_float32
+
+SAMPLES = (np.sin(np.linspace(0, 40 * np.pi, 1600)) * 20000).astype("<i2")
+
+
+def _wav(samples=SAMPLES, channels=1, rate=SAMPLE_RATE):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def _chunks(wav):
+    """Split a RIFF/WAVE file into (id, body) chunks"""
+    chunks, offset = [], 12
+    while offset + 8 <= len(wav):
+        chunk_id = wav[offset:offset + 4]
+        (size,) = struct.unpack_from("<I", wav, offset + 4)
+        chunks.append((chunk_id, wav[offset + 8:offset + 8 + size]))
+        offset += 8 + size + (size & 1)
+    return chunks
+
+
+def _riff(chunks, data_size=None):
+    """Build a RIFF/WAVE file; data_size overrides the size field of the data chunk"""
+    body = b"WAVE"
+    for chunk_id, payload in chunks:
+        size = data_size if chunk_id == b"data" and data_size is not None else len(payload)
+        body += chunk_id + struct.pack("<I", size) + payload + (b"\0" if len(payload) & 1 else b"")
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _expected():
+    return SAMPLES.astype(np.float32) / 32768.0
+
+
+def test_mono_16k_wav_takes_fast_path():
+    """Test that a PCM16 mono 16 kHz WAV is decoded straight to float32"""
+    audio = load_audio_bytes(_wav())
+    assert isinstance(audio, np.ndarray)
+    np.testing.assert_array_equal(audio, _expected())
+
+
+def test_other_layouts_fall_back_to_bytesio():
+    """Test that stereo, 22.05 kHz and non-WAV input go to the container decoder"""
+    stereo = _wav(np.repeat(SAMPLES, 2), channels=2)
+    resampled = _wav(rate=22050)
+    for content in (stereo, resampled, b"ID3\x03 not a wav at all"):
+        audio = load_audio_bytes(content)
+        assert isinstance(audio, io.BytesIO)
+        assert audio.getvalue() == content
+
+
+def test_odd_sized_chunk_before_data_is_padded():
+    """Test that an odd-length chunk's pad byte is skipped when walking to the data chunk"""
+    fmt, data = _chunks(_wav())
+    wav = _riff([fmt, (b"LIST", b"INFOabc"), data])
+    np.testing.assert_array_equal(load_audio_bytes(wav), _expected())
+
+
+def test_streaming_data_sizes_read_to_end_of_file():
+    """Test that a data size of 0 or 0xFFFFFFFF means "rest of the file" """
+    fmt, data = _chunks(_wav())
+    for size in (0, 0xFFFFFFFF):
+        np.testing.assert_array_equal(load_audio_bytes(_riff([fmt, data], data_size=size)), _expected())
+
+
+def test_truncated_data_chunk_is_clamped():
+    """Test that a data size past the end of the upload only returns the bytes present"""
+    fmt, data = _chunks(_wav())
+    wav = _riff([fmt, data], data_size=len(data[1]) * 4)
+    assert len(load_audio_bytes(wav)) == len(SAMPLES)
+
+
+def test_extensible_format_is_accepted():
+    """Test that WAVE_FORMAT_EXTENSIBLE PCM (as written by ffmpeg) takes the fast path"""
+    fmt, data = _chunks(_wav())
+    extensible = struct.pack("<H", 0xFFFE) + fmt[1][2:] + struct.pack("<HHHI", 22, 16, 4, 1) + b"\0" * 16
+    wav = _riff([(b"fmt ", extensible), data])
+    np.testing.assert_array_equal(load_audio_bytes(wav), _expected())
+
+
+def test_data_before_fmt_and_short_fmt_fall_back():
+    """Test that layouts the walker cannot vouch for are left to the decoder"""
+    fmt, data = _chunks(_wav())
+    assert _wav_pcm16_mono_16k(_riff([data, fmt])) is None
+    assert _wav_pcm16_mono_16k(_riff([(b"fmt ", fmt[1][:14]), data])) is None
+    assert _wav_pcm16_mono_16k(_riff([fmt])) is None
+
+
+def test_raw_pcm16_with_odd_length():
+    """Test that a raw PCM body with a trailing odd byte drops only that byte"""
+    body = SAMPLES.tobytes() + b"\x7f"
+    audio = load_audio_bytes(body, raw_pcm16=True)
+    np.testing.assert_array_equal(audio, _expected())
+    assert pcm16_to_float32(b"\x00\x80").tolist() == [-1.0]
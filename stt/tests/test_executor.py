@@ -0,0 +1,211 @@
+"""
+Inference executor tests - admission, slot release, reservations and streaming
+"""
+
+import gc
+import threading
+import time
+
+import pytest
+
+from stt_backend.executor import STREAM_BUFFER, ExecutorBusy, InferenceExecutor, current_replica
+
+
+def _executor(workers=1, max_queue=0, replicas=None):
+    executor = InferenceExecutor(workers=workers, max_queue=max_queue)
+    executor.set_replicas(replicas if replicas is not None else [f"replica-{i}" for i in range(workers)])
+    return executor
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def _idle(executor):
+    stats = executor.get_stats()
+    return executor._pending == 0 and stats["running"] == 0 and stats["queued"] == 0
+
+
+def test_tasks_run_on_checked_out_replica():
+    """Test that current_replica() returns the replica held by the task"""
+    executor = _executor(workers=2, replicas=["a", "b"])
+    seen = {executor.submit(current_replica).result(2) for _ in range(6)}
+    assert seen <= {"a", "b"}
+    assert current_replica() is None
+    executor.shutdown()
+
+
+def test_rejects_past_capacity_and_recovers():
+    """Test that submissions beyond workers + max_queue raise ExecutorBusy until a slot frees"""
+    executor = _executor(workers=1, max_queue=1)
+    gate = threading.Event()
+    first = executor.submit(gate.wait, 2)
+    second = executor.submit(gate.wait, 2)
+
+    assert executor.is_saturated()
+    with pytest.raises(ExecutorBusy):
+        executor.submit(gate.wait, 2)
+    assert executor.get_stats()["rejected"] == 1
+
+    gate.set()
+    first.result(2)
+    second.result(2)
+    _wait_for(lambda: _idle(executor))
+    assert executor.submit(lambda: "ok").result(2) == "ok"
+    executor.shutdown()
+
+
+def test_failed_task_releases_slot_and_replica():
+    """Test that an exception in the task frees its slot and returns the replica"""
+    executor = _executor(workers=1, max_queue=0)
+
+    def fail():
+        raise RuntimeError("decode failed")
+
+    with pytest.raises(RuntimeError, match="decode failed"):
+        executor.submit(fail).result(2)
+    _wait_for(lambda: _idle(executor))
+    assert executor.get_stats()["failed"] == 1
+    assert executor.submit(current_replica).result(2) == "replica-0"
+    executor.shutdown()
+
+
+def test_reservation_counts_against_capacity():
+    """Test that a reserved session occupies a slot between its transcriptions"""
+    executor = _executor(workers=1, max_queue=1)
+    reservation = executor.reserve()
+    assert executor.get_stats()["reserved_sessions"] == 1
+
+    assert reservation.submit(lambda x: x * 2, 21).result(2) == 42
+    _wait_for(lambda: executor.get_stats()["running"] == 0)
+    # Still held after the task finished: only one more slot is left
+    executor.submit(lambda: None).result(2)
+    other = executor.reserve()
+    with pytest.raises(ExecutorBusy):
+        executor.reserve()
+
+    other.release()
+    reservation.release()
+    reservation.release()
+    _wait_for(lambda: _idle(executor))
+    assert executor.get_stats()["reserved_sessions"] == 0
+    with pytest.raises(RuntimeError):
+        reservation.submit(lambda: None)
+    executor.shutdown()
+
+
+def test_reservation_work_does_not_take_extra_slots():
+    """Test that work of an admitted session runs even when the queue is full"""
+    executor = _executor(workers=1, max_queue=0)
+    with executor.reserve() as reservation:
+        assert executor.is_saturated()
+        assert reservation.submit(current_replica).result(2) == "replica-0"
+    _wait_for(lambda: _idle(executor))
+    assert not executor.is_saturated()
+    executor.shutdown()
+
+
+def test_iterate_relays_items_and_errors():
+    """Test that iterate() yields producer items in order and re-raises its error"""
+    executor = _executor()
+
+    def produce(count, fail):
+        for index in range(count):
+            yield index
+        if fail:
+            raise ValueError("bad audio")
+
+    assert list(executor.iterate(produce, 5, False)) == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError, match="bad audio"):
+        list(executor.iterate(produce, 3, True))
+    _wait_for(lambda: _idle(executor))
+    executor.shutdown()
+
+
+def test_iterate_rejects_when_saturated():
+    """Test that iterate() is admitted up front and raises ExecutorBusy before streaming"""
+    executor = _executor(workers=1, max_queue=0)
+    gate = threading.Event()
+    busy = executor.submit(gate.wait, 2)
+    with pytest.raises(ExecutorBusy):
+        executor.iterate(lambda: iter([1]))
+    gate.set()
+    busy.result(2)
+    executor.shutdown()
+
+
+def _endless(produced):
+    index = 0
+    while True:
+        produced.append(index)
+        yield index
+        index += 1
+
+
+def test_iterate_buffer_is_bounded():
+    """Test that a producer pauses when the consumer does not read"""
+    executor = _executor()
+    produced = []
+    stream = executor.iterate(_endless, produced)
+    _wait_for(lambda: len(produced) > STREAM_BUFFER)
+    time.sleep(0.05)
+    assert len(produced) <= STREAM_BUFFER + 1
+
+    stream.close()
+    _wait_for(lambda: _idle(executor))
+    executor.shutdown()
+
+
+def test_closing_stream_releases_slot():
+    """Test that closing a partly consumed stream stops the producer and frees the slot"""
+    executor = _executor(workers=1, max_queue=0)
+    produced = []
+    stream = executor.iterate(_endless, produced)
+    assert [next(stream) for _ in range(3)] == [0, 1, 2]
+
+    stream.close()
+    _wait_for(lambda: _idle(executor))
+    assert list(stream) == []
+    assert executor.submit(lambda: "free").result(2) == "free"
+    executor.shutdown()
+
+
+def test_dropped_stream_releases_slot():
+    """Test that a stream garbage-collected without being consumed frees the slot"""
+    executor = _executor(workers=1, max_queue=0)
+    produced = []
+    executor.iterate(_endless, produced)
+    gc.collect()
+
+    _wait_for(lambda: _idle(executor))
+    assert executor.submit(lambda: "free").result(2) == "free"
+    executor.shutdown()
+
+
+def test_close_wakes_blocked_consumer():
+    """Test that close() from another thread ends a consumer waiting for the next item"""
+    executor = _executor()
+    gate = threading.Event()
+
+    def slow():
+        yield "first"
+        gate.wait(2)
+        yield "late"
+
+    stream = executor.iterate(slow)
+    assert next(stream) == "first"
+    received = []
+    consumer = threading.Thread(target=lambda: received.extend(stream))
+    consumer.start()
+    time.sleep(0.02)
+    stream.close()
+    consumer.join(2)
+    gate.set()
+
+    assert not consumer.is_alive()
+    assert received == []
+    _wait_for(lambda: _idle(executor))
+    executor.shutdown()
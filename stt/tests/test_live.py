@@ -0,0 +1,192 @@
+"""
+Live transcription tests - streaming VAD and the background transcription worker
+(stub service, synthetic tone/silence PCM)
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from stt_backend.audio_input import SAMPLE_RATE
+from stt_backend.executor import InferenceExecutor
+from stt_backend.live import LiveTranscriber, StreamingVAD
+
+
+def _tone(seconds, amplitude=0.3, frequency=220.0):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def _silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def _pcm16(audio):
+    return (np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def _feed(session, audio, frame_ms=20):
+    """Feed in microphone-sized frames; returns the events handed back by feed()"""
+    pcm = _pcm16(audio)
+    step = SAMPLE_RATE * 2 * frame_ms // 1000
+    events = []
+    for offset in range(0, len(pcm), step):
+        events.extend(session.feed(pcm[offset:offset + step]))
+    return events
+
+
+class _StubService:
+    """Transcribes every call to its duration and records the audio lengths and beam sizes"""
+
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+        self.executor = InferenceExecutor(workers=1, max_queue=0)
+        self.executor.set_replicas([None])
+
+    def get_executor(self):
+        return self.executor
+
+    def transcribe(self, audio, beam_size=5, **kwargs):
+        self.calls.append((len(audio), beam_size))
+        if self.gate is not None:
+            self.gate.wait(2)
+        seconds = len(audio) / SAMPLE_RATE
+        return {
+            "text": f"{seconds:.2f}s",
+            "language": "en",
+            "segments": [{"text": f"{seconds:.2f}s", "start": 0.0, "end": seconds}],
+        }
+
+
+def _session(service, **kwargs):
+    kwargs.setdefault("partial_interval_seconds", 0)
+    return LiveTranscriber(service, reservation=service.get_executor().reserve(), **kwargs)
+
+
+def test_vad_tracks_tone_and_adapts_to_steady_hum():
+    """Test speech/non-speech frames and that a constant hum raises the noise floor"""
+    vad = StreamingVAD()
+    frame = vad.frame_samples
+
+    assert not vad.is_speech(_silence(0.03)[:frame])
+    assert vad.is_speech(_tone(0.03)[:frame])
+
+    hum_vad = StreamingVAD()
+    hum = _tone(1.0, amplitude=0.05)
+    decisions = [hum_vad.is_speech(hum[i:i + frame]) for i in range(0, len(hum) - frame, frame)]
+    assert not any(decisions)
+    assert hum_vad.is_speech(_tone(0.03, amplitude=0.5)[:frame])
+
+
+def test_segments_become_finals_with_stream_timestamps():
+    """Test that two tone bursts separated by silence give two finals in order"""
+    service = _StubService()
+    session = _session(service, speech_pad_ms=0)
+
+    _feed(session, np.concatenate([_silence(0.5), _tone(1.0), _silence(1.0), _tone(0.8), _silence(0.2)]))
+    events = session.flush()
+    session.close()
+
+    finals = [e for e in events if e["type"] == "final"]
+    assert [e["segment_id"] for e in finals] == [0, 1]
+    assert abs(finals[0]["start"] - 0.5) < 0.1
+    assert abs(finals[1]["start"] - 2.5) < 0.1
+    assert finals[1]["end"] <= session.duration + 1e-6
+    assert finals[0]["segments"][0]["start"] == finals[0]["start"]
+    assert all(beam == 5 for _, beam in service.calls)
+
+
+def test_feed_does_not_wait_for_transcription():
+    """Test that audio keeps being consumed while a segment is still being transcribed"""
+    gate = threading.Event()
+    service = _StubService(gate=gate)
+    session = _session(service)
+
+    _feed(session, np.concatenate([_silence(0.3), _tone(0.5), _silence(0.7)]))
+    _wait_for(lambda: len(service.calls) == 1)
+    started = time.perf_counter()
+    _feed(session, np.concatenate([_tone(0.5), _silence(0.7), _tone(0.5)]))
+    assert time.perf_counter() - started < 1.0
+    assert len(service.calls) == 1  # First segment still blocked in the model
+
+    gate.set()
+    events = session.flush()
+    session.close()
+    assert [e["segment_id"] for e in events if e["type"] == "final"] == [0, 1, 2]
+
+
+def test_stale_partials_are_dropped_and_windowed():
+    """Test that only the newest partial is decoded and it covers at most the window"""
+    gate = threading.Event()
+    service = _StubService(gate=gate)
+    session = _session(service, partial_interval_seconds=0.2, partial_window_seconds=1.0,
+                       max_segment_seconds=30)
+
+    _feed(session, np.concatenate([_silence(0.3), _tone(1.0)]))
+    _wait_for(lambda: len(service.calls) == 1)
+    # Partials keep coming due while the first one is stuck in the model
+    _feed(session, _tone(3.0))
+    assert session.dropped_partials > 0
+    gate.set()
+    events = session.flush()
+    session.close()
+
+    partial_calls = [length for length, beam in service.calls if beam == 1]
+    assert len(partial_calls) <= 3
+    assert max(partial_calls) <= SAMPLE_RATE
+    partials = [e for e in events if e["type"] == "partial"]
+    assert all(e["end"] - e["start"] <= 1.0 + 1e-6 for e in partials)
+    assert events[-1]["type"] == "final"
+
+
+def test_on_event_callback_and_transcription_errors():
+    """Test that events go to the callback and a failed segment yields an error event"""
+    service = _StubService()
+    failing = {"first": True}
+    transcribe = service.transcribe
+
+    def flaky(audio, **kwargs):
+        if failing.pop("first", False):
+            raise RuntimeError("decoder crashed")
+        return transcribe(audio, **kwargs)
+
+    service.transcribe = flaky
+    received = []
+    session = _session(service, on_event=received.append)
+
+    assert _feed(session, np.concatenate([_silence(0.3)] + [_tone(0.5), _silence(0.7)] * 2)) == []
+    assert session.flush() == []
+    session.close()
+
+    assert [e["type"] for e in received] == ["error", "final"]
+    assert received[0]["message"] == "decoder crashed"
+    assert received[1]["segment_id"] == 1
+
+
+def test_close_drops_pending_work_and_frees_reservation():
+    """Test that close() stops the worker and the session's slot can be released"""
+    gate = threading.Event()
+    service = _StubService(gate=gate)
+    reservation = service.get_executor().reserve()
+    session = LiveTranscriber(service, reservation=reservation, partial_interval_seconds=0)
+
+    _feed(session, np.concatenate([_silence(0.3)] + [_tone(0.5), _silence(0.7)] * 3))
+    _wait_for(lambda: len(service.calls) == 1)
+    closer = threading.Thread(target=session.close)
+    closer.start()
+    gate.set()
+    closer.join(2)
+    reservation.release()
+
+    assert not closer.is_alive()
+    assert len(service.calls) == 1
+    assert not service.get_executor().is_saturated()
@@ -0,0 +1,107 @@
+"""
+Transcription result cache tests - LRU tiers, corrupt files, pruning and key options
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from stt_backend.result_cache import TranscriptionCache, make_key
+
+PCM = np.linspace(-0.5, 0.5, 16000, dtype=np.float32)
+OPTIONS = dict(model_id="large-v3@int8", language="en", task="transcribe", beam_size=5,
+               vad_filter=True, word_timestamps=False)
+
+
+def _result(text):
+    return {"segments": [{"text": text, "start": 0.0, "end": 1.0}], "summary": {"type": "summary", "text": text}}
+
+
+def _set_mtime(cache, key, when):
+    os.utime(cache.store_dir / f"{key}.json", (when, when))
+
+
+def test_memory_lru_evicts_oldest_and_promotes_disk_hits(tmp_path):
+    """Test that evicted results are served from disk and moved back into memory"""
+    cache = TranscriptionCache(str(tmp_path), max_memory_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, _result(key))
+
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["memory_entries"] == 2
+
+    assert cache.get("a") == _result("a")
+    assert cache.get_stats()["disk_hits"] == 1
+    assert cache.get("a") == _result("a")
+    assert cache.get_stats()["memory_hits"] == 1
+    # Promoting "a" evicted "b", the least recently used
+    cache.get("b")
+    assert cache.get_stats()["disk_hits"] == 2
+
+
+def test_results_persist_across_instances(tmp_path):
+    """Test that a new cache on the same directory finds stored results"""
+    TranscriptionCache(str(tmp_path)).put("key", _result("persisted"))
+    cache = TranscriptionCache(str(tmp_path))
+    assert cache.get("key") == _result("persisted")
+    assert cache.get("other") is None
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_corrupt_file_is_a_miss(tmp_path):
+    """Test that an unreadable stored result counts as a miss instead of raising"""
+    cache = TranscriptionCache(str(tmp_path))
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+
+    assert cache.get("broken") is None
+    stats = cache.get_stats()
+    assert stats["misses"] == 1
+    assert stats["disk_hits"] == 0
+
+
+def test_prune_drops_least_recently_read(tmp_path):
+    """Test that pruning keeps max_disk_entries files and drops the least recently used"""
+    cache = TranscriptionCache(str(tmp_path), max_memory_entries=1, max_disk_entries=2)
+    for index, key in enumerate(("old", "mid", "new")):
+        cache.put(key, _result(key))
+        _set_mtime(cache, key, 1_000_000 + index)
+
+    # Reading "old" from disk makes it the most recently used
+    assert cache.get("old") is not None
+    cache._prune()
+
+    assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["new", "old"]
+    assert cache.get_stats()["pruned"] == 1
+
+
+def test_bypass_counts_separately(tmp_path):
+    """Test that bypassed lookups are not counted as misses"""
+    cache = TranscriptionCache(str(tmp_path))
+    cache.record_bypass()
+    cache.record_bypass()
+
+    stats = cache.get_stats()
+    assert stats["bypassed"] == 2
+    assert stats["misses"] == 0
+    assert stats["hit_ratio"] is None
+
+
+def test_key_depends_on_audio_and_every_option():
+    """Test that changing the samples or any decoding option changes the key"""
+    base = make_key(PCM, **OPTIONS)
+    assert make_key(PCM.copy(), **OPTIONS) == base
+    assert make_key(PCM.astype(np.float64), **OPTIONS) == base
+
+    assert make_key(PCM[:-1], **OPTIONS) != base
+    changed = dict(model_id="large-v3@float16", language=None, task="translate", beam_size=1,
+                   vad_filter=False, word_timestamps=True)
+    for name, value in changed.items():
+        assert make_key(PCM, **{**OPTIONS, name: value}) != base, name
+
+
+@pytest.mark.parametrize("language", [None, "auto"])
+def test_auto_language_shares_key(language):
+    """Test that None and "auto" both mean auto-detection"""
+    assert make_key(PCM, **{**OPTIONS, "language": language}) == make_key(PCM, **{**OPTIONS, "language": None})
@@ -0,0 +1,100 @@
+"""
+STT service state tests - warm load, readiness and executor hand-off with fake replicas
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from stt_backend import service as service_module
+from stt_backend.executor import current_replica
+from stt_backend.service import CacheLookup, STTService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setitem(service_module.SERVING_CONFIG, "replicas", 2)
+    monkeypatch.setitem(service_module.SERVING_CONFIG, "max_queue", 0)
+    monkeypatch.setitem(service_module.LONG_AUDIO_CONFIG, "workers", 0)
+    instance = STTService()
+    yield instance
+    instance.shutdown()
+
+
+def _fake_load(service, gate=None, error=None):
+    """Replace the model load with one that hands out two fake replicas"""
+
+    def load():
+        if gate is not None:
+            gate.wait(2)
+        if error is not None:
+            raise error
+        service.model = "replica-0"
+        service._model_loaded = True
+        service.device_in_use = "cpu"
+        service._replicas = ["replica-0", "replica-1"]
+        return service._replicas
+
+    service._load_replicas = load
+
+
+def test_warm_load_moves_to_ready_and_serves_replicas(service):
+    """Test not_loaded -> loading -> ready, with tasks waiting for the replicas"""
+    gate = threading.Event()
+    _fake_load(service, gate=gate)
+    assert service.state == "not_loaded"
+    assert not service.is_ready()
+
+    service.start_warm_load()
+    assert service.state == "loading"
+    assert not service.is_ready()
+    task = service.get_executor().submit(current_replica)
+    assert not task.done()
+
+    gate.set()
+    assert task.result(2) in ("replica-0", "replica-1")
+    service._warm_thread.join(2)
+    status = service.get_status()
+    assert status["state"] == "ready"
+    assert status["ready"]
+    assert status["replicas"] == 2
+    assert status["error"] is None
+
+
+def test_failed_warm_load_reports_error_and_frees_slots(service):
+    """Test that a failed load is reported and slots fall back to the default model"""
+    _fake_load(service, error=RuntimeError("no weights"))
+
+    service.start_warm_load(wait=True)
+    assert service.state == "failed"
+    assert service.load_error == "no weights"
+    assert not service.is_ready()
+    assert service.get_executor().submit(current_replica).result(2) is None
+
+
+def test_cache_hit_replays_without_loading_the_model(service):
+    """Test that a lookup hit is served by transcribe() without touching the model"""
+    audio = np.zeros(16000, dtype=np.float32)
+    entry = {
+        "segments": [{"text": "hello", "start": 0.0, "end": 1.0}],
+        "summary": {"type": "summary", "text": "hello", "language": "en", "language_probability": 0.9,
+                    "duration": 1.0, "segment_count": 1},
+    }
+
+    result = service.transcribe(audio, lookup=CacheLookup(audio, "key", entry))
+    assert result["text"] == "hello"
+    assert result["cached"] is True
+    assert service.state == "not_loaded"
+    assert service.model is None
+
+
+def test_cache_key_uses_loaded_compute_type(service):
+    """Test that results after a CUDA -> CPU int8 fallback are keyed as int8"""
+    service.config = {**service.config, "compute_type": "float16"}
+    assert service._cache_model_id().endswith("@float16")
+
+    service._compute_type_in_use = "int8"
+    assert service._cache_model_id().endswith("@int8")
@@ -0,0 +1,58 @@
+"""
+Long-audio shard planning tests
+"""
+
+import random
+
+from stt_backend.sharding import plan_shards
+
+RATE = 16000
+
+
+def _random_speech(rng, total_samples):
+    """Sorted, non-overlapping VAD regions with random gaps"""
+    regions = []
+    position = rng.randrange(0, 2 * RATE)
+    while position < total_samples:
+        end = min(total_samples, position + rng.randrange(RATE // 4, 40 * RATE))
+        regions.append({"start": position, "end": end})
+        position = end + rng.randrange(RATE // 10, 3 * RATE)
+    return regions
+
+
+def test_random_plans_cover_recording_without_cutting_speech():
+    """Test that shards tile the recording exactly and only cut inside gaps or over-long speech"""
+    rng = random.Random(1234)
+    for _ in range(300):
+        total = rng.randrange(RATE, 900 * RATE)
+        target_seconds = rng.choice([10, 30, 60])
+        target = target_seconds * RATE
+        speech = _random_speech(rng, total) if rng.random() > 0.1 else []
+
+        shards = plan_shards(total, speech, target_seconds, sampling_rate=RATE)
+
+        assert shards[0][0] == 0
+        assert shards[-1][1] == total
+        for (_, end), (next_start, _) in zip(shards, shards[1:]):
+            assert end == next_start
+        for start, end in shards:
+            assert end > start
+            # Cuts land mid-gap, so a shard may run past 2x target by up to a gap (< 3 s here)
+            assert end - start <= 2 * target + 3 * RATE
+
+        for start, end in shards[:-1]:
+            inside = [r for r in speech if r["start"] < end < r["end"]]
+            # A cut inside speech only happens as a hard cut at 2x target
+            assert not inside or end - start == 2 * target
+
+
+def test_short_recording_is_one_shard():
+    """Test that audio no longer than the target is not split"""
+    assert plan_shards(30 * RATE, [{"start": 0, "end": 30 * RATE}], 60, sampling_rate=RATE) == [(0, 30 * RATE)]
+
+
+def test_no_speech_falls_back_to_fixed_windows():
+    """Test that without VAD regions the recording is cut into fixed target windows"""
+    assert plan_shards(25 * RATE, [], 10, sampling_rate=RATE) == [
+        (0, 10 * RATE), (10 * RATE, 20 * RATE), (20 * RATE, 25 * RATE)
+    ]
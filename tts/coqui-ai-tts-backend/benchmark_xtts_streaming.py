@@ -0,0 +1,82 @@
+"""
+Benchmark XTTS Streaming Latency
+Đo độ trễ Streaming XTTS
+
+Synthesizes typical tutor replies with the full-clip path (synthesize) and with
+incremental inference (synthesize_stream) at several stream chunk sizes, and reports
+time-to-first-frame (TTFF), total time and audio duration. For the full-clip path the
+first audio is only available when the whole clip is done, so its TTFF equals its
+total time.
+
+Tổng hợp các câu trả lời tutor điển hình bằng đường cả clip (synthesize) và bằng
+inference từng phần (synthesize_stream) với vài stream chunk size, báo cáo thời gian
+đến frame đầu tiên (TTFF), tổng thời gian và độ dài audio. Với đường cả clip, audio
+đầu tiên chỉ có khi cả clip xong, nên TTFF bằng tổng thời gian.
+
+Usage / Cách dùng:
+    python benchmark_xtts_streaming.py [--chunk-sizes 10 20 40] [--runs 3] [--speaker "Ana Florence"]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+TEXTS = [
+    "Great job! That sentence was almost perfect.",
+    "Let's practice the past tense. Yesterday I went to the market and bought some fresh vegetables.",
+    "Good question. We use 'since' with a point in time and 'for' with a period of time. "
+    "For example, I have lived here since 2019, and I have lived here for five years.",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XTTS streaming latency benchmark / Đo độ trễ streaming XTTS")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[10, 20, 40], help="Stream chunk sizes (GPT tokens)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per text and mode")
+    parser.add_argument("--speaker", default=None, help="Built-in or registered speaker")
+    parser.add_argument("--speaker-wav", default=None, help="Reference WAV for voice cloning")
+    parser.add_argument("--device", default="cuda", help="Device (cuda/cpu)")
+    args = parser.parse_args()
+
+    from tts_backend.models.xtts_english import XTTSEnglishWrapper
+
+    xtts = XTTSEnglishWrapper(device=args.device)
+    voice = {"speaker_wav": args.speaker_wav, "speaker": args.speaker}
+    xtts.synthesize("Warm up.", **voice)  # Warm-up, fills the latent cache / Khởi động, nạp cache latent
+
+    print("=" * 72)
+    print(f"XTTS full clip vs streaming on {xtts.device} / Cả clip so với streaming")
+    print("=" * 72)
+    print(f"{'text':>4} {'mode':<10} {'TTFF s':>8} {'total s':>8} {'audio s':>8} {'TTFF/full':>10}")
+
+    for index, text in enumerate(TEXTS):
+        full_times, audio_seconds = [], 0.0
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            wav = xtts.synthesize(text, **voice)
+            full_times.append(time.perf_counter() - start)
+            audio_seconds = len(wav) / xtts.sample_rate
+        full = statistics.median(full_times)
+        print(f"{index:>4} {'full':<10} {full:>8.2f} {full:>8.2f} {audio_seconds:>8.2f} {1.0:>10.2f}")
+
+        for chunk_size in args.chunk_sizes:
+            ttffs, totals, samples = [], [], 0
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                first, samples = None, 0
+                for chunk in xtts.synthesize_stream(text, stream_chunk_size=chunk_size, **voice):
+                    if first is None:
+                        first = time.perf_counter() - start
+                    samples += len(chunk)
+                ttffs.append(first)
+                totals.append(time.perf_counter() - start)
+            ttff = statistics.median(ttffs)
+            print(f"{index:>4} {f'stream/{chunk_size}':<10} {ttff:>8.2f} {statistics.median(totals):>8.2f} "
+                  f"{samples / xtts.sample_rate:>8.2f} {ttff / full:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark Sentence-Parallel XTTS Workers on CPU
+Đo hiệu năng Worker XTTS Song song theo Câu trên CPU
+
+Synthesizes a multi-sentence tutor reply in-process (1 worker) and with worker pools
+of 2..N processes, and reports wall time, speedup and per-worker utilization.
+
+With spawn (the default) every worker loads its own XTTS copy, so each pool is
+built, measured and shut down before the next one starts: only one pool's
+copies are in memory at a time. With --start-method fork, every pool is forked
+up front, before the parent runs inference, and the workers share the weights
+loaded once by this process.
+
+Tổng hợp một câu trả lời tutor nhiều câu trong tiến trình (1 worker) và với pool
+2..N tiến trình, báo cáo thời gian, mức tăng tốc và mức sử dụng từng worker.
+
+Với spawn (mặc định) mỗi worker tải bản XTTS riêng, nên mỗi pool được tạo, đo và
+tắt trước khi pool kế tiếp bắt đầu: mỗi lúc chỉ có bản sao của một pool trong bộ
+nhớ. Với --start-method fork, mọi pool được fork từ đầu, trước khi tiến trình cha
+chạy inference, và các worker dùng chung trọng số được tải một lần bởi tiến trình này.
+
+Usage / Cách dùng:
+    python benchmark_xtts_workers.py [--max-workers 4] [--runs 2] [--speaker "Ana Florence"]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+TEXT = (
+    "Nice work on today's lesson. "
+    "You used the present perfect correctly in almost every sentence. "
+    "Remember that we say 'I have been to Paris', not 'I have gone to Paris', when we talk about experiences. "
+    "Next time, let's focus on phrasal verbs like 'look after' and 'give up'. "
+    "Try to write three sentences with each of them before our next session. "
+    "See you soon!"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XTTS CPU worker scaling benchmark / Đo khả năng mở rộng worker XTTS trên CPU")
+    parser.add_argument("--max-workers", type=int, default=4, help="Largest pool size")
+    parser.add_argument("--runs", type=int, default=2, help="Runs per pool size")
+    parser.add_argument("--speaker", default=None, help="Built-in or registered speaker")
+    parser.add_argument("--start-method", default=None, help="spawn or fork (default: spawn)")
+    args = parser.parse_args()
+
+    from tts_backend.models.xtts_english import XTTSEnglishWrapper
+    from tts_backend.worker_pool import XTTSWorkerPool
+
+    xtts = XTTSEnglishWrapper(device="cpu")
+    speaker = args.speaker or (xtts.tts.speakers[0] if getattr(xtts.tts, "speakers", None) else None)
+
+    # Fork: every pool before the parent runs inference (shared weights)
+    # Spawn: one pool at a time inside the loop (each worker loads its own copy)
+    # Fork: mọi pool trước khi tiến trình cha chạy inference (dùng chung trọng số)
+    # Spawn: từng pool một trong vòng lặp (mỗi worker tải bản riêng)
+    forked = args.start_method == "fork"
+    pools = {n: XTTSWorkerPool(xtts, n, start_method="fork") for n in range(2, args.max_workers + 1)} if forked else {}
+    sentences = len(xtts.tts.synthesizer.split_into_sentences(TEXT))
+
+    print("=" * 72)
+    print(f"XTTS on CPU: {sentences} sentences, 1..{args.max_workers} workers / {sentences} câu, 1..{args.max_workers} worker")
+    print("=" * 72)
+    print(f"{'workers':>7} {'time s':>8} {'audio s':>8} {'RTF':>6} {'speedup':>8} {'pool util':>10}  per-worker util")
+
+    baseline = None
+    for n in range(1, args.max_workers + 1):
+        pool = None
+        if n > 1:
+            pool = pools.pop(n) if forked else XTTSWorkerPool(xtts, n, start_method=args.start_method)
+        synthesize = pool.synthesize if pool else xtts.synthesize
+        synthesize("Warm up. Second sentence.", speaker=speaker)  # Warm-up / Khởi động
+        times, audio = [], None
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            audio = synthesize(TEXT, speaker=speaker)
+            times.append(time.perf_counter() - start)
+        elapsed = statistics.median(times)
+        baseline = baseline or elapsed
+        audio_seconds = len(audio) / xtts.sample_rate
+        if pool:
+            stats = pool.get_stats()
+            per_worker = " ".join(f"{w['utilization']:.2f}" for w in stats["workers"].values())
+            pool_util = f"{stats['pool_utilization']:.2f}"
+            pool.shutdown()
+        else:
+            per_worker, pool_util = "-", "1.00"
+        print(f"{n:>7} {elapsed:>8.1f} {audio_seconds:>8.1f} {elapsed / max(audio_seconds, 1e-9):>6.2f} "
+              f"{baseline / elapsed:>7.2f}x {pool_util:>10}  {per_worker}")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,9 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown / Tắt
+    from tts_backend import service as tts_service
+    if tts_service._service_instance is not None:
+        tts_service._service_instance.shutdown()
     from tts_backend.storage import get_storage
     try:
         storage = get_storage()
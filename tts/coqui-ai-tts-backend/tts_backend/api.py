@@ -2,13 +2,16 @@
 TTS API Endpoints
 Điểm cuối API TTS
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, Literal
 import soundfile as sf
 import io
 import numpy as np
 import uuid
+import tempfile
+import os
 
 from .service import get_service
 from .storage import get_storage
@@ -29,6 +32,10 @@ class TTSSynthesizeRequest(BaseModel):
     expiry_hours: Optional[int] = None  # Expiration hours (None = use default)
     return_audio: Optional[bool] = True  # Return audio in response / Trả về audio trong response
 
+class TTSStreamRequest(TTSSynthesizeRequest):
+    """Streaming synthesis request / Yêu cầu tổng hợp streaming"""
+    stream_chunk_size: Optional[int] = None  # GPT tokens per frame (None = config default) / Số token GPT mỗi frame
+
 class ModelInfoRequest(BaseModel):
     """Model info request / Yêu cầu thông tin model"""
     model: Literal["xtts-english", "coqui-xtts-v2", "coqui-tts", "xtts-v2"]
@@ -70,6 +77,69 @@ async def get_speakers():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Register speaker / Đăng ký giọng nói
+@router.post("/speakers/register")
+async def register_speaker(name: str = Form(...), file: UploadFile = File(...)):
+    """
+    Register a reference clip as a named speaker / Đăng ký clip tham chiếu thành giọng có tên
+    
+    Conditioning latents are computed once and cached on disk; synthesize with
+    speaker=<name> afterwards.
+    Latent điều kiện được tính một lần và cache trên disk; sau đó tổng hợp với
+    speaker=<name>.
+    
+    Args:
+        name: Speaker name / Tên giọng
+        file: Reference WAV / WAV tham chiếu
+    """
+    from .latent_cache import get_latent_cache
+    service = get_service()
+    content = await file.read()
+    
+    def register():
+        # Model load, temp file and GPT conditioning pass all block
+        # Tải model, file tạm và lượt conditioning GPT đều chặn
+        tmp_path = None
+        try:
+            xtts = service.get_xtts_english()
+            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+                tmp.write(content)
+                tmp_path = tmp.name
+            return get_latent_cache().register(name, tmp_path, xtts.compute_latents)
+        finally:
+            if tmp_path:
+                os.unlink(tmp_path)
+    
+    try:
+        # Off the event loop, like streaming synthesis / Ngoài event loop, như tổng hợp streaming
+        entry = await run_in_threadpool(register)
+        return {"success": True, "speaker": entry}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# List registered speakers / Liệt kê giọng đã đăng ký
+@router.get("/speakers/registered")
+async def list_registered_speakers():
+    """
+    Registered speakers and latent cache statistics / Giọng đã đăng ký và thống kê cache latent
+    """
+    from .latent_cache import get_latent_cache
+    cache = get_latent_cache()
+    return {"success": True, "speakers": cache.list_registered(), "cache": cache.get_stats()}
+
+# Delete registered speaker / Xóa giọng đã đăng ký
+@router.delete("/speakers/registered/{name}")
+async def delete_registered_speaker(name: str):
+    """
+    Remove a registered speaker / Xóa giọng đã đăng ký
+    """
+    from .latent_cache import get_latent_cache
+    if not get_latent_cache().unregister(name):
+        raise HTTPException(status_code=404, detail="Speaker not registered")
+    return {"success": True, "message": "Speaker removed", "name": name}
+
 # Get model info / Lấy thông tin model
 @router.post("/model/info")
 async def get_model_info(request: ModelInfoRequest):
@@ -190,6 +260,118 @@ async def synthesize_speech(request: TTSSynthesizeRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Stream synthesized speech / Stream giọng nói tổng hợp
+@router.post("/synthesize/stream")
+async def synthesize_speech_stream(request: TTSStreamRequest):
+    """
+    Stream speech as raw PCM frames while it is being generated
+    Stream giọng nói dạng frame PCM thô trong khi đang tạo
+    
+    The body is 16-bit little-endian mono PCM at X-Sample-Rate, sent frame by frame
+    as XTTS vocodes it. When the stream ends the complete clip is stored as WAV under
+    X-File-ID (if store=true).
+    Nội dung là PCM mono 16-bit little-endian ở X-Sample-Rate, gửi từng frame khi
+    XTTS vocode xong. Khi stream kết thúc, clip đầy đủ được lưu dạng WAV với ID
+    X-File-ID (nếu store=true).
+    
+    The first frame is generated before the response starts, so setup and model
+    errors return a normal HTTP error. A failure after that ends the stream early
+    and nothing is stored.
+    Frame đầu tiên được tạo trước khi response bắt đầu, nên lỗi thiết lập và lỗi
+    model trả về lỗi HTTP bình thường. Lỗi sau đó kết thúc stream sớm và không lưu gì.
+    
+    Args:
+        request: Streaming synthesis request / Yêu cầu tổng hợp streaming
+    """
+    text = request.text.strip() if request.text else ""
+    if not text:
+        raise HTTPException(
+            status_code=400,
+            detail="Text is empty. Cannot generate audio from empty text."
+        )
+    
+    service = get_service()
+    storage = get_storage()
+    request_id = str(uuid.uuid4())
+    file_id = request_id.replace("-", "")
+    
+    normalized_model = request.model
+    if request.model in ["coqui-xtts-v2", "coqui-tts", "xtts-v2"]:
+        normalized_model = "xtts-english"
+    
+    def start_stream():
+        """Create the stream and generate its first frame (worker thread) / Tạo stream và frame đầu tiên (luồng worker)"""
+        sample_rate = service.get_model_info(normalized_model)["sample_rate"]
+        chunks = iter(service.synthesize_stream(
+            text=text,
+            model=normalized_model,
+            speaker_wav=request.speaker_wav,
+            speaker=request.speaker,
+            language=request.language or "en",
+            stream_chunk_size=request.stream_chunk_size
+        ))
+        return sample_rate, chunks, next(chunks, None)
+    
+    # Errors up to the first frame still get a proper status code
+    # Lỗi cho đến frame đầu tiên vẫn nhận mã trạng thái đúng
+    try:
+        sample_rate, chunks, first_chunk = await run_in_threadpool(start_stream)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    def pcm_frames():
+        """PCM16 frames; stores the full clip at the end / Frame PCM16; lưu clip đầy đủ khi kết thúc"""
+        if first_chunk is None:
+            return
+        pieces = []
+        chunk = first_chunk
+        try:
+            while chunk is not None:
+                pieces.append(chunk)
+                yield (np.clip(chunk, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+                chunk = next(chunks, None)
+        except Exception as e:
+            # Headers are already sent: end the body cleanly instead of dropping the connection
+            # Header đã gửi: kết thúc body gọn gàng thay vì ngắt kết nối
+            print(f"⚠️  [Stream {request_id}] Synthesis failed after {len(pieces)} frames: {e}")
+            print(f"⚠️  [Stream {request_id}] Tổng hợp lỗi sau {len(pieces)} frame: {e}")
+            return
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        
+        if request.store and pieces:
+            audio_buffer = io.BytesIO()
+            sf.write(audio_buffer, np.concatenate(pieces), sample_rate, format="WAV")
+            storage.save_audio(
+                audio_data=audio_buffer.getvalue(),
+                text=request.text,
+                speaker_id=request.speaker_wav or request.speaker or "default",
+                model=normalized_model,
+                expiry_hours=request.expiry_hours,
+                metadata={
+                    "request_id": request_id,
+                    "language": request.language or "en",
+                    "sample_rate": sample_rate,
+                    "streamed": True
+                },
+                file_id=file_id
+            )
+    
+    from fastapi.responses import StreamingResponse
+    headers = {
+        "X-Request-ID": request_id,
+        "X-Sample-Rate": str(sample_rate),
+        "X-Audio-Format": "pcm_s16le",
+        "X-Channels": "1"
+    }
+    if request.store:
+        headers["X-File-ID"] = file_id
+    return StreamingResponse(pcm_frames(), media_type=f"audio/L16; rate={sample_rate}; channels=1", headers=headers)
+
 # Get audio file by ID / Lấy file audio theo ID
 @router.get("/audio/{file_id}")
 async def get_audio_file(file_id: str):
@@ -264,6 +446,15 @@ async def delete_audio_file(file_id: str):
     
     return {"success": True, "message": "Audio file deleted", "file_id": file_id}
 
+# Worker pool statistics / Thống kê pool worker
+@router.get("/workers/stats")
+async def get_worker_stats():
+    """
+    Sentence-parallel worker pool utilization / Mức sử dụng pool worker song song theo câu
+    """
+    service = get_service()
+    return {"success": True, "stats": service.get_worker_stats()}
+
 # Get storage statistics / Lấy thống kê lưu trữ
 @router.get("/storage/stats")
 async def get_storage_stats():
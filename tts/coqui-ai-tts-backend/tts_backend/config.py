@@ -50,3 +50,25 @@ STORAGE_DIR = os.getenv("TTS_STORAGE_DIR", str(BASE_DIR / "storage" / "audio"))
 DEFAULT_EXPIRY_HOURS = int(os.getenv("TTS_DEFAULT_EXPIRY_HOURS", "2"))  # Changed from 24 to 2 hours
 CLEANUP_INTERVAL_MINUTES = int(os.getenv("TTS_CLEANUP_INTERVAL_MINUTES", "30"))  # More frequent cleanup
 
+
+# XTTS speaker latent cache / Cache latent giọng XTTS
+# (gpt_cond_latent, speaker_embedding) per reference clip / built-in speaker, plus registered speakers
+# (gpt_cond_latent, speaker_embedding) cho mỗi clip tham chiếu / giọng có sẵn, cùng các giọng đã đăng ký
+XTTS_LATENT_CACHE_DIR = os.getenv("XTTS_LATENT_CACHE_DIR", str(BASE_DIR / "storage" / "xtts_latents"))
+XTTS_LATENT_MEMORY_ENTRIES = int(os.getenv("XTTS_LATENT_MEMORY_ENTRIES", "32"))
+# Disk limit for cached (unregistered) latents, ~130 KB each; registered speakers are exempt (0 = unlimited)
+# Giới hạn disk cho latent đã cache (chưa đăng ký), ~130 KB mỗi cặp; giọng đã đăng ký được miễn (0 = không giới hạn)
+XTTS_LATENT_DISK_MB = float(os.getenv("XTTS_LATENT_DISK_MB", "512"))
+
+# Streaming synthesis / Tổng hợp streaming
+# GPT tokens per vocoded frame: smaller = earlier first audio, more vocoder calls
+# Số token GPT mỗi frame vocode: nhỏ hơn = audio đầu tiên sớm hơn, nhiều lần gọi vocoder hơn
+XTTS_STREAM_CHUNK_SIZE = int(os.getenv("XTTS_STREAM_CHUNK_SIZE", "20"))
+
+# Sentence-parallel worker pool (CPU only) / Pool worker song song theo câu (chỉ CPU)
+# 0 or 1 = synthesize in-process; N > 1 = N worker processes, built and warmed at startup
+# 0 hoặc 1 = tổng hợp trong tiến trình; N > 1 = N tiến trình worker, tạo và khởi động lúc khởi động
+XTTS_CPU_WORKERS = int(os.getenv("XTTS_CPU_WORKERS", "0"))
+# spawn (default: one model copy per worker) or fork (shares the loaded weights copy-on-write)
+# spawn (mặc định: mỗi worker một bản model) hoặc fork (dùng chung trọng số đã tải theo copy-on-write)
+XTTS_WORKER_START_METHOD = os.getenv("XTTS_WORKER_START_METHOD") or None
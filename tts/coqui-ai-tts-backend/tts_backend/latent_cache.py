@@ -0,0 +1,361 @@
+"""
+XTTS Speaker Latent Cache
+Cache Latent Giọng nói XTTS
+
+TTS.tts(speaker_wav=...) recomputes the GPT conditioning latents and the speaker
+embedding from the reference WAV on every call, although the tutor sends the same
+speaker for every chunk. The (gpt_cond_latent, speaker_embedding) pair is cached
+here, keyed by the reference content hash plus the model identity (or by built-in
+speaker name), with a bounded in-memory LRU in front of a size-bounded torch.save()
+disk tier. Registered speakers (uploaded reference clips) are keyed by their name,
+are never evicted from disk and survive restarts.
+
+TTS.tts(speaker_wav=...) tính lại latent điều kiện GPT và speaker embedding từ WAV
+tham chiếu mỗi lần gọi, dù tutor gửi cùng một giọng cho mọi chunk. Cặp
+(gpt_cond_latent, speaker_embedding) được cache ở đây theo hash nội dung tham chiếu
+cộng định danh model (hoặc theo tên giọng có sẵn), với LRU bộ nhớ có giới hạn phía
+trước tầng disk torch.save() có giới hạn dung lượng. Giọng đã đăng ký (clip tham
+chiếu tải lên) có khóa theo tên, không bao giờ bị gỡ khỏi disk và giữ lại sau khi
+khởi động lại.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import torch
+
+# Bump when the stored latent layout changes / Tăng khi cấu trúc latent lưu trữ thay đổi
+LATENT_VERSION = 1
+
+# Allowed registered speaker names / Tên giọng đăng ký hợp lệ
+_SPEAKER_NAME_RE = re.compile(r"^[A-Za-z0-9_\- ]{1,64}$")
+
+Latents = Tuple[torch.Tensor, torch.Tensor]
+
+
+def model_version() -> str:
+    """Installed coqui-tts version, part of the cache key / Phiên bản coqui-tts đã cài, một phần của khóa cache"""
+    try:
+        from importlib.metadata import version
+        return version("coqui-tts")
+    except Exception:
+        return "unknown"
+
+
+def hash_audio_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a reference file / SHA-256 của file tham chiếu"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LatentCache:
+    """Disk (.pt) + LRU cache of XTTS speaker latents / Cache disk (.pt) + LRU cho latent giọng XTTS"""
+
+    def __init__(
+        self,
+        store_dir: str,
+        max_memory_entries: int = 32,
+        model_id: Optional[str] = None,
+        max_disk_mb: float = 0
+    ):
+        """
+        Initialize latent cache / Khởi tạo cache latent
+
+        Args:
+            store_dir: Directory for latents and registered clips / Thư mục cho latent và clip đã đăng ký
+            max_memory_entries: Maximum latent pairs kept in memory / Số cặp latent tối đa giữ trong bộ nhớ
+            model_id: Model identity, part of the cache key / Định danh model, một phần của khóa cache
+            max_disk_mb: Size limit of unregistered .pt files (0 = unlimited) / Giới hạn dung lượng file .pt chưa đăng ký (0 = không giới hạn)
+        """
+        self.store_dir = Path(store_dir).resolve()
+        self.voices_dir = self.store_dir / "voices"
+        self.voices_dir.mkdir(parents=True, exist_ok=True)
+        self.registry_file = self.store_dir / "registered.json"
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.model_id = model_id or f"xtts_v2@{model_version()}"
+
+        self._memory: "OrderedDict[str, Latents]" = OrderedDict()
+        # path -> (mtime, size, content hash), avoids re-hashing unchanged files
+        # path -> (mtime, size, hash nội dung), tránh hash lại file không đổi
+        self._path_hashes: Dict[str, tuple] = {}
+        self._lock = threading.RLock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "computed": 0, "evictions": 0,
+                       "disk_evictions": 0, "compute_seconds": 0.0}
+        self._registered: Dict[str, Dict[str, Any]] = self._load_registry()
+
+        print(f"[LatentCache] Directory: {self.store_dir} (model: {self.model_id}, memory LRU: {self.max_memory_entries})")
+
+    # ---- keys / khóa -------------------------------------------------------
+
+    def wav_key(self, speaker_wav: str) -> str:
+        """Cache key for a reference file / Khóa cache cho file tham chiếu"""
+        path = str(speaker_wav)
+        stat = Path(path).stat()
+        with self._lock:
+            memo = self._path_hashes.get(path)
+        if memo and memo[0] == stat.st_mtime and memo[1] == stat.st_size:
+            content_hash = memo[2]
+        else:
+            content_hash = hash_audio_file(path)
+            with self._lock:
+                self._path_hashes[path] = (stat.st_mtime, stat.st_size, content_hash)
+        return hashlib.sha256(f"{self.model_id}:v{LATENT_VERSION}:wav:{content_hash}".encode()).hexdigest()
+
+    def speaker_key(self, speaker: str) -> str:
+        """Cache key for a built-in speaker / Khóa cache cho giọng có sẵn"""
+        return hashlib.sha256(f"{self.model_id}:v{LATENT_VERSION}:speaker:{speaker}".encode()).hexdigest()
+
+    def registered_speaker_key(self, name: str) -> str:
+        """
+        Cache key of a registered speaker name (not its content, so names never share files)
+        Khóa cache theo tên giọng đã đăng ký (không theo nội dung, nên các tên không dùng chung file)
+        """
+        return hashlib.sha256(f"{self.model_id}:v{LATENT_VERSION}:registered:{name}".encode()).hexdigest()
+
+    # ---- tiers / các tầng --------------------------------------------------
+
+    def _remember(self, key: str, latents: Latents):
+        """Insert into memory LRU (caller holds lock) / Thêm vào LRU bộ nhớ (đã giữ lock)"""
+        self._memory[key] = latents
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key: str, device: Optional[str] = None) -> Optional[Latents]:
+        """Cached latents for a key or None / Latent đã cache theo khóa hoặc None"""
+        with self._lock:
+            latents = self._memory.get(key)
+            if latents is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return latents
+
+            latents_path = self.store_dir / f"{key}.pt"
+            if latents_path.exists():
+                try:
+                    data = torch.load(latents_path, map_location=device or "cpu", weights_only=True)
+                    latents = (data["gpt_cond_latent"], data["speaker_embedding"])
+                    # Refresh mtime: the disk tier evicts least recently used files
+                    # Làm mới mtime: tầng disk gỡ file ít dùng gần đây nhất
+                    os.utime(latents_path)
+                    self._stats["disk_hits"] += 1
+                    self._remember(key, latents)
+                    return latents
+                except Exception as e:
+                    print(f"⚠️  [LatentCache] Corrupt latents {latents_path.name}, recomputing: {e}")
+                    print(f"⚠️  [LatentCache] Latent hỏng {latents_path.name}, tính lại: {e}")
+        return None
+
+    def put(self, key: str, latents: Latents, compute_seconds: float = 0.0, persist: bool = True):
+        """Store freshly computed latents / Lưu latent vừa tính"""
+        if persist:
+            latents_path = self.store_dir / f"{key}.pt"
+            tmp_path = latents_path.with_suffix(".tmp")
+            torch.save(
+                {"gpt_cond_latent": latents[0].detach().cpu(), "speaker_embedding": latents[1].detach().cpu()},
+                tmp_path
+            )
+            tmp_path.replace(latents_path)
+        with self._lock:
+            self._stats["computed"] += 1
+            self._stats["compute_seconds"] += compute_seconds
+            self._remember(key, latents)
+            if persist:
+                self._prune_disk()
+
+    def _prune_disk(self):
+        """
+        Delete least recently used unregistered .pt files above the size limit (caller holds lock)
+        Xóa file .pt chưa đăng ký ít dùng gần đây nhất khi vượt giới hạn dung lượng (đã giữ lock)
+        """
+        if not self.max_disk_bytes:
+            return
+        protected = {entry["key"] for entry in self._registered.values()}
+        files = []
+        total = 0
+        for path in self.store_dir.glob("*.pt"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            total += stat.st_size
+            if path.stem not in protected:
+                files.append((stat.st_mtime, stat.st_size, path))
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self._stats["disk_evictions"] += 1
+
+    def _disk_bytes(self) -> int:
+        """Size of all .pt files / Dung lượng mọi file .pt"""
+        return sum(path.stat().st_size for path in self.store_dir.glob("*.pt") if path.exists())
+
+    def _drop_if_unreferenced(self, key: str):
+        """
+        Delete a key's latents unless a registered speaker still uses it (caller holds lock)
+        Xóa latent của khóa trừ khi một giọng đã đăng ký vẫn dùng nó (đã giữ lock)
+        """
+        if any(entry["key"] == key for entry in self._registered.values()):
+            return
+        self._memory.pop(key, None)
+        (self.store_dir / f"{key}.pt").unlink(missing_ok=True)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute_fn: Callable[[], Latents],
+        device: Optional[str] = None,
+        persist: bool = True
+    ) -> Latents:
+        """
+        Latents from cache, computing on miss / Latent từ cache, tính khi miss
+
+        Args:
+            key: Cache key (wav_key / speaker_key) / Khóa cache (wav_key / speaker_key)
+            compute_fn: Computes (gpt_cond_latent, speaker_embedding) / Tính (gpt_cond_latent, speaker_embedding)
+            device: Device for disk hits / Thiết bị cho disk hit
+            persist: Write to the disk tier / Ghi xuống tầng disk
+        """
+        latents = self.get(key, device)
+        if latents is not None:
+            return latents
+        start = time.time()
+        latents = compute_fn()
+        self.put(key, latents, time.time() - start, persist=persist)
+        return latents
+
+    # ---- registered speakers / giọng đã đăng ký ----------------------------
+
+    def _load_registry(self) -> Dict[str, Dict[str, Any]]:
+        """Load registered speakers index / Tải chỉ mục giọng đã đăng ký"""
+        if not self.registry_file.exists():
+            return {}
+        try:
+            with open(self.registry_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️  [LatentCache] Could not read {self.registry_file.name}: {e}")
+            print(f"⚠️  [LatentCache] Không thể đọc {self.registry_file.name}: {e}")
+            return {}
+
+    def _save_registry(self):
+        """Persist registered speakers index (caller holds lock) / Lưu chỉ mục giọng đã đăng ký (đã giữ lock)"""
+        tmp_path = self.registry_file.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._registered, f, indent=2, ensure_ascii=False)
+        tmp_path.replace(self.registry_file)
+
+    def register(self, name: str, source_path: str, compute_fn: Callable[[str], Latents]) -> Dict[str, Any]:
+        """
+        Register a reference clip under a speaker name / Đăng ký clip tham chiếu dưới một tên giọng
+
+        The clip is copied into the cache directory and its latents are computed now,
+        so later requests with speaker=<name> never touch the reference audio.
+        Clip được sao chép vào thư mục cache và latent được tính ngay, nên các request
+        sau với speaker=<name> không bao giờ đọc lại audio tham chiếu.
+
+        Args:
+            name: Speaker name / Tên giọng
+            source_path: Reference WAV path / Đường dẫn WAV tham chiếu
+            compute_fn: Reference path -> latents / Đường dẫn tham chiếu -> latent
+
+        Raises:
+            ValueError: Invalid speaker name / Tên giọng không hợp lệ
+        """
+        if not _SPEAKER_NAME_RE.match(name):
+            raise ValueError("Speaker name must be 1-64 letters, digits, spaces, '-' or '_'")
+        voice_path = self.voices_dir / f"{hashlib.sha256(name.encode()).hexdigest()[:16]}.wav"
+        if Path(source_path).resolve() != voice_path:
+            shutil.copyfile(source_path, voice_path)
+        key = self.registered_speaker_key(name)
+        start = time.time()
+        latents = compute_fn(str(voice_path))
+        entry = {"key": key, "speaker_wav": str(voice_path), "registered_at": time.time()}
+        with self._lock:
+            # Register before storing so the disk limit never evicts the new file
+            # Đăng ký trước khi lưu để giới hạn disk không bao giờ gỡ file mới
+            previous = self._registered.get(name)
+            self._registered[name] = entry
+            self._save_registry()
+            self.put(key, latents, time.time() - start)
+            # Entries from older versions were keyed by content / Mục từ phiên bản cũ có khóa theo nội dung
+            if previous is not None and previous["key"] != key:
+                self._drop_if_unreferenced(previous["key"])
+        return {"name": name, **entry}
+
+    def registered_key(self, name: str) -> Optional[str]:
+        """Cache key of a registered speaker or None / Khóa cache của giọng đã đăng ký hoặc None"""
+        entry = self._registered.get(name)
+        return entry["key"] if entry else None
+
+    def registered_wav(self, name: str) -> Optional[str]:
+        """Stored reference clip of a registered speaker / Clip tham chiếu đã lưu của giọng đăng ký"""
+        entry = self._registered.get(name)
+        return entry["speaker_wav"] if entry else None
+
+    def unregister(self, name: str) -> bool:
+        """Remove a registered speaker / Xóa giọng đã đăng ký"""
+        with self._lock:
+            entry = self._registered.pop(name, None)
+            if entry is None:
+                return False
+            self._save_registry()
+            self._drop_if_unreferenced(entry["key"])
+        Path(entry["speaker_wav"]).unlink(missing_ok=True)
+        return True
+
+    def list_registered(self) -> Dict[str, Dict[str, Any]]:
+        """Registered speakers / Các giọng đã đăng ký"""
+        with self._lock:
+            return dict(self._registered)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics / Thống kê cache"""
+        with self._lock:
+            lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["computed"]
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            return {
+                **self._stats,
+                "hit_ratio": hits / lookups if lookups else None,
+                "memory_entries": len(self._memory),
+                "max_memory_entries": self.max_memory_entries,
+                "disk_mb": self._disk_bytes() / 2**20,
+                "max_disk_mb": self.max_disk_bytes / 2**20 if self.max_disk_bytes else None,
+                "registered_speakers": len(self._registered),
+                "model": self.model_id,
+                "store_dir": str(self.store_dir),
+            }
+
+
+# Global cache instance / Instance cache toàn cục
+_cache_instance: Optional[LatentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_latent_cache() -> LatentCache:
+    """Get global latent cache / Lấy cache latent toàn cục"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                from .config import XTTS_LATENT_CACHE_DIR, XTTS_LATENT_MEMORY_ENTRIES, XTTS_LATENT_DISK_MB
+                _cache_instance = LatentCache(
+                    store_dir=XTTS_LATENT_CACHE_DIR,
+                    max_memory_entries=XTTS_LATENT_MEMORY_ENTRIES,
+                    max_disk_mb=XTTS_LATENT_DISK_MB
+                )
+    return _cache_instance
@@ -9,7 +9,7 @@ với interface mà service layer mong đợi.
 """
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 import torch
 import numpy as np
 
@@ -48,6 +48,7 @@ except ImportError:
         )
 
 from ..config import ModelConfig
+from ..audio_dsp import ensure_audio_format
 
 
 class XTTSEnglishWrapper:
@@ -182,6 +183,12 @@ class XTTSEnglishWrapper:
                 print(f"Using fallback speaker: {speaker}")
                 print(f"Sử dụng giọng dự phòng: {speaker}")
         
+        # Use cached conditioning latents with the model's own inference when possible
+        # Dùng latent điều kiện đã cache với inference của model khi có thể
+        latents = self.get_latents(speaker_wav=speaker_wav, speaker=speaker)
+        if latents is not None:
+            return self._synthesize_with_latents(text, language, latents, **kwargs)
+        
         # Call Coqui TTS API
         # Gọi API Coqui TTS
         wav = self.tts.tts(
@@ -192,13 +199,168 @@ class XTTSEnglishWrapper:
             **kwargs
         )
         
-        # Ensure it's a numpy array
-        # Đảm bảo nó là numpy array
-        if not isinstance(wav, np.ndarray):
-            wav = np.array(wav)
+        # XTTS returns a list of floats; convert straight to mono float32
+        # XTTS trả về list float; chuyển thẳng sang float32 mono
+        wav = ensure_audio_format(wav)
         
         return wav
     
+    def _xtts_model(self):
+        """
+        Underlying Xtts model, or None if it lacks latent inference
+        Model Xtts bên dưới, hoặc None nếu không hỗ trợ inference với latent
+        """
+        model = getattr(getattr(self.tts, "synthesizer", None), "tts_model", None)
+        if model is None or not hasattr(model, "inference") or not hasattr(model, "get_conditioning_latents"):
+            return None
+        return model
+    
+    def compute_latents(self, speaker_wav: str):
+        """
+        Compute (gpt_cond_latent, speaker_embedding) for a reference clip
+        Tính (gpt_cond_latent, speaker_embedding) cho clip tham chiếu
+        """
+        model = self._xtts_model()
+        if model is None:
+            raise RuntimeError("Loaded TTS model does not expose XTTS conditioning latents")
+        config = model.config
+        return model.get_conditioning_latents(
+            audio_path=[speaker_wav],
+            gpt_cond_len=config.gpt_cond_len,
+            gpt_cond_chunk_len=config.gpt_cond_chunk_len,
+            max_ref_length=config.max_ref_len,
+            sound_norm_refs=config.sound_norm_refs,
+        )
+    
+    def get_latents(self, speaker_wav: Optional[str] = None, speaker: Optional[str] = None):
+        """
+        Cached latents for a reference clip, registered speaker or built-in speaker
+        Latent đã cache cho clip tham chiếu, giọng đã đăng ký hoặc giọng có sẵn
+        
+        Returns:
+            (gpt_cond_latent, speaker_embedding) or None to fall back to TTS.tts()
+            (gpt_cond_latent, speaker_embedding) hoặc None để quay về TTS.tts()
+        """
+        model = self._xtts_model()
+        if model is None:
+            return None
+        from ..latent_cache import get_latent_cache
+        cache = get_latent_cache()
+        
+        if speaker_wav:
+            return cache.get_or_compute(
+                cache.wav_key(speaker_wav), lambda: self.compute_latents(speaker_wav), device=self.device
+            )
+        
+        registered_key = cache.registered_key(speaker)
+        if registered_key:
+            return cache.get_or_compute(
+                registered_key, lambda: self.compute_latents(cache.registered_wav(speaker)), device=self.device
+            )
+        
+        # Built-in speakers ship with the checkpoint: memory tier only
+        # Giọng có sẵn đi kèm checkpoint: chỉ dùng tầng bộ nhớ
+        speakers = getattr(getattr(model, "speaker_manager", None), "speakers", None) or {}
+        if speaker not in speakers:
+            return None
+        return cache.get_or_compute(
+            cache.speaker_key(speaker),
+            lambda: (speakers[speaker]["gpt_cond_latent"], speakers[speaker]["speaker_embedding"]),
+            persist=False
+        )
+    
+    def _inference_settings(self, **kwargs) -> dict:
+        """
+        Sampling settings as TTS.tts() would use them (config defaults, kwargs override)
+        Tham số lấy mẫu như TTS.tts() sẽ dùng (mặc định từ config, kwargs ghi đè)
+        """
+        config = self._xtts_model().config
+        settings = {
+            "temperature": config.temperature,
+            "length_penalty": config.length_penalty,
+            "repetition_penalty": config.repetition_penalty,
+            "top_k": config.top_k,
+            "top_p": config.top_p,
+        }
+        settings.update(kwargs)
+        return settings
+    
+    def _synthesize_with_latents(self, text: str, language: str, latents, **kwargs) -> np.ndarray:
+        """
+        Synthesize sentence by sentence with precomputed latents (mirrors Synthesizer.tts)
+        Tổng hợp từng câu với latent tính sẵn (giống Synthesizer.tts)
+        """
+        model = self._xtts_model()
+        gpt_cond_latent, speaker_embedding = latents
+        split_sentences = kwargs.pop("split_sentences", True)
+        settings = self._inference_settings(**kwargs)
+        sentences = self.tts.synthesizer.split_into_sentences(text) if split_sentences else [text]
+        
+        pieces = []
+        with torch.inference_mode():
+            for sentence in sentences:
+                out = model.inference(sentence, language, gpt_cond_latent, speaker_embedding, **settings)
+                wav = out["wav"]
+                if hasattr(wav, "detach"):
+                    wav = wav.detach().cpu().numpy()
+                pieces.append(np.asarray(wav, dtype=np.float32).reshape(-1))
+                # Same inter-sentence gap as Synthesizer.tts / Cùng khoảng lặng giữa câu như Synthesizer.tts
+                pieces.append(np.zeros(10000, dtype=np.float32))
+        
+        return ensure_audio_format(np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32))
+    
+    def synthesize_stream(
+        self,
+        text: str,
+        speaker_wav: Optional[str] = None,
+        speaker: Optional[str] = None,
+        language: str = "en",
+        stream_chunk_size: int = 20,
+        **kwargs
+    ) -> Iterator[np.ndarray]:
+        """
+        Synthesize speech incrementally, yielding audio as it is vocoded
+        Tổng hợp giọng nói từng phần, trả audio ngay khi được vocode
+        
+        Args:
+            text: Input text / Văn bản đầu vào
+            speaker_wav: Reference audio path (optional) / Đường dẫn audio tham chiếu (tùy chọn)
+            speaker: Built-in or registered speaker name / Tên giọng có sẵn hoặc đã đăng ký
+            language: Language code / Mã ngôn ngữ
+            stream_chunk_size: GPT tokens per vocoded frame (smaller = earlier first audio)
+                              Số token GPT mỗi frame được vocode (nhỏ hơn = audio đầu tiên sớm hơn)
+            **kwargs: Sampling parameters / Tham số lấy mẫu
+            
+        Yields:
+            Float32 mono audio chunks / Các chunk audio float32 mono
+        """
+        if not speaker_wav and not speaker:
+            speakers = getattr(self.tts, "speakers", None)
+            speaker = speakers[0] if speakers else "Claribel Dervla"
+        
+        latents = self.get_latents(speaker_wav=speaker_wav, speaker=speaker)
+        model = self._xtts_model()
+        if latents is None or not hasattr(model, "inference_stream"):
+            # No incremental inference: the whole clip is a single frame
+            # Không có inference từng phần: cả clip là một frame
+            yield self.synthesize(text, speaker_wav=speaker_wav, speaker=speaker, language=language, **kwargs)
+            return
+        
+        gpt_cond_latent, speaker_embedding = latents
+        kwargs.pop("split_sentences", None)
+        settings = self._inference_settings(**kwargs)
+        sentences = self.tts.synthesizer.split_into_sentences(text)
+        
+        with torch.inference_mode():
+            for index, sentence in enumerate(sentences):
+                if index:
+                    yield np.zeros(10000, dtype=np.float32)
+                for chunk in model.inference_stream(
+                    sentence, language, gpt_cond_latent, speaker_embedding,
+                    stream_chunk_size=stream_chunk_size, **settings
+                ):
+                    yield chunk.detach().cpu().numpy().astype(np.float32, copy=False).reshape(-1)
+    
     def get_sample_rate(self) -> int:
         """
         Get sample rate
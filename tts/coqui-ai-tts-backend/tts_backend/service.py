@@ -26,6 +26,7 @@ class TTSService:
         """
         self.default_model = default_model
         self.xtts_english = None
+        self.worker_pool = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         print(f"Initializing TTS Service on {self.device} (default model={default_model})")
         print(f"Đang khởi tạo Dịch vụ TTS trên {self.device} (model mặc định={default_model})")
@@ -40,6 +41,9 @@ class TTSService:
                     self.get_xtts_english()  # Preload XTTS English model
                     print("✅ XTTS English model preloaded")
                     print("✅ Model XTTS tiếng Anh đã được tải trước")
+                    # Built here, at startup, never lazily inside a request thread
+                    # Tạo ở đây, lúc khởi động, không bao giờ tạo trễ trong luồng request
+                    self._start_worker_pool()
                 except Exception as e:
                     print(f"⚠️  Failed to preload XTTS English: {e}")
                     print(f"⚠️  Không thể tải trước XTTS tiếng Anh: {e}")
@@ -55,6 +59,27 @@ class TTSService:
             self.xtts_english = XTTSEnglishWrapper(device=self.device)
         return self.xtts_english
     
+    def _start_worker_pool(self):
+        """
+        Start and warm the sentence-parallel pool at startup, right after preloading (CPU only)
+        Khởi động và làm nóng pool song song theo câu lúc khởi động, ngay sau khi tải trước (chỉ CPU)
+        
+        Without a preloaded model there is no pool and requests synthesize in-process.
+        Không có model tải trước thì không có pool và request tổng hợp trong tiến trình.
+        """
+        from .config import XTTS_CPU_WORKERS, XTTS_WORKER_START_METHOD
+        if XTTS_CPU_WORKERS <= 1 or self.xtts_english.device != "cpu":
+            return
+        try:
+            from .worker_pool import XTTSWorkerPool
+            self.worker_pool = XTTSWorkerPool(
+                self.xtts_english, XTTS_CPU_WORKERS, start_method=XTTS_WORKER_START_METHOD
+            )
+        except Exception as e:
+            print(f"⚠️  Failed to start XTTS worker pool, synthesizing in-process: {e}")
+            print(f"⚠️  Không thể khởi động pool worker XTTS, tổng hợp trong tiến trình: {e}")
+            self.worker_pool = None
+    
     def synthesize(
         self,
         text: str,
@@ -85,10 +110,50 @@ class TTSService:
         if model == "xtts-english":
             xtts = self.get_xtts_english()
             lang = language or "en"
+            if self.worker_pool is not None:
+                audio = self.worker_pool.synthesize(text, speaker_wav=speaker_wav, speaker=speaker, language=lang, **kwargs)
+                if audio is not None:
+                    return audio
             return xtts.synthesize(text, speaker_wav=speaker_wav, speaker=speaker, language=lang, **kwargs)
         else:
             raise ValueError(f"Unknown model: {model}")
     
+    def synthesize_stream(
+        self,
+        text: str,
+        model: Optional[ModelType] = None,
+        speaker_wav: Optional[str] = None,
+        speaker: Optional[str] = None,
+        language: Optional[str] = None,
+        stream_chunk_size: Optional[int] = None,
+        **kwargs
+    ):
+        """
+        Synthesize speech as a stream of audio chunks / Tổng hợp giọng nói thành luồng chunk audio
+        
+        Args:
+            stream_chunk_size: GPT tokens per frame (None = config default) / Số token GPT mỗi frame (None = mặc định config)
+            (other arguments as synthesize / các tham số khác như synthesize)
+            
+        Returns:
+            Iterator of float32 audio chunks / Iterator các chunk audio float32
+        """
+        model = model or self.default_model
+        
+        if model == "xtts-english":
+            from .config import XTTS_STREAM_CHUNK_SIZE
+            xtts = self.get_xtts_english()
+            return xtts.synthesize_stream(
+                text,
+                speaker_wav=speaker_wav,
+                speaker=speaker,
+                language=language or "en",
+                stream_chunk_size=stream_chunk_size or XTTS_STREAM_CHUNK_SIZE,
+                **kwargs
+            )
+        else:
+            raise ValueError(f"Unknown model: {model}")
+    
     def get_model_info(self, model: ModelType) -> dict:
         """
         Get model information / Lấy thông tin model
@@ -111,6 +176,18 @@ class TTSService:
         else:
             raise ValueError(f"Unknown model: {model}")
 
+    def get_worker_stats(self) -> dict:
+        """Worker pool statistics / Thống kê pool worker"""
+        if self.worker_pool is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.worker_pool.get_stats()}
+    
+    def shutdown(self):
+        """Stop worker processes / Dừng tiến trình worker"""
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+            self.worker_pool = None
+
 # Global service instance / Instance dịch vụ toàn cục
 _service_instance: Optional[TTSService] = None
 
@@ -82,7 +82,8 @@ class AudioStorage:
         speaker_id: str,
         model: str,
         expiry_hours: Optional[int] = None,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        file_id: Optional[str] = None
     ) -> Dict:
         """
         Save audio file with metadata / Lưu file audio với metadata
@@ -94,12 +95,13 @@ class AudioStorage:
             model: Model used / Model sử dụng
             expiry_hours: Expiration hours (None = use default) / Giờ hết hạn
             metadata: Additional metadata / Metadata bổ sung
+            file_id: Pre-assigned file ID (e.g. announced before a stream) / ID file gán trước (vd. thông báo trước khi stream)
             
         Returns:
             Dictionary with file info / Từ điển với thông tin file
         """
         # Generate file ID
-        file_id = self._generate_file_id(text, speaker_id, model)
+        file_id = file_id or self._generate_file_id(text, speaker_id, model)
         
         # Set expiration time
         if expiry_hours is None:
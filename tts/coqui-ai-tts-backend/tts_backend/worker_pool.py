@@ -0,0 +1,213 @@
+"""
+Sentence-Parallel XTTS Worker Pool
+Pool Worker XTTS Song song theo Câu
+
+On CPU one XTTS instance synthesizes the sentences of a reply one after another and
+uses only part of the machine. XTTSWorkerPool splits a request into sentences,
+synthesizes them in parallel in worker processes and stitches the audio back in
+order. By default workers are spawned and each loads its own copy of the model,
+which is safe in the threaded server. With the opt-in "fork" start method the
+workers are forked from the process that already holds the loaded model, so the
+weights are shared copy-on-write; the pool must then be built at startup, before
+the server runs any threads or inference. All workers are started and loaded when
+the pool is created, never on the first request.
+Conditioning latents are resolved once in the parent (through the latent cache) and
+sent with each sentence. Busy time per worker is recorded for utilization metrics.
+
+Trên CPU, một instance XTTS tổng hợp các câu của câu trả lời lần lượt và chỉ dùng một
+phần máy. XTTSWorkerPool chia request thành câu, tổng hợp song song trong các tiến
+trình worker và ghép audio lại theo thứ tự. Mặc định worker được spawn và mỗi worker
+tự tải bản model riêng, an toàn trong server đa luồng. Với phương thức "fork" (tùy
+chọn), worker được fork từ tiến trình đã giữ model, nên trọng số được chia sẻ
+copy-on-write; khi đó pool phải được tạo lúc khởi động, trước khi server chạy luồng
+hay inference. Mọi worker được khởi động và tải model khi tạo pool, không bao giờ ở
+request đầu tiên. Latent điều kiện được
+lấy một lần ở tiến trình cha (qua cache latent) và gửi kèm mỗi câu. Thời gian bận của
+từng worker được ghi lại để tính mức sử dụng.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+
+# Model used inside worker processes (inherited on fork, loaded on spawn)
+# Model dùng trong tiến trình worker (kế thừa khi fork, tải khi spawn)
+_worker_xtts = None
+
+
+def _init_worker(device: str, threads: int):
+    """Worker initializer / Khởi tạo worker"""
+    global _worker_xtts
+    torch.set_num_threads(threads)
+    if _worker_xtts is None:
+        from .models.xtts_english import XTTSEnglishWrapper
+        _worker_xtts = XTTSEnglishWrapper(device=device)
+
+
+def _worker_ready(delay: float = 0.0) -> int:
+    """
+    No-op task that forces a worker (and its model load) to start
+    Tác vụ rỗng buộc một worker (và việc tải model của nó) khởi động
+
+    The short delay keeps one worker from taking every warm-up task.
+    Độ trễ ngắn giúp một worker không nhận hết mọi tác vụ khởi động.
+    """
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _synthesize_sentence(sentence: str, language: str, latents, kwargs: Dict[str, Any]):
+    """
+    Synthesize one sentence in a worker / Tổng hợp một câu trong worker
+
+    Returns:
+        (audio, pid, start, end) / (audio, pid, bắt đầu, kết thúc)
+    """
+    start = time.time()
+    audio = _worker_xtts._synthesize_with_latents(sentence, language, latents, split_sentences=False, **kwargs)
+    return audio, os.getpid(), start, time.time()
+
+
+class XTTSWorkerPool:
+    """Process pool synthesizing sentences in parallel / Pool tiến trình tổng hợp câu song song"""
+
+    def __init__(self, xtts, num_workers: int, start_method: Optional[str] = None):
+        """
+        Start worker processes / Khởi động tiến trình worker
+
+        With "fork", create the pool at startup right after the model is loaded and
+        before it runs inference: forking after the parent has started threads or used
+        its intra-op thread pool can hang the children.
+        Với "fork", tạo pool lúc khởi động ngay sau khi tải model và trước khi chạy
+        inference: fork sau khi tiến trình cha đã tạo luồng hoặc dùng thread pool nội
+        bộ có thể làm treo tiến trình con.
+
+        Args:
+            xtts: Loaded XTTSEnglishWrapper (parent) / XTTSEnglishWrapper đã tải (tiến trình cha)
+            num_workers: Worker processes / Số tiến trình worker
+            start_method: "spawn" or "fork" (None = spawn) / "spawn" hoặc "fork" (None = spawn)
+        """
+        global _worker_xtts
+        self.xtts = xtts
+        self.num_workers = max(1, num_workers)
+        self.start_method = start_method = start_method or "spawn"
+        threads = max(1, (os.cpu_count() or 1) // self.num_workers)
+
+        # Children forked now inherit the loaded model / Tiến trình con fork lúc này kế thừa model đã tải
+        if start_method == "fork":
+            _worker_xtts = xtts
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(xtts.device, threads),
+        )
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._workers: Dict[int, Dict[str, float]] = {}
+        self._stats = {"requests": 0, "sentences": 0, "wall_seconds": 0.0}
+        # Start every worker now rather than on the first request
+        # Khởi động mọi worker ngay thay vì ở request đầu tiên
+        self.warm_up()
+        print(f"[XTTSWorkerPool] {self.num_workers} workers ({start_method}, {threads} threads each)")
+        print(f"[XTTSWorkerPool] {self.num_workers} worker ({start_method}, mỗi worker {threads} luồng)")
+
+    def warm_up(self, timeout: float = 600.0):
+        """
+        Start all workers and wait until each has loaded its model
+        Khởi động mọi worker và chờ đến khi từng worker tải xong model
+
+        Raises:
+            TimeoutError: Not every worker answered in time / Không phải mọi worker trả lời kịp
+        """
+        deadline = time.time() + timeout
+        ready = set()
+        while len(ready) < self.num_workers:
+            if time.time() > deadline:
+                raise TimeoutError(f"Only {len(ready)}/{self.num_workers} XTTS workers started")
+            ready.update(self._executor.map(_worker_ready, [0.05] * self.num_workers))
+        return sorted(ready)
+
+    def synthesize(
+        self,
+        text: str,
+        speaker_wav: Optional[str] = None,
+        speaker: Optional[str] = None,
+        language: str = "en",
+        **kwargs
+    ) -> Optional[np.ndarray]:
+        """
+        Synthesize the sentences of a text in parallel / Tổng hợp song song các câu của văn bản
+
+        Returns:
+            Stitched audio, or None for single-sentence text or when latents are
+            unavailable (caller synthesizes in-process)
+            Audio đã ghép, hoặc None với văn bản một câu hoặc khi không có latent
+            (bên gọi tổng hợp trong tiến trình)
+        """
+        sentences = self.xtts.tts.synthesizer.split_into_sentences(text)
+        if len(sentences) < 2:
+            return None  # Nothing to parallelize / Không có gì để song song
+        latents = self.xtts.get_latents(speaker_wav=speaker_wav, speaker=speaker)
+        if latents is None:
+            return None
+        latents = tuple(t.detach().cpu() for t in latents)
+        kwargs.pop("split_sentences", None)
+
+        start = time.time()
+        futures = [
+            self._executor.submit(_synthesize_sentence, sentence, language, latents, kwargs)
+            for sentence in sentences
+        ]
+        # Results are collected in submission order / Kết quả được lấy theo thứ tự gửi
+        results = [future.result() for future in futures]
+        wall = time.time() - start
+
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["sentences"] += len(sentences)
+            self._stats["wall_seconds"] += wall
+            for _, pid, task_start, task_end in results:
+                worker = self._workers.setdefault(pid, {"sentences": 0, "busy_seconds": 0.0})
+                worker["sentences"] += 1
+                worker["busy_seconds"] += task_end - task_start
+
+        pieces: List[np.ndarray] = [audio for audio, _, _, _ in results]
+        return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Pool and per-worker utilization / Mức sử dụng của pool và từng worker
+
+        utilization = busy time / time spent serving requests; a value well below
+        1.0 means sentences were too few or too uneven to keep the worker busy.
+        utilization = thời gian bận / thời gian phục vụ request; giá trị thấp hơn
+        nhiều so với 1.0 nghĩa là số câu quá ít hoặc quá chênh lệch để worker bận.
+        """
+        with self._lock:
+            serving = self._stats["wall_seconds"]
+            workers = {
+                str(pid): {
+                    **worker,
+                    "utilization": worker["busy_seconds"] / serving if serving else 0.0,
+                }
+                for pid, worker in self._workers.items()
+            }
+            busy = sum(worker["busy_seconds"] for worker in self._workers.values())
+            return {
+                **self._stats,
+                "num_workers": self.num_workers,
+                "start_method": self.start_method,
+                "uptime_seconds": time.time() - self._started,
+                "pool_utilization": busy / (serving * self.num_workers) if serving else 0.0,
+                "workers": workers,
+            }
+
+    def shutdown(self):
+        """Stop worker processes / Dừng tiến trình worker"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -2,11 +2,12 @@
 TTS API Endpoints
 Điểm cuối API TTS
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel
 from typing import Optional, Literal
 import soundfile as sf
 import io
+import os
 import numpy as np
 import uuid
 import time
@@ -64,6 +65,52 @@ async def get_voices():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Register custom voice / Đăng ký giọng tùy chỉnh
+@router.post("/voices")
+async def register_voice(
+    name: str = Form(...),
+    file: UploadFile = File(...)
+):
+    """
+    Upload a voice and precompute its prompt features once / Tải lên giọng và tính trước đặc trưng prompt một lần
+    
+    The voice can then be used by name in /synthesize at the same cost as built-in voices.
+    Sau đó giọng có thể dùng theo tên trong /synthesize với chi phí như giọng có sẵn.
+    
+    Args:
+        name: Voice name / Tên giọng
+        file: Voice audio file (wav/mp3) / File audio giọng (wav/mp3)
+        
+    Returns:
+        Registered voice info / Thông tin giọng đã đăng ký
+    """
+    try:
+        audio_data = await file.read()
+        suffix = os.path.splitext(file.filename or "")[1].lower() or ".wav"
+        service = get_service()
+        voice_info = service.register_voice(name, audio_data, suffix)
+        return {"success": True, "voice": voice_info}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print("❌ Exception in /voices:", repr(e))
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Get voice feature store stats / Lấy thống kê kho đặc trưng giọng
+@router.get("/voices/stats")
+async def get_voice_store_stats():
+    """Get voice feature store statistics / Lấy thống kê kho đặc trưng giọng"""
+    from .voice_store import get_voice_store
+    return {"success": True, "stats": get_voice_store().get_stats()}
+
+# Get frontend memo cache stats / Lấy thống kê cache ghi nhớ frontend
+@router.get("/frontend/cache/stats")
+async def get_frontend_cache_stats():
+    """Get text frontend cache statistics / Lấy thống kê cache frontend văn bản"""
+    from .frontend_cache import get_frontend_cache
+    return {"success": True, "stats": get_frontend_cache().get_stats()}
+
 # Get model info / Lấy thông tin model
 @router.post("/model/info")
 async def get_model_info(request: ModelInfoRequest):
@@ -0,0 +1,166 @@
+"""
+Audio Assembly Utilities
+Tiện ích Ghép Audio
+
+Chunked synthesis produces one array per chunk. Collecting them in a list and
+calling np.concatenate at the end keeps every chunk alive and then copies the
+whole chapter once more. AudioAssembler instead writes each chunk into a single
+growable float32 buffer sized from an up-front length estimate (or hands
+finished samples straight to a streaming sink), and applies inter-chunk pauses
+or crossfades in place.
+
+Tổng hợp theo chunk tạo ra một mảng cho mỗi chunk. Gom vào list rồi gọi
+np.concatenate ở cuối giữ mọi chunk trong bộ nhớ và sao chép cả chương thêm một
+lần. AudioAssembler ghi từng chunk vào một buffer float32 có thể mở rộng, được
+cấp phát theo ước lượng độ dài (hoặc chuyển thẳng sang sink streaming), và áp
+dụng khoảng lặng hoặc crossfade giữa các chunk tại chỗ.
+"""
+from typing import Callable, Optional
+
+import numpy as np
+
+# Average Vietnamese narration rate used for length estimates
+# Tốc độ đọc tiếng Việt trung bình dùng để ước lượng độ dài
+DEFAULT_CHARS_PER_SECOND = 14.0
+
+# Growth factor when the estimate is too small / Hệ số mở rộng khi ước lượng quá nhỏ
+_GROWTH_FACTOR = 1.5
+
+
+def estimate_samples(text_chars: int, sample_rate: int, chars_per_second: float = DEFAULT_CHARS_PER_SECOND) -> int:
+    """
+    Estimate output length in samples from text length
+    Ước lượng độ dài đầu ra (số mẫu) từ độ dài văn bản
+
+    Args:
+        text_chars: Number of characters to synthesize / Số ký tự cần tổng hợp
+        sample_rate: Output sample rate / Tần số lấy mẫu đầu ra
+        chars_per_second: Speaking rate / Tốc độ nói
+
+    Returns:
+        Estimated number of samples (10% headroom) / Số mẫu ước lượng (dư 10%)
+    """
+    seconds = max(1.0, text_chars / max(chars_per_second, 1e-3))
+    return int(seconds * sample_rate * 1.1)
+
+
+class AudioAssembler:
+    """Growable float32 buffer for chunk assembly / Buffer float32 mở rộng được để ghép chunk"""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        expected_samples: int = 0,
+        pause_ms: float = 0.0,
+        crossfade_ms: float = 0.0,
+        sink: Optional[Callable[[np.ndarray], None]] = None
+    ):
+        """
+        Initialize assembler / Khởi tạo bộ ghép
+
+        Args:
+            sample_rate: Audio sample rate / Tần số lấy mẫu
+            expected_samples: Initial capacity (e.g. from estimate_samples) / Dung lượng ban đầu
+            pause_ms: Silence inserted between chunks / Khoảng lặng chèn giữa các chunk
+            crossfade_ms: Linear crossfade between chunks (ignored when pause_ms > 0)
+                          Crossfade tuyến tính giữa các chunk (bỏ qua khi pause_ms > 0)
+            sink: Optional streaming writer; finished samples are passed to it instead of being kept
+                  Writer streaming tùy chọn; mẫu đã hoàn tất được chuyển cho nó thay vì giữ lại
+        """
+        self.sample_rate = sample_rate
+        self.pause_samples = int(sample_rate * pause_ms / 1000.0)
+        self.crossfade_samples = 0 if self.pause_samples else int(sample_rate * crossfade_ms / 1000.0)
+        self.sink = sink
+
+        # In sink mode only the crossfade tail has to stay in memory
+        # Ở chế độ sink chỉ cần giữ phần đuôi crossfade trong bộ nhớ
+        capacity = self.crossfade_samples if sink else expected_samples
+        self._buffer = np.zeros(max(capacity, 1), dtype=np.float32)
+        self._length = 0
+        self.chunks = 0
+        self.total_samples = 0
+        self.reallocations = 0
+
+    def _reserve(self, needed: int):
+        """Grow buffer to hold at least `needed` samples / Mở rộng buffer để chứa ít nhất `needed` mẫu"""
+        if needed <= self._buffer.shape[0]:
+            return
+        new_capacity = max(needed, int(self._buffer.shape[0] * _GROWTH_FACTOR))
+        grown = np.empty(new_capacity, dtype=np.float32)
+        grown[:self._length] = self._buffer[:self._length]
+        self._buffer = grown
+        self.reallocations += 1
+
+    def _write(self, data: np.ndarray):
+        """Append samples to the buffer / Thêm mẫu vào buffer"""
+        end = self._length + data.shape[0]
+        self._reserve(end)
+        self._buffer[self._length:end] = data
+        self._length = end
+
+    def append(self, chunk: np.ndarray):
+        """
+        Append one synthesized chunk / Thêm một chunk đã tổng hợp
+
+        Args:
+            chunk: Mono audio chunk (any float dtype) / Chunk audio mono
+        """
+        chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        if chunk.shape[0] == 0:
+            return
+
+        if self.chunks and self.pause_samples:
+            end = self._length + self.pause_samples
+            self._reserve(end)
+            self._buffer[self._length:end] = 0.0
+            self._length = end
+            self.total_samples += self.pause_samples
+
+        overlap = min(self.crossfade_samples, self._length, chunk.shape[0]) if self.chunks else 0
+        if overlap:
+            # Crossfade in place over the buffer tail / Crossfade tại chỗ trên đuôi buffer
+            fade_in = np.linspace(0.0, 1.0, overlap, dtype=np.float32)
+            tail = self._buffer[self._length - overlap:self._length]
+            tail *= 1.0 - fade_in
+            tail += chunk[:overlap] * fade_in
+            chunk = chunk[overlap:]
+
+        self._write(chunk)
+        self.total_samples += chunk.shape[0]
+        self.chunks += 1
+
+        if self.sink is not None:
+            self._flush(keep=self.crossfade_samples)
+
+    def _flush(self, keep: int = 0):
+        """Send all but the last `keep` samples to the sink / Gửi tất cả trừ `keep` mẫu cuối cho sink"""
+        ready = self._length - keep
+        if ready <= 0:
+            return
+        self.sink(self._buffer[:ready].copy())
+        self._buffer[:keep] = self._buffer[ready:self._length]
+        self._length = keep
+
+    def finalize(self) -> np.ndarray:
+        """
+        Finish assembly / Hoàn tất ghép
+
+        Returns:
+            Assembled float32 audio (a view of the buffer). In sink mode the
+            remaining tail is flushed and an empty array is returned.
+            Audio float32 đã ghép (view của buffer). Ở chế độ sink phần đuôi
+            còn lại được gửi đi và trả về mảng rỗng.
+        """
+        if self.sink is not None:
+            self._flush(keep=0)
+            return np.zeros(0, dtype=np.float32)
+        return self._buffer[:self._length]
+
+    def get_stats(self) -> dict:
+        """Assembly statistics / Thống kê ghép"""
+        return {
+            "chunks": self.chunks,
+            "samples": self.total_samples,
+            "capacity": int(self._buffer.shape[0]),
+            "reallocations": self.reallocations,
+        }
@@ -48,3 +48,24 @@ STORAGE_DIR = os.getenv("TTS_STORAGE_DIR", str(BASE_DIR / "storage" / "audio"))
 DEFAULT_EXPIRY_HOURS = int(os.getenv("TTS_DEFAULT_EXPIRY_HOURS", "2"))  # Changed from 24 to 2 hours
 CLEANUP_INTERVAL_MINUTES = int(os.getenv("TTS_CLEANUP_INTERVAL_MINUTES", "30"))  # More frequent cleanup
 
+# Voice feature store configuration / Cấu hình kho đặc trưng giọng
+# Precomputed prompt features (speaker embedding, prompt tokens) persisted across restarts
+# Đặc trưng prompt tính trước (speaker embedding, prompt tokens) được lưu qua các lần khởi động lại
+VOICE_STORE_DIR = os.getenv("TTS_VOICE_STORE_DIR", str(BASE_DIR / "storage" / "viettts_voices"))
+VOICE_STORE_MEMORY_ENTRIES = int(os.getenv("TTS_VOICE_STORE_MEMORY_ENTRIES", "16"))
+# Voices to precompute at startup (comma separated, "*" = all built-in voices)
+# Giọng tính trước khi khởi động (phân tách bằng dấu phẩy, "*" = tất cả giọng có sẵn)
+VOICE_PRELOAD = os.getenv("TTS_VOICE_PRELOAD", "quynh,cdteam,nu-nhe-nhang")
+
+# Frontend memo cache configuration / Cấu hình cache ghi nhớ frontend
+# Normalization + tokenization outputs reused for repeated text (headers, dialogue tags, re-generated paragraphs)
+# Kết quả chuẩn hóa + tokenize tái sử dụng cho văn bản lặp lại (tiêu đề, lời thoại, đoạn tạo lại)
+FRONTEND_CACHE_MAX_ENTRIES = int(os.getenv("TTS_FRONTEND_CACHE_MAX_ENTRIES", "4096"))
+# Optional on-disk tier (empty = memory only) / Tầng disk tùy chọn (trống = chỉ bộ nhớ)
+FRONTEND_CACHE_DISK_DIR = os.getenv("TTS_FRONTEND_CACHE_DISK_DIR", "")
+
+# Chunk assembly configuration / Cấu hình ghép chunk
+# Silence or crossfade applied in place between synthesized chunks (0 = plain join)
+# Khoảng lặng hoặc crossfade áp dụng tại chỗ giữa các chunk đã tổng hợp (0 = nối thẳng)
+CHUNK_PAUSE_MS = float(os.getenv("TTS_CHUNK_PAUSE_MS", "0"))
+CHUNK_CROSSFADE_MS = float(os.getenv("TTS_CHUNK_CROSSFADE_MS", "0"))
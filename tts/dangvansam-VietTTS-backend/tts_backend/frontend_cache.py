@@ -0,0 +1,160 @@
+"""
+Memoized Text Frontend Cache
+Cache Frontend Văn bản có Ghi nhớ
+
+Novels repeat a lot of text (chapter headers, dialogue tags, paragraphs
+regenerated after a voice remap). The VietTTS frontend runs underthesea
+normalization and tokenization on the CPU for every chunk, so its outputs are
+memoized here in a bounded LRU with an optional on-disk tier. Each entry keeps
+the time it originally took to compute, so hits can report time saved.
+
+Tiểu thuyết lặp lại nhiều văn bản (tiêu đề chương, lời thoại, đoạn tạo lại sau
+khi đổi giọng). Frontend VietTTS chạy chuẩn hóa và tokenize underthesea trên CPU
+cho mỗi chunk, nên kết quả được ghi nhớ ở đây trong LRU có giới hạn với tầng
+disk tùy chọn. Mỗi mục lưu thời gian tính ban đầu để báo cáo thời gian tiết kiệm.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import torch
+
+
+class FrontendCache:
+    """Bounded LRU (+ optional disk) cache for frontend outputs / Cache LRU có giới hạn (+ disk tùy chọn) cho kết quả frontend"""
+
+    def __init__(self, max_entries: int = 4096, disk_dir: Optional[str] = None):
+        """
+        Initialize frontend cache / Khởi tạo cache frontend
+
+        Args:
+            max_entries: Maximum in-memory entries / Số mục tối đa trong bộ nhớ
+            disk_dir: Optional directory for the on-disk tier / Thư mục tùy chọn cho tầng disk
+        """
+        self.max_entries = max(1, max_entries)
+        self.disk_dir = Path(disk_dir).resolve() if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+        # key -> (value, compute_seconds)
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "seconds_saved": 0.0}
+
+    @staticmethod
+    def make_key(kind: str, text: str, voice_key: str = "") -> str:
+        """
+        Build cache key from kind, exact text and voice / Tạo khóa cache từ loại, text nguyên văn và giọng
+
+        The text is not normalized: the frontend sees the raw text, and spacing,
+        newlines or Unicode composition can change how it segments.
+        Text không được chuẩn hóa: frontend nhận text gốc, và khoảng trắng, xuống
+        dòng hay dạng tổ hợp Unicode có thể làm thay đổi cách tách đoạn.
+
+        Args:
+            kind: Frontend stage ("preprocess", "text_token", "model_input") / Giai đoạn frontend
+            text: Input text / Văn bản đầu vào
+            voice_key: Voice identity for voice-dependent outputs ("" if independent)
+                       Định danh giọng cho kết quả phụ thuộc giọng ("" nếu không phụ thuộc)
+        """
+        payload = f"{kind}\x00{voice_key}\x00{text}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, value: Any, cost: float):
+        """Insert into LRU (caller holds lock) / Thêm vào LRU (đã giữ lock)"""
+        self._entries[key] = (value, cost)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get_or_compute(
+        self,
+        kind: str,
+        text: str,
+        compute: Callable[[], Any],
+        voice_key: str = ""
+    ) -> Tuple[Any, bool, float]:
+        """
+        Return cached frontend output or compute and cache it
+        Trả kết quả frontend đã cache hoặc tính và cache
+
+        Args:
+            kind: Frontend stage / Giai đoạn frontend
+            text: Input text / Văn bản đầu vào
+            compute: Callable producing the output on a miss / Hàm tạo kết quả khi miss
+            voice_key: Voice identity ("" if output is voice independent) / Định danh giọng
+
+        Returns:
+            Tuple of (value, hit, seconds_saved) / Tuple của (giá trị, trúng cache, số giây tiết kiệm)
+        """
+        key = self.make_key(kind, text, voice_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["seconds_saved"] += entry[1]
+                return entry[0], True, entry[1]
+
+        if self.disk_dir:
+            disk_path = self.disk_dir / f"{key}.pt"
+            if disk_path.exists():
+                try:
+                    stored = torch.load(disk_path, map_location="cpu")
+                    with self._lock:
+                        self._remember(key, stored["value"], stored["cost"])
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                        self._stats["seconds_saved"] += stored["cost"]
+                    return stored["value"], True, stored["cost"]
+                except Exception:
+                    pass  # Corrupt entry, recompute / Mục hỏng, tính lại
+
+        start = time.time()
+        value = compute()
+        cost = time.time() - start
+
+        with self._lock:
+            self._stats["misses"] += 1
+            self._remember(key, value, cost)
+
+        if self.disk_dir:
+            try:
+                tmp_path = self.disk_dir / f"{key}.tmp"
+                torch.save({"value": value, "cost": cost}, tmp_path)
+                tmp_path.replace(self.disk_dir / f"{key}.pt")
+            except Exception as e:
+                print(f"⚠️  [FrontendCache] Could not persist entry: {e}")
+                print(f"⚠️  [FrontendCache] Không thể lưu mục: {e}")
+        return value, False, 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics / Lấy thống kê cache"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["disk_enabled"] = self.disk_dir is not None
+        return stats
+
+
+# Global cache instance shared by all model instances / Instance cache toàn cục dùng chung
+_cache_instance: Optional[FrontendCache] = None
+
+
+def get_frontend_cache() -> FrontendCache:
+    """Get global frontend cache / Lấy cache frontend toàn cục"""
+    global _cache_instance
+    if _cache_instance is None:
+        from .config import FRONTEND_CACHE_MAX_ENTRIES, FRONTEND_CACHE_DISK_DIR
+        _cache_instance = FrontendCache(
+            max_entries=FRONTEND_CACHE_MAX_ENTRIES,
+            disk_dir=FRONTEND_CACHE_DISK_DIR or None
+        )
+    return _cache_instance
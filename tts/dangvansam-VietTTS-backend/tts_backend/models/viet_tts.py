@@ -138,7 +138,29 @@ _patch_vinorm()
 
 # Import VietTTS classes
 from viettts.tts import TTS
-from viettts.utils.file_utils import load_prompt_speech_from_file, load_voices
+from viettts.utils.file_utils import load_voices
+
+from ..voice_store import get_voice_store, TEXT_KEYS
+from ..frontend_cache import get_frontend_cache
+from ..audio_assembly import AudioAssembler, estimate_samples
+
+
+# VietTTS has no public text-only tokenizer: frontend_tts() also re-extracts the
+# prompt speech features on every call. These two helpers are the only code that
+# touches the private TTSFrontEnd._extract_text_token; if upstream renames it,
+# _build_model_input falls back to the full frontend_tts() call.
+# VietTTS không có hàm tokenize chỉ text công khai: frontend_tts() còn trích xuất lại
+# đặc trưng giọng mẫu mỗi lần gọi. Hai hàm dưới là code duy nhất chạm vào hàm private
+# TTSFrontEnd._extract_text_token; nếu upstream đổi tên, _build_model_input quay về
+# gọi frontend_tts() đầy đủ.
+def _supports_text_only_tokens(frontend) -> bool:
+    """Whether the frontend can tokenize text alone / Frontend có tokenize riêng text được không"""
+    return callable(getattr(frontend, "_extract_text_token", None))
+
+
+def _text_only_tokens(frontend, text: str):
+    """(text_token, text_token_len) for one chunk / (text_token, text_token_len) cho một chunk"""
+    return frontend._extract_text_token(text)
 
 
 class VietTTSWrapper:
@@ -188,9 +210,13 @@ class VietTTSWrapper:
         # Load available voices
         self.voice_map = load_voices(self.voice_samples_dir)
         
-        # Cache for loaded prompt speech (to avoid reloading from disk each time)
-        # Cache cho prompt speech đã tải (để tránh tải lại từ disk mỗi lần)
-        self._prompt_speech_cache = {}
+        # Shared persistent store of precomputed voice features (all instances, all restarts)
+        # Kho bền vững dùng chung cho đặc trưng giọng đã tính trước (mọi instance, mọi lần khởi động)
+        self.voice_store = get_voice_store()
+        
+        # Shared memo cache for text frontend outputs (normalization + tokenization)
+        # Cache ghi nhớ dùng chung cho kết quả frontend văn bản (chuẩn hóa + tokenize)
+        self.frontend_cache = get_frontend_cache()
         
         # Initialize model
         print(f"🖥️  Using device: {self.device}")
@@ -218,20 +244,23 @@ class VietTTSWrapper:
     
     def _preload_common_voices(self):
         """
-        Preload common voices to avoid disk I/O delay on first use.
-        Tải trước các giọng phổ biến để tránh độ trễ I/O disk khi dùng lần đầu.
+        Preload configured voices into the feature store (computed once, then read from disk).
+        Tải trước các giọng được cấu hình vào kho đặc trưng (tính một lần, sau đó đọc từ disk).
         """
-        common_voices = ["quynh", "cdteam", "nu-nhe-nhang"]  # Most commonly used voices
+        from ..config import VOICE_PRELOAD
+        if VOICE_PRELOAD.strip() == "*":
+            common_voices = list(self.voice_map.keys())
+        else:
+            common_voices = [v.strip() for v in VOICE_PRELOAD.split(",") if v.strip()]
         print("📦 Preloading common voices to memory...")
         print("📦 Đang tải trước các giọng phổ biến vào memory...")
         
         for voice_name in common_voices:
-            if voice_name in self.voice_map:
+            voice_file = self._resolve_voice_file(voice_name)
+            if voice_file:
                 try:
-                    voice_file = self.voice_map[voice_name]
-                    if voice_name not in self._prompt_speech_cache:
-                        self._prompt_speech_cache[voice_name] = load_prompt_speech_from_file(voice_file)
-                        print(f"   ✅ Preloaded voice: {voice_name}")
+                    self.voice_store.get(voice_file, self.model.frontend)
+                    print(f"   ✅ Preloaded voice: {voice_name}")
                 except Exception as e:
                     print(f"   ⚠️  Failed to preload voice {voice_name}: {e}")
         
@@ -262,16 +291,13 @@ class VietTTSWrapper:
                 voice_name = "quynh"  # Default voice for novel reader
             
             # Get voice file
-            voice_file = self.voice_map.get(voice_name)
+            voice_file = self._resolve_voice_file(voice_name)
             if not voice_file:
                 voice_file = list(self.voice_map.values())[0]
             
-            # Load voice (will be cached)
-            # Tải giọng (sẽ được cache)
-            cache_key = voice_name if voice_name in self.voice_map else "default"
-            if cache_key not in self._prompt_speech_cache:
-                self._prompt_speech_cache[cache_key] = load_prompt_speech_from_file(voice_file)
-            prompt_speech = self._prompt_speech_cache[cache_key]
+            # Load voice features (from feature store)
+            # Tải đặc trưng giọng (từ kho đặc trưng)
+            voice_features = self.voice_store.get(voice_file, self.model.frontend)
             
             # Short dummy text for warmup
             dummy_text = "Xin chào."
@@ -283,7 +309,7 @@ class VietTTSWrapper:
             print("   Running warmup inference (compiling CUDA kernels - one-time cost)...")
             print("   Đang chạy warmup inference (compile CUDA kernels - chi phí một lần)...")
             
-            _ = self.model.tts_to_wav(dummy_text, prompt_speech, speed=1.0)
+            _ = self._synthesize_with_detailed_timing(dummy_text, voice_features, speed=1.0)
             
             print("✅ Model warmup completed! CUDA kernels compiled - no more 10s setup delay!")
             print("✅ Model warmup hoàn tất! CUDA kernels đã compile - không còn độ trễ setup 10s!")
@@ -303,6 +329,46 @@ class VietTTSWrapper:
             # Model will still work - PyTorch uses GPU, ONNX uses CPU (handled by patch)
             # Model vẫn sẽ hoạt động - PyTorch dùng GPU, ONNX dùng CPU (đã được xử lý bởi patch)
     
+    def _resolve_voice_file(self, voice: str) -> Optional[str]:
+        """
+        Resolve voice name to file path (built-in or registered) / Phân giải tên giọng sang đường dẫn file (có sẵn hoặc đã đăng ký)
+        """
+        if voice in self.voice_map:
+            return self.voice_map[voice]
+        registered = self.voice_store.registered.get(voice)
+        return registered["file"] if registered else None
+    
+    def _build_model_input(self, chunk_text: str, voice_features: dict) -> tuple:
+        """
+        Build model input from text tokens and precomputed voice features.
+        Tạo model input từ text tokens và đặc trưng giọng đã tính trước.
+        
+        Only the text is tokenized per chunk (memoized); speaker embedding and
+        prompt tokens come from the feature store.
+        Chỉ text được tokenize mỗi chunk (có ghi nhớ); speaker embedding và prompt tokens lấy từ kho đặc trưng.
+        
+        Returns:
+            Tuple of (model_input, cache_hit, seconds_saved) / Tuple của (model_input, trúng cache, số giây tiết kiệm)
+        """
+        frontend = self.model.frontend
+        if not _supports_text_only_tokens(frontend):
+            # Older frontend: fall back to full extraction, memoized per voice
+            # Frontend cũ: dự phòng trích xuất đầy đủ, ghi nhớ theo giọng
+            return self.frontend_cache.get_or_compute(
+                "model_input",
+                chunk_text,
+                lambda: frontend.frontend_tts(chunk_text, voice_features["prompt_speech"]),
+                voice_key=voice_features.get("cache_key", "")
+            )
+        text_tokens, hit, saved = self.frontend_cache.get_or_compute(
+            "text_token",
+            chunk_text,
+            lambda: _text_only_tokens(frontend, chunk_text)
+        )
+        model_input = dict(voice_features["prompt_inputs"])
+        model_input.update(dict(zip(TEXT_KEYS, text_tokens)))
+        return model_input, hit, saved
+    
     def _setup_cuda_optimizations(self):
         """
         Setup CUDA optimizations (TF32) for better performance.
@@ -358,38 +424,21 @@ class VietTTSWrapper:
         step_start = time.time()
         if voice_file:
             prompt_speech_file = voice_file
-            cache_key = voice_file
         elif voice:
-            prompt_speech_file = self.voice_map.get(voice)
+            prompt_speech_file = self._resolve_voice_file(voice)
             if not prompt_speech_file:
-                raise ValueError(f"Voice '{voice}' not found. Available voices: {list(self.voice_map.keys())}")
-            cache_key = voice
+                raise ValueError(f"Voice '{voice}' not found. Available voices: {list(self.list_voices().keys())}")
         else:
             # Use default voice
             prompt_speech_file = list(self.voice_map.values())[0]
-            cache_key = "default"
         step_duration = time.time() - step_start
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
         print(f"[{timestamp}] [PERF] Step 1 - Voice selection: {step_duration*1000:.2f}ms")
         print(f"[{timestamp}] [PERF] Bước 1 - Chọn giọng: {step_duration*1000:.2f}ms")
         
-        # Step 2: Load prompt speech from cache / Bước 2: Tải prompt speech từ cache
+        # Step 2: Load voice features from feature store / Bước 2: Tải đặc trưng giọng từ kho đặc trưng
         step_start = time.time()
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        if cache_key not in self._prompt_speech_cache:
-            print(f"[{timestamp}] [PERF] Voice '{cache_key}' not in cache, loading from disk...")
-            print(f"[{timestamp}] [PERF] Giọng '{cache_key}' chưa có trong cache, đang tải từ disk...")
-            load_start = time.time()
-            self._prompt_speech_cache[cache_key] = load_prompt_speech_from_file(prompt_speech_file)
-            load_duration = time.time() - load_start
-            timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-            print(f"[{timestamp}] [PERF]   Voice loaded from disk: {load_duration:.3f}s")
-            print(f"[{timestamp}] [PERF]   Đã tải giọng từ disk: {load_duration:.3f}s")
-        else:
-            print(f"[{timestamp}] [PERF] Voice '{cache_key}' found in cache (instant)")
-            print(f"[{timestamp}] [PERF] Giọng '{cache_key}' có trong cache (tức thời)")
-        
-        prompt_speech = self._prompt_speech_cache[cache_key]
+        voice_features = self.voice_store.get(prompt_speech_file, self.model.frontend)
         step_duration = time.time() - step_start
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
         print(f"[{timestamp}] [PERF] Step 2 - Voice loading: {step_duration*1000:.2f}ms")
@@ -425,7 +474,7 @@ class VietTTSWrapper:
         try:
             # Add detailed timing for each step inside tts_to_wav
             # Thêm timing chi tiết cho từng bước bên trong tts_to_wav
-            wav = self._synthesize_with_detailed_timing(text, prompt_speech, speed)
+            wav = self._synthesize_with_detailed_timing(text, voice_features, speed)
         except ValueError as e:
             if "need at least one array" in str(e).lower() or "concatenate" in str(e).lower():
                 raise ValueError(
@@ -482,7 +531,7 @@ class VietTTSWrapper:
         
         return wav
     
-    def _synthesize_with_detailed_timing(self, text: str, prompt_speech, speed: float) -> np.ndarray:
+    def _synthesize_with_detailed_timing(self, text: str, voice_features: dict, speed: float) -> np.ndarray:
         """
         Synthesize with detailed timing logs to identify bottlenecks.
         Tổng hợp với timing logs chi tiết để xác định điểm nghẽn.
@@ -492,7 +541,15 @@ class VietTTSWrapper:
         print(f"[{timestamp}] [PERF-DETAIL] Starting detailed synthesis timing...")
         print(f"[{timestamp}] [PERF-DETAIL] Bắt đầu timing chi tiết synthesis...")
         
-        wavs = []
+        # Chunks are written into one growable float32 buffer (no list + concatenate copy)
+        # Chunk được ghi vào một buffer float32 mở rộng được (không list + copy khi nối)
+        from ..config import CHUNK_PAUSE_MS, CHUNK_CROSSFADE_MS
+        assembler = AudioAssembler(
+            self.sample_rate,
+            expected_samples=estimate_samples(len(text), self.sample_rate),
+            pause_ms=CHUNK_PAUSE_MS,
+            crossfade_ms=CHUNK_CROSSFADE_MS
+        )
         chunk_count = 0
         
         # Step 4.1: Text preprocessing / Bước 4.1: Xử lý text trước
@@ -500,11 +557,17 @@ class VietTTSWrapper:
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
         print(f"[{timestamp}] [PERF-DETAIL] Step 4.1 - Starting text preprocessing...")
         print(f"[{timestamp}] [PERF-DETAIL] Bước 4.1 - Bắt đầu xử lý text trước...")
-        preprocessed_chunks = list(self.model.frontend.preprocess_text(text, split=True))
+        cached_chunks, preprocess_hit, frontend_saved = self.frontend_cache.get_or_compute(
+            "preprocess",
+            text,
+            lambda: list(self.model.frontend.preprocess_text(text, split=True))
+        )
+        preprocessed_chunks = list(cached_chunks)
+        frontend_hits = int(preprocess_hit)
         preprocess_duration = time.time() - preprocess_start
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        print(f"[{timestamp}] [PERF-DETAIL] Step 4.1 - Text preprocessing completed: {preprocess_duration:.3f}s")
-        print(f"[{timestamp}] [PERF-DETAIL] Bước 4.1 - Xử lý text trước hoàn tất: {preprocess_duration:.3f}s")
+        print(f"[{timestamp}] [PERF-DETAIL] Step 4.1 - Text preprocessing completed: {preprocess_duration:.3f}s{' (cached)' if preprocess_hit else ''}")
+        print(f"[{timestamp}] [PERF-DETAIL] Bước 4.1 - Xử lý text trước hoàn tất: {preprocess_duration:.3f}s{' (đã cache)' if preprocess_hit else ''}")
         print(f"[{timestamp}] [PERF-DETAIL]   Number of chunks: {len(preprocessed_chunks)}")
         print(f"[{timestamp}] [PERF-DETAIL]   Số lượng chunks: {len(preprocessed_chunks)}")
         
@@ -525,7 +588,9 @@ class VietTTSWrapper:
             timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
             print(f"[{timestamp}] [PERF-DETAIL]   Step 4.2.{chunk_idx + 1}.1 - Frontend processing (ONNX - may be CPU)...")
             print(f"[{timestamp}] [PERF-DETAIL]   Bước 4.2.{chunk_idx + 1}.1 - Xử lý frontend (ONNX - có thể là CPU)...")
-            model_input = self.model.frontend.frontend_tts(chunk_text, prompt_speech)
+            model_input, frontend_hit, saved = self._build_model_input(chunk_text, voice_features)
+            frontend_hits += int(frontend_hit)
+            frontend_saved += saved
             frontend_duration = time.time() - frontend_start
             total_frontend_time += frontend_duration
             timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
@@ -538,7 +603,7 @@ class VietTTSWrapper:
             print(f"[{timestamp}] [PERF-DETAIL]   Step 4.2.{chunk_idx + 1}.2 - Model inference (PyTorch GPU)...")
             print(f"[{timestamp}] [PERF-DETAIL]   Bước 4.2.{chunk_idx + 1}.2 - Inference model (PyTorch GPU)...")
             for model_output in self.model.model.tts(**model_input, stream=False, speed=speed):
-                wavs.append(model_output['tts_speech'].squeeze(0).numpy())
+                assembler.append(model_output['tts_speech'].squeeze(0).numpy())
                 chunk_count += 1
             model_duration = time.time() - model_start
             total_model_time += model_duration
@@ -554,9 +619,11 @@ class VietTTSWrapper:
         # Step 4.3: Concatenate audio chunks / Bước 4.3: Nối các chunks audio
         concat_start = time.time()
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        print(f"[{timestamp}] [PERF-DETAIL] Step 4.3 - Concatenating {len(wavs)} audio chunks...")
-        print(f"[{timestamp}] [PERF-DETAIL] Bước 4.3 - Đang nối {len(wavs)} chunks audio...")
-        wav = np.concatenate(wavs, axis=0)
+        print(f"[{timestamp}] [PERF-DETAIL] Step 4.3 - Finalizing {chunk_count} assembled audio chunks...")
+        print(f"[{timestamp}] [PERF-DETAIL] Bước 4.3 - Đang hoàn tất {chunk_count} chunks audio đã ghép...")
+        if chunk_count == 0:
+            raise ValueError("need at least one array to concatenate")
+        wav = assembler.finalize()
         concat_duration = time.time() - concat_start
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
         print(f"[{timestamp}] [PERF-DETAIL] Step 4.3 - Concatenation completed: {concat_duration*1000:.2f}ms")
@@ -571,6 +638,8 @@ class VietTTSWrapper:
         print(f"[{timestamp}] [PERF-DETAIL]   Xử lý text trước: {preprocess_duration:.3f}s ({preprocess_duration/total_duration*100:.1f}%)")
         print(f"[{timestamp}] [PERF-DETAIL]   Frontend processing (ONNX): {total_frontend_time:.3f}s ({total_frontend_time/total_duration*100:.1f}%)")
         print(f"[{timestamp}] [PERF-DETAIL]   Xử lý frontend (ONNX): {total_frontend_time:.3f}s ({total_frontend_time/total_duration*100:.1f}%)")
+        print(f"[{timestamp}] [PERF-DETAIL]   Frontend cache: {frontend_hits}/{len(preprocessed_chunks) + 1} hits, saved ~{frontend_saved:.3f}s")
+        print(f"[{timestamp}] [PERF-DETAIL]   Cache frontend: {frontend_hits}/{len(preprocessed_chunks) + 1} lần trúng, tiết kiệm ~{frontend_saved:.3f}s")
         print(f"[{timestamp}] [PERF-DETAIL]   Model inference (PyTorch GPU): {total_model_time:.3f}s ({total_model_time/total_duration*100:.1f}%)")
         print(f"[{timestamp}] [PERF-DETAIL]   Inference model (PyTorch GPU): {total_model_time:.3f}s ({total_model_time/total_duration*100:.1f}%)")
         print(f"[{timestamp}] [PERF-DETAIL]   Audio concatenation: {concat_duration:.3f}s ({concat_duration/total_duration*100:.1f}%)")
@@ -597,5 +666,8 @@ class VietTTSWrapper:
         Returns:
             Dictionary mapping voice names to file paths / Từ điển ánh xạ tên giọng đến đường dẫn file
         """
-        return self.voice_map.copy()
+        voices = self.voice_map.copy()
+        for name, info in self.voice_store.registered.items():
+            voices.setdefault(name, info["file"])
+        return voices
 
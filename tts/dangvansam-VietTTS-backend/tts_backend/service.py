@@ -303,6 +303,24 @@ class TTSService:
         
         return result
     
+    def register_voice(self, name: str, audio_data: bytes, suffix: str = ".wav") -> dict:
+        """
+        Register an uploaded voice and precompute its features once.
+        Đăng ký giọng tải lên và tính trước đặc trưng một lần.
+        
+        Args:
+            name: Voice name / Tên giọng
+            audio_data: Voice file bytes / Bytes file giọng
+            suffix: File extension / Phần mở rộng file
+            
+        Returns:
+            Registered voice info / Thông tin giọng đã đăng ký
+        """
+        viet_tts = self.get_viet_tts()
+        if name in viet_tts.voice_map:
+            raise ValueError(f"Voice '{name}' is a built-in voice and cannot be replaced")
+        return viet_tts.voice_store.register(name, audio_data, suffix, viet_tts.model.frontend)
+    
     def get_model_info(self, model: ModelType) -> dict:
         """
         Get model information / Lấy thông tin model
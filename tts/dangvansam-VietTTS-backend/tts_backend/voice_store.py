@@ -0,0 +1,303 @@
+"""
+Persistent Voice-Prompt Feature Store
+Kho Đặc trưng Giọng Prompt Bền vững
+
+Precomputes everything VietTTS derives from a prompt voice file (16 kHz prompt
+speech, speaker embedding, prompt speech tokens and mel features) once, keyed by
+the content hash of the file, and keeps it on disk plus in a bounded in-memory LRU.
+Built-in voices, custom voice_file paths and uploaded voices all go through the
+same store, so every model instance (including Model Pool instances) and every
+restart reuses the same features.
+
+Tính toán trước mọi thứ VietTTS lấy từ file giọng prompt (prompt speech 16 kHz,
+speaker embedding, prompt speech tokens và mel features) một lần, theo hash nội
+dung file, lưu trên disk và trong LRU bộ nhớ có giới hạn.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import torch
+
+# Bump when the layout of stored features changes
+# Tăng khi cấu trúc đặc trưng lưu trữ thay đổi
+FEATURE_VERSION = 1
+
+# Short probe text used to run the frontend once for prompt-side features
+# Văn bản thăm dò ngắn dùng để chạy frontend một lần lấy đặc trưng phía prompt
+_PROBE_TEXT = "Xin chào."
+
+# Model input keys that depend on the text, not on the voice
+# Các khóa model input phụ thuộc vào text, không phụ thuộc giọng
+TEXT_KEYS = ("text", "text_len")
+
+
+def hash_voice_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Content hash of a voice file / Hash nội dung của file giọng
+
+    Args:
+        path: Voice file path / Đường dẫn file giọng
+        chunk_size: Read chunk size / Kích thước đọc mỗi lần
+
+    Returns:
+        SHA-256 hex digest / Chuỗi hex SHA-256
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class VoiceFeatureStore:
+    """Disk + LRU store for precomputed voice features / Kho disk + LRU cho đặc trưng giọng đã tính trước"""
+
+    def __init__(self, store_dir: str, max_memory_entries: int = 16, model_id: str = "viet-tts"):
+        """
+        Initialize voice feature store / Khởi tạo kho đặc trưng giọng
+
+        Args:
+            store_dir: Directory for feature files and uploaded voices / Thư mục cho file đặc trưng và giọng đã tải lên
+            max_memory_entries: Maximum voices kept in memory / Số giọng tối đa giữ trong bộ nhớ
+            model_id: Model identity, part of the cache key / Định danh model, một phần của khóa cache
+        """
+        self.store_dir = Path(store_dir).resolve()
+        self.features_dir = self.store_dir / "features"
+        self.voices_dir = self.store_dir / "voices"
+        self.index_path = self.store_dir / "voices.json"
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.model_id = model_id
+
+        self.features_dir.mkdir(parents=True, exist_ok=True)
+        self.voices_dir.mkdir(parents=True, exist_ok=True)
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # path -> (mtime, size, content hash), avoids re-hashing unchanged files
+        # path -> (mtime, size, hash nội dung), tránh hash lại file không đổi
+        self._path_hashes: Dict[str, tuple] = {}
+        # Guards the memory tier, hash memo, stats and index; never held while hashing, loading or computing
+        # Bảo vệ tầng bộ nhớ, memo hash, thống kê và chỉ mục; không giữ khi hash, tải hay tính
+        self._lock = threading.RLock()
+        # cache key -> lock of the load/compute in flight, so one voice is computed once
+        # while other voices proceed / khóa cache -> lock của lần tải/tính đang chạy, để một
+        # giọng chỉ tính một lần trong khi các giọng khác vẫn tiếp tục
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "computed": 0, "evictions": 0}
+
+        # Registered (uploaded) voices: name -> {"file": ..., "hash": ...}
+        # Giọng đã đăng ký (tải lên): tên -> {"file": ..., "hash": ...}
+        self.registered: Dict[str, Dict[str, Any]] = self._load_index()
+
+        print(f"[VoiceStore] Feature directory: {self.features_dir} (memory LRU: {self.max_memory_entries})")
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Load registered voice index / Tải chỉ mục giọng đã đăng ký"""
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            return {name: info for name, info in index.items() if Path(info["file"]).exists()}
+        except Exception as e:
+            print(f"⚠️  [VoiceStore] Could not read voice index: {e}")
+            print(f"⚠️  [VoiceStore] Không thể đọc chỉ mục giọng: {e}")
+            return {}
+
+    def _save_index(self):
+        """Persist registered voice index / Lưu chỉ mục giọng đã đăng ký"""
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.registered, f, indent=2, ensure_ascii=False)
+        tmp_path.replace(self.index_path)
+
+    def _cache_key(self, content_hash: str) -> str:
+        """Cache key for a voice file hash / Khóa cache cho hash file giọng"""
+        return hashlib.sha256(f"{self.model_id}:v{FEATURE_VERSION}:{content_hash}".encode()).hexdigest()
+
+    def _file_hash(self, path: str) -> str:
+        """Content hash with (mtime, size) memo / Hash nội dung có ghi nhớ (mtime, size)"""
+        stat = Path(path).stat()
+        with self._lock:
+            memo = self._path_hashes.get(path)
+        if memo and memo[0] == stat.st_mtime and memo[1] == stat.st_size:
+            return memo[2]
+        content_hash = hash_voice_file(path)
+        with self._lock:
+            self._path_hashes[path] = (stat.st_mtime, stat.st_size, content_hash)
+        return content_hash
+
+    def _from_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        """Memory-tier lookup / Tra cứu tầng bộ nhớ"""
+        with self._lock:
+            features = self._memory.get(key)
+            if features is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+            return features
+
+    def _remember(self, key: str, features: Dict[str, Any]):
+        """Insert into memory LRU (caller holds lock) / Thêm vào LRU bộ nhớ (đã giữ lock)"""
+        features["cache_key"] = key
+        self._memory[key] = features
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _compute(self, voice_file: str, frontend) -> Dict[str, Any]:
+        """
+        Run the VietTTS frontend once for a voice file / Chạy frontend VietTTS một lần cho file giọng
+        """
+        from viettts.utils.file_utils import load_prompt_speech_from_file
+
+        prompt_speech = load_prompt_speech_from_file(voice_file)
+        model_input = frontend.frontend_tts(_PROBE_TEXT, prompt_speech)
+        prompt_inputs = {
+            k: (v.detach().cpu() if torch.is_tensor(v) else v)
+            for k, v in model_input.items()
+            if k not in TEXT_KEYS
+        }
+        return {
+            "version": FEATURE_VERSION,
+            "prompt_speech": prompt_speech.detach().cpu() if torch.is_tensor(prompt_speech) else prompt_speech,
+            "prompt_inputs": prompt_inputs,
+        }
+
+    def get(self, voice_file: str, frontend) -> Dict[str, Any]:
+        """
+        Get precomputed features for a voice file / Lấy đặc trưng đã tính trước cho file giọng
+
+        Args:
+            voice_file: Prompt voice file path / Đường dẫn file giọng prompt
+            frontend: VietTTS frontend used when features must be computed / Frontend VietTTS dùng khi cần tính đặc trưng
+
+        Returns:
+            Dict with prompt_speech and prompt_inputs (speaker embedding, prompt tokens, features)
+            Dict chứa prompt_speech và prompt_inputs (speaker embedding, prompt tokens, đặc trưng)
+        """
+        voice_file = str(voice_file)
+        key = self._cache_key(self._file_hash(voice_file))
+        features = self._from_memory(key)
+        if features is not None:
+            return features
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                # Another request may have loaded it while we waited
+                # Request khác có thể đã tải xong trong lúc chờ
+                features = self._from_memory(key)
+                if features is not None:
+                    return features
+                return self._load_or_compute(key, voice_file, frontend)
+            finally:
+                with self._lock:
+                    if self._key_locks.get(key) is key_lock:
+                        del self._key_locks[key]
+
+    def _load_or_compute(self, key: str, voice_file: str, frontend) -> Dict[str, Any]:
+        """Disk tier, else compute and persist (caller holds the key lock) / Tầng disk, nếu không thì tính và lưu (đã giữ lock của khóa)"""
+        feature_path = self.features_dir / f"{key}.pt"
+        if feature_path.exists():
+            try:
+                features = torch.load(feature_path, map_location="cpu")
+                if features.get("version") == FEATURE_VERSION:
+                    with self._lock:
+                        self._stats["disk_hits"] += 1
+                        self._remember(key, features)
+                    return features
+            except Exception as e:
+                print(f"⚠️  [VoiceStore] Corrupt feature file {feature_path.name}, recomputing: {e}")
+                print(f"⚠️  [VoiceStore] File đặc trưng hỏng {feature_path.name}, tính lại: {e}")
+
+        start = time.time()
+        features = self._compute(voice_file, frontend)
+        tmp_path = feature_path.with_suffix(".tmp")
+        torch.save(features, tmp_path)
+        tmp_path.replace(feature_path)
+        with self._lock:
+            self._stats["computed"] += 1
+            self._remember(key, features)
+        print(f"[VoiceStore] Precomputed voice features for {Path(voice_file).name}: {time.time() - start:.3f}s")
+        print(f"[VoiceStore] Đã tính trước đặc trưng giọng cho {Path(voice_file).name}: {time.time() - start:.3f}s")
+        return features
+
+    def register(self, name: str, audio_data: bytes, suffix: str, frontend) -> Dict[str, Any]:
+        """
+        Register an uploaded voice and precompute its features / Đăng ký giọng tải lên và tính trước đặc trưng
+
+        Args:
+            name: Voice name used in synthesize requests / Tên giọng dùng trong request synthesize
+            audio_data: Uploaded audio bytes / Bytes audio tải lên
+            suffix: File extension (e.g. ".wav") / Phần mở rộng file
+            frontend: VietTTS frontend / Frontend VietTTS
+
+        Returns:
+            Registered voice info / Thông tin giọng đã đăng ký
+        """
+        if not re.fullmatch(r"[\w\-]{1,64}", name):
+            raise ValueError("Voice name must be 1-64 letters, digits, '_' or '-'")
+        if not audio_data:
+            raise ValueError("Uploaded voice file is empty")
+
+        content_hash = hashlib.sha256(audio_data).hexdigest()
+        voice_path = self.voices_dir / f"{content_hash[:16]}{suffix or '.wav'}"
+        if not voice_path.exists():
+            # Content-addressed name: concurrent writers write the same bytes
+            # Tên theo nội dung: các lần ghi đồng thời ghi cùng bytes
+            tmp_path = voice_path.with_name(f"{voice_path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(audio_data)
+            tmp_path.replace(voice_path)
+
+        start = time.time()
+        self.get(str(voice_path), frontend)
+        precompute_seconds = time.time() - start
+
+        info = {
+            "file": str(voice_path),
+            "hash": content_hash,
+            "registered_at": datetime.now().isoformat(),
+        }
+        with self._lock:
+            self.registered[name] = info
+            self._save_index()
+        return {"name": name, **info, "precompute_seconds": precompute_seconds}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics / Lấy thống kê kho"""
+        with self._lock:
+            return {
+                **self._stats,
+                "memory_entries": len(self._memory),
+                "max_memory_entries": self.max_memory_entries,
+                "disk_entries": sum(1 for _ in self.features_dir.glob("*.pt")),
+                "registered_voices": len(self.registered),
+            }
+
+
+# Global store instance shared by all model instances / Instance kho toàn cục dùng chung cho mọi instance model
+_store_instance: Optional[VoiceFeatureStore] = None
+_store_lock = threading.Lock()
+
+
+def get_voice_store() -> VoiceFeatureStore:
+    """Get global voice feature store / Lấy kho đặc trưng giọng toàn cục"""
+    global _store_instance
+    if _store_instance is None:
+        with _store_lock:
+            if _store_instance is None:
+                from .config import VOICE_STORE_DIR, VOICE_STORE_MEMORY_ENTRIES, ModelConfig
+                _store_instance = VoiceFeatureStore(
+                    store_dir=VOICE_STORE_DIR,
+                    max_memory_entries=VOICE_STORE_MEMORY_ENTRIES,
+                    model_id=Path(ModelConfig.VIETTTS["model_path"]).name
+                )
+    return _store_instance
@@ -0,0 +1,130 @@
+"""
+Benchmark Audio Assembly
+Đo hiệu năng Ghép Audio
+
+Compares peak memory and time of the old list + np.concatenate chunk assembly
+against AudioAssembler (preallocated float32 buffer and streaming sink) for a
+long chapter, plus np.interp vs change_speed for speed changes.
+No model is needed: chunks are synthetic float32 arrays.
+
+So sánh bộ nhớ đỉnh và thời gian của cách ghép cũ (list + np.concatenate) với
+AudioAssembler (buffer float32 cấp phát trước và sink streaming) cho một chương
+dài, cùng np.interp so với change_speed khi đổi tốc độ.
+Không cần model: chunk là mảng float32 tổng hợp.
+
+Usage / Cách dùng:
+    python benchmark_audio_assembly.py [--minutes 60] [--chunk-seconds 18]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tts_backend.audio_assembly import AudioAssembler, estimate_samples
+from tts_backend.audio_dsp import change_speed
+
+SAMPLE_RATE = 24_000
+CHARS_PER_SECOND = 14.0
+
+
+def make_chunks(total_seconds: float, chunk_seconds: float, seed: int = 0):
+    """Yield synthetic model outputs / Tạo đầu ra model tổng hợp"""
+    rng = np.random.default_rng(seed)
+    remaining = int(total_seconds * SAMPLE_RATE)
+    while remaining > 0:
+        # Vary chunk length like real sentences / Thay đổi độ dài chunk như câu thật
+        n = min(remaining, int(chunk_seconds * SAMPLE_RATE * rng.uniform(0.6, 1.4)))
+        yield (rng.standard_normal(n) * 0.1).astype(np.float32)
+        remaining -= n
+
+
+def measure(label: str, fn):
+    """Run fn under tracemalloc and print peak/time / Chạy fn với tracemalloc và in đỉnh/thời gian"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<34} peak: {peak / 2**20:9.1f} MiB   time: {duration:7.3f}s")
+    return result, peak
+
+
+def run_list_concat(total_seconds, chunk_seconds):
+    segments = []
+    for chunk in make_chunks(total_seconds, chunk_seconds):
+        segments.append(chunk)
+    return np.concatenate(segments)
+
+
+def run_assembler(total_seconds, chunk_seconds):
+    text_chars = int(total_seconds * CHARS_PER_SECOND)
+    assembler = AudioAssembler(SAMPLE_RATE, expected_samples=estimate_samples(text_chars, SAMPLE_RATE))
+    for chunk in make_chunks(total_seconds, chunk_seconds):
+        assembler.append(chunk)
+    print(f"    stats: {assembler.get_stats()}")
+    return assembler.finalize()
+
+
+def run_assembler_sink(total_seconds, chunk_seconds):
+    written = [0]
+
+    def sink(samples):
+        written[0] += samples.shape[0]  # a real sink would write PCM here / sink thật sẽ ghi PCM ở đây
+
+    assembler = AudioAssembler(SAMPLE_RATE, crossfade_ms=10, sink=sink)
+    for chunk in make_chunks(total_seconds, chunk_seconds):
+        assembler.append(chunk)
+    assembler.finalize()
+    return written[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio assembly benchmark / Đo hiệu năng ghép audio")
+    parser.add_argument("--minutes", type=float, default=60.0, help="Chapter length in minutes")
+    parser.add_argument("--chunk-seconds", type=float, default=18.0, help="Average chunk length")
+    args = parser.parse_args()
+
+    total_seconds = args.minutes * 60
+    audio_mib = total_seconds * SAMPLE_RATE * 4 / 2**20
+    print("=" * 70)
+    print(f"Chunk assembly: {args.minutes:.0f} min @ {SAMPLE_RATE} Hz (float32 audio = {audio_mib:.1f} MiB)")
+    print(f"Ghép chunk: {args.minutes:.0f} phút @ {SAMPLE_RATE} Hz (audio float32 = {audio_mib:.1f} MiB)")
+    print("=" * 70)
+
+    baseline, base_peak = measure("list + np.concatenate", lambda: run_list_concat(total_seconds, args.chunk_seconds))
+    assembled, asm_peak = measure("AudioAssembler (preallocated)", lambda: run_assembler(total_seconds, args.chunk_seconds))
+    _, sink_peak = measure("AudioAssembler (streaming sink)", lambda: run_assembler_sink(total_seconds, args.chunk_seconds))
+
+    identical = np.array_equal(baseline, assembled)
+    print(f"  Identical output / Đầu ra giống hệt: {identical}")
+    print(f"  Peak reduction / Giảm bộ nhớ đỉnh: {base_peak / max(asm_peak, 1):.2f}x (buffer), "
+          f"{base_peak / max(sink_peak, 1):.1f}x (sink)")
+    del baseline, assembled
+
+    print()
+    print("=" * 70)
+    print("Speed change on a 60 s clip / Đổi tốc độ trên đoạn 60 s")
+    print("=" * 70)
+    clip = next(make_chunks(60, 60, seed=1))
+    clip = np.resize(clip, 60 * SAMPLE_RATE)
+    speed = 0.9
+
+    def interp():
+        n = len(clip)
+        target = int(n / speed)
+        return np.interp(np.linspace(0, n - 1, target), np.arange(n), clip).astype(np.float32)
+
+    ref, interp_peak = measure("np.interp (float64 intermediates)", interp)
+    out, speed_peak = measure("change_speed (float32)", lambda: change_speed(clip, speed))
+    print(f"  Max abs difference / Sai khác tối đa: {np.abs(ref - out).max():.2e}")
+    print(f"  Peak reduction / Giảm bộ nhớ đỉnh: {interp_peak / max(speed_peak, 1):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark Text Chunker
+Đo hiệu năng Chia nhỏ Văn bản
+
+Chunks a full novel with the previous greedy splitter and with the length-balanced
+streaming chunker, and reports throughput (characters per second), chunk count,
+length mean / standard deviation / coefficient of variation, and how many chunks
+are short tails (< 25% of max_chars). The novel is read from --file (UTF-8 text,
+streamed line by line) or generated from Vietnamese sentences when omitted.
+
+Chia một tiểu thuyết bằng bộ chia tham lam trước đây và bằng bộ chia streaming cân
+bằng độ dài, báo cáo thông lượng (ký tự mỗi giây), số chunk, trung bình / độ lệch
+chuẩn / hệ số biến thiên độ dài, và số chunk đuôi ngắn (< 25% max_chars). Tiểu
+thuyết được đọc từ --file (văn bản UTF-8, đọc dần từng dòng) hoặc được tạo từ các
+câu tiếng Việt nếu không chỉ định.
+
+Usage / Cách dùng:
+    python benchmark_text_chunker.py [--file novel.txt] [--max-chars 256] [--chars 2000000]
+"""
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from tts_backend.text_chunker import iter_text_chunks
+
+SENTENCES = [
+    "Màn đêm buông xuống thị trấn nhỏ ven sông.",
+    "Những ngọn đèn dầu lần lượt được thắp lên, hắt ánh sáng vàng vọt lên mặt nước.",
+    "Anh có nghe thấy tiếng gì không?",
+    "Ông Trần V. B. từ TP. Hồ Chí Minh trở về sau mười năm xa cách, mang theo một chiếc va li cũ và rất nhiều kỷ niệm.",
+    "\"Cẩn thận đấy. Giờ này chẳng ai tới thăm đâu.\"",
+    "Gió lạnh.",
+    "Bà cụ bán nước đầu ngõ dọn hàng muộn hơn mọi ngày, như đang chờ đợi một ai đó mà chính bà cũng không nhớ rõ là ai, chỉ biết rằng người ấy đã hứa sẽ quay lại trước mùa lũ năm nay.",
+]
+
+
+def greedy_split(text: str, max_chars: int) -> List[str]:
+    """Previous greedy splitter, kept as the baseline / Bộ chia tham lam trước đây, giữ làm mốc so sánh"""
+    sentences = re.split(r"(?<=[\.\!\?\…。．！？])\s+", text.strip())
+    chunks: List[str] = []
+    buffer = ""
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            candidate = f"{buffer} {sentence}".strip() if buffer else sentence
+            if len(candidate) <= max_chars:
+                buffer = candidate
+            else:
+                if buffer:
+                    chunks.append(buffer)
+                buffer = sentence
+            continue
+        if buffer:
+            chunks.append(buffer)
+            buffer = ""
+        current = ""
+        for word in sentence.split():
+            candidate = f"{current} {word}".strip() if current else word
+            if len(candidate) > max_chars and current:
+                chunks.append(current)
+                current = word
+            else:
+                current = candidate
+        if current:
+            chunks.append(current)
+    if buffer:
+        chunks.append(buffer)
+    return chunks
+
+
+def make_novel(total_chars: int, seed: int = 0) -> str:
+    """Synthetic novel with paragraphs / Tiểu thuyết tổng hợp có phân đoạn"""
+    rng = random.Random(seed)
+    paragraphs, size = [], 0
+    while size < total_chars:
+        paragraph = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 8)))
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def report(label: str, lengths: List[int], seconds: float, chars: int, max_chars: int):
+    mean = statistics.mean(lengths)
+    stdev = statistics.pstdev(lengths)
+    tails = sum(1 for length in lengths if length < 0.25 * max_chars)
+    print(f"{label:<10} {chars / seconds / 1e6:>8.2f} {len(lengths):>8} {mean:>7.1f} {stdev:>7.1f} "
+          f"{stdev / mean:>6.2f} {max(lengths):>5} {tails:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text chunker benchmark / Đo hiệu năng chia văn bản")
+    parser.add_argument("--file", type=Path, help="UTF-8 novel to chunk")
+    parser.add_argument("--max-chars", type=int, default=256, help="Maximum characters per chunk")
+    parser.add_argument("--chars", type=int, default=2_000_000, help="Synthetic novel size when --file is omitted")
+    args = parser.parse_args()
+
+    if args.file:
+        text = args.file.read_text(encoding="utf-8")
+    else:
+        text = make_novel(args.chars)
+
+    print("=" * 66)
+    print(f"Chunking {len(text):,} chars, max_chars={args.max_chars} / Chia {len(text):,} ký tự")
+    print("=" * 66)
+    print(f"{'chunker':<10} {'Mchar/s':>8} {'chunks':>8} {'mean':>7} {'stdev':>7} {'cv':>6} {'max':>5} {'tails':>6}")
+
+    start = time.perf_counter()
+    greedy = greedy_split(text, args.max_chars)
+    report("greedy", [len(c) for c in greedy], time.perf_counter() - start, len(text), args.max_chars)
+
+    # Streamed: only lengths are kept, never the full chunk list
+    # Streaming: chỉ giữ độ dài, không bao giờ giữ toàn bộ danh sách chunk
+    start = time.perf_counter()
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            lengths = [len(chunk) for chunk in iter_text_chunks(f, max_chars=args.max_chars)]
+    else:
+        lengths = [len(chunk) for chunk in iter_text_chunks(text, max_chars=args.max_chars)]
+    report("balanced", lengths, time.perf_counter() - start, len(text), args.max_chars)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark Batched VieNeu-TTS Inference
+Đo hiệu năng Suy luận VieNeu-TTS theo Batch
+
+Synthesizes one long paragraph (split into chunks like auto_chunk does) with the
+sequential per-chunk infer() loop (batch size 1) and with batched backbone/codec
+passes, and reports wall time, chunks per second and real-time factor for each
+batch size. Runs on CPU by default, where the sequential loop is slowest.
+
+Tổng hợp một đoạn văn dài (chia chunk như auto_chunk) bằng vòng lặp infer() tuần
+tự từng chunk (batch size 1) và bằng các lần chạy backbone/codec theo batch, báo
+cáo thời gian, số chunk mỗi giây và hệ số thời gian thực cho mỗi batch size. Mặc
+định chạy trên CPU, nơi vòng lặp tuần tự chậm nhất.
+
+Usage / Cách dùng:
+    python benchmark_vieneu_batch.py [--batch-sizes 1 2 4 8] [--chunks 8] [--device cpu] [--voice id_0002]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+SENTENCES = [
+    "Màn đêm buông xuống thị trấn nhỏ ven sông, những ngọn đèn dầu lần lượt được thắp lên.",
+    "Tiếng chó sủa xa xa hòa cùng tiếng côn trùng rả rích trong bụi cỏ ven đường.",
+    "Bà cụ bán nước đầu ngõ dọn hàng muộn hơn mọi ngày, như đang chờ đợi một ai đó.",
+    "Gió từ mặt sông thổi vào mang theo hơi lạnh và mùi phù sa quen thuộc.",
+]
+
+
+def make_chunks(count: int, max_chars: int):
+    """Chunks as produced by auto_chunk / Các chunk như auto_chunk tạo ra"""
+    from tts_backend.text_chunker import split_text_into_chunks
+
+    text = " ".join(SENTENCES[i % len(SENTENCES)] for i in range(count))
+    return split_text_into_chunks(text, max_chars=max_chars)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VieNeu batched inference benchmark / Đo hiệu năng suy luận batch VieNeu")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8], help="Batch sizes (1 = sequential)")
+    parser.add_argument("--chunks", type=int, default=8, help="Sentences in the paragraph")
+    parser.add_argument("--max-chars", type=int, default=100, help="Maximum characters per chunk")
+    parser.add_argument("--device", default="cpu", help="Device (cpu/cuda)")
+    parser.add_argument("--voice", default="id_0002", help="Reference voice ID")
+    args = parser.parse_args()
+
+    import torch
+    from tts_backend.models.vieneu_tts import VieNeuTTSWrapper
+    from tts_backend.voice_selector import select_voice
+
+    chunks = make_chunks(args.chunks, args.max_chars)
+    ref_audio_path, ref_text_path = select_voice(voice=args.voice)
+    ref_text = ref_text_path.read_text(encoding="utf-8").strip()
+
+    print("=" * 78)
+    print("VieNeu-TTS: sequential vs batched chunks / Chunk tuần tự so với theo batch")
+    print("=" * 78)
+    tts = VieNeuTTSWrapper(device=args.device)
+    if not tts.supports_batching():
+        print("⚠️  Backbone does not support batched generate(); every batch size runs sequentially")
+        print("⚠️  Backbone không hỗ trợ generate() theo batch; mọi batch size đều chạy tuần tự")
+    ref_codes = tts.get_ref_codes(str(ref_audio_path))
+    tts.infer_batch(chunks[:1], ref_codes, ref_text)  # Warm-up / Khởi động
+    print(f"{len(chunks)} chunks on {args.device}, {torch.get_num_threads()} CPU threads")
+    print(f"{'batch':>5} {'time s':>8} {'chunks/s':>9} {'audio s':>8} {'RTF':>6} {'speedup':>8}")
+
+    baseline = None
+    for batch_size in args.batch_sizes:
+        torch.manual_seed(0)
+        start = time.perf_counter()
+        wavs = []
+        for i in range(0, len(chunks), batch_size):
+            wavs.extend(tts.infer_batch(chunks[i:i + batch_size], ref_codes, ref_text))
+        elapsed = time.perf_counter() - start
+        audio_seconds = sum(len(w) for w in wavs) / tts.sample_rate
+        baseline = baseline or elapsed
+        print(f"{batch_size:>5} {elapsed:>8.1f} {len(chunks) / elapsed:>9.2f} {audio_seconds:>8.1f} "
+              f"{elapsed / max(audio_seconds, 1e-9):>6.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
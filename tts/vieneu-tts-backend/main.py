@@ -19,6 +19,7 @@ import uvicorn
 # Import TTS backend
 from tts_backend.service import get_service
 from tts_backend.api import router
+from tts_backend.voice_registry import get_voice_registry
 from tts_backend.logging_utils import setup_logging, get_logger
 
 setup_logging()
@@ -37,6 +38,9 @@ app = FastAPI(
 async def startup_event():
     """Initialize TTS service and preload Dia model at startup / Khởi tạo dịch vụ TTS và tải trước model Dia khi khởi động"""
     logger.info("Starting TTS Backend (VieNeu-TTS environment)")
+    # Voices are read once here; the model encodes them when it loads
+    # Giọng được đọc một lần ở đây; model mã hóa chúng khi tải
+    get_voice_registry()
     service = get_service()
     logger.info("TTS Backend ready with default model %s", service.default_model)
 
@@ -83,7 +87,9 @@ if __name__ == "__main__":
     # Register cleanup on exit / Đăng ký dọn dẹp khi thoát
     def cleanup_on_exit():
         from tts_backend.storage import get_storage
+        from tts_backend.prefetch import get_prefetch_scheduler
         try:
+            get_prefetch_scheduler().shutdown()
             storage = get_storage()
             storage.shutdown()
         except Exception:
@@ -0,0 +1,83 @@
+"""
+Decode pipeline tests - ordering, error propagation and cancellation
+Kiểm thử pipeline giải mã - thứ tự, lan truyền lỗi và hủy
+"""
+
+import threading
+import time
+
+import pytest
+
+from tts_backend.decode_pipeline import DecodePipeline
+
+
+def test_results_reach_sink_in_submission_order():
+    """Test that decoded items arrive in order and stats count every item"""
+    received = []
+
+    def decode(item):
+        time.sleep(0.002 * (item % 3))
+        return item * 10
+
+    pipeline = DecodePipeline(decode, received.append, depth=2)
+    for item in range(10):
+        pipeline.submit(item, generate_seconds=0.001)
+    stats = pipeline.close()
+
+    assert received == [item * 10 for item in range(10)]
+    assert stats["items"] == 10
+    assert stats["max_queue_depth"] <= 2
+
+
+def test_decode_error_propagates_to_producer():
+    """Test that a decode failure is raised by a later submit() or by close()"""
+    received = []
+
+    def decode(item):
+        if item == 1:
+            raise RuntimeError("codec failed")
+        return item
+
+    pipeline = DecodePipeline(decode, received.append, depth=1)
+    with pytest.raises(RuntimeError, match="codec failed"):
+        for item in range(50):
+            pipeline.submit(item)
+            time.sleep(0.001)
+        pipeline.close()
+
+    pipeline.cancel()
+    assert received == [0]
+
+
+def test_close_raises_error_of_last_item():
+    """Test that close() reports a failure of the final decode"""
+    pipeline = DecodePipeline(lambda item: 1 / 0, lambda result: None)
+    pipeline.submit(0)
+    with pytest.raises(ZeroDivisionError):
+        pipeline.close()
+
+
+def test_cancel_drains_queue_without_decoding():
+    """Test that cancel() discards queued items and stops the worker"""
+    gate = threading.Event()
+    decoded = []
+
+    def decode(item):
+        gate.wait(2)
+        decoded.append(item)
+        return item
+
+    pipeline = DecodePipeline(decode, lambda result: None, depth=2)
+    pipeline.submit(0)
+    pipeline.submit(1)
+    pipeline.submit(2)
+
+    canceller = threading.Thread(target=pipeline.cancel)
+    canceller.start()
+    time.sleep(0.02)
+    gate.set()
+    canceller.join(2)
+
+    assert not canceller.is_alive()
+    assert not pipeline._worker.is_alive()
+    assert decoded == [0]
@@ -0,0 +1,98 @@
+"""
+Prefetch tests - interactive requests preempt background work
+Kiểm thử tải trước - request tương tác chen trước công việc nền
+"""
+
+import threading
+import time
+
+from tts_backend.prefetch import PrefetchHint, PrefetchScheduler, PriorityLock
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_interactive_goes_before_waiting_background():
+    """Test that a queued interactive request is served before a queued background job"""
+    lock = PriorityLock()
+    order = []
+    lock.acquire()
+
+    def run(name, background):
+        with lock.hold(background=background):
+            order.append(name)
+
+    background = threading.Thread(target=run, args=("background", True))
+    background.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=run, args=("interactive", False))
+    interactive.start()
+    _wait_until(lambda: lock._waiting_interactive == 1)
+    lock.release()
+    background.join(timeout=2)
+    interactive.join(timeout=2)
+    assert order == ["interactive", "background"]
+
+
+def test_background_yields_between_chunks():
+    """Test that a running background job hands the lock to an interactive request between chunks"""
+    lock = PriorityLock()
+    order = []
+    interactive_waiting = threading.Event()
+
+    def background_job():
+        with lock.hold(background=True):
+            order.append("chunk-1")
+            interactive_waiting.wait(timeout=2)
+            _wait_until(lambda: lock._waiting_interactive == 1)
+            assert lock.yield_to_interactive()
+            order.append("chunk-2")
+
+    def interactive_request():
+        interactive_waiting.set()
+        with lock.hold():
+            order.append("interactive")
+
+    worker = threading.Thread(target=background_job)
+    worker.start()
+    _wait_until(lambda: order == ["chunk-1"])
+    interactive_request()
+    worker.join(timeout=2)
+    assert order == ["chunk-1", "interactive", "chunk-2"]
+
+
+def test_yield_without_waiters_keeps_lock():
+    """Test that yielding with nobody waiting is a no-op"""
+    lock = PriorityLock()
+    with lock.hold(background=True):
+        assert not lock.yield_to_interactive()
+        assert lock._held
+
+
+def test_hit_rate_counts_only_hinted_lookups():
+    """Test that lookups without a hint change cache coverage but not the prefetch hit rate"""
+    done = threading.Event()
+    scheduler = PrefetchScheduler(runner=lambda hint: done.set(), idle_seconds=0)
+    scheduler.submit("s", [PrefetchHint("s", "ready", {})])
+    _wait_until(lambda: scheduler.get_stats()["hints_completed"] == 1)
+
+    with scheduler.interactive():
+        scheduler.submit("s", [PrefetchHint("s", "pending", {})])
+        scheduler.record_lookup("ready", hit=True)
+        scheduler.record_lookup("pending", hit=False)
+        for key in ("cold-1", "cold-2", "cold-3"):
+            scheduler.record_lookup(key, hit=False)
+        scheduler.record_lookup("ready", hit=True)  # Replay of an already-counted prefetch
+    scheduler.shutdown()
+
+    stats = scheduler.get_stats()
+    assert stats["hits_prefetched"] == 1
+    assert stats["misses_pending"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["cache_hit_rate"] == 2 / 6
+    assert stats["utilization"] == 1.0
+    assert stats["pending"] == 0
@@ -0,0 +1,22 @@
+"""
+Shared module tests - helpers copied between backends must stay identical
+Kiểm thử module dùng chung - các helper sao chép giữa các backend phải giống hệt
+"""
+
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1] / "tts_backend"
+APP_BACKEND = Path(__file__).resolve().parents[3] / "app" / "tts_backend"
+
+SHARED_MODULES = ["audio_dsp.py", "text_chunker.py", "token_predictor.py"]
+
+
+@pytest.mark.parametrize("name", SHARED_MODULES)
+def test_copy_matches_app(name):
+    """Test that this backend's copy has the same content as app/tts_backend"""
+    reference = APP_BACKEND / name
+    if not reference.exists():
+        pytest.skip("app/tts_backend not checked out")
+    assert (BACKEND / name).read_bytes() == reference.read_bytes(), f"{name} differs from app/tts_backend/{name}"
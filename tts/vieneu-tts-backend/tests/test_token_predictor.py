@@ -0,0 +1,68 @@
+"""
+Token predictor tests - censored (truncated) runs and batched persistence
+Kiểm thử bộ dự đoán token - lần chạy bị cắt và lưu theo lô
+"""
+
+import json
+
+from tts_backend.token_predictor import TokenPredictor
+
+TEXT = "[01] Một câu thoại vừa phải, có dấu phẩy và dấu chấm."
+
+
+def _train(predictor, tokens, count):
+    for _ in range(count):
+        predictor.observe(TEXT, 1.0, needed_tokens=tokens, max_tokens=4096, truncated=False)
+
+
+def test_truncated_samples_do_not_shrink_budget(tmp_path):
+    """Test that truncated runs (lower bounds) never lower the predicted max_tokens"""
+    predictor = TokenPredictor(str(tmp_path / "state.json"), min_samples=4)
+    _train(predictor, 1000, 10)
+    before = predictor.predict(TEXT, heuristic_tokens=4096)
+
+    # Budget ran out at 600 tokens many times: the true length is >= 600, not 600
+    for _ in range(20):
+        predictor.observe(TEXT, 1.0, needed_tokens=600, max_tokens=600, truncated=True)
+    after = predictor.predict(TEXT, heuristic_tokens=4096)
+
+    assert after["expected_tokens"] == before["expected_tokens"]
+    assert after["max_tokens"] >= before["max_tokens"]
+
+
+def test_truncation_above_prediction_widens_margin(tmp_path):
+    """Test that a truncated run longer than predicted widens the safety margin"""
+    predictor = TokenPredictor(str(tmp_path / "state.json"), min_samples=4)
+    _train(predictor, 1000, 10)
+    before = predictor.predict(TEXT, heuristic_tokens=4096)
+
+    predictor.observe(TEXT, 1.0, needed_tokens=1600, max_tokens=1600, truncated=True)
+    after = predictor.predict(TEXT, heuristic_tokens=4096)
+
+    assert after["expected_tokens"] == before["expected_tokens"]
+    assert after["margin"] > before["margin"]
+
+
+def test_only_truncated_runs_never_trust_a_model(tmp_path):
+    """Test that a speaker seen only through truncated runs falls back to the heuristic"""
+    predictor = TokenPredictor(str(tmp_path / "state.json"), min_samples=2)
+    for _ in range(5):
+        predictor.observe(TEXT, 1.0, needed_tokens=800, max_tokens=800, truncated=True)
+    assert predictor.predict(TEXT, heuristic_tokens=4096) is None
+
+
+def test_saves_are_batched_and_log_rotates(tmp_path):
+    """Test that state is written every save_every observations and the log is capped"""
+    state_path = tmp_path / "state.json"
+    predictor = TokenPredictor(str(state_path), save_every=5, save_interval_seconds=3600, max_log_bytes=600)
+
+    _train(predictor, 900, 4)
+    assert not state_path.exists()
+    _train(predictor, 900, 1)
+    assert json.loads(state_path.read_text())["metrics"]["observations"] == 5
+
+    _train(predictor, 900, 10)
+    predictor.flush()
+    log_path = state_path.with_suffix(".jsonl")
+    assert log_path.with_suffix(".jsonl.1").exists()
+    assert log_path.stat().st_size < 600 + 5 * 300
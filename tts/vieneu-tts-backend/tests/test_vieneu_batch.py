@@ -0,0 +1,94 @@
+"""
+VieNeu batch decode tests - row padding and trimming with a stub codec
+Kiểm thử giải mã theo batch VieNeu - pad và cắt hàng với codec giả
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+vieneu_tts = pytest.importorskip("tts_backend.models.vieneu_tts", exc_type=ImportError)
+
+SAMPLES_PER_CODE = 4
+
+
+class _StubCodec:
+    """Decodes each code c into SAMPLES_PER_CODE samples of value c and records its input"""
+
+    device = "cpu"
+
+    def __init__(self):
+        self.inputs = []
+
+    def decode_code(self, codes):
+        self.inputs.append(codes.clone())
+        return codes.float().repeat_interleave(SAMPLES_PER_CODE, dim=-1)
+
+
+def _decode(speech_ids):
+    codec = _StubCodec()
+    wrapper = SimpleNamespace(model=SimpleNamespace(codec=codec))
+    return vieneu_tts.VieNeuTTSWrapper._decode_codes(wrapper, speech_ids), codec
+
+
+def test_rows_padded_with_last_code_and_trimmed_to_length():
+    """Test that short rows are padded with their last code and trimmed back afterwards"""
+    wavs, codec = _decode([[1, 2, 3, 4], [7, 8], [5]])
+
+    assert len(codec.inputs) == 1
+    assert codec.inputs[0].shape == (3, 1, 4)
+    assert codec.inputs[0][1, 0].tolist() == [7, 8, 8, 8]
+    assert codec.inputs[0][2, 0].tolist() == [5, 5, 5, 5]
+
+    assert [len(wav) for wav in wavs] == [16, 8, 4]
+    np.testing.assert_array_equal(wavs[1], np.repeat([7.0, 8.0], SAMPLES_PER_CODE))
+    np.testing.assert_array_equal(wavs[2], np.full(SAMPLES_PER_CODE, 5.0))
+
+
+def test_empty_rows_decode_to_empty_audio():
+    """Test that a row without speech tokens yields an empty waveform"""
+    wavs, _ = _decode([[3, 3], []])
+    assert [len(wav) for wav in wavs] == [8, 0]
+
+    wavs, codec = _decode([[], []])
+    assert [len(wav) for wav in wavs] == [0, 0]
+    assert codec.inputs == []
+
+
+def _synthesis_wrapper(monkeypatch, batched):
+    """Wrapper stub whose chunks synthesize to one sample per character"""
+    monkeypatch.setattr(vieneu_tts, "VIENEU_PIPELINE_ENABLED", True)
+    wrapper = SimpleNamespace(
+        sample_rate=24000,
+        model=SimpleNamespace(infer=lambda text, ref_codes, ref_text: np.ones(len(text), dtype=np.float32)),
+        get_ref_codes=lambda path: "codes",
+        supports_batching=lambda: batched,
+        infer_batch=lambda chunks, ref_codes, ref_text: [np.ones(len(c), dtype=np.float32) for c in chunks],
+    )
+
+    def pipelined(chunks, ref_codes, ref_text, batch_size, assembler, between_batches=None):
+        for wav in wrapper.infer_batch(chunks, ref_codes, ref_text):
+            assembler.append(wav)
+        return {"items": -(-len(chunks) // batch_size), "overlap_seconds": 0.5}
+
+    wrapper._synthesize_pipelined = pipelined
+    return wrapper
+
+
+def test_synthesize_returns_pipeline_stats_on_request(monkeypatch):
+    """Test that return_stats gives the pipeline metrics, or None when not pipelined"""
+    text = "Một câu. " * 80
+    synthesize = vieneu_tts.VieNeuTTSWrapper.synthesize
+
+    wrapper = _synthesis_wrapper(monkeypatch, batched=True)
+    audio, stats = synthesize(wrapper, text, "ref.wav", "ref", max_chars=64, batch_size=4, return_stats=True)
+    assert stats["items"] >= 1
+    assert len(audio) > 0
+
+    audio, stats = synthesize(wrapper, text, "ref.wav", "ref", max_chars=64, batch_size=1, return_stats=True)
+    assert stats is None
+    audio, stats = synthesize(wrapper, "Ngắn.", "ref.wav", "ref", return_stats=True)
+    assert stats is None
+    assert isinstance(synthesize(wrapper, "Ngắn.", "ref.wav", "ref"), np.ndarray)
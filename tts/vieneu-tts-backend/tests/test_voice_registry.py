@@ -0,0 +1,81 @@
+"""
+Voice registry tests - alias selection, encoder reuse and hot reload
+Kiểm thử sổ đăng ký giọng - chọn bí danh, dùng lại mã hóa và tải lại nóng
+"""
+
+import os
+
+import pytest
+
+from tts_backend.voice_registry import VoiceRegistry
+
+
+def _write_voice(sample_dir, voice_id, audio=b"RIFF-audio", text="Xin chào."):
+    (sample_dir / f"{voice_id}.wav").write_bytes(audio)
+    (sample_dir / f"{voice_id}.txt").write_text(text, encoding="utf-8")
+
+
+class _CountingEncoder:
+    """Encoder stub returning a marker per path and counting calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, audio_path):
+        self.calls.append(os.path.basename(audio_path))
+        return f"codes:{os.path.basename(audio_path)}:{len(self.calls)}"
+
+
+@pytest.fixture
+def sample_dir(tmp_path):
+    _write_voice(tmp_path, "id_0001", text="Giọng nam.")
+    _write_voice(tmp_path, "id_0002", text="Giọng nữ.")
+    return tmp_path
+
+
+def test_aliases_select_default_voices(sample_dir):
+    """Test that gender aliases, IDs and the fallback resolve without touching disk"""
+    registry = VoiceRegistry(sample_dir, watch_interval=0)
+
+    assert registry.select("male").voice_id == "id_0001"
+    assert registry.select("nữ").voice_id == "id_0002"
+    assert registry.select("FEMALE").voice_id == "id_0002"
+    assert registry.select("id_0002").ref_text == "Giọng nữ."
+    assert registry.select(None).voice_id == "id_0001"
+    assert registry.select("id_9999").voice_id == "id_0001"
+
+
+def test_reload_keeps_codes_of_unchanged_audio(sample_dir):
+    """Test that reloading re-encodes only voices whose audio changed"""
+    registry = VoiceRegistry(sample_dir, watch_interval=0)
+    encoder = _CountingEncoder()
+    registry.attach_encoder(encoder)
+    assert sorted(encoder.calls) == ["id_0001.wav", "id_0002.wav"]
+    male_codes = registry.select("male").ref_codes
+
+    registry.reload()
+    assert len(encoder.calls) == 2
+    assert registry.select("male").ref_codes == male_codes
+
+    _write_voice(sample_dir, "id_0002", audio=b"RIFF-new-recording", text="Giọng nữ.")
+    registry.reload()
+    assert encoder.calls[2:] == ["id_0002.wav"]
+    assert registry.select("male").ref_codes == male_codes
+    assert registry.ref_codes_for(str(sample_dir / "id_0002.wav")) == registry.select("female").ref_codes
+
+
+def test_reload_picks_up_new_voice_pairs(sample_dir):
+    """Test that a new id_*.wav/.txt pair is registered and encoded on reload"""
+    registry = VoiceRegistry(sample_dir, watch_interval=0)
+    encoder = _CountingEncoder()
+    registry.attach_encoder(encoder)
+
+    _write_voice(sample_dir, "id_0100", text="Giọng mới.")
+    (sample_dir / "id_0200.wav").write_bytes(b"RIFF-no-transcript")
+    assert registry.reload() == 3
+
+    voice = registry.select("id_0100")
+    assert voice.ref_text == "Giọng mới."
+    assert voice.ref_codes is not None
+    assert "id_0200" not in registry.list_voices()
+    assert encoder.calls[2:] == ["id_0100.wav"]
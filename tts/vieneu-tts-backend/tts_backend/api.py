@@ -3,8 +3,9 @@ TTS API Endpoints
 Điểm cuối API TTS
 """
 from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional, Literal
+from typing import Optional, Literal, List
 import soundfile as sf
 import io
 import numpy as np
@@ -12,8 +13,10 @@ import uuid
 
 from .service import get_service
 from .storage import get_storage
-from .voice_selector import select_voice, get_available_voices
+from .voice_registry import get_voice_registry
 from .logging_utils import get_logger, PerformanceTracker
+from .prefetch import PrefetchHint, build_cache_key, get_prefetch_scheduler
+from .config import PREFETCH_ENABLED, PREFETCH_EXPIRY_HOURS
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -43,6 +46,12 @@ class TTSSynthesizeRequest(BaseModel):
     store: Optional[bool] = True  # Store audio file / Lưu file audio
     expiry_hours: Optional[int] = None  # Expiration hours (None = use default)
     return_audio: Optional[bool] = True  # Return audio in response / Trả về audio trong response
+    use_cache: Optional[bool] = True  # Serve prefetched audio if available / Dùng audio đã tải trước nếu có
+
+class PrefetchRequest(BaseModel):
+    """Read-ahead prefetch request / Yêu cầu tải trước (đọc trước)"""
+    session_id: str  # Listener session; a new request replaces pending hints / Session người nghe; yêu cầu mới thay thế gợi ý đang chờ
+    items: List[TTSSynthesizeRequest]  # Upcoming paragraphs in reading order / Các đoạn sắp tới theo thứ tự đọc
 
 class ModelInfoRequest(BaseModel):
     """Model info request / Yêu cầu thông tin model"""
@@ -63,7 +72,7 @@ async def get_voices():
     Returns:
         List of available voices with gender and description / Danh sách giọng có sẵn với giới tính và mô tả
     """
-    voices = get_available_voices()
+    voices = get_voice_registry().list_voices()
     return {
         "success": True,
         "voices": voices,
@@ -90,6 +99,99 @@ async def get_model_info(request: ModelInfoRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _resolve_synthesis_params(request: TTSSynthesizeRequest, text: str, request_id: str, perf: PerformanceTracker):
+    """
+    Resolve request into service.synthesize parameters / Phân giải request thành tham số service.synthesize
+    
+    Args:
+        request: TTS synthesis request / Yêu cầu tổng hợp TTS
+        text: Validated text / Văn bản đã xác thực
+        request_id: Request ID / ID request
+        perf: Performance tracker / Bộ theo dõi hiệu suất
+        
+    Returns:
+        Tuple of (params, speaker_id) / Tuple của (params, speaker_id)
+    """
+    speaker_id = "default"
+    if request.model == "dia" and text.startswith("["):
+        end_idx = text.find("]")
+        if end_idx > 0:
+            speaker_id = text[1:end_idx]
+    
+    params = {
+        "text": text,  # Use validated text / Sử dụng text đã xác thực
+        "model": request.model,
+        "request_id": request_id,
+    }
+    
+    if request.model == "vieneu-tts":
+        params["max_chars"] = request.max_chars or 256
+        params["auto_chunk"] = request.auto_chunk if request.auto_chunk is not None else True
+        voice_strategy = "default"
+        
+        if request.voice or request.auto_voice:
+            voice_strategy = "selector"
+            with perf.stage("voice_selection", strategy="selector", voice=request.voice, auto=request.auto_voice):
+                selected = get_voice_registry().select(
+                    voice=request.voice,
+                    auto_voice=request.auto_voice or False,
+                    text=text
+                )
+                params["ref_audio_path"] = selected.audio_path
+                params["ref_text"] = selected.ref_text
+        elif request.ref_audio_path and request.ref_text:
+            voice_strategy = "custom_reference"
+            params["ref_audio_path"] = request.ref_audio_path
+            params["ref_text"] = request.ref_text
+        else:
+            with perf.stage("voice_selection", strategy="default"):
+                selected = get_voice_registry().select()
+                params["ref_audio_path"] = selected.audio_path
+                params["ref_text"] = selected.ref_text
+        perf.log("Voice prepared", strategy=voice_strategy)
+    elif request.model == "dia":
+        params.update({
+            "temperature": request.temperature,
+            "top_p": request.top_p,
+            "cfg_scale": request.cfg_scale,
+            "max_tokens": request.max_tokens,
+            "speed_factor": request.speed_factor or 1.0,
+            "trim_silence": request.trim_silence if request.trim_silence is not None else True,
+            "normalize": request.normalize if request.normalize is not None else False
+        })
+    return params, speaker_id
+
+def _cached_response(metadata: dict, request: TTSSynthesizeRequest, request_id: str):
+    """
+    Build response for audio served from the prefetch cache / Tạo phản hồi cho audio lấy từ cache tải trước
+    """
+    file_id = metadata["file_id"]
+    headers = {
+        "X-Request-ID": request_id,
+        "X-File-ID": file_id,
+        "X-Expires-At": metadata["expires_at"],
+        "X-Cache": "HIT",
+    }
+    if request.return_audio:
+        from fastapi.responses import StreamingResponse
+        audio_buffer = io.BytesIO(get_storage().get_audio(file_id))
+        headers["Content-Disposition"] = f'attachment; filename="{metadata["file_name"]}"'
+        return StreamingResponse(audio_buffer, media_type="audio/wav", headers=headers)
+    
+    from fastapi.responses import JSONResponse
+    return JSONResponse(
+        content={
+            "success": True,
+            "request_id": request_id,
+            "model": request.model,
+            "sample_rate": metadata.get("sample_rate"),
+            "duration_seconds": metadata.get("duration_seconds"),
+            "file_metadata": metadata,
+            "cached": True
+        },
+        headers=headers
+    )
+
 # Synthesize speech / Tổng hợp giọng nói
 @router.post("/synthesize")
 async def synthesize_speech(request: TTSSynthesizeRequest):
@@ -189,65 +291,26 @@ async def synthesize_speech(request: TTSSynthesizeRequest):
     perf.log("Received synthesize request", model=request.model, text_chars=len(text))
 
     try:
-        with perf.stage("request_total", model=request.model):
-            speaker_id = "default"
-            if request.model == "dia" and text.startswith("["):
-                end_idx = text.find("]")
-                if end_idx > 0:
-                    speaker_id = text[1:end_idx]
+        with get_prefetch_scheduler().interactive(), perf.stage("request_total", model=request.model):
+            params, speaker_id = _resolve_synthesis_params(request, text, request_id, perf)
+            cache_key = build_cache_key(params)
             
-            params = {
-                "text": text,  # Use validated text / Sử dụng text đã xác thực
-                "model": request.model,
-                "request_id": request_id,
-            }
-            
-            if request.model == "vieneu-tts":
-                params["max_chars"] = request.max_chars or 256
-                params["auto_chunk"] = request.auto_chunk if request.auto_chunk is not None else True
-                voice_strategy = "default"
-                
-                if request.voice or request.auto_voice:
-                    voice_strategy = "selector"
-                    with perf.stage("voice_selection", strategy="selector", voice=request.voice, auto=request.auto_voice):
-                        ref_audio_path, ref_text_path = select_voice(
-                            voice=request.voice,
-                            auto_voice=request.auto_voice or False,
-                            text=text
-                        )
-                        with open(ref_text_path, "r", encoding="utf-8") as f:
-                            ref_text = f.read()
-                        params["ref_audio_path"] = str(ref_audio_path)
-                        params["ref_text"] = ref_text
-                elif request.ref_audio_path and request.ref_text:
-                    voice_strategy = "custom_reference"
-                    params["ref_audio_path"] = request.ref_audio_path
-                    params["ref_text"] = request.ref_text
-                else:
-                    with perf.stage("voice_selection", strategy="default"):
-                        ref_audio_path, ref_text_path = select_voice(
-                            voice=None,
-                            auto_voice=False,
-                            text=text
-                        )
-                        with open(ref_text_path, "r", encoding="utf-8") as f:
-                            ref_text = f.read()
-                        params["ref_audio_path"] = str(ref_audio_path)
-                        params["ref_text"] = ref_text
-                perf.log("Voice prepared", strategy=voice_strategy)
-            elif request.model == "dia":
-                params.update({
-                    "temperature": request.temperature,
-                    "top_p": request.top_p,
-                    "cfg_scale": request.cfg_scale,
-                    "max_tokens": request.max_tokens,
-                    "speed_factor": request.speed_factor or 1.0,
-                    "trim_silence": request.trim_silence if request.trim_silence is not None else True,
-                    "normalize": request.normalize if request.normalize is not None else False
-                })
+            # Serve prefetched audio if available / Trả audio đã tải trước nếu có
+            if PREFETCH_ENABLED and request.use_cache:
+                cached = storage.find_by_cache_key(cache_key)
+                get_prefetch_scheduler().record_lookup(cache_key, hit=cached is not None)
+                if cached:
+                    perf.log("Prefetch cache hit", file_id=cached["file_id"])
+                    return _cached_response(cached, request, request_id)
             
             with perf.stage("synthesize_call", model=request.model):
-                audio = service.synthesize(**params)
+                # Off the event loop: the model lock may be held by a prefetch job
+                # Ngoài event loop: khóa model có thể đang bị job tải trước giữ
+                pipeline_stats = None
+                if request.model == "vieneu-tts":
+                    audio, pipeline_stats = await run_in_threadpool(service.synthesize, **params, return_stats=True)
+                else:
+                    audio = await run_in_threadpool(service.synthesize, **params)
             
             model_info = service.get_model_info(request.model)
             sample_rate = model_info["sample_rate"]
@@ -288,7 +351,10 @@ async def synthesize_speech(request: TTSSynthesizeRequest):
                 "model": request.model,
                 "sample_rate": sample_rate,
                 "duration_seconds": duration_seconds,
-                "file_metadata": file_metadata
+                "file_metadata": file_metadata,
+                # Decode/generate overlap of this request (None = not pipelined)
+                # Mức chồng giải mã/tạo của request này (None = không chạy pipeline)
+                "pipeline": pipeline_stats
             }
             
             if request.return_audio:
@@ -304,6 +370,8 @@ async def synthesize_speech(request: TTSSynthesizeRequest):
                         "X-Request-ID": request_id,
                         "X-File-ID": file_metadata["file_id"] if file_metadata else "",
                         "X-Expires-At": file_metadata["expires_at"] if file_metadata else "",
+                        "X-Pipeline-Batches": str(pipeline_stats["items"]) if pipeline_stats else "",
+                        "X-Pipeline-Overlap-Seconds": f"{pipeline_stats['overlap_seconds']:.3f}" if pipeline_stats else "",
                     }
                 )
             else:
@@ -521,3 +589,69 @@ async def manual_cleanup():
     result = storage.cleanup_expired()
     return {"success": True, "cleanup": result}
 
+
+# Read-ahead prefetch / Tải trước (đọc trước)
+@router.post("/prefetch")
+async def prefetch_audio(request: PrefetchRequest):
+    """
+    Submit upcoming paragraphs for idle-time synthesis / Gửi các đoạn sắp tới để tổng hợp khi rảnh
+    
+    Hints run only while no interactive request is in flight. A new submission
+    for the same session replaces hints that have not started yet.
+    Gợi ý chỉ chạy khi không có request tương tác nào. Lần gửi mới cho cùng
+    session sẽ thay thế các gợi ý chưa bắt đầu.
+    
+    Args:
+        request: Prefetch request / Yêu cầu tải trước
+        
+    Returns:
+        Accepted/superseded/skipped counts / Số gợi ý được nhận/bị thay thế/bỏ qua
+    """
+    if not PREFETCH_ENABLED:
+        return {"success": True, "enabled": False, "accepted": 0}
+    
+    storage = get_storage()
+    scheduler = get_prefetch_scheduler()
+    perf = PerformanceTracker(logger, request.session_id)
+    
+    hints = []
+    cached_keys = set()
+    skipped_invalid = 0
+    for item in request.items:
+        text = item.text.strip() if item.text else ""
+        meaningful_text = ''.join(c for c in text if c.isalnum() or c.isspace()).strip()
+        if len(meaningful_text) < 5:
+            skipped_invalid += 1
+            continue
+        
+        try:
+            params, speaker_id = _resolve_synthesis_params(item, text, str(uuid.uuid4()), perf)
+        except (FileNotFoundError, ValueError) as e:
+            logger.warning("Skipping prefetch item for session %s: %s", request.session_id, e)
+            skipped_invalid += 1
+            continue
+        
+        cache_key = build_cache_key(params)
+        if storage.find_by_cache_key(cache_key):
+            cached_keys.add(cache_key)
+        hints.append(PrefetchHint(
+            session_id=request.session_id,
+            cache_key=cache_key,
+            params=params,
+            speaker_id=speaker_id,
+            expiry_hours=item.expiry_hours or PREFETCH_EXPIRY_HOURS
+        ))
+    
+    result = scheduler.submit(request.session_id, hints, cached_keys=cached_keys)
+    return {"success": True, "enabled": True, "session_id": request.session_id, "skipped_invalid": skipped_invalid, **result}
+
+@router.delete("/prefetch/{session_id}")
+async def cancel_prefetch(session_id: str):
+    """Cancel pending prefetch hints of a session / Hủy gợi ý tải trước đang chờ của session"""
+    dropped = get_prefetch_scheduler().cancel(session_id)
+    return {"success": True, "session_id": session_id, "dropped": dropped}
+
+@router.get("/prefetch/stats")
+async def get_prefetch_stats():
+    """Get prefetch hit rate and utilization / Lấy tỷ lệ trúng và mức sử dụng tải trước"""
+    return {"success": True, "enabled": PREFETCH_ENABLED, "stats": get_prefetch_scheduler().get_stats()}
@@ -0,0 +1,217 @@
+"""
+Audio Post-processing (vectorized)
+Hậu xử lý Audio (vector hóa)
+
+NumPy implementations of the post-processing steps shared by the TTS backends:
+silence trimming, peak/dB normalization, format coercion and speed change.
+trim_silence uses a cumulative-sum RMS envelope, so every window sum costs O(1)
+instead of re-slicing a >=1000-sample window for every sample in Python.
+
+Các bước hậu xử lý dùng chung cho các backend TTS, cài đặt bằng NumPy: cắt im
+lặng, chuẩn hóa peak/dB, chuẩn hóa định dạng và đổi tốc độ. trim_silence dùng
+envelope RMS dựa trên tổng tích lũy, nên mỗi tổng cửa sổ tốn O(1) thay vì cắt lại
+cửa sổ >=1000 mẫu cho từng mẫu trong vòng lặp Python.
+"""
+import numpy as np
+
+# Samples per block in change_speed / Số mẫu mỗi khối trong change_speed
+_SPEED_BLOCK = 1 << 16
+
+
+def rms_envelope_mask(audio: np.ndarray, window_size: int, threshold: float) -> np.ndarray:
+    """
+    Boolean mask of samples whose centered window RMS exceeds threshold
+    Mặt nạ boolean các mẫu có RMS cửa sổ (căn giữa) vượt ngưỡng
+
+    Window for sample i is [i - window_size // 2, i + window_size // 2) clipped
+    to the signal, same as the original per-sample loop.
+    Cửa sổ cho mẫu i là [i - window_size // 2, i + window_size // 2) cắt theo tín
+    hiệu, giống vòng lặp từng mẫu ban đầu.
+
+    Args:
+        audio: Mono audio / Audio mono
+        window_size: RMS window length in samples / Độ dài cửa sổ RMS (mẫu)
+        threshold: RMS threshold / Ngưỡng RMS
+
+    Returns:
+        Boolean array, True where RMS > threshold / Mảng boolean, True khi RMS > ngưỡng
+    """
+    n = audio.shape[0]
+    half = window_size // 2
+    # float64 running sum keeps window sums exact enough for long clips
+    # Tổng tích lũy float64 giữ tổng cửa sổ đủ chính xác cho đoạn dài
+    cumulative = np.empty(n + 1, dtype=np.float64)
+    cumulative[0] = 0.0
+    np.cumsum(np.square(audio, dtype=np.float64), out=cumulative[1:])
+
+    index = np.arange(n)
+    starts = np.maximum(index - half, 0)
+    ends = np.minimum(index + half, n)
+    window_sums = cumulative[ends] - cumulative[starts]
+    counts = ends - starts
+    # sqrt(sum / count) > t  <=>  sum > t^2 * count (empty windows never pass)
+    # sqrt(sum / count) > t  <=>  sum > t^2 * count (cửa sổ rỗng không bao giờ vượt)
+    return window_sums > (threshold * threshold) * counts
+
+
+def trim_silence(audio: np.ndarray, threshold: float = 0.01, margin: int = 1000) -> np.ndarray:
+    """
+    Remove silence from the beginning and end of audio.
+    Cắt bỏ vùng im lặng ở đầu và cuối audio.
+
+    Only trims from start/end, never cuts content in middle.
+    Chỉ cắt từ đầu/cuối, không bao giờ cắt nội dung ở giữa.
+
+    Args:
+        audio: Audio array / Mảng audio
+        threshold: Amplitude threshold to consider as 'sound' / Ngưỡng biên độ để coi là 'có tiếng'
+        margin: Keep some samples before and after the sound region / Giữ lại một ít mẫu trước và sau vùng có tiếng
+
+    Returns:
+        Trimmed audio array (view) / Mảng audio đã cắt (view)
+    """
+    if audio.size == 0:
+        return audio
+
+    # Larger window avoids cutting on brief pauses: at least 1000 samples or 2% of audio
+    # Cửa sổ lớn hơn để tránh cắt ở khoảng tạm dừng ngắn: ít nhất 1000 mẫu hoặc 2% audio
+    window_size = min(max(1000, int(0.02 * len(audio))), len(audio))
+
+    # RMS threshold is more lenient than amplitude to keep quiet speech
+    # Ngưỡng RMS dễ hơn ngưỡng biên độ để giữ giọng nói yếu
+    non_silent_indices = np.flatnonzero(rms_envelope_mask(audio, window_size, threshold * 0.5))
+
+    if non_silent_indices.size == 0:
+        # Completely silent, return as is / Hoàn toàn im lặng, trả về như cũ
+        return audio
+
+    start = max(non_silent_indices[0] - margin, 0)
+    end = min(non_silent_indices[-1] + margin + 1, len(audio))
+    return audio[start:end]
+
+
+def normalize_audio(audio: np.ndarray, target_db: float = -3.0, max_peak: float = 0.95) -> np.ndarray:
+    """
+    Normalize audio to target dB level and prevent clipping.
+    Chuẩn hóa audio đến mức dB mục tiêu và ngăn chặn clipping.
+
+    The clipping guard and the dB gain are folded into a single multiply.
+    Giới hạn clipping và hệ số dB được gộp thành một phép nhân.
+
+    Args:
+        audio: Audio array / Mảng audio
+        target_db: Target dB level (negative value, e.g., -3.0 for -3dB) / Mức dB mục tiêu
+        max_peak: Maximum peak value to prevent clipping / Giá trị peak tối đa để ngăn clipping
+
+    Returns:
+        Normalized audio array / Mảng audio đã chuẩn hóa
+    """
+    if audio.size == 0:
+        return audio
+
+    current_max = float(max(audio.max(), -audio.min()))
+    if current_max == 0:
+        # Silent audio, return as is / Audio im lặng, trả về như cũ
+        return audio
+
+    if target_db is None:
+        if current_max <= max_peak:
+            return audio
+        gain = max_peak / current_max
+    else:
+        # Target peak in linear scale, never above max_peak
+        # Peak mục tiêu theo tỷ lệ tuyến tính, không vượt max_peak
+        gain = min(10 ** (target_db / 20.0), max_peak) / current_max
+
+    return audio * np.asarray(gain, dtype=audio.dtype if audio.dtype.kind == "f" else np.float32)
+
+
+def ensure_audio_format(audio: np.ndarray) -> np.ndarray:
+    """
+    Ensure audio is in correct format (float32, mono, clamped to [-1, 1]).
+    Đảm bảo audio ở định dạng đúng (float32, mono, giới hạn trong [-1, 1]).
+
+    Accepts lists and arrays of any dtype; clamps in place when a copy was already made.
+    Nhận list và mảng mọi dtype; giới hạn tại chỗ khi đã tạo bản sao.
+
+    Args:
+        audio: Audio array / Mảng audio
+
+    Returns:
+        Formatted audio array / Mảng audio đã định dạng
+    """
+    audio = np.asarray(audio)
+    if audio.size == 0:
+        return audio.astype(np.float32, copy=False)
+
+    owned = False
+    if audio.dtype != np.float32:
+        if np.issubdtype(audio.dtype, np.integer):
+            # Convert from integer to float / Chuyển từ integer sang float
+            max_val = np.iinfo(audio.dtype).max
+            audio = audio.astype(np.float32)
+            audio /= max_val
+        else:
+            audio = audio.astype(np.float32)
+        owned = True
+
+    # Ensure mono (average stereo channels) / Đảm bảo mono (trung bình kênh stereo)
+    if audio.ndim > 1:
+        if audio.shape[0] == 2:  # (channels, samples)
+            audio = np.mean(audio, axis=0)
+            owned = True
+        elif audio.shape[1] == 2:  # (samples, channels)
+            audio = np.mean(audio, axis=1)
+            owned = True
+        else:
+            audio = audio.flatten()
+            owned = True
+
+    # Clamp to [-1, 1]; in place when the array is already a private copy
+    # Giới hạn trong [-1, 1]; tại chỗ khi mảng đã là bản sao riêng
+    return np.clip(audio, -1.0, 1.0, out=audio if owned else None)
+
+
+def change_speed(audio: np.ndarray, speed: float) -> np.ndarray:
+    """
+    Change playback speed with float32 linear interpolation
+    Thay đổi tốc độ phát bằng nội suy tuyến tính float32
+
+    Equivalent to np.interp over np.linspace(0, n - 1, int(n / speed)) but
+    without float64 intermediates.
+    Tương đương np.interp trên np.linspace(0, n - 1, int(n / speed)) nhưng
+    không tạo mảng trung gian float64.
+
+    Args:
+        audio: Mono audio / Audio mono
+        speed: Speed factor (>1 faster, <1 slower) / Hệ số tốc độ
+
+    Returns:
+        Resampled float32 audio / Audio float32 đã lấy mẫu lại
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    original_len = audio.shape[0]
+    target_len = int(original_len / speed)
+    if speed == 1.0 or original_len < 2 or target_len < 2:
+        return audio
+    # Exact integer positions i * (n - 1) / (m - 1) = left + frac, computed in
+    # blocks so index intermediates stay small for long chapters
+    # Vị trí nguyên chính xác i * (n - 1) / (m - 1) = left + frac, tính theo khối
+    # để mảng chỉ số trung gian luôn nhỏ với chương dài
+    denominator = target_len - 1
+    out = np.empty(target_len, dtype=np.float32)
+    for start in range(0, target_len, _SPEED_BLOCK):
+        stop = min(start + _SPEED_BLOCK, target_len)
+        numerator = np.arange(start, stop, dtype=np.int64)
+        numerator *= original_len - 1
+        left, remainder = np.divmod(numerator, denominator)
+        np.minimum(left, original_len - 2, out=left)
+        frac = remainder.astype(np.float32)
+        frac /= np.float32(denominator)
+        if stop == target_len:
+            frac[-1] = 1.0  # last sample maps exactly to audio[-1] / mẫu cuối khớp audio[-1]
+        block = out[start:stop]
+        np.subtract(audio[left + 1], audio[left], out=block)
+        block *= frac
+        block += audio[left]
+    return out
@@ -66,3 +66,85 @@ STORAGE_DIR = os.getenv("TTS_STORAGE_DIR", str(BASE_DIR / "storage" / "audio"))
 DEFAULT_EXPIRY_HOURS = int(os.getenv("TTS_DEFAULT_EXPIRY_HOURS", "2"))  # Changed from 24 to 2 hours
 CLEANUP_INTERVAL_MINUTES = int(os.getenv("TTS_CLEANUP_INTERVAL_MINUTES", "30"))  # More frequent cleanup
 
+# Prefetch configuration / Cấu hình tải trước
+# Read-ahead hints are synthesized only after the interactive queue has been idle this long
+# Gợi ý đọc trước chỉ được tổng hợp sau khi hàng đợi tương tác rảnh trong khoảng thời gian này
+PREFETCH_ENABLED = os.getenv("TTS_PREFETCH_ENABLED", "true").lower() == "true"
+PREFETCH_IDLE_SECONDS = float(os.getenv("TTS_PREFETCH_IDLE_SECONDS", "1.0"))
+PREFETCH_MAX_PENDING = int(os.getenv("TTS_PREFETCH_MAX_PENDING", "64"))  # Across all sessions
+PREFETCH_EXPIRY_HOURS = int(os.getenv("TTS_PREFETCH_EXPIRY_HOURS", str(DEFAULT_EXPIRY_HOURS)))
+
+# Chunk assembly configuration / Cấu hình ghép chunk
+# Silence or crossfade applied in place between synthesized chunks (0 = plain join)
+# Khoảng lặng hoặc crossfade áp dụng tại chỗ giữa các chunk đã tổng hợp (0 = nối thẳng)
+CHUNK_PAUSE_MS = float(os.getenv("TTS_CHUNK_PAUSE_MS", "0"))
+CHUNK_CROSSFADE_MS = float(os.getenv("TTS_CHUNK_CROSSFADE_MS", "0"))
+# Chunks generated together in one backbone pass (1 = sequential infer() per chunk)
+# Số chunk tạo cùng lúc trong một lần chạy backbone (1 = infer() tuần tự từng chunk)
+# Default 1 (the proven infer() loop) until batching is benchmarked on the target hardware
+# Mặc định 1 (vòng lặp infer() đã kiểm chứng) cho đến khi batch được đo trên phần cứng đích
+VIENEU_BATCH_SIZE = int(os.getenv("VIENEU_BATCH_SIZE", "1"))
+# Batched sampling, same defaults as VieNeuTTS.infer() (used when the model does not expose its own)
+# Lấy mẫu theo batch, cùng mặc định với VieNeuTTS.infer() (dùng khi model không tự cung cấp)
+VIENEU_TEMPERATURE = float(os.getenv("VIENEU_TEMPERATURE", "1.0"))
+VIENEU_TOP_K = int(os.getenv("VIENEU_TOP_K", "50"))
+VIENEU_MIN_NEW_TOKENS = int(os.getenv("VIENEU_MIN_NEW_TOKENS", "50"))
+# Decode batch i on a worker thread while the backbone generates batch i+1.
+# Needs VIENEU_BATCH_SIZE > 1: batch size 1 keeps the verified VieNeuTTS.infer()
+# path, which generates and decodes inside one call and cannot be split. Off by
+# default because it only runs on the batched path, which is itself off until
+# benchmarked on the target hardware (benchmark_vieneu_batch.py); enable both
+# together. Per-request stage stats are returned in the "pipeline" response field
+# and the X-Pipeline-* headers.
+# Giải mã batch i trên luồng worker trong khi backbone tạo batch i+1.
+# Cần VIENEU_BATCH_SIZE > 1: batch 1 giữ đường VieNeuTTS.infer() đã kiểm chứng, vốn
+# tạo và giải mã trong một lần gọi và không tách được. Mặc định tắt vì chỉ chạy trên
+# nhánh batch, vốn cũng tắt cho đến khi được đo trên phần cứng đích
+# (benchmark_vieneu_batch.py); bật cả hai cùng lúc. Số liệu giai đoạn theo request
+# được trả về trong trường "pipeline" của phản hồi và các header X-Pipeline-*.
+VIENEU_PIPELINE_ENABLED = os.getenv("VIENEU_PIPELINE_ENABLED", "false").lower() == "true"
+VIENEU_PIPELINE_DEPTH = int(os.getenv("VIENEU_PIPELINE_DEPTH", "2"))  # Generated batches waiting for decode
+
+# Dia generation watchdog / Watchdog generation Dia
+# Forces EOS once channel-0 codes stay near-constant (silence) after speech (~86 frames per second)
+# Ép EOS khi mã kênh 0 gần như không đổi (im lặng) sau giọng nói (~86 frame mỗi giây)
+DIA_WATCHDOG_ENABLED = os.getenv("DIA_WATCHDOG_ENABLED", "true").lower() == "true"
+DIA_WATCHDOG_WINDOW = int(os.getenv("DIA_WATCHDOG_WINDOW", "86"))  # Rolling window in frames
+DIA_WATCHDOG_MAX_DISTINCT = int(os.getenv("DIA_WATCHDOG_MAX_DISTINCT", "4"))  # Distinct codes counted as silence
+DIA_WATCHDOG_PATIENCE = int(os.getenv("DIA_WATCHDOG_PATIENCE", "43"))  # Extra silent frames before stopping
+DIA_WATCHDOG_MIN_SPEECH = int(os.getenv("DIA_WATCHDOG_MIN_SPEECH", "86"))  # Speech frames required first
+
+# Dia max_tokens predictor / Bộ dự đoán max_tokens Dia
+# Online per-speaker regression replacing the len(text) * 20 heuristic once trained
+# Hồi quy trực tuyến theo người nói thay heuristic len(text) * 20 khi đã đủ dữ liệu
+DIA_TOKEN_PREDICTOR_ENABLED = os.getenv("DIA_TOKEN_PREDICTOR_ENABLED", "true").lower() == "true"
+DIA_TOKEN_PREDICTOR_PATH = os.getenv("DIA_TOKEN_PREDICTOR_PATH", str(BASE_DIR / "storage" / "dia_token_predictor.json"))
+DIA_TOKEN_PREDICTOR_MIN_SAMPLES = int(os.getenv("DIA_TOKEN_PREDICTOR_MIN_SAMPLES", "8"))  # Before a model is trusted
+DIA_TOKEN_PREDICTOR_MIN_MARGIN = float(os.getenv("DIA_TOKEN_PREDICTOR_MIN_MARGIN", "0.2"))  # Relative safety margin
+DIA_TOKEN_PREDICTOR_HEADROOM = int(os.getenv("DIA_TOKEN_PREDICTOR_HEADROOM", "256"))  # Extra tokens for the watchdog
+
+# Dia audio-prompt encoding cache / Cache mã hóa audio prompt Dia
+DIA_PROMPT_CACHE_DIR = os.getenv("DIA_PROMPT_CACHE_DIR", str(BASE_DIR / "storage" / "dia_prompts"))
+DIA_PROMPT_CACHE_MEMORY_ENTRIES = int(os.getenv("DIA_PROMPT_CACHE_MEMORY_ENTRIES", "16"))
+
+# Dia long-text chunking / Chia nhỏ văn bản dài cho Dia
+# Long text is split on speaker-tag/sentence boundaries and generated chunk by chunk.
+# Off by default: it changes the output (a pause is inserted between chunks), so callers
+# opt in per request (auto_chunk=true) or server-wide with DIA_AUTO_CHUNK=true.
+# Văn bản dài được chia tại ranh giới tag người nói/câu và tạo từng chunk.
+# Tắt mặc định: nó thay đổi đầu ra (chèn khoảng lặng giữa các chunk), nên client bật
+# theo request (auto_chunk=true) hoặc cho cả server với DIA_AUTO_CHUNK=true.
+DIA_AUTO_CHUNK = os.getenv("DIA_AUTO_CHUNK", "false").lower() == "true"
+DIA_CHUNK_MAX_CHARS = int(os.getenv("DIA_CHUNK_MAX_CHARS", "250"))
+DIA_CHUNK_PAUSE_MS = float(os.getenv("DIA_CHUNK_PAUSE_MS", "150"))  # Silence between trimmed chunks
+DIA_CHUNK_CROSSFADE_MS = float(os.getenv("DIA_CHUNK_CROSSFADE_MS", "0"))
+
+# VieNeu-TTS reference-code cache / Cache mã tham chiếu VieNeu-TTS
+# Same default directory in app and VieNeu backends so encodings are shared
+# Cùng thư mục mặc định ở app và VieNeu backend để dùng chung mã hóa
+VIENEU_REF_CODE_CACHE_DIR = os.getenv("VIENEU_REF_CODE_CACHE_DIR", str(BASE_DIR / "storage" / "vieneu_ref_codes"))
+VIENEU_REF_CODE_MEMORY_ENTRIES = int(os.getenv("VIENEU_REF_CODE_MEMORY_ENTRIES", "32"))
+VIENEU_PRELOAD_VOICES = os.getenv("VIENEU_PRELOAD_VOICES", "true").lower() == "true"  # Encode VOICE_SAMPLES on load
+# Voice registry hot reload: seconds between sample-directory checks (0 = off)
+# Tải lại nóng sổ giọng: số giây giữa các lần kiểm tra thư mục mẫu (0 = tắt)
+VOICE_REGISTRY_WATCH_SECONDS = float(os.getenv("VOICE_REGISTRY_WATCH_SECONDS", "2"))
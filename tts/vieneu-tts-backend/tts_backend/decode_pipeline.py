@@ -0,0 +1,126 @@
+"""
+Two-Stage Generate/Decode Pipeline
+Pipeline Hai Giai đoạn Tạo/Giải mã
+
+VieNeu synthesizes each chunk in two stages: the LM backbone generates speech
+tokens, then the neucodec codec decodes them to audio. Run back to back, one stage
+is always idle. DecodePipeline runs the decode stage on a worker thread fed by a
+bounded queue, so the codec decodes chunk i while the backbone generates chunk i+1.
+Decoded items reach the sink in submission order. Per-stage busy time and
+utilization are recorded.
+
+VieNeu tổng hợp mỗi chunk qua hai giai đoạn: backbone LM tạo token giọng nói, rồi
+codec neucodec giải mã thành audio. Chạy nối tiếp thì luôn có một giai đoạn rảnh.
+DecodePipeline chạy giai đoạn giải mã trên luồng worker nhận từ hàng đợi có giới
+hạn, để codec giải mã chunk i trong khi backbone tạo chunk i+1. Kết quả giải mã tới
+sink theo đúng thứ tự gửi. Thời gian bận và mức sử dụng từng giai đoạn được ghi lại.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# End-of-stream marker / Dấu kết thúc luồng
+_DONE = object()
+
+
+class DecodePipeline:
+    """Bounded hand-off from generation to a decode worker / Chuyển giao có giới hạn từ tạo sang worker giải mã"""
+
+    def __init__(self, decode_fn: Callable[[Any], Any], sink: Callable[[Any], None], depth: int = 2):
+        """
+        Start the decode worker / Khởi động worker giải mã
+
+        Args:
+            decode_fn: Decode stage (runs on the worker) / Giai đoạn giải mã (chạy trên worker)
+            sink: Receives each decoded result in order / Nhận từng kết quả giải mã theo thứ tự
+            depth: Generated items allowed to wait for decoding / Số mục đã tạo được phép chờ giải mã
+        """
+        self.decode_fn = decode_fn
+        self.sink = sink
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, depth))
+        self._error: Optional[BaseException] = None
+        self._cancelled = False
+        self._started = time.perf_counter()
+        self._stats = {
+            "items": 0,
+            "generate_seconds": 0.0,
+            "decode_seconds": 0.0,
+            "producer_blocked_seconds": 0.0,  # Generation waited on a full queue / Tạo chờ hàng đợi đầy
+            "decoder_idle_seconds": 0.0,  # Decoder waited on an empty queue / Giải mã chờ hàng đợi rỗng
+            "max_queue_depth": 0,
+        }
+        self._worker = threading.Thread(target=self._run, name="vieneu-decode", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        """Decode worker loop / Vòng lặp worker giải mã"""
+        while True:
+            wait_start = time.perf_counter()
+            item = self._queue.get()
+            self._stats["decoder_idle_seconds"] += time.perf_counter() - wait_start
+            if item is _DONE:
+                return
+            if self._error is not None or self._cancelled:
+                continue  # Drain after a failure / Xả hàng đợi sau lỗi
+            try:
+                start = time.perf_counter()
+                result = self.decode_fn(item)
+                self._stats["decode_seconds"] += time.perf_counter() - start
+                self.sink(result)
+            except BaseException as e:
+                self._error = e
+
+    def submit(self, item: Any, generate_seconds: float = 0.0):
+        """
+        Hand a generated item to the decoder (blocks while the queue is full)
+        Chuyển mục đã tạo cho bộ giải mã (chặn khi hàng đợi đầy)
+
+        Args:
+            item: Generated item / Mục đã tạo
+            generate_seconds: Time the producer spent generating it / Thời gian producer tạo mục này
+        """
+        if self._error is not None:
+            raise self._error
+        self._stats["generate_seconds"] += generate_seconds
+        self._stats["items"] += 1
+        start = time.perf_counter()
+        self._queue.put(item)
+        self._stats["producer_blocked_seconds"] += time.perf_counter() - start
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queue.qsize())
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Wait for pending decodes and return stage metrics / Chờ giải mã còn lại và trả về số liệu giai đoạn
+
+        Raises:
+            Exception: First error raised by the decode stage / Lỗi đầu tiên của giai đoạn giải mã
+        """
+        self._queue.put(_DONE)
+        self._worker.join()
+        if self._error is not None:
+            raise self._error
+        return self.get_stats()
+
+    def cancel(self):
+        """
+        Stop after a generation failure, discarding pending items
+        Dừng sau lỗi ở giai đoạn tạo, bỏ các mục đang chờ
+        """
+        self._cancelled = True
+        self._queue.put(_DONE)
+        self._worker.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Stage timings and utilization / Thời gian và mức sử dụng từng giai đoạn"""
+        wall = time.perf_counter() - self._started
+        serial = self._stats["generate_seconds"] + self._stats["decode_seconds"]
+        return {
+            **self._stats,
+            "wall_seconds": wall,
+            "generate_utilization": self._stats["generate_seconds"] / wall if wall else 0.0,
+            "decode_utilization": self._stats["decode_seconds"] / wall if wall else 0.0,
+            # Time saved relative to running both stages back to back
+            # Thời gian tiết kiệm so với chạy hai giai đoạn nối tiếp
+            "overlap_seconds": max(0.0, serial - wall),
+        }
@@ -0,0 +1,182 @@
+"""
+Dia Generation Watchdog
+Watchdog cho quá trình Generation của Dia
+
+Short lines that never emit EOS keep generating until max_tokens (>= 3072 tokens,
+~30 s), and almost all of that tail is trimmed as silence afterwards. The watchdog
+observes every sampled audio frame; once speech has been seen and the first DAC
+codebook (channel 0, which carries the coarse signal and has no delay) collapses
+to a handful of repeating codes for a sustained stretch, it forces EOS on channel 0
+so Dia's own delay-pattern countdown finishes the clip cleanly.
+
+Câu ngắn không sinh EOS sẽ tiếp tục tạo đến max_tokens (>= 3072 tokens, ~30 giây),
+và gần như toàn bộ phần đuôi đó bị cắt như im lặng sau đó. Watchdog quan sát mỗi
+frame audio được lấy mẫu; khi đã có giọng nói và codebook DAC đầu tiên (kênh 0,
+mang tín hiệu thô và không có delay) co lại còn vài mã lặp lại trong một khoảng
+đủ dài, nó ép EOS trên kênh 0 để bộ đếm delay-pattern của Dia kết thúc clip gọn gàng.
+"""
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+# DAC hop length used by Dia (samples per audio token frame at 44.1 kHz)
+# Độ dài hop DAC của Dia (số mẫu mỗi frame token audio ở 44.1 kHz)
+DIA_HOP_LENGTH = 512
+
+# Per-thread active watchdog, read by the patched sampler
+# Watchdog đang hoạt động theo từng thread, được sampler đã patch đọc
+_active = threading.local()
+_hook_lock = threading.Lock()
+
+
+class GenerationWatchdog:
+    """Rolling-window silence detector over sampled Dia frames / Bộ phát hiện im lặng cửa sổ trượt trên frame Dia"""
+
+    def __init__(
+        self,
+        max_tokens: int,
+        eos_value: Optional[int] = None,
+        window: int = 86,
+        max_distinct: int = 4,
+        patience: int = 43,
+        min_speech_frames: int = 86,
+        enabled: bool = True
+    ):
+        """
+        Initialize watchdog / Khởi tạo watchdog
+
+        Args:
+            max_tokens: Token budget of this request / Ngân sách token của request
+            eos_value: Audio EOS token forced on channel 0 / Token EOS audio ép trên kênh 0
+            window: Rolling window in frames (~86 frames per second) / Cửa sổ trượt (frame)
+            max_distinct: Window with at most this many distinct codes counts as silence
+                          Cửa sổ có tối đa số mã khác nhau này được coi là im lặng
+            patience: Silent frames (after the first silent window) before stopping
+                      Số frame im lặng (sau cửa sổ im lặng đầu tiên) trước khi dừng
+            min_speech_frames: Speech frames required before stopping is allowed
+                               Số frame giọng nói cần có trước khi được phép dừng
+            enabled: Only observe (never stop) when False / Chỉ quan sát (không dừng) khi False
+        """
+        self.max_tokens = max_tokens
+        self.eos_value = eos_value
+        self.window = max(8, window)
+        self.max_distinct = max(1, max_distinct)
+        self.patience = max(0, patience)
+        self.min_speech_frames = max(0, min_speech_frames)
+        self.enabled = enabled and eos_value is not None
+
+        self._codes: deque = deque(maxlen=self.window)
+        self._counts: Counter = Counter()
+        self.frames = 0
+        self.speech_frames = 0
+        self.silent_run = 0
+        self.stopped_early = False
+        self.stop_frame: Optional[int] = None
+
+    def observe(self, frame) -> bool:
+        """
+        Observe one sampled frame / Quan sát một frame đã lấy mẫu
+
+        Args:
+            frame: Sampled codes for all channels (tensor or sequence) / Mã đã lấy mẫu cho mọi kênh
+
+        Returns:
+            True if EOS should be forced now / True nếu cần ép EOS ngay
+        """
+        code = int(frame[0])
+        self.frames += 1
+
+        if len(self._codes) == self.window:
+            oldest = self._codes[0]
+            self._counts[oldest] -= 1
+            if not self._counts[oldest]:
+                del self._counts[oldest]
+        self._codes.append(code)
+        self._counts[code] += 1
+
+        if len(self._codes) < self.window or len(self._counts) > self.max_distinct:
+            # Window still has varied codes: speech / Cửa sổ còn đa dạng mã: giọng nói
+            self.speech_frames += 1
+            self.silent_run = 0
+            return False
+
+        self.silent_run += 1
+        if (
+            self.enabled
+            and not self.stopped_early
+            and self.speech_frames >= self.min_speech_frames
+            and self.silent_run > self.patience
+        ):
+            self.stopped_early = True
+            self.stop_frame = self.frames
+            return True
+        return False
+
+    @property
+    def trailing_silent_frames(self) -> int:
+        """Frames of the current silent tail (window + run) / Số frame của đuôi im lặng hiện tại"""
+        return self.window - 1 + self.silent_run if self.silent_run else 0
+
+    def get_stats(self, generated_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Per-request generation statistics / Thống kê generation theo request
+
+        Args:
+            generated_tokens: Override when frames were not observed (hook unavailable)
+                              Giá trị thay thế khi không quan sát được frame (không có hook)
+        """
+        generated = self.frames if self.frames else (generated_tokens or 0)
+        wasted = min(self.trailing_silent_frames, generated)
+        return {
+            "max_tokens": self.max_tokens,
+            "generated_tokens": generated,
+            "wasted_tokens": wasted,
+            "wasted_ratio": wasted / generated if generated else 0.0,
+            "unused_budget_ratio": max(0, self.max_tokens - generated) / self.max_tokens if self.max_tokens else 0.0,
+            "stopped_early": self.stopped_early,
+            "stop_frame": self.stop_frame,
+            "observed": self.frames > 0,
+        }
+
+
+def install_sampler_hook(dia_model_module) -> bool:
+    """
+    Wrap dia.model._sample_next_token so the active watchdog sees every frame
+    Bọc dia.model._sample_next_token để watchdog đang hoạt động thấy mọi frame
+
+    Args:
+        dia_model_module: Imported dia.model module / Module dia.model đã import
+
+    Returns:
+        True if the hook is (already) installed / True nếu hook đã được cài
+    """
+    with _hook_lock:
+        original = getattr(dia_model_module, "_sample_next_token", None)
+        if original is None:
+            return False
+        if getattr(original, "_watchdog_hook", False):
+            return True
+
+        def _watched_sample_next_token(*args, **kwargs):
+            pred = original(*args, **kwargs)
+            watchdog = getattr(_active, "watchdog", None)
+            if watchdog is not None and watchdog.observe(pred):
+                pred = pred.clone()
+                pred[0] = watchdog.eos_value
+            return pred
+
+        _watched_sample_next_token._watchdog_hook = True
+        dia_model_module._sample_next_token = _watched_sample_next_token
+        return True
+
+
+@contextmanager
+def watch(watchdog: GenerationWatchdog):
+    """Make watchdog active for generate() calls in this thread / Kích hoạt watchdog cho generate() trong thread này"""
+    previous = getattr(_active, "watchdog", None)
+    _active.watchdog = watchdog
+    try:
+        yield watchdog
+    finally:
+        _active.watchdog = previous
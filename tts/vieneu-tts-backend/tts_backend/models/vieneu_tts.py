@@ -9,10 +9,12 @@ NO PATCHES NEEDED - We're using VieNeu-TTS's working environment!
 KHÔNG CẦN PATCH - Chúng ta đang sử dụng môi trường hoạt động của VieNeu-TTS!
 """
 import sys
+import re
+import time
 import warnings
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional, Tuple, Union
 import torch
 import soundfile as sf
 import numpy as np
@@ -62,6 +64,17 @@ except ImportError:
 # Import chunking utilities at module level (not on every synthesize call)
 # Import tiện ích chunking ở cấp module (không phải mỗi lần gọi synthesize)
 from ..text_chunker import split_text_into_chunks, should_chunk_text
+from ..audio_assembly import AudioAssembler, estimate_samples
+from ..config import (
+    CHUNK_PAUSE_MS, CHUNK_CROSSFADE_MS, VIENEU_PRELOAD_VOICES, VIENEU_BATCH_SIZE,
+    VIENEU_PIPELINE_ENABLED, VIENEU_PIPELINE_DEPTH, VIENEU_TEMPERATURE, VIENEU_TOP_K, VIENEU_MIN_NEW_TOKENS
+)
+from ..decode_pipeline import DecodePipeline
+from ..ref_code_cache import get_ref_code_cache
+from ..voice_registry import get_voice_registry
+
+# Speech token emitted by the backbone / Token giọng nói do backbone sinh ra
+_SPEECH_TOKEN = re.compile(r"<\|speech_(\d+)\|>")
 
 
 class VieNeuTTSWrapper:
@@ -125,9 +138,174 @@ class VieNeuTTSWrapper:
         
         self.logger.info("VieNeu-TTS loaded successfully")
         
-        # Cache for reference audio encodings (key: ref_audio_path, value: ref_codes)
-        # Cache cho mã hóa audio tham chiếu (key: ref_audio_path, value: ref_codes)
-        self._ref_codes_cache = {}
+        # Reference encodings: shared on-disk .npy cache with in-memory LRU
+        # Mã hóa tham chiếu: cache .npy trên disk dùng chung với LRU bộ nhớ
+        self.ref_code_cache = get_ref_code_cache()
+        if VIENEU_PRELOAD_VOICES:
+            self.preload_voices()
+    
+    def get_ref_codes(self, ref_audio_path: str) -> torch.Tensor:
+        """
+        Reference codes for an audio file (encoded once, then cached)
+        Mã tham chiếu cho file audio (mã hóa một lần, sau đó cache)
+        """
+        # Registered voices already hold their codes / Giọng đã đăng ký đã giữ sẵn mã
+        codes = get_voice_registry().ref_codes_for(ref_audio_path)
+        if codes is not None:
+            return codes
+        return self._load_ref_codes(ref_audio_path)
+    
+    def _load_ref_codes(self, ref_audio_path: str) -> torch.Tensor:
+        """Reference codes from the shared cache / Mã tham chiếu từ cache chung"""
+        return self.ref_code_cache.get_or_encode_tensor(ref_audio_path, self.model.encode_reference)
+    
+    def preload_voices(self):
+        """
+        Encode registered voices ahead of requests (and on every hot reload)
+        Mã hóa các giọng đã đăng ký trước request (và mỗi lần tải lại nóng)
+        """
+        get_voice_registry().attach_encoder(self._load_ref_codes)
+    
+    def supports_batching(self) -> bool:
+        """
+        Whether the loaded backbone can run batched generate() (PyTorch backbone only)
+        Backbone đã tải có chạy được generate() theo batch không (chỉ backbone PyTorch)
+        """
+        return (
+            hasattr(self.model, "backbone")
+            and hasattr(self.model, "_apply_chat_template")
+            and not getattr(self.model, "_is_quantized_model", False)
+        )
+    
+    def _sampling_params(self) -> dict:
+        """
+        Sampling settings for batched generate(), taken from the model when it defines them
+        Thiết lập lấy mẫu cho generate() theo batch, lấy từ model nếu model có định nghĩa
+        """
+        return {
+            "temperature": getattr(self.model, "temperature", VIENEU_TEMPERATURE),
+            "top_k": getattr(self.model, "top_k", VIENEU_TOP_K),
+            "min_new_tokens": getattr(self.model, "min_new_tokens", VIENEU_MIN_NEW_TOKENS),
+        }
+    
+    def _generate_codes(self, chunks: List[str], ref_codes: torch.Tensor, ref_text: str) -> List[List[int]]:
+        """
+        Backbone stage: speech codes for several chunks in one generate() call
+        Giai đoạn backbone: mã giọng nói cho nhiều chunk trong một lần gọi generate()
+        
+        Prompts share the reference prefix but differ in length, so they are left-padded
+        with an attention mask.
+        Các prompt dùng chung phần tham chiếu nhưng khác độ dài, nên được pad trái kèm attention mask.
+        """
+        tokenizer = self.model.tokenizer
+        backbone = self.model.backbone
+        prompts = [self.model._apply_chat_template(ref_codes, ref_text, chunk) for chunk in chunks]
+        speech_end_id = tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_END|>")
+        pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else speech_end_id
+        
+        # Left-pad prompts so generation starts at the same position for every row
+        # Pad trái prompt để mọi hàng bắt đầu tạo tại cùng vị trí
+        width = max(len(ids) for ids in prompts)
+        input_ids = torch.full((len(prompts), width), pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(prompts), width), dtype=torch.long)
+        for row, ids in enumerate(prompts):
+            input_ids[row, width - len(ids):] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, width - len(ids):] = 1
+        
+        with torch.no_grad():
+            output_tokens = backbone.generate(
+                input_ids.to(backbone.device),
+                attention_mask=attention_mask.to(backbone.device),
+                max_length=getattr(self.model, "max_context", 2048),
+                eos_token_id=speech_end_id,
+                pad_token_id=pad_id,
+                do_sample=True,
+                use_cache=True,
+                **self._sampling_params(),
+            )
+        
+        speech_ids = []
+        for row in output_tokens[:, width:].cpu().numpy():
+            output_str = tokenizer.decode(row.tolist(), add_special_tokens=False)
+            speech_ids.append([int(num) for num in _SPEECH_TOKEN.findall(output_str)])
+        return speech_ids
+    
+    def _decode_codes(self, speech_ids: List[List[int]]) -> List[np.ndarray]:
+        """
+        Codec stage: decode all rows at once, padding with each row's last code
+        Giai đoạn codec: giải mã mọi hàng một lần, pad bằng mã cuối của mỗi hàng
+        """
+        longest = max((len(ids) for ids in speech_ids), default=0)
+        if longest == 0:
+            return [np.zeros(0, dtype=np.float32) for _ in speech_ids]
+        codes = torch.zeros((len(speech_ids), 1, longest), dtype=torch.long)
+        for row, ids in enumerate(speech_ids):
+            if ids:
+                codes[row, 0, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+                codes[row, 0, len(ids):] = ids[-1]
+        with torch.no_grad():
+            recon = self.model.codec.decode_code(codes.to(self.model.codec.device)).cpu().numpy()
+        # Trim each waveform back to its own length / Cắt mỗi waveform về đúng độ dài
+        samples_per_code = recon.shape[-1] // longest
+        return [recon[row, 0, :len(ids) * samples_per_code] for row, ids in enumerate(speech_ids)]
+    
+    def infer_batch(self, chunks: List[str], ref_codes: torch.Tensor, ref_text: str) -> List[np.ndarray]:
+        """
+        Generate several chunks in one backbone pass and one codec decode
+        Tạo nhiều chunk trong một lần chạy backbone và một lần giải mã codec
+        
+        Args:
+            chunks: Text chunks / Các chunk văn bản
+            ref_codes: Reference codes / Mã tham chiếu
+            ref_text: Reference text / Văn bản tham chiếu
+            
+        Returns:
+            One waveform per chunk / Một waveform cho mỗi chunk
+        """
+        if len(chunks) == 1 or not self.supports_batching():
+            return [self.model.infer(chunk, ref_codes, ref_text) for chunk in chunks]
+        return self._decode_codes(self._generate_codes(chunks, ref_codes, ref_text))
+    
+    def _synthesize_pipelined(
+        self,
+        chunks: List[str],
+        ref_codes: torch.Tensor,
+        ref_text: str,
+        batch_size: int,
+        assembler: AudioAssembler,
+        between_batches: Optional[Callable[[], None]] = None
+    ) -> dict:
+        """
+        Generate batch i+1 on this thread while a worker decodes batch i
+        Tạo batch i+1 trên luồng này trong khi worker giải mã batch i
+        
+        Returns:
+            Stage metrics of this request (also logged) / Số liệu giai đoạn của request này (cũng được ghi log)
+        """
+        def sink(wavs):
+            for wav in wavs:
+                assembler.append(wav)
+        
+        pipeline = DecodePipeline(self._decode_codes, sink, depth=VIENEU_PIPELINE_DEPTH)
+        try:
+            for start in range(0, len(chunks), batch_size):
+                if start and between_batches:
+                    between_batches()
+                generate_start = time.perf_counter()
+                speech_ids = self._generate_codes(chunks[start:start + batch_size], ref_codes, ref_text)
+                pipeline.submit(speech_ids, time.perf_counter() - generate_start)
+        except BaseException:
+            pipeline.cancel()
+            raise
+        stats = pipeline.close()
+        self.logger.info(
+            "Pipeline: %d batches, generate %.0f%% / decode %.0f%% busy, %.2fs overlapped",
+            stats["items"],
+            stats["generate_utilization"] * 100,
+            stats["decode_utilization"] * 100,
+            stats["overlap_seconds"]
+        )
+        return stats
     
     def synthesize(
         self,
@@ -137,30 +315,64 @@ class VieNeuTTSWrapper:
         output_path: Optional[str] = None,
         max_chars: int = 256,
         auto_chunk: bool = True,
-        request_id: Optional[str] = None
-    ) -> np.ndarray:
+        request_id: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        between_batches: Optional[Callable[[], None]] = None,
+        return_stats: bool = False
+    ) -> Union[np.ndarray, Tuple[np.ndarray, Optional[dict]]]:
         """
         Synthesize speech - EXACTLY matches working main.py pattern.
         Tổng hợp giọng nói - KHỚP CHÍNH XÁC pattern main.py hoạt động.
         
         Simple and direct - no extra optimizations that might interfere.
         Đơn giản và trực tiếp - không có tối ưu hóa thêm có thể gây nhiễu.
+        
+        Chunks of long text run through infer_batch() batch_size at a time
+        (None = VIENEU_BATCH_SIZE, 1 = one infer() call per chunk).
+        Chunk của văn bản dài chạy qua infer_batch() mỗi lần batch_size chunk
+        (None = VIENEU_BATCH_SIZE, 1 = một lần gọi infer() cho mỗi chunk).
+        
+        between_batches is called before every batch after the first (the service
+        uses it to let interactive requests preempt prefetch work).
+        between_batches được gọi trước mỗi batch sau batch đầu (service dùng nó để
+        request tương tác chen trước công việc tải trước).
+        
+        With return_stats=True, returns (audio, pipeline_stats); the stats are the
+        decode pipeline's stage metrics, or None when the request was not pipelined.
+        Với return_stats=True, trả về (audio, pipeline_stats); stats là số liệu giai
+        đoạn của pipeline giải mã, hoặc None khi request không chạy pipeline.
         """
-        # Cache reference encoding (encode once, reuse many times)
-        # Cache mã hóa tham chiếu (mã hóa một lần, tái sử dụng nhiều lần)
-        if ref_audio_path not in self._ref_codes_cache:
-            self._ref_codes_cache[ref_audio_path] = self.model.encode_reference(ref_audio_path)
-        ref_codes = self._ref_codes_cache[ref_audio_path]
+        pipeline_stats = None
+        # Cached reference encoding (encode once, reuse across requests and backends)
+        # Mã hóa tham chiếu đã cache (mã hóa một lần, dùng lại giữa request và backend)
+        ref_codes = self.get_ref_codes(ref_audio_path)
         
         # Handle long text with chunking if needed
         # Xử lý văn bản dài với chunking nếu cần
         if auto_chunk and len(text) > max_chars:
             chunks = split_text_into_chunks(text, max_chars=max_chars)
-            generated_segments = []
-            for chunk in chunks:
-                wav = self.model.infer(chunk, ref_codes, ref_text)
-                generated_segments.append(wav)
-            audio = np.concatenate(generated_segments)
+            # Write chunks straight into one preallocated float32 buffer
+            # Ghi chunk thẳng vào một buffer float32 cấp phát trước
+            assembler = AudioAssembler(
+                self.sample_rate,
+                expected_samples=estimate_samples(len(text), self.sample_rate),
+                pause_ms=CHUNK_PAUSE_MS,
+                crossfade_ms=CHUNK_CROSSFADE_MS
+            )
+            batch_size = max(1, batch_size or VIENEU_BATCH_SIZE)
+            if batch_size > 1 and VIENEU_PIPELINE_ENABLED and self.supports_batching():
+                # Codec decode of one batch overlaps generation of the next (batched path only)
+                # Giải mã codec của một batch chạy song song với tạo batch kế tiếp (chỉ nhánh batch)
+                pipeline_stats = self._synthesize_pipelined(
+                    chunks, ref_codes, ref_text, batch_size, assembler, between_batches
+                )
+            else:
+                for start in range(0, len(chunks), batch_size):
+                    if start and between_batches:
+                        between_batches()
+                    for wav in self.infer_batch(chunks[start:start + batch_size], ref_codes, ref_text):
+                        assembler.append(wav)
+            audio = assembler.finalize()
         else:
             # Direct call - EXACTLY like working main.py: tts.infer(text, ref_codes, ref_text)
             # Gọi trực tiếp - CHÍNH XÁC như main.py hoạt động: tts.infer(text, ref_codes, ref_text)
@@ -169,6 +381,8 @@ class VieNeuTTSWrapper:
         if output_path:
             sf.write(output_path, audio, self.sample_rate)
         
+        if return_stats:
+            return audio, pipeline_stats
         return audio
     
     def get_sample_rate(self) -> int:
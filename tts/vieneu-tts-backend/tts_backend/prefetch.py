@@ -0,0 +1,390 @@
+"""
+Read-ahead Prefetch Scheduler
+Bộ lập lịch Tải trước (Đọc trước)
+
+Clients submit upcoming paragraphs as low-priority hints. Hints are synthesized
+into the storage cache only while no interactive request is running, and a new
+submission for the same session replaces whatever is still pending (e.g. the
+listener jumped to another chapter).
+
+Client gửi các đoạn văn sắp tới như gợi ý ưu tiên thấp. Gợi ý chỉ được tổng hợp
+vào cache lưu trữ khi không có request tương tác nào đang chạy, và lần gửi mới cho
+cùng session sẽ thay thế các gợi ý còn chờ (ví dụ người nghe nhảy sang chương khác).
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .logging_utils import get_logger, PerformanceTracker
+
+logger = get_logger(__name__)
+
+
+def build_cache_key(params: Dict[str, Any]) -> str:
+    """
+    Build content cache key from resolved synthesis parameters
+    Tạo khóa cache nội dung từ tham số tổng hợp đã phân giải
+
+    Args:
+        params: Parameters passed to service.synthesize (request_id is ignored)
+                Tham số truyền vào service.synthesize (bỏ qua request_id)
+
+    Returns:
+        Hex digest / Chuỗi hex
+    """
+    keyed = {k: v for k, v in params.items() if k != "request_id"}
+    payload = json.dumps(keyed, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PriorityLock:
+    """
+    Model lock where interactive requests go before background (prefetch) work
+    Khóa model trong đó request tương tác được ưu tiên hơn công việc nền (tải trước)
+
+    A background holder should call yield_to_interactive() between chunks, so a
+    waiting interactive request does not have to wait for a whole prefetch job.
+    Bên giữ khóa nền nên gọi yield_to_interactive() giữa các chunk, để request tương
+    tác đang chờ không phải đợi hết cả một job tải trước.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._held = False
+        self._waiting_interactive = 0
+
+    def acquire(self, background: bool = False):
+        """Acquire the lock / Lấy khóa"""
+        with self._cond:
+            if background:
+                while self._held or self._waiting_interactive:
+                    self._cond.wait()
+            else:
+                self._waiting_interactive += 1
+                try:
+                    while self._held:
+                        self._cond.wait()
+                finally:
+                    self._waiting_interactive -= 1
+            self._held = True
+
+    def release(self):
+        """Release the lock / Nhả khóa"""
+        with self._cond:
+            self._held = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def hold(self, background: bool = False):
+        """Hold the lock for a block / Giữ khóa trong một khối lệnh"""
+        self.acquire(background)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def yield_to_interactive(self) -> bool:
+        """
+        Let waiting interactive requests run, then reacquire (background holders only)
+        Nhường cho request tương tác đang chờ, rồi lấy lại khóa (chỉ bên giữ khóa nền)
+
+        Returns:
+            True if the lock was handed over / True nếu đã nhường khóa
+        """
+        with self._cond:
+            if not self._waiting_interactive:
+                return False
+        self.release()
+        self.acquire(background=True)
+        return True
+
+
+@dataclass
+class PrefetchHint:
+    """Single read-ahead hint / Một gợi ý đọc trước"""
+    session_id: str
+    cache_key: str
+    params: Dict[str, Any]
+    speaker_id: str = "default"
+    expiry_hours: Optional[int] = None
+    submitted_at: float = field(default_factory=time.time)
+
+
+class PrefetchScheduler:
+    """Idle-time executor for read-ahead hints / Bộ thực thi gợi ý đọc trước khi rảnh"""
+
+    def __init__(
+        self,
+        runner: Callable[[PrefetchHint], None],
+        idle_seconds: float = 1.0,
+        max_pending: int = 64
+    ):
+        """
+        Initialize scheduler / Khởi tạo bộ lập lịch
+
+        Args:
+            runner: Callable that synthesizes one hint into storage / Hàm tổng hợp một gợi ý vào lưu trữ
+            idle_seconds: Required idle time after the last interactive request / Thời gian rảnh cần thiết sau request tương tác cuối
+            max_pending: Maximum pending hints across sessions / Số gợi ý chờ tối đa trên mọi session
+        """
+        self.runner = runner
+        self.idle_seconds = idle_seconds
+        self.max_pending = max_pending
+
+        # session_id -> OrderedDict(cache_key -> hint), in read order
+        self._pending: Dict[str, "OrderedDict[str, PrefetchHint]"] = {}
+        self._cond = threading.Condition()
+        self._active_interactive = 0
+        self._last_interactive = 0.0
+        self._running_key: Optional[str] = None
+        # Keys synthesized by prefetch and not yet requested, oldest first
+        # Khóa đã được tải trước nhưng chưa được yêu cầu, cũ nhất trước
+        self._prefetched: "OrderedDict[str, None]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+
+        self._stats = {
+            "hints_submitted": 0,
+            "hints_skipped_cached": 0,
+            "hints_superseded": 0,
+            "hints_dropped_overflow": 0,
+            "hints_completed": 0,
+            "hints_failed": 0,
+            "hits": 0,
+            "hits_prefetched": 0,
+            "misses": 0,
+            "misses_pending": 0,
+        }
+
+    def _ensure_worker(self):
+        """Start worker thread on first use / Khởi động thread worker khi dùng lần đầu"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop = False
+            self._thread = threading.Thread(target=self._worker_loop, name="tts-prefetch", daemon=True)
+            self._thread.start()
+
+    def _pending_count(self) -> int:
+        return sum(len(hints) for hints in self._pending.values())
+
+    def submit(self, session_id: str, hints: List[PrefetchHint], cached_keys: Optional[set] = None) -> Dict[str, int]:
+        """
+        Replace the pending look-ahead window of a session / Thay thế cửa sổ đọc trước đang chờ của một session
+
+        Args:
+            session_id: Listener session (e.g. novel + user) / Session người nghe
+            hints: Hints in reading order / Gợi ý theo thứ tự đọc
+            cached_keys: Keys already present in storage (skipped) / Khóa đã có trong lưu trữ (bỏ qua)
+
+        Returns:
+            Counts of accepted, superseded and skipped hints / Số gợi ý được nhận, bị thay thế và bỏ qua
+        """
+        cached_keys = cached_keys or set()
+        with self._cond:
+            previous = self._pending.pop(session_id, OrderedDict())
+            window: "OrderedDict[str, PrefetchHint]" = OrderedDict()
+            skipped = 0
+            for hint in hints:
+                if hint.cache_key in cached_keys or hint.cache_key == self._running_key:
+                    skipped += 1
+                    continue
+                window.setdefault(hint.cache_key, hint)
+
+            superseded = sum(1 for key in previous if key not in window)
+
+            # Enforce global bound by trimming the tail of the new window
+            # Áp dụng giới hạn toàn cục bằng cách cắt đuôi cửa sổ mới
+            room = max(0, self.max_pending - self._pending_count())
+            overflow = 0
+            while len(window) > room:
+                window.popitem(last=True)
+                overflow += 1
+
+            if window:
+                self._pending[session_id] = window
+
+            self._stats["hints_submitted"] += len(hints)
+            self._stats["hints_skipped_cached"] += skipped
+            self._stats["hints_superseded"] += superseded
+            self._stats["hints_dropped_overflow"] += overflow
+            self._ensure_worker()
+            self._cond.notify_all()
+
+        if superseded:
+            logger.info("Prefetch session %s: %d pending hints superseded", session_id, superseded)
+        return {"accepted": len(window), "superseded": superseded, "skipped_cached": skipped, "dropped_overflow": overflow}
+
+    def cancel(self, session_id: str) -> int:
+        """Drop all pending hints of a session / Hủy mọi gợi ý đang chờ của session"""
+        with self._cond:
+            dropped = len(self._pending.pop(session_id, {}))
+            self._stats["hints_superseded"] += dropped
+        return dropped
+
+    def record_lookup(self, cache_key: str, hit: bool):
+        """
+        Record an interactive cache lookup / Ghi nhận một lần tra cache tương tác
+
+        A miss for a hint that is still pending removes it: the interactive
+        request is about to synthesize the same audio.
+        Miss cho gợi ý còn đang chờ sẽ xóa gợi ý đó: request tương tác sắp tổng hợp cùng audio.
+        """
+        with self._cond:
+            if hit:
+                self._stats["hits"] += 1
+                if cache_key in self._prefetched:
+                    del self._prefetched[cache_key]
+                    self._stats["hits_prefetched"] += 1
+                return
+            self._stats["misses"] += 1
+            if cache_key == self._running_key:
+                self._stats["misses_pending"] += 1
+                return
+            for hints in self._pending.values():
+                if hints.pop(cache_key, None) is not None:
+                    self._stats["misses_pending"] += 1
+                    break
+
+    @contextmanager
+    def interactive(self):
+        """Mark an interactive request in flight / Đánh dấu request tương tác đang chạy"""
+        with self._cond:
+            self._active_interactive += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active_interactive -= 1
+                self._last_interactive = time.monotonic()
+                self._cond.notify_all()
+
+    def _next_hint(self) -> Optional[PrefetchHint]:
+        """Pop oldest session's next hint (caller holds lock) / Lấy gợi ý kế tiếp (đã giữ lock)"""
+        for session_id in list(self._pending):
+            hints = self._pending[session_id]
+            if hints:
+                _, hint = hints.popitem(last=False)
+                if not hints:
+                    del self._pending[session_id]
+                return hint
+            del self._pending[session_id]
+        return None
+
+    def _worker_loop(self):
+        """Run hints while interactive queue is idle / Chạy gợi ý khi hàng đợi tương tác rảnh"""
+        while not self._stop:
+            with self._cond:
+                while not self._stop:
+                    idle_for = time.monotonic() - self._last_interactive
+                    if self._active_interactive == 0 and idle_for >= self.idle_seconds and self._pending:
+                        break
+                    busy = self._active_interactive > 0 or not self._pending
+                    timeout = None if busy else max(0.05, self.idle_seconds - idle_for)
+                    self._cond.wait(timeout=timeout)
+                if self._stop:
+                    return
+                hint = self._next_hint()
+                if hint is None:
+                    continue
+                self._running_key = hint.cache_key
+
+            try:
+                self.runner(hint)
+                with self._cond:
+                    self._stats["hints_completed"] += 1
+                    self._prefetched[hint.cache_key] = None
+                    while len(self._prefetched) > self.max_pending * 4:
+                        self._prefetched.popitem(last=False)
+            except Exception as e:
+                logger.warning("Prefetch hint failed for session %s: %s", hint.session_id, e)
+                with self._cond:
+                    self._stats["hints_failed"] += 1
+            finally:
+                with self._cond:
+                    self._running_key = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get prefetch statistics / Lấy thống kê tải trước"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["pending"] = self._pending_count()
+            stats["sessions"] = len(self._pending)
+            stats["interactive_in_flight"] = self._active_interactive
+        # Only lookups of hinted keys: served from a prefetch vs still pending / running
+        # Chỉ tính lần tra khóa đã gợi ý: lấy từ bản tải trước vs còn chờ / đang chạy
+        hinted = stats["hits_prefetched"] + stats["misses_pending"]
+        stats["hit_rate"] = stats["hits_prefetched"] / hinted if hinted else 0.0
+        # All interactive lookups, hinted or not (storage cache coverage)
+        # Mọi lần tra tương tác, có gợi ý hay không (độ phủ cache lưu trữ)
+        lookups = stats["hits"] + stats["misses"]
+        stats["cache_hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        # Share of finished prefetches that a listener actually requested
+        # Tỷ lệ bản tải trước hoàn tất được người nghe thực sự yêu cầu
+        stats["utilization"] = stats["hits_prefetched"] / stats["hints_completed"] if stats["hints_completed"] else 0.0
+        return stats
+
+    def shutdown(self):
+        """Stop worker thread / Dừng thread worker"""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+
+
+def _synthesize_hint(hint: PrefetchHint):
+    """
+    Synthesize one hint and store it under its cache key
+    Tổng hợp một gợi ý và lưu dưới khóa cache của nó
+    """
+    import io
+    import soundfile as sf
+    from .service import get_service
+    from .storage import get_storage
+
+    service = get_service()
+    storage = get_storage()
+    perf = PerformanceTracker(logger, hint.params.get("request_id"))
+
+    with perf.stage("prefetch_synthesize", session=hint.session_id):
+        audio = service.synthesize(**hint.params, background=True)
+    sample_rate = service.get_model_info(hint.params["model"])["sample_rate"]
+
+    audio_buffer = io.BytesIO()
+    sf.write(audio_buffer, audio, sample_rate, format="WAV")
+    storage.save_audio(
+        audio_data=audio_buffer.getvalue(),
+        text=hint.params["text"],
+        speaker_id=hint.speaker_id,
+        model=hint.params["model"],
+        expiry_hours=hint.expiry_hours,
+        metadata={
+            "request_id": hint.params.get("request_id"),
+            "sample_rate": sample_rate,
+            "duration_seconds": len(audio) / sample_rate,
+            "cache_key": hint.cache_key,
+            "prefetched": True,
+            "prefetch_session": hint.session_id,
+        }
+    )
+
+
+# Global scheduler instance / Instance bộ lập lịch toàn cục
+_scheduler_instance: Optional[PrefetchScheduler] = None
+
+
+def get_prefetch_scheduler() -> PrefetchScheduler:
+    """Get global prefetch scheduler / Lấy bộ lập lịch tải trước toàn cục"""
+    global _scheduler_instance
+    if _scheduler_instance is None:
+        from .config import PREFETCH_IDLE_SECONDS, PREFETCH_MAX_PENDING
+        _scheduler_instance = PrefetchScheduler(
+            runner=_synthesize_hint,
+            idle_seconds=PREFETCH_IDLE_SECONDS,
+            max_pending=PREFETCH_MAX_PENDING
+        )
+    return _scheduler_instance
@@ -0,0 +1,303 @@
+"""
+Dia Audio-Prompt Encoding Cache
+Cache Mã hóa Audio Prompt cho Dia
+
+Dia loads the reference WAV and runs the DAC encoder on it inside every
+generate() call that uses audio_prompt_path. Narrator cloning reuses the same few
+prompts for thousands of lines, so the DAC codes are cached here by content hash:
+a bounded in-memory LRU in front of an on-disk tier (torch.save). Prompts can be
+registered once and then referenced by ID.
+
+Dia tải WAV tham chiếu và chạy bộ mã hóa DAC trong mỗi lần gọi generate() có
+audio_prompt_path. Clone giọng người kể dùng lại vài prompt cho hàng nghìn câu,
+nên mã DAC được cache ở đây theo hash nội dung: LRU bộ nhớ có giới hạn phía trước
+tầng disk (torch.save). Prompt có thể được đăng ký một lần rồi tham chiếu bằng ID.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import torch
+
+# Bump when the stored encoding layout changes / Tăng khi cấu trúc mã hóa lưu trữ thay đổi
+ENCODING_VERSION = 1
+
+# Per-thread cache key of the prompt being generated / Khóa cache theo thread của prompt đang generate
+_active = threading.local()
+_hook_lock = threading.Lock()
+
+
+def hash_prompt_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Content hash of a prompt file / Hash nội dung của file prompt
+
+    Args:
+        path: Prompt audio path / Đường dẫn audio prompt
+        chunk_size: Read chunk size / Kích thước đọc mỗi lần
+
+    Returns:
+        SHA-256 hex digest / Chuỗi hex SHA-256
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PromptEncodingCache:
+    """Disk + LRU cache of Dia prompt DAC codes / Cache disk + LRU cho mã DAC của prompt Dia"""
+
+    def __init__(self, store_dir: str, max_memory_entries: int = 16, model_id: str = "dia"):
+        """
+        Initialize prompt cache / Khởi tạo cache prompt
+
+        Args:
+            store_dir: Directory for encodings and registered prompts / Thư mục cho mã hóa và prompt đã đăng ký
+            max_memory_entries: Maximum encodings kept in memory / Số mã hóa tối đa giữ trong bộ nhớ
+            model_id: Model identity, part of the cache key / Định danh model, một phần của khóa cache
+        """
+        self.store_dir = Path(store_dir).resolve()
+        self.encodings_dir = self.store_dir / "encodings"
+        self.prompts_dir = self.store_dir / "prompts"
+        self.index_path = self.store_dir / "prompts.json"
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.model_id = model_id
+
+        self.encodings_dir.mkdir(parents=True, exist_ok=True)
+        self.prompts_dir.mkdir(parents=True, exist_ok=True)
+
+        self._memory: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+        # path -> (mtime, size, content hash), avoids re-hashing unchanged files
+        # path -> (mtime, size, hash nội dung), tránh hash lại file không đổi
+        self._path_hashes: Dict[str, tuple] = {}
+        self._lock = threading.RLock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "encoded": 0, "evictions": 0, "encode_seconds": 0.0}
+
+        # Registered prompts: prompt_id -> {"file": ..., "hash": ..., "name": ...}
+        # Prompt đã đăng ký: prompt_id -> {"file": ..., "hash": ..., "name": ...}
+        self.registered: Dict[str, Dict[str, Any]] = self._load_index()
+
+        print(f"[PromptCache] Encoding directory: {self.encodings_dir} (memory LRU: {self.max_memory_entries})")
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Load registered prompt index / Tải chỉ mục prompt đã đăng ký"""
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            return {prompt_id: info for prompt_id, info in index.items() if Path(info["file"]).exists()}
+        except Exception as e:
+            print(f"⚠️  [PromptCache] Could not read prompt index: {e}")
+            print(f"⚠️  [PromptCache] Không thể đọc chỉ mục prompt: {e}")
+            return {}
+
+    def _save_index(self):
+        """Persist registered prompt index / Lưu chỉ mục prompt đã đăng ký"""
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.registered, f, indent=2, ensure_ascii=False)
+        tmp_path.replace(self.index_path)
+
+    def _file_hash(self, path: str) -> str:
+        """Content hash with (mtime, size) memo / Hash nội dung có ghi nhớ (mtime, size)"""
+        stat = Path(path).stat()
+        memo = self._path_hashes.get(path)
+        if memo and memo[0] == stat.st_mtime and memo[1] == stat.st_size:
+            return memo[2]
+        content_hash = hash_prompt_file(path)
+        self._path_hashes[path] = (stat.st_mtime, stat.st_size, content_hash)
+        return content_hash
+
+    def cache_key(self, prompt_path: str) -> str:
+        """Cache key for a prompt file / Khóa cache cho file prompt"""
+        with self._lock:
+            content_hash = self._file_hash(str(prompt_path))
+        return hashlib.sha256(f"{self.model_id}:v{ENCODING_VERSION}:{content_hash}".encode()).hexdigest()
+
+    def resolve(self, prompt_id: str) -> str:
+        """
+        Path of a registered prompt / Đường dẫn của prompt đã đăng ký
+
+        Raises:
+            ValueError: Unknown prompt ID / ID prompt không tồn tại
+        """
+        info = self.registered.get(prompt_id)
+        if info is None:
+            raise ValueError(f"Unknown audio prompt ID: {prompt_id}")
+        return info["file"]
+
+    def _remember(self, key: str, codes: torch.Tensor):
+        """Insert into memory LRU (caller holds lock) / Thêm vào LRU bộ nhớ (đã giữ lock)"""
+        self._memory[key] = codes
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[torch.Tensor]:
+        """
+        Cached codes for a key (CPU tensor) or None / Mã đã cache theo khóa (tensor CPU) hoặc None
+        """
+        with self._lock:
+            codes = self._memory.get(key)
+            if codes is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return codes
+
+            encoding_path = self.encodings_dir / f"{key}.pt"
+            if encoding_path.exists():
+                try:
+                    stored = torch.load(encoding_path, map_location="cpu")
+                    if stored.get("version") == ENCODING_VERSION:
+                        self._stats["disk_hits"] += 1
+                        self._remember(key, stored["codes"])
+                        return stored["codes"]
+                except Exception as e:
+                    print(f"⚠️  [PromptCache] Corrupt encoding {encoding_path.name}, re-encoding: {e}")
+                    print(f"⚠️  [PromptCache] Mã hóa hỏng {encoding_path.name}, mã hóa lại: {e}")
+        return None
+
+    def put(self, key: str, codes: torch.Tensor, encode_seconds: float):
+        """Store freshly encoded codes / Lưu mã vừa mã hóa"""
+        codes = codes.detach().cpu()
+        encoding_path = self.encodings_dir / f"{key}.pt"
+        tmp_path = encoding_path.with_suffix(".tmp")
+        torch.save({"version": ENCODING_VERSION, "codes": codes, "encode_seconds": encode_seconds}, tmp_path)
+        tmp_path.replace(encoding_path)
+        with self._lock:
+            self._stats["encoded"] += 1
+            self._stats["encode_seconds"] += encode_seconds
+            self._remember(key, codes)
+
+    def register(self, audio_data: bytes, suffix: str, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Store an uploaded prompt and return its ID / Lưu prompt tải lên và trả về ID
+
+        Args:
+            audio_data: Uploaded audio bytes / Bytes audio tải lên
+            suffix: File extension (e.g. ".wav") / Phần mở rộng file
+            name: Optional display name / Tên hiển thị tùy chọn
+
+        Returns:
+            Registered prompt info including prompt_id / Thông tin prompt đã đăng ký gồm prompt_id
+        """
+        if not audio_data:
+            raise ValueError("Uploaded audio prompt is empty")
+        if name is not None and not re.fullmatch(r"[\w\- ]{1,64}", name):
+            raise ValueError("Prompt name must be 1-64 letters, digits, spaces, '_' or '-'")
+
+        content_hash = hashlib.sha256(audio_data).hexdigest()
+        prompt_id = content_hash[:16]
+        prompt_path = self.prompts_dir / f"{prompt_id}{suffix or '.wav'}"
+        with self._lock:
+            if not prompt_path.exists():
+                prompt_path.write_bytes(audio_data)
+            info = {
+                "file": str(prompt_path),
+                "hash": content_hash,
+                "name": name or prompt_id,
+                "registered_at": datetime.now().isoformat(),
+            }
+            self.registered[prompt_id] = info
+            self._save_index()
+        return {"prompt_id": prompt_id, **info}
+
+    def unregister(self, prompt_id: str) -> bool:
+        """Remove a registered prompt (encodings stay cached) / Xóa prompt đã đăng ký (mã hóa vẫn được cache)"""
+        with self._lock:
+            info = self.registered.pop(prompt_id, None)
+            if info is None:
+                return False
+            self._save_index()
+        Path(info["file"]).unlink(missing_ok=True)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics / Lấy thống kê cache"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["encoded"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        stats["max_memory_entries"] = self.max_memory_entries
+        stats["disk_entries"] = sum(1 for _ in self.encodings_dir.glob("*.pt"))
+        stats["registered_prompts"] = len(self.registered)
+        return stats
+
+
+def install_encoder_hook(dia_model_module, cache: PromptEncodingCache) -> bool:
+    """
+    Wrap dia.model.audio_to_codebook so prompt encodings come from the cache
+    Bọc dia.model.audio_to_codebook để mã hóa prompt lấy từ cache
+
+    Args:
+        dia_model_module: Imported dia.model module / Module dia.model đã import
+        cache: Prompt encoding cache / Cache mã hóa prompt
+
+    Returns:
+        True if the hook is (already) installed / True nếu hook đã được cài
+    """
+    with _hook_lock:
+        original = getattr(dia_model_module, "audio_to_codebook", None)
+        if original is None:
+            return False
+        if getattr(original, "_prompt_cache_hook", False):
+            return True
+
+        def _cached_audio_to_codebook(model, audio, *args, **kwargs):
+            key = getattr(_active, "key", None)
+            if key is None:
+                return original(model, audio, *args, **kwargs)
+            codes = cache.get(key)
+            if codes is not None:
+                return codes.to(audio.device)
+            start = time.time()
+            codes = original(model, audio, *args, **kwargs)
+            cache.put(key, codes, time.time() - start)
+            return codes
+
+        _cached_audio_to_codebook._prompt_cache_hook = True
+        dia_model_module.audio_to_codebook = _cached_audio_to_codebook
+        return True
+
+
+@contextmanager
+def use_prompt(cache_key: Optional[str]):
+    """Route prompt encoding in this thread through the cache / Dẫn mã hóa prompt trong thread này qua cache"""
+    previous = getattr(_active, "key", None)
+    _active.key = cache_key
+    try:
+        yield
+    finally:
+        _active.key = previous
+
+
+# Global cache instance / Instance cache toàn cục
+_cache_instance: Optional[PromptEncodingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_prompt_cache() -> PromptEncodingCache:
+    """Get global prompt encoding cache / Lấy cache mã hóa prompt toàn cục"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                from .config import DIA_PROMPT_CACHE_DIR, DIA_PROMPT_CACHE_MEMORY_ENTRIES, DIA_CHECKPOINT_PATH
+                _cache_instance = PromptEncodingCache(
+                    store_dir=DIA_PROMPT_CACHE_DIR,
+                    max_memory_entries=DIA_PROMPT_CACHE_MEMORY_ENTRIES,
+                    model_id=Path(DIA_CHECKPOINT_PATH).parent.name
+                )
+    return _cache_instance
@@ -11,6 +11,7 @@ if TYPE_CHECKING:
 
 from .config import ModelConfig
 from .logging_utils import get_logger, PerformanceTracker
+from .prefetch import PriorityLock
 
 # Model types / Loại model
 ModelType = Literal["vieneu-tts", "dia"]
@@ -32,6 +33,9 @@ class TTSService:
         self.dia_tts = None
         self.dia_available = None  # Cache availability check
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        # Serializes model access; interactive requests go before the prefetch worker
+        # Tuần tự hóa truy cập model; request tương tác được ưu tiên hơn worker tải trước
+        self._inference_lock = PriorityLock()
         self.logger.info("Initializing TTS Service on %s (default model=%s)", self.device, default_model)
         
         # Preload default model at startup to avoid loading delay on first request
@@ -96,6 +100,7 @@ class TTSService:
         ref_audio_path: Optional[str] = None,
         ref_text: Optional[str] = None,
         request_id: Optional[str] = None,
+        background: bool = False,
         **kwargs
     ):
         """
@@ -106,6 +111,8 @@ class TTSService:
             model: Model to use (vieneu-tts or dia) / Model sử dụng
             ref_audio_path: Reference audio path (for VieNeu-TTS) / Đường dẫn audio tham chiếu
             ref_text: Reference text (for VieNeu-TTS) / Văn bản tham chiếu
+            background: Low-priority prefetch work; yields to interactive requests between chunks
+                        Công việc tải trước ưu tiên thấp; nhường request tương tác giữa các chunk
             **kwargs: Additional model-specific parameters / Tham số bổ sung theo model
             
         Returns:
@@ -116,36 +123,38 @@ class TTSService:
         perf = PerformanceTracker(self.logger, request_id)
         perf.log("Starting synthesis", model=model, text_chars=len(text))
         
-        if model == "vieneu-tts":
-            if not ref_audio_path or not ref_text:
-                raise ValueError("VieNeu-TTS requires ref_audio_path and ref_text")
-            vieneu = self.get_vieneu_tts()
-            max_chars = kwargs.get("max_chars", 256)
-            auto_chunk = kwargs.get("auto_chunk", True)
-            # Direct call - performance tracking is handled inside vieneu.synthesize()
-            # Gọi trực tiếp - theo dõi hiệu suất được xử lý bên trong vieneu.synthesize()
-            return vieneu.synthesize(
-                text, 
-                ref_audio_path, 
-                ref_text, 
-                max_chars=max_chars,
-                auto_chunk=auto_chunk,
-                request_id=request_id,
-                **{k: v for k, v in kwargs.items() if k not in ["max_chars", "auto_chunk"]}
-            )
-        
-        elif model == "dia":
-            if not self.is_dia_available():
-                raise ValueError(
-                    "Dia TTS is not available. "
-                    "Use 'vieneu-tts' model instead, or install Dia dependencies."
+        with self._inference_lock.hold(background=background):
+            if model == "vieneu-tts":
+                if not ref_audio_path or not ref_text:
+                    raise ValueError("VieNeu-TTS requires ref_audio_path and ref_text")
+                vieneu = self.get_vieneu_tts()
+                max_chars = kwargs.get("max_chars", 256)
+                auto_chunk = kwargs.get("auto_chunk", True)
+                # Direct call - performance tracking is handled inside vieneu.synthesize()
+                # Gọi trực tiếp - theo dõi hiệu suất được xử lý bên trong vieneu.synthesize()
+                return vieneu.synthesize(
+                    text, 
+                    ref_audio_path, 
+                    ref_text, 
+                    max_chars=max_chars,
+                    auto_chunk=auto_chunk,
+                    request_id=request_id,
+                    between_batches=self._inference_lock.yield_to_interactive if background else None,
+                    **{k: v for k, v in kwargs.items() if k not in ["max_chars", "auto_chunk"]}
                 )
-            dia = self.get_dia_tts()
-            with perf.stage("dia_synthesize"):
-                return dia.synthesize(text, **kwargs)
         
-        else:
-            raise ValueError(f"Unknown model: {model}")
+            elif model == "dia":
+                if not self.is_dia_available():
+                    raise ValueError(
+                        "Dia TTS is not available. "
+                        "Use 'vieneu-tts' model instead, or install Dia dependencies."
+                    )
+                dia = self.get_dia_tts()
+                with perf.stage("dia_synthesize"):
+                    return dia.synthesize(text, **kwargs)
+        
+            else:
+                raise ValueError(f"Unknown model: {model}")
     
     def get_model_info(self, model: ModelType) -> dict:
         """
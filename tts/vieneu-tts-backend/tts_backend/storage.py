@@ -56,6 +56,11 @@ class AudioStorage:
         # Metadata cache
         self.metadata_cache: Dict[str, Dict] = {}
         
+        # Content-keyed index for reusable audio (cache_key -> file_id)
+        # Chỉ mục theo nội dung cho audio dùng lại được (cache_key -> file_id)
+        self.cache_index: Dict[str, str] = {}
+        self._load_cache_index()
+        
         # Start cleanup thread
         self._cleanup_thread = None
         self._stop_cleanup = False
@@ -75,6 +80,19 @@ class AudioStorage:
         self._cleanup_thread = threading.Thread(target=cleanup_loop, daemon=True)
         self._cleanup_thread.start()
     
+    def _load_cache_index(self):
+        """Rebuild cache index from metadata on disk / Xây dựng lại chỉ mục cache từ metadata trên disk"""
+        now = datetime.now()
+        for metadata_path in self.metadata_dir.glob("*.json"):
+            try:
+                with open(metadata_path, "r", encoding="utf-8") as f:
+                    metadata = json.load(f)
+                cache_key = metadata.get("cache_key")
+                if cache_key and now <= datetime.fromisoformat(metadata["expires_at"]):
+                    self.cache_index[cache_key] = metadata["file_id"]
+            except Exception:
+                pass
+    
     def _generate_file_id(self, text: str, speaker_id: str, model: str) -> str:
         """Generate unique file ID / Tạo ID file duy nhất"""
         content = f"{text}_{speaker_id}_{model}_{time.time()}"
@@ -145,6 +163,10 @@ class AudioStorage:
         # Cache metadata
         self.metadata_cache[file_id] = file_metadata
         
+        # Index by content key if provided / Đánh chỉ mục theo khóa nội dung nếu có
+        if file_metadata.get("cache_key"):
+            self.cache_index[file_metadata["cache_key"]] = file_id
+        
         return file_metadata
     
     def get_audio(self, file_id: str) -> Optional[bytes]:
@@ -214,6 +236,26 @@ class AudioStorage:
         except Exception:
             return None
     
+    def find_by_cache_key(self, cache_key: str) -> Optional[Dict]:
+        """
+        Find stored audio by content cache key / Tìm audio đã lưu theo khóa cache nội dung
+        
+        Args:
+            cache_key: Cache key stored in metadata / Khóa cache lưu trong metadata
+            
+        Returns:
+            Metadata dictionary or None if missing/expired / Từ điển metadata hoặc None nếu không có/hết hạn
+        """
+        file_id = self.cache_index.get(cache_key)
+        if not file_id:
+            return None
+        
+        metadata = self.get_metadata(file_id)
+        if not metadata or not Path(metadata["file_path"]).exists():
+            self.cache_index.pop(cache_key, None)
+            return None
+        return metadata
+    
     def delete_audio(self, file_id: str) -> bool:
         """
         Delete audio file and metadata / Xóa file audio và metadata
@@ -248,6 +290,10 @@ class AudioStorage:
         if file_id in self.metadata_cache:
             del self.metadata_cache[file_id]
         
+        cache_key = metadata.get("cache_key")
+        if cache_key and self.cache_index.get(cache_key) == file_id:
+            del self.cache_index[cache_key]
+        
         return True
     
     def cleanup_expired(self) -> Dict:
@@ -5,16 +5,256 @@ Tiện ích Chia nhỏ Văn bản cho Tạo Văn bản Dài
 Based on VieNeu-TTS infer_long_text.py strategy
 Dựa trên chiến lược VieNeu-TTS infer_long_text.py
 """
+import io
 import re
-from typing import List
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+# Abbreviations whose trailing "." does not end a sentence (case-sensitive)
+# Từ viết tắt có dấu "." không kết thúc câu (phân biệt hoa thường)
+VIETNAMESE_ABBREVIATIONS = frozenset({
+    "TP", "Tp", "TT", "Tt", "TX", "Ng", "Th", "Tr", "GS", "PGS", "TS", "ThS", "BS", "KS",
+    "CN", "ĐH", "THPT", "THCS", "UBND", "St", "Mr", "Mrs", "Ms", "Dr", "tr",
+})
+
+# Sentence-final punctuation plus any closing quotes/brackets that belong to it
+# Dấu kết câu cùng các dấu đóng ngoặc/nháy thuộc về câu đó
+_SENTENCE_END = re.compile(r"[\.\!\?\…。．！？]+[\"”’»\)\]]*(?=\s|$)")
+# Clause punctuation where an over-long sentence prefers to break
+# Dấu ngắt mệnh đề nơi câu quá dài ưu tiên ngắt
+_CLAUSE_END = re.compile(r"[,;:\u2013\u2014]$")
+
+# Text buffered before balancing, in multiples of max_chars / Văn bản đệm trước khi cân bằng, theo bội số max_chars
+_WINDOW_CHUNKS = 16
+
+
+class Sentence(NamedTuple):
+    """A sentence and where it sits / Một câu và vị trí của nó"""
+    text: str
+    paragraph_end: bool  # Last sentence of its paragraph / Câu cuối của đoạn
+    in_quote: bool  # A quotation is still open after it / Còn trích dẫn đang mở sau câu
+
+
+def _is_abbreviation(text: str, end: int) -> bool:
+    """Whether the "." ending at text[end - 1] belongs to an abbreviation / Dấu "." tại text[end - 1] có thuộc từ viết tắt không"""
+    start = end - 1
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    word = text[start:end - 1].lstrip("\"“‘«([")
+    if not word:
+        return False
+    if word in VIETNAMESE_ABBREVIATIONS:
+        return True
+    # Single-letter initials: "N. V. A." / Chữ cái viết tắt tên: "N. V. A."
+    return len(word) == 1 and word.isupper()
+
+
+def iter_sentences(paragraph: str, in_quote: bool = False) -> Iterator[Sentence]:
+    """
+    Split one paragraph into sentences / Chia một đoạn thành các câu
+
+    Abbreviations, initials and punctuation followed by a lowercase word do not end
+    a sentence; closing quotes stay with the sentence they close.
+    Từ viết tắt, chữ cái đầu tên và dấu câu theo sau bởi chữ thường không kết thúc
+    câu; dấu đóng nháy đi cùng câu mà nó đóng.
+
+    Args:
+        paragraph: Paragraph text / Văn bản đoạn
+        in_quote: Whether a quotation is open at the start / Có trích dẫn đang mở ở đầu không
+
+    Yields:
+        Sentences; the last one has paragraph_end=True / Các câu; câu cuối có paragraph_end=True
+    """
+    paragraph = " ".join(paragraph.split())
+    position = 0
+    pending = None
+    for match in _SENTENCE_END.finditer(paragraph):
+        end = match.end()
+        following = paragraph[end + 1:end + 2]
+        if following.islower():
+            continue
+        if paragraph[match.start():match.end()].rstrip("\"”’»)]") == "." and _is_abbreviation(paragraph, match.start() + 1):
+            continue
+        sentence = paragraph[position:end].strip()
+        position = end
+        if not sentence:
+            continue
+        for char in sentence:
+            if char == '"':
+                in_quote = not in_quote
+            elif char in "“«":
+                in_quote = True
+            elif char in "”»":
+                in_quote = False
+        if pending is not None:
+            yield pending
+        pending = Sentence(sentence, False, in_quote)
+    tail = paragraph[position:].strip()
+    if tail:
+        if pending is not None:
+            yield pending
+        pending = Sentence(tail, False, in_quote)
+    if pending is not None:
+        yield pending._replace(paragraph_end=True)
+
+
+def _iter_paragraphs(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Paragraphs separated by blank lines, read lazily / Các đoạn cách nhau bởi dòng trống, đọc dần"""
+    lines = io.StringIO(source) if isinstance(source, str) else source
+    buffer: List[str] = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            buffer.append(line)
+        elif buffer:
+            yield " ".join(buffer)
+            buffer = []
+    if buffer:
+        yield " ".join(buffer)
+
+
+def _balanced_partition(units: Sequence[str], max_chars: int, penalties: Sequence[float]) -> List[str]:
+    """
+    Join units into the fewest chunks <= max_chars with the most even lengths
+    Ghép các đơn vị thành ít chunk nhất <= max_chars với độ dài đều nhất
+
+    Dynamic programming over break positions minimizing (chunk count, sum of squared
+    deviations from the mean chunk length + break penalties).
+    Quy hoạch động trên vị trí ngắt, tối thiểu (số chunk, tổng bình phương độ lệch so
+    với độ dài chunk trung bình + phạt vị trí ngắt).
+
+    Args:
+        units: Sentences or words, each <= max_chars / Câu hoặc từ, mỗi đơn vị <= max_chars
+        max_chars: Maximum chunk length / Độ dài chunk tối đa
+        penalties: Cost of breaking after each unit / Chi phí ngắt sau mỗi đơn vị
+    """
+    count = len(units)
+    if count == 0:
+        return []
+    lengths = [len(unit) for unit in units]
+    total = sum(lengths) + count - 1
+    if total <= max_chars:
+        return [" ".join(units)]
+
+    # Fewest chunks (greedy is optimal for this) / Ít chunk nhất (tham lam là tối ưu cho việc này)
+    chunk_count, current = 1, -1
+    for length in lengths:
+        if current + 1 + length > max_chars:
+            chunk_count += 1
+            current = length
+        else:
+            current += 1 + length
+    target = (total - (chunk_count - 1)) / chunk_count
+
+    inf = (float("inf"), float("inf"))
+    best = [inf] * (count + 1)
+    back = [0] * (count + 1)
+    best[0] = (0, 0.0)
+    for end in range(1, count + 1):
+        width = -1
+        for start in range(end - 1, -1, -1):
+            width += lengths[start] + 1
+            if width > max_chars:
+                break
+            if best[start] == inf:
+                continue
+            penalty = penalties[end - 1] if end < count else 0.0
+            candidate = (best[start][0] + 1, best[start][1] + (width - target) ** 2 + penalty)
+            if candidate < best[end]:
+                best[end] = candidate
+                back[end] = start
+
+    chunks = []
+    end = count
+    while end > 0:
+        start = back[end]
+        chunks.append(" ".join(units[start:end]))
+        end = start
+    chunks.reverse()
+    return chunks
+
+
+def _split_long_sentence(sentence: str, max_chars: int) -> List[str]:
+    """Balanced word-level split of a sentence longer than max_chars / Chia câu dài hơn max_chars theo từ, cân bằng"""
+    words = []
+    for word in sentence.split():
+        # Hard-cut words longer than a chunk / Cắt cứng từ dài hơn một chunk
+        words.extend(word[i:i + max_chars] for i in range(0, len(word), max_chars))
+    # Prefer clause punctuation / Ưu tiên dấu ngắt mệnh đề
+    penalty = (0.1 * max_chars) ** 2
+    penalties = [0.0 if _CLAUSE_END.search(word) else penalty for word in words]
+    return _balanced_partition(words, max_chars, penalties)
+
+
+def _chunk_window(sentences: List[Sentence], max_chars: int) -> List[str]:
+    """Balanced chunks for a window of sentences / Các chunk cân bằng cho một cửa sổ câu"""
+    units: List[str] = []
+    penalties: List[float] = []
+    quote_penalty = (0.15 * max_chars) ** 2
+    for sentence in sentences:
+        if len(sentence.text) > max_chars:
+            pieces = _split_long_sentence(sentence.text, max_chars)
+            units.extend(pieces)
+            # Splitting inside a sentence costs more than at its end
+            # Ngắt trong câu tốn hơn ngắt ở cuối câu
+            penalties.extend([quote_penalty] * (len(pieces) - 1))
+        else:
+            units.append(sentence.text)
+        penalties.append(quote_penalty if sentence.in_quote and not sentence.paragraph_end else 0.0)
+    return _balanced_partition(units, max_chars, penalties)
+
+
+def iter_text_chunks(
+    source: Union[str, Iterable[str]],
+    max_chars: int = 256,
+    window_chars: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Stream length-balanced chunks no longer than max_chars.
+    Sinh dần các chunk cân bằng độ dài, không dài hơn max_chars.
+
+    Sentences are buffered up to window_chars (ending on a paragraph boundary when
+    possible) and each window is split into the fewest chunks with the most even
+    lengths, preferring not to break inside quotations. Works on a string or any
+    iterable of lines (e.g. an open file), so whole novels never need to be held
+    in memory as chunks.
+
+    Câu được đệm tới window_chars (kết thúc tại ranh giới đoạn khi có thể) và mỗi
+    cửa sổ được chia thành ít chunk nhất với độ dài đều nhất, hạn chế ngắt trong
+    trích dẫn. Dùng được với chuỗi hoặc bất kỳ iterable dòng nào (vd. file đang mở),
+    nên cả tiểu thuyết không cần giữ trong bộ nhớ dưới dạng chunk.
+
+    Args:
+        source: Text or iterable of lines / Văn bản hoặc iterable các dòng
+        max_chars: Maximum characters per chunk / Ký tự tối đa mỗi chunk
+        window_chars: Characters balanced together (default 16 * max_chars) / Số ký tự được cân bằng cùng nhau
+
+    Yields:
+        Text chunks / Các chunk văn bản
+    """
+    window_chars = window_chars or _WINDOW_CHUNKS * max_chars
+    window: List[Sentence] = []
+    buffered = 0
+    in_quote = False
+    for paragraph in _iter_paragraphs(source):
+        for sentence in iter_sentences(paragraph, in_quote):
+            in_quote = sentence.in_quote
+            window.append(sentence)
+            buffered += len(sentence.text) + 1
+            if buffered >= 2 * window_chars or (buffered >= window_chars and sentence.paragraph_end):
+                yield from _chunk_window(window, max_chars)
+                window, buffered = [], 0
+        # Paragraphs do not carry an unbalanced quote / Đoạn văn không mang theo nháy chưa đóng
+        in_quote = False
+    if window:
+        yield from _chunk_window(window, max_chars)
 
 
 def split_text_into_chunks(text: str, max_chars: int = 256) -> List[str]:
     """
-    Split raw text into chunks no longer than max_chars.
+    Split raw text into length-balanced chunks no longer than max_chars.
     Preference is given to sentence boundaries; otherwise falls back to word-based splitting.
     
-    Chia văn bản thô thành các chunk không dài hơn max_chars.
+    Chia văn bản thô thành các chunk cân bằng độ dài, không dài hơn max_chars.
     Ưu tiên chia tại ranh giới câu; nếu không thì chia theo từ.
     
     Args:
@@ -24,49 +264,7 @@ def split_text_into_chunks(text: str, max_chars: int = 256) -> List[str]:
     Returns:
         List of text chunks / Danh sách các chunk văn bản
     """
-    sentences = re.split(r"(?<=[\.\!\?\…。．！？])\s+", text.strip())
-    chunks: List[str] = []
-    buffer = ""
-
-    def flush_buffer():
-        nonlocal buffer
-        if buffer:
-            chunks.append(buffer.strip())
-            buffer = ""
-
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-
-        # If single sentence already fits, try to append to current buffer
-        # Nếu câu đơn lẻ đã vừa, thử thêm vào buffer hiện tại
-        if len(sentence) <= max_chars:
-            candidate = f"{buffer} {sentence}".strip() if buffer else sentence
-            if len(candidate) <= max_chars:
-                buffer = candidate
-            else:
-                flush_buffer()
-                buffer = sentence
-            continue
-
-        # Fallback: sentence too long, break by words
-        # Dự phòng: câu quá dài, chia theo từ
-        flush_buffer()
-        words = sentence.split()
-        current = ""
-        for word in words:
-            candidate = f"{current} {word}".strip() if current else word
-            if len(candidate) > max_chars and current:
-                chunks.append(current.strip())
-                current = word
-            else:
-                current = candidate
-        if current:
-            chunks.append(current.strip())
-
-    flush_buffer()
-    return [chunk for chunk in chunks if chunk]
+    return list(iter_text_chunks(text, max_chars=max_chars))
 
 
 def should_chunk_text(text: str, max_chars: int = 256) -> bool:
@@ -82,3 +280,66 @@ def should_chunk_text(text: str, max_chars: int = 256) -> bool:
     """
     return len(text) > max_chars
 
+
+
+# Dia speaker tags such as [01], [02], [S1] / Tag người nói Dia như [01], [02], [S1]
+_SPEAKER_TAG_PATTERN = re.compile(r"\[([^\[\]]{1,16})\]")
+
+
+def split_dia_text(text: str, max_chars: int = 256) -> List[str]:
+    """
+    Split Dia dialog text into chunks that each start with a speaker tag.
+    Chia văn bản hội thoại Dia thành các chunk, mỗi chunk bắt đầu bằng tag người nói.
+
+    Splits on speaker-tag and sentence boundaries (word boundaries only for
+    over-long sentences). Several short turns may share a chunk; a turn that
+    continues into the next chunk gets its speaker tag repeated, so every chunk
+    is voiced by the same speakers as in the full text.
+
+    Chia tại ranh giới tag người nói và câu (chỉ chia theo từ với câu quá dài).
+    Nhiều lượt ngắn có thể chung một chunk; lượt thoại kéo sang chunk sau được
+    lặp lại tag người nói, nên mỗi chunk được đọc bởi đúng người nói như văn bản gốc.
+
+    Args:
+        text: Input text, optionally with [tag] markers / Văn bản đầu vào, có thể có tag [tag]
+        max_chars: Maximum characters per chunk, tags included / Ký tự tối đa mỗi chunk, tính cả tag
+
+    Returns:
+        List of text chunks / Danh sách các chunk văn bản
+    """
+    # (tag, body) turns; text before the first tag has no tag
+    # Các lượt (tag, nội dung); phần trước tag đầu tiên không có tag
+    turns = []
+    position = 0
+    tag = None
+    for match in _SPEAKER_TAG_PATTERN.finditer(text):
+        body = text[position:match.start()].strip()
+        if body:
+            turns.append((tag, body))
+        tag = match.group(0)
+        position = match.end()
+    body = text[position:].strip()
+    if body:
+        turns.append((tag, body))
+
+    chunks: List[str] = []
+    current = ""
+    current_tag = None
+
+    for tag, body in turns:
+        prefix_len = len(tag) + 1 if tag else 0
+        for piece in split_text_into_chunks(body, max_chars=max(16, max_chars - prefix_len)):
+            if current and current_tag == tag:
+                candidate = f"{current} {piece}"
+            else:
+                candidate = f"{current} {tag} {piece}".strip() if tag else f"{current} {piece}".strip()
+            if len(candidate) <= max_chars or not current:
+                current = candidate
+            else:
+                chunks.append(current)
+                current = f"{tag} {piece}" if tag else piece
+            current_tag = tag
+
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,265 @@
+"""
+Preloaded Voice Registry for VieNeu-TTS
+Sổ đăng ký Giọng Tải trước cho VieNeu-TTS
+
+select_voice() checks two paths on disk per request and the API then opens and
+reads the reference .txt file. The registry does that once at startup: for each
+voice it keeps the audio path, the reference text and (once the model is loaded)
+the encoded reference, plus a precomputed alias table, so selecting a voice on
+the request path is a dictionary lookup with no filesystem access.
+
+A background watcher polls the sample directory and rebuilds the registry when a
+.wav/.txt file is added, changed or removed. Voices whose audio did not change keep
+their encoded reference.
+
+select_voice() kiểm tra hai đường dẫn trên disk mỗi request và API sau đó mở và
+đọc file .txt tham chiếu. Sổ đăng ký làm việc đó một lần khi khởi động: với mỗi
+giọng giữ đường dẫn audio, văn bản tham chiếu và (khi model đã tải) mã tham chiếu,
+cùng bảng bí danh tính sẵn, nên chọn giọng trên đường request chỉ là tra từ điển,
+không truy cập hệ thống file.
+
+Luồng theo dõi nền kiểm tra thư mục sample và xây lại sổ khi file .wav/.txt được
+thêm, sửa hoặc xóa. Giọng có audio không đổi giữ nguyên mã tham chiếu.
+"""
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .logging_utils import get_logger
+from .voice_selector import (
+    VOICE_SAMPLES, DEFAULT_MALE_VOICE, DEFAULT_FEMALE_VOICE, DEFAULT_VOICE,
+    get_sample_dir, detect_gender_from_text
+)
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RegisteredVoice:
+    """A voice ready for synthesis / Một giọng sẵn sàng để tổng hợp"""
+    voice_id: str
+    audio_path: str
+    ref_text: str
+    gender: str
+    accent: str
+    description: str
+    # (mtime_ns, size) of the audio file / (mtime_ns, size) của file audio
+    audio_signature: Tuple[int, int]
+    ref_codes: Any = None
+
+
+class VoiceRegistry:
+    """In-memory voices with hot reload / Giọng trong bộ nhớ với tải lại nóng"""
+
+    def __init__(self, sample_dir: Optional[Path] = None, watch_interval: float = 2.0):
+        """
+        Build the registry / Xây sổ đăng ký
+
+        Args:
+            sample_dir: Voice sample directory / Thư mục mẫu giọng
+            watch_interval: Seconds between directory checks (0 = no watcher) / Số giây giữa các lần kiểm tra thư mục (0 = không theo dõi)
+        """
+        self.sample_dir = Path(sample_dir or get_sample_dir())
+        self.watch_interval = watch_interval
+        self._voices: Dict[str, RegisteredVoice] = {}
+        self._aliases: Dict[str, RegisteredVoice] = {}
+        self._by_audio_path: Dict[str, RegisteredVoice] = {}
+        self._encoder: Optional[Callable[[str], Any]] = None
+        self._reload_lock = threading.Lock()
+        self._signature = None
+        self._stop = threading.Event()
+        self._watcher = None
+        self.reloads = 0
+        self.reload()
+
+    def _directory_signature(self) -> Tuple:
+        """(name, mtime_ns, size) of sample files / (tên, mtime_ns, kích thước) của file mẫu"""
+        try:
+            with os.scandir(self.sample_dir) as entries:
+                return tuple(sorted(
+                    (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                    for entry in entries
+                    if entry.is_file() and entry.name.endswith((".wav", ".txt"))
+                ))
+        except FileNotFoundError:
+            return ()
+
+    def reload(self) -> int:
+        """
+        Rebuild voices from the sample directory / Xây lại giọng từ thư mục mẫu
+
+        Returns:
+            Number of voices / Số giọng
+        """
+        with self._reload_lock:
+            signature = self._directory_signature()
+            previous = self._voices
+            voices: Dict[str, RegisteredVoice] = {}
+
+            # Known voices first, then any other id_*.wav with a matching .txt
+            # Giọng đã biết trước, sau đó các id_*.wav khác có .txt tương ứng
+            catalog = dict(VOICE_SAMPLES)
+            for name, _, _ in signature:
+                voice_id = name[:-4]
+                if name.endswith(".wav") and voice_id.startswith("id_") and voice_id not in catalog:
+                    catalog[voice_id] = {
+                        "audio": name, "text": f"{voice_id}.txt",
+                        "gender": "unknown", "accent": "unknown", "description": voice_id
+                    }
+
+            for voice_id, info in catalog.items():
+                audio_path = self.sample_dir / info["audio"]
+                text_path = self.sample_dir / info["text"]
+                try:
+                    stat = audio_path.stat()
+                    ref_text = text_path.read_text(encoding="utf-8")
+                except OSError:
+                    continue
+                voice = RegisteredVoice(
+                    voice_id=voice_id,
+                    audio_path=str(audio_path),
+                    ref_text=ref_text,
+                    gender=info["gender"],
+                    accent=info["accent"],
+                    description=info["description"],
+                    audio_signature=(stat.st_mtime_ns, stat.st_size),
+                )
+                old = previous.get(voice_id)
+                if old is not None and old.audio_signature == voice.audio_signature:
+                    voice.ref_codes = old.ref_codes
+                voices[voice_id] = voice
+
+            if self._encoder is not None:
+                self._encode(voices.values())
+
+            # Swap whole tables so readers never see a half-built registry
+            # Đổi cả bảng để luồng đọc không bao giờ thấy sổ đang xây dở
+            self._voices = voices
+            self._aliases = self._build_aliases(voices)
+            self._by_audio_path = {voice.audio_path: voice for voice in voices.values()}
+            self._signature = signature
+            self.reloads += 1
+        logger.info("Voice registry loaded %d voices from %s", len(voices), self.sample_dir)
+        return len(voices)
+
+    @staticmethod
+    def _build_aliases(voices: Dict[str, RegisteredVoice]) -> Dict[str, RegisteredVoice]:
+        """Every accepted voice name -> voice / Mọi tên giọng hợp lệ -> giọng"""
+        aliases = {voice_id: voice for voice_id, voice in voices.items()}
+        for names, voice_id in ((("male", "nam"), DEFAULT_MALE_VOICE), (("female", "nữ"), DEFAULT_FEMALE_VOICE)):
+            if voice_id in voices:
+                for name in names:
+                    aliases[name] = voices[voice_id]
+        return aliases
+
+    def _encode(self, voices):
+        """Encode references still missing codes / Mã hóa tham chiếu còn thiếu mã"""
+        for voice in voices:
+            if voice.ref_codes is None:
+                try:
+                    voice.ref_codes = self._encoder(voice.audio_path)
+                except Exception as e:
+                    logger.warning("Could not encode voice %s: %s", voice.voice_id, e)
+
+    def attach_encoder(self, encode_fn: Callable[[str], Any]):
+        """
+        Encode all voices now and every reloaded voice later / Mã hóa mọi giọng ngay và mọi giọng được tải lại sau này
+
+        Args:
+            encode_fn: Audio path -> reference codes / Đường dẫn audio -> mã tham chiếu
+        """
+        with self._reload_lock:
+            self._encoder = encode_fn
+            self._encode(self._voices.values())
+        logger.info("Encoded references for %d voices", sum(v.ref_codes is not None for v in self._voices.values()))
+
+    def ref_codes_for(self, audio_path: str) -> Any:
+        """Encoded reference of a registered audio path, or None / Mã tham chiếu của đường dẫn đã đăng ký, hoặc None"""
+        voice = self._by_audio_path.get(audio_path)
+        return voice.ref_codes if voice is not None else None
+
+    def select(self, voice: Optional[str] = None, auto_voice: bool = False, text: Optional[str] = None) -> RegisteredVoice:
+        """
+        Select a voice (same rules as select_voice, no filesystem access)
+        Chọn giọng (cùng quy tắc như select_voice, không truy cập hệ thống file)
+
+        Args:
+            voice: "male"/"female", voice ID, description fragment or None / "male"/"female", ID giọng, một phần mô tả hoặc None
+            auto_voice: Auto-detect gender from text / Tự động phát hiện giới tính từ văn bản
+            text: Input text for auto-detection / Văn bản đầu vào để tự động phát hiện
+
+        Raises:
+            FileNotFoundError: No voice could be loaded / Không tải được giọng nào
+        """
+        aliases = self._aliases
+        if auto_voice and text:
+            voice = detect_gender_from_text(text)
+        selected = None
+        if voice:
+            selected = aliases.get(voice) or aliases.get(voice.lower())
+            if selected is None and not voice.lower().startswith("id_"):
+                # Partial description match (rare path) / Khớp một phần mô tả (đường hiếm)
+                voice_lower = voice.lower()
+                for candidate in self._voices.values():
+                    if voice_lower in candidate.description.lower() or voice_lower == candidate.gender:
+                        selected = candidate
+                        break
+        if selected is None:
+            selected = aliases.get(DEFAULT_VOICE) or next(iter(self._voices.values()), None)
+        if selected is None:
+            raise FileNotFoundError(f"No voice samples found in {self.sample_dir}")
+        return selected
+
+    def list_voices(self) -> Dict[str, Dict[str, Any]]:
+        """Registered voices (API listing) / Các giọng đã đăng ký (danh sách API)"""
+        return {
+            voice_id: {
+                "gender": voice.gender,
+                "accent": voice.accent,
+                "description": voice.description,
+                "encoded": voice.ref_codes is not None,
+            }
+            for voice_id, voice in self._voices.items()
+        }
+
+    def start_watching(self):
+        """Start the sample-directory watcher / Khởi động luồng theo dõi thư mục mẫu"""
+        if self.watch_interval <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch_loop, name="voice-registry-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch_loop(self):
+        """Reload when sample files change / Tải lại khi file mẫu thay đổi"""
+        while not self._stop.wait(self.watch_interval):
+            try:
+                if self._directory_signature() != self._signature:
+                    logger.info("Voice samples changed, reloading registry")
+                    self.reload()
+            except Exception as e:
+                logger.warning("Voice registry reload failed: %s", e)
+
+    def shutdown(self):
+        """Stop the watcher / Dừng luồng theo dõi"""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+
+
+# Global registry instance / Instance sổ đăng ký toàn cục
+_registry_instance: Optional[VoiceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_voice_registry() -> VoiceRegistry:
+    """Get global voice registry (watcher started) / Lấy sổ đăng ký giọng toàn cục (đã bật theo dõi)"""
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                from .config import VOICE_REGISTRY_WATCH_SECONDS
+                _registry_instance = VoiceRegistry(watch_interval=VOICE_REGISTRY_WATCH_SECONDS)
+                _registry_instance.start_watching()
+    return _registry_instance
@@ -74,6 +74,33 @@ def get_sample_dir() -> Path:
     return Path(__file__).parent.parent.parent.parent / "tts" / "VieNeu-TTS" / "sample"
 
 
+# Gender indicators, compiled once at import / Chỉ số giới tính, biên dịch một lần khi import
+# Vietnamese female indicators / Chỉ số nữ tính trong tiếng Việt
+_FEMALE_PATTERNS = [re.compile(pattern) for pattern in (
+    # Pronouns / Đại từ
+    r'\b(cô|bà|chị|em gái|chị gái|cô gái|bạn gái|người phụ nữ|phụ nữ)\b',
+    # Common female names (examples) / Tên nữ phổ biến (ví dụ)
+    r'\b(linh|mai|lan|hương|ngọc|oanh|thảo|trang|phương|vy|my|anh thư)\b',
+    # Female-specific words / Từ chỉ nữ
+    r'\b(công chúa|hoàng hậu|nữ hoàng|thiếu nữ)\b',
+)]
+
+# Vietnamese male indicators / Chỉ số nam tính trong tiếng Việt
+_MALE_PATTERNS = [re.compile(pattern) for pattern in (
+    # Pronouns / Đại từ
+    r'\b(ông|anh|em trai|anh trai|con trai|bạn trai|người đàn ông|đàn ông)\b',
+    # Common male names (examples) / Tên nam phổ biến (ví dụ)
+    r'\b(minh|hùng|dũng|nam|long|tuấn|khôi|phúc|đức|kiên|hoàng)\b',
+    # Male-specific words / Từ chỉ nam
+    r'\b(hoàng tử|vua|nam nhi|tráng sĩ)\b',
+)]
+
+_FIRST_PERSON_PATTERN = re.compile(r'\b(tôi|tao|tớ|mình|ta)\b')
+_FEMALE_CONTEXT_PATTERN = re.compile(r'\b(nữ|phụ nữ|gái)\b')
+_MALE_CONTEXT_PATTERN = re.compile(r'\b(nam|đàn ông|trai)\b')
+_DIALOGUE_PATTERN = re.compile(r'[.!?]\s*["\']')
+
+
 def detect_gender_from_text(text: str) -> Literal["male", "female"]:
     """
     Detect gender preference from text content (simple heuristic)
@@ -90,36 +117,16 @@ def detect_gender_from_text(text: str) -> Literal["male", "female"]:
     """
     text_lower = text.lower()
     
-    # Vietnamese female indicators / Chỉ số nữ tính trong tiếng Việt
-    female_indicators = [
-        # Pronouns / Đại từ
-        r'\b(cô|bà|chị|em gái|chị gái|cô gái|bạn gái|người phụ nữ|phụ nữ)\b',
-        # Common female names (examples) / Tên nữ phổ biến (ví dụ)
-        r'\b(linh|mai|lan|hương|ngọc|oanh|thảo|trang|phương|vy|my|anh thư)\b',
-        # Female-specific words / Từ chỉ nữ
-        r'\b(công chúa|hoàng hậu|nữ hoàng|thiếu nữ)\b',
-    ]
-    
-    # Vietnamese male indicators / Chỉ số nam tính trong tiếng Việt
-    male_indicators = [
-        # Pronouns / Đại từ
-        r'\b(ông|anh|em trai|anh trai|con trai|bạn trai|người đàn ông|đàn ông)\b',
-        # Common male names (examples) / Tên nam phổ biến (ví dụ)
-        r'\b(minh|hùng|dũng|nam|long|tuấn|khôi|phúc|đức|kiên|hoàng)\b',
-        # Male-specific words / Từ chỉ nam
-        r'\b(hoàng tử|vua|nam nhi|tráng sĩ)\b',
-    ]
-    
     # Count matches / Đếm số lần khớp
-    female_score = sum(1 for pattern in female_indicators if re.search(pattern, text_lower))
-    male_score = sum(1 for pattern in male_indicators if re.search(pattern, text_lower))
+    female_score = sum(1 for pattern in _FEMALE_PATTERNS if pattern.search(text_lower))
+    male_score = sum(1 for pattern in _MALE_PATTERNS if pattern.search(text_lower))
     
     # First-person pronouns / Đại từ ngôi thứ nhất
-    if re.search(r'\b(tôi|tao|tớ|mình|ta)\b', text_lower):
+    if _FIRST_PERSON_PATTERN.search(text_lower):
         # Check context for gender markers / Kiểm tra ngữ cảnh cho dấu hiệu giới tính
-        if re.search(r'\b(nữ|phụ nữ|gái)\b', text_lower):
+        if _FEMALE_CONTEXT_PATTERN.search(text_lower):
             female_score += 2
-        elif re.search(r'\b(nam|đàn ông|trai)\b', text_lower):
+        elif _MALE_CONTEXT_PATTERN.search(text_lower):
             male_score += 2
     
     # Determine gender based on scores / Xác định giới tính dựa trên điểm số
@@ -130,7 +137,7 @@ def detect_gender_from_text(text: str) -> Literal["male", "female"]:
     else:
         # Default to female for narration, male for dialogue (heuristic)
         # Mặc định nữ cho kể chuyện, nam cho đối thoại (heuristic)
-        if re.search(r'[.!?]\s*["\']', text):  # Dialogue markers / Dấu hiệu đối thoại
+        if _DIALOGUE_PATTERN.search(text):  # Dialogue markers / Dấu hiệu đối thoại
             return "male"
         else:
             return "female"  # Default to female for general narration